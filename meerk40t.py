@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 
 
+import multiprocessing
 import re
 import sys
 from meerk40t import main
 
 if __name__ == "__main__":
+    # Frozen builds must not relaunch the application in worker processes.
+    multiprocessing.freeze_support()
     sys.argv[0] = re.sub(r"(-script\.pyw|\.exe)?$", "", sys.argv[0])
     sys.exit(main.run())
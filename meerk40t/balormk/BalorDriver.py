@@ -545,6 +545,7 @@ class BalorDriver(Parameters):
         self.connect_if_needed()
         self.paused = False
         self.connection.raw_restart_list()
+        self.service.spooler.wake()
 
     def reset(self):
         """
@@ -0,0 +1,592 @@
+"""
+The MeerK40t binary project format stores a project as:
+
+    preamble: magic b"MK4B", version (uint16), reserved (uint16), header length (uint32)
+    header:   utf-8 json of the note, the operations and flat lists of node records.
+    data:     8-byte aligned section of the node geometry as packed little-endian
+              float64 arrays and of the images as embedded PNG.
+
+Node records refer to their parent by index and to their geometry and images by
+(offset, length) in the data section, so the header stays small and the geometry is
+never converted to or parsed from text. Every record also keeps the settings of its
+node, such as labels and image processing attributes.
+
+Loading is lazy: path geometry is decoded into segments on first use and images are
+only decoded by PIL when their pixels are first read.
+"""
+
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from io import BytesIO
+
+from meerk40t.core.exceptions import BadFileError
+
+from ..svgelements import (
+    Arc,
+    Close,
+    Color,
+    CubicBezier,
+    Ellipse,
+    Line,
+    Matrix,
+    Move,
+    Path,
+    Polygon,
+    Polyline,
+    QuadraticBezier,
+    Rect,
+    SimpleLine,
+    SVGText,
+)
+
+
+def plugin(kernel, lifecycle=None):
+    if lifecycle == "register":
+        kernel.register("load/BinaryLoader", BinaryLoader)
+        kernel.register("save/BinaryWriter", BinaryWriter)
+
+
+BINARY_MAGIC = b"MK4B"
+BINARY_VERSION = 1
+PREAMBLE = struct.Struct("<4sHHI")
+
+SEGMENT_MOVE = 0
+SEGMENT_LINE = 1
+SEGMENT_CLOSE = 2
+SEGMENT_QUAD = 3
+SEGMENT_CUBIC = 4
+SEGMENT_ARC = 5
+
+_NAN = float("nan")
+
+
+def _point(p):
+    if p is None:
+        return _NAN, _NAN
+    return p[0], p[1]
+
+
+def _color(color):
+    if color is None or color.value is None:
+        return None
+    return color.hexa
+
+
+def _matrix(matrix):
+    if matrix is None:
+        return None
+    return [matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f]
+
+
+def _setting(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_setting(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _setting(v) for k, v in value.items()}
+    return str(value)
+
+
+def _settings(node):
+    settings = dict()
+    for key, value in getattr(node, "settings", dict()).items():
+        if not key or key == "references":
+            continue
+        settings[key] = _setting(value)
+    return settings
+
+
+def _values(geometry):
+    values = array("d")
+    values.frombytes(geometry)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class BinaryPath(Path):
+    """
+    Path of a binary project, its segments are decoded from the packed geometry on
+    first use.
+    """
+
+    def __init__(self, geometry=None, *args, **kwargs):
+        Path.__init__(self, *args, **kwargs)
+        self._geometry = geometry
+
+    @property
+    def _segments(self):
+        geometry = getattr(self, "_geometry", None)
+        if geometry is not None:
+            self._geometry = None
+            self._segment_list.extend(BinaryProcessor._segments(_values(geometry)))
+        return self._segment_list
+
+    @_segments.setter
+    def _segments(self, segments):
+        self._geometry = None
+        self._segment_list = segments
+
+
+class BinaryWriter:
+    @staticmethod
+    def save_types():
+        yield "MeerK40t Binary Project", "mkb", "application/x-meerk40t-binary"
+
+    @staticmethod
+    def versions():
+        yield "default"
+
+    @staticmethod
+    def save(context, f, version="default"):
+        elements = context.elements
+        elements.validate_ids()
+        writer = BinaryWriter()
+        for node in elements._tree.children:
+            if node.type == "branch ops":
+                for op in node.children:
+                    writer.write_operation(op)
+            elif node.type == "branch elems":
+                writer.write_elements(node, writer.elements, -1)
+            elif node.type == "branch reg":
+                writer.write_elements(node, writer.regmarks, -1)
+        header = {
+            "note": elements.note,
+            "operations": writer.operations,
+            "elements": writer.elements,
+            "regmarks": writer.regmarks,
+        }
+        if isinstance(f, str):
+            with open(f, "wb") as stream:
+                writer.write(stream, header)
+        else:
+            writer.write(f, header)
+
+    def __init__(self):
+        self.operations = list()
+        self.elements = list()
+        self.regmarks = list()
+        self.data = list()
+        self.data_length = 0
+
+    def write(self, stream, header):
+        """
+        Writes the preamble, header and data section to the given binary stream.
+
+        @param stream: binary stream
+        @param header: header dictionary
+        @return:
+        """
+        header = json.dumps(header, separators=(",", ":")).encode("utf8")
+        header += b" " * (-(PREAMBLE.size + len(header)) % 8)
+        stream.write(PREAMBLE.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(header)))
+        stream.write(header)
+        for data in self.data:
+            stream.write(data)
+
+    def _add_data(self, data):
+        offset = self.data_length
+        data = bytes(data)
+        data += b"\x00" * (-len(data) % 8)
+        self.data.append(data)
+        self.data_length += len(data)
+        return offset
+
+    def _add_geometry(self, values):
+        geometry = array("d", values)
+        if sys.byteorder == "big":
+            geometry.byteswap()
+        return [self._add_data(geometry.tobytes()), len(geometry)]
+
+    def write_operation(self, node):
+        settings = _settings(node)
+        references = list()
+        for c in node.children:
+            ref = getattr(c, "node", c)
+            if ref.id is not None:
+                references.append(ref.id)
+        self.operations.append(
+            {
+                "type": node.type,
+                "id": node.id,
+                "settings": settings,
+                "references": references,
+            }
+        )
+
+    def write_elements(self, branch, records, parent):
+        """
+        Writes the nodes below the branch as flat records in the given list.
+
+        @param branch: node whose children are written.
+        @param records: list of records
+        @param parent: index of the parent record, -1 is the branch itself.
+        @return:
+        """
+        for c in branch.children:
+            record = {"type": c.type, "id": c.id, "parent": parent}
+            if c.type in ("group", "file"):
+                record["type"] = "group"
+                records.append(record)
+                self.write_elements(c, records, len(records) - 1)
+                continue
+            record["settings"] = _settings(c)
+            if c.type == "elem path":
+                record["geometry"] = self._add_geometry(self._path_values(c.path))
+            elif c.type == "elem rect":
+                shape = c.shape
+                record["geometry"] = self._add_geometry(
+                    (shape.x, shape.y, shape.width, shape.height, shape.rx, shape.ry)
+                )
+            elif c.type == "elem ellipse":
+                shape = c.shape
+                record["geometry"] = self._add_geometry(
+                    (shape.cx, shape.cy, shape.rx, shape.ry)
+                )
+            elif c.type == "elem line":
+                shape = c.shape
+                record["geometry"] = self._add_geometry(
+                    (shape.x1, shape.y1, shape.x2, shape.y2)
+                )
+            elif c.type == "elem polyline":
+                shape = c.shape
+                record["closed"] = isinstance(shape, Polygon)
+                values = list()
+                for p in shape.points:
+                    values.extend(_point(p))
+                record["geometry"] = self._add_geometry(values)
+            elif c.type == "elem image":
+                stream = BytesIO()
+                c.image.save(stream, format="PNG")
+                png = stream.getvalue()
+                record["png"] = [self._add_data(png), len(png)]
+                record["size"] = list(c.image.size)
+                record["matrix"] = _matrix(c.matrix)
+                for attr in ("dpi", "overscan", "direction", "step_x", "step_y"):
+                    record[attr] = _setting(getattr(c, attr, None))
+                records.append(record)
+                continue
+            elif c.type == "elem text":
+                if hasattr(c, "wxfont"):
+                    # The svg attributes may lag behind the wxfont.
+                    from meerk40t.core.fonts import wxfont_to_svg
+
+                    wxfont_to_svg(c)
+                text = c.text
+                record["text"] = text.text
+                for attr in (
+                    "font_family",
+                    "font_face",
+                    "font_size",
+                    "font_weight",
+                    "anchor",
+                    "x",
+                    "y",
+                ):
+                    record[attr] = _setting(getattr(text, attr, None))
+                record["font_style"] = getattr(c, "font_style", None)
+            else:
+                # Unknown elements are stored by their settings alone.
+                records.append(record)
+                continue
+            record["matrix"] = _matrix(c.matrix)
+            record["stroke"] = _color(c.stroke)
+            record["fill"] = _color(c.fill)
+            record["stroke_width"] = c.stroke_width
+            records.append(record)
+
+    @staticmethod
+    def _path_values(path):
+        values = list()
+        for seg in path:
+            if isinstance(seg, Move):
+                values.append(SEGMENT_MOVE)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.end))
+            elif isinstance(seg, Close):
+                values.append(SEGMENT_CLOSE)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.end))
+            elif isinstance(seg, Line):
+                values.append(SEGMENT_LINE)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.end))
+            elif isinstance(seg, QuadraticBezier):
+                values.append(SEGMENT_QUAD)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.control))
+                values.extend(_point(seg.end))
+            elif isinstance(seg, CubicBezier):
+                values.append(SEGMENT_CUBIC)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.control1))
+                values.extend(_point(seg.control2))
+                values.extend(_point(seg.end))
+            elif isinstance(seg, Arc):
+                values.append(SEGMENT_ARC)
+                values.extend(_point(seg.start))
+                values.extend(_point(seg.end))
+                values.extend(_point(seg.center))
+                values.extend(_point(seg.prx))
+                values.extend(_point(seg.pry))
+                values.append(seg.sweep)
+        return values
+
+
+class BinaryProcessor:
+    """
+    Reads a memory mapped binary project into the elements tree.
+
+    The header is parsed once and each node copies its geometry and image out of the
+    mapped data section. Paths decode their segments and PIL decodes the image pixels
+    on first use.
+    """
+
+    GEOMETRY_TYPES = (
+        "elem path",
+        "elem rect",
+        "elem ellipse",
+        "elem line",
+        "elem polyline",
+        "elem text",
+    )
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.element_list = list()
+        self.regmark_list = list()
+        self.pathname = None
+        self.data = None
+        self.data_offset = 0
+
+    def process(self, data, pathname):
+        self.pathname = pathname
+        self.data = data
+        if len(data) < PREAMBLE.size:
+            raise BadFileError("File is too short.")
+        magic, version, reserved, header_length = PREAMBLE.unpack_from(data, 0)
+        if magic != BINARY_MAGIC:
+            raise BadFileError("Not a MeerK40t binary project.")
+        if version > BINARY_VERSION:
+            raise BadFileError("Unsupported binary project version %d." % version)
+        self.data_offset = PREAMBLE.size + header_length
+        try:
+            header = json.loads(
+                bytes(data[PREAMBLE.size : self.data_offset]).decode("utf8")
+            )
+        except ValueError as e:
+            raise BadFileError(str(e)) from e
+
+        note = header.get("note")
+        if note is not None:
+            self.elements.note = note
+            self.elements.signal("note", self.pathname)
+
+        context_node = self.elements.get(type="branch elems")
+        file_node = context_node.add(type="file", filepath=pathname)
+        file_node.focus()
+        self.parse(header.get("elements", ()), file_node, self.element_list)
+        self.parse(
+            header.get("regmarks", ()), self.elements.reg_branch, self.regmark_list
+        )
+
+        operations = header.get("operations")
+        requires_classification = True
+        if operations:
+            self.elements.clear_operations()
+            nodes = dict()
+            for e in self.element_list:
+                if e.id is not None:
+                    nodes[e.id] = e
+            for record in operations:
+                op = self.elements.op_branch.add(type=record["type"])
+                op.settings.update(record.get("settings", dict()))
+                try:
+                    op.validate()
+                except AttributeError:
+                    pass
+                op.id = record.get("id")
+                for ref in record.get("references", ()):
+                    e = nodes.get(ref)
+                    if e is not None:
+                        requires_classification = False
+                        op.add_reference(e)
+        if requires_classification:
+            self.elements.classify(self.element_list)
+
+    def geometry(self, record):
+        offset, count = record["geometry"]
+        start = self.data_offset + offset
+        return self.data[start : start + 8 * count]
+
+    def parse(self, records, context_node, e_list):
+        nodes = list()
+        for record in records:
+            parent = record.get("parent", -1)
+            parent_node = context_node if parent < 0 else nodes[parent]
+            node = self.parse_record(record, parent_node)
+            nodes.append(node)
+            if node is not None and node.type != "group":
+                e_list.append(node)
+
+    def parse_record(self, record, context_node):
+        node = self.parse_node(record, context_node)
+        settings = record.get("settings")
+        if node is not None and settings and node.type != "group":
+            node.settings.update(settings)
+            try:
+                node.validate()
+            except AttributeError:
+                pass
+        return node
+
+    def parse_node(self, record, context_node):
+        node_type = record["type"]
+        ident = record.get("id")
+        if node_type == "group":
+            return context_node.add(type="group", id=ident)
+        if node_type == "elem image":
+            from PIL import Image
+
+            offset, length = record["png"]
+            start = self.data_offset + offset
+            image = Image.open(BytesIO(self.data[start : start + length]))
+            node = context_node.add(
+                image=image,
+                matrix=Matrix(*record["matrix"]) if record.get("matrix") else Matrix(),
+                type="elem image",
+                id=ident,
+            )
+            for attr in ("dpi", "overscan", "direction", "step_x", "step_y"):
+                if record.get(attr) is not None:
+                    setattr(node, attr, record[attr])
+            return node
+        if node_type not in self.GEOMETRY_TYPES:
+            return context_node.add(type=node_type, id=ident)
+
+        matrix = Matrix(*record["matrix"]) if record.get("matrix") else Matrix()
+        stroke = Color(record["stroke"]) if record.get("stroke") is not None else None
+        fill = Color(record["fill"]) if record.get("fill") is not None else None
+        stroke_width = record.get("stroke_width")
+        if node_type == "elem text":
+            text = SVGText(record.get("text", ""))
+            for attr in (
+                "font_family",
+                "font_face",
+                "font_size",
+                "font_weight",
+                "anchor",
+                "x",
+                "y",
+            ):
+                if record.get(attr) is not None:
+                    setattr(text, attr, record[attr])
+            element = text
+        elif node_type == "elem path":
+            element = BinaryPath(self.geometry(record))
+        elif node_type == "elem rect":
+            element = Rect(*_values(self.geometry(record)))
+        elif node_type == "elem ellipse":
+            element = Ellipse(*_values(self.geometry(record)))
+        elif node_type == "elem line":
+            element = SimpleLine(*_values(self.geometry(record)))
+        elif node_type == "elem polyline":
+            values = _values(self.geometry(record))
+            points = [(values[i], values[i + 1]) for i in range(0, len(values), 2)]
+            if record.get("closed"):
+                element = Polygon(points)
+            else:
+                element = Polyline(points)
+        element.transform = matrix
+        element.stroke = stroke
+        element.fill = fill
+        element.stroke_width = stroke_width
+        if node_type == "elem text":
+            node = context_node.add(text=element, type=node_type, id=ident)
+            if record.get("font_style") is not None:
+                node.font_style = record["font_style"]
+            try:
+                from meerk40t.core.fonts import svgfont_to_wx
+            except ImportError:
+                pass
+            else:
+                svgfont_to_wx(node)
+        elif node_type == "elem path":
+            node = context_node.add(path=element, type=node_type, id=ident)
+        else:
+            node = context_node.add(shape=element, type=node_type, id=ident)
+        return node
+
+    @staticmethod
+    def _segments(values):
+        def point(i):
+            x = values[i]
+            if math.isnan(x):
+                return None
+            return x, values[i + 1]
+
+        segments = list()
+        i = 0
+        length = len(values)
+        while i < length:
+            code = values[i]
+            if code == SEGMENT_MOVE:
+                segments.append(Move(point(i + 1), point(i + 3)))
+                i += 5
+            elif code == SEGMENT_LINE:
+                segments.append(Line(point(i + 1), point(i + 3)))
+                i += 5
+            elif code == SEGMENT_CLOSE:
+                segments.append(Close(point(i + 1), point(i + 3)))
+                i += 5
+            elif code == SEGMENT_QUAD:
+                segments.append(
+                    QuadraticBezier(point(i + 1), point(i + 3), point(i + 5))
+                )
+                i += 7
+            elif code == SEGMENT_CUBIC:
+                segments.append(
+                    CubicBezier(point(i + 1), point(i + 3), point(i + 5), point(i + 7))
+                )
+                i += 9
+            elif code == SEGMENT_ARC:
+                segments.append(
+                    Arc(
+                        point(i + 1),
+                        point(i + 3),
+                        point(i + 5),
+                        point(i + 7),
+                        point(i + 9),
+                        values[i + 11],
+                    )
+                )
+                i += 12
+            else:
+                raise BadFileError("Unknown path segment %d." % code)
+        return segments
+
+
+class BinaryLoader:
+    @staticmethod
+    def load_types():
+        yield "MeerK40t Binary Project", ("mkb",), "application/x-meerk40t-binary"
+
+    @staticmethod
+    def load(context, elements_modifier, pathname, **kwargs):
+        with open(pathname, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                # Empty files cannot be mapped.
+                raise BadFileError(str(e)) from e
+            try:
+                processor = BinaryProcessor(elements_modifier)
+                processor.process(data, pathname)
+            finally:
+                data.close()
+        return True
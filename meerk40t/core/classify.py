@@ -0,0 +1,101 @@
+"""
+The classification index finds the operations an element is classified into without testing the element against
+every operation. Operations are indexed by their color and type, once per classify call, and operations created
+during the classification are added to the index as they are made. The matches are the same, and in the same order,
+as testing every operation in turn.
+"""
+
+from ..svgelements import Color
+
+VECTOR_OPERATIONS = ("op engrave", "op cut", "op hatch")
+
+
+def color_key(color):
+    """
+    Key of the color, two colors are equal if their keys are equal.
+    """
+    if isinstance(color, str):
+        color = Color(color)
+    if isinstance(color, Color):
+        color = color.value
+    if color is None:
+        return None
+    return color & 0xFFFFFFFF
+
+
+class ClassificationIndex:
+    """
+    Index of the operations elements are classified into, by color and type.
+
+    Raster operations take elements whose stroke is their color, or any stroked element if they are default, and any
+    image, text or filled element. Engrave, cut and hatch operations take elements whose stroke is their color, or
+    any element if they are default. The first image operation takes images and the first dots operation takes
+    points, and no operation after these takes those elements.
+    """
+
+    def __init__(self, operations=()):
+        self.count = 0
+        self.colors = dict()
+        self.rasters = list()
+        self.default_rasters = list()
+        self.default_vectors = list()
+        self.first_image = None
+        self.first_dots = None
+        for op in operations:
+            self.add(op)
+
+    def add(self, op):
+        """
+        Add the operation to the index, after every operation added before.
+        """
+        entry = (self.count, op)
+        self.count += 1
+        op_type = op.type
+        if op_type == "op raster":
+            self.rasters.append(entry)
+            if op.default:
+                self.default_rasters.append(entry)
+            self.colors.setdefault(color_key(op.color), list()).append(entry)
+        elif op_type in VECTOR_OPERATIONS:
+            if op.default:
+                self.default_vectors.append(entry)
+            self.colors.setdefault(color_key(op.color), list()).append(entry)
+        elif op_type == "op image":
+            if self.first_image is None:
+                self.first_image = entry
+        elif op_type == "op dots":
+            if self.first_dots is None:
+                self.first_dots = entry
+
+    def matches(self, node):
+        """
+        Operations the node is classified into, in the order of the operations.
+
+        @param node: element node.
+        @return: list of operations
+        """
+        node_type = node.type
+        stroke = getattr(node, "stroke", None)
+        fill = getattr(node, "fill", None)
+        found = dict(self.default_vectors)
+        if (
+            node_type in ("elem image", "elem text")
+            or fill is not None
+            and fill.argb is not None
+        ):
+            found.update(self.rasters)
+        elif stroke is not None:
+            found.update(self.default_rasters)
+        if stroke is not None:
+            found.update(self.colors.get(color_key(stroke), ()))
+        last = None
+        if node_type == "elem image":
+            last = self.first_image
+        elif node_type == "elem point":
+            last = self.first_dots
+        if last is not None:
+            # Nothing after the first image or dots operation is matched.
+            position, op = last
+            found = {p: o for p, o in found.items() if p < position}
+            found[position] = op
+        return [found[position] for position in sorted(found)]
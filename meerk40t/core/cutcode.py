@@ -1,10 +1,14 @@
 from abc import ABC
+from array import array
+from collections import OrderedDict
+from math import sqrt
+from threading import Lock
 from typing import Optional
 
 from ..svgelements import Color, Path, Point
 from ..tools.rasterplotter import RasterPlotter
 from ..tools.zinglplotter import ZinglPlotter
-from .parameters import Parameters
+from .parameters import BaseParameters, Parameters
 
 """
 Cutcode is a list of cut objects. These are line, quad, cubic, arc, and raster. And anything else that should be
@@ -20,14 +24,183 @@ are references to settings which may be shared by all CutObjects created by a La
 
 MILS_IN_MM = 39.3701
 
+# Gauss-Legendre 8 point abscissas and weights over [0, 1].
+_GAUSS_LEGENDRE = [
+    ((1 + x) / 2.0, w / 2.0)
+    for x, w in (
+        (-0.9602898564975363, 0.1012285362903763),
+        (-0.7966664774136267, 0.2223810344533745),
+        (-0.5255324099163290, 0.3137066458778873),
+        (-0.1834346424956498, 0.3626837833783620),
+        (0.1834346424956498, 0.3626837833783620),
+        (0.5255324099163290, 0.3137066458778873),
+        (0.7966664774136267, 0.2223810344533745),
+        (0.9602898564975363, 0.1012285362903763),
+    )
+]
+
+
+def bezier_length(points, error=1e-4, depth=12):
+    """
+    Arc length of the bezier curve with the given control points, by adaptive
+    Gauss-Legendre quadrature of the speed of the curve.
+
+    @param points: 3 or 4 control points
+    @param error: relative error
+    @param depth: maximum depth of subdivision
+    @return: length of the curve
+    """
+    # Control points of the derivative curve.
+    n = len(points) - 1
+    d = [
+        (n * (b[0] - a[0]), n * (b[1] - a[1])) for a, b in zip(points, points[1:])
+    ]
+    if n == 2:
+
+        def speed(t):
+            e = 1.0 - t
+            return sqrt(
+                (e * d[0][0] + t * d[1][0]) ** 2 + (e * d[0][1] + t * d[1][1]) ** 2
+            )
+
+    else:
+
+        def speed(t):
+            e = 1.0 - t
+            b0 = e * e
+            b1 = 2 * e * t
+            b2 = t * t
+            return sqrt(
+                (b0 * d[0][0] + b1 * d[1][0] + b2 * d[2][0]) ** 2
+                + (b0 * d[0][1] + b1 * d[1][1] + b2 * d[2][1]) ** 2
+            )
+
+    def integrate(t0, t1):
+        span = t1 - t0
+        return span * sum(w * speed(t0 + span * x) for x, w in _GAUSS_LEGENDRE)
+
+    total = 0.0
+    stack = [(0.0, 1.0, integrate(0.0, 1.0), 0)]
+    while stack:
+        t0, t1, whole, level = stack.pop()
+        mid = (t0 + t1) / 2.0
+        left = integrate(t0, mid)
+        right = integrate(mid, t1)
+        if level >= depth or abs(left + right - whole) <= error * (left + right):
+            total += left + right
+            continue
+        stack.append((t0, mid, left, level + 1))
+        stack.append((mid, t1, right, level + 1))
+    return total
+
+
+class PlotCache:
+    """
+    Memory bounded LRU cache of the plotted steps of curve cuts. Steps are stored as flat
+    arrays of x, y values in the forward direction of the curve, keyed by its geometry,
+    so reversed cuts, copies of cuts and multiple passes share the same steps.
+
+    The cache is shared by the threads planning and plotting cutcode, it is changed under
+    a lock. Steps are plotted outside the lock.
+    """
+
+    def __init__(self, max_size=32 * 1048576):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def entry_size(steps):
+        return len(steps) * steps.itemsize + 200
 
-class CutObject(Parameters):
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def steps(self, key, plotter):
+        """
+        Flat array of the x, y steps for the key, plotted by plotter() if not cached.
+        """
+        with self._lock:
+            steps = self._entries.get(key)
+            if steps is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return steps
+            self.misses += 1
+        steps = array("q")
+        for x, y in plotter():
+            steps.append(int(x))
+            steps.append(int(y))
+        size = self.entry_size(steps)
+        if size > self.max_size:
+            return steps
+        with self._lock:
+            if key in self._entries:
+                # Plotted by another thread meanwhile.
+                self.size -= self.entry_size(self._entries[key])
+            self._entries[key] = steps
+            self.size += size
+            while self.size > self.max_size and self._entries:
+                old_key, old_steps = self._entries.popitem(last=False)
+                self.size -= self.entry_size(old_steps)
+        return steps
+
+    @staticmethod
+    def generate(steps, normal=True):
+        """
+        Generator of the x, y steps, backwards for reversed cuts.
+        """
+        if normal:
+            i = iter(steps)
+            return zip(i, i)
+        return zip(steps[-2::-2], steps[::-2])
+
+
+plot_cache = PlotCache()
+
+
+class CutObject(BaseParameters):
     """
     CutObjects are small vector cuts which have on them a laser settings object.
     These store the start and end point of the cut. Whether this cut is normal or
     reversed.
+
+    The numerous line and curve cuts keep the attributes set here in __slots__ and
+    have no __dict__. Other cut objects keep their attributes in their __dict__.
     """
 
+    __slots__ = ()
+    SLOTS = (
+        "settings",
+        "_start_x",
+        "_start_y",
+        "_end_x",
+        "_end_y",
+        "normal",
+        "parent",
+        "next",
+        "previous",
+        "_burns_done",
+        "mode",
+        "inside",
+        "contains",
+        "first",
+        "last",
+        "closed",
+        "original_op",
+        "pass_index",
+        "raster_step",
+    )
+    _slot_names = dict()
+
     def __init__(
         self, start=None, end=None, settings=None, parent=None, passes=1, **kwargs
     ):
@@ -60,6 +233,33 @@ class CutObject(Parameters):
         self.original_op = None
         self.pass_index = -1
 
+    def __getstate__(self):
+        """
+        Attributes of the cut object, including those kept in slots.
+        """
+        state = dict(getattr(self, "__dict__", ()))
+        cls = type(self)
+        try:
+            names = CutObject._slot_names[cls]
+        except KeyError:
+            names = tuple(
+                name
+                for c in cls.__mro__
+                for name in c.__dict__.get("__slots__", ())
+                if name not in ("__dict__", "__weakref__")
+            )
+            CutObject._slot_names[cls] = names
+        for name in names:
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
     @property
     def burns_done(self):
         return self._burns_done
@@ -520,6 +720,8 @@ class CutCode(CutGroup):
 
 
 class LineCut(CutObject):
+    __slots__ = CutObject.SLOTS
+
     def __init__(self, start_point, end_point, settings=None, passes=1, parent=None):
         CutObject.__init__(
             self,
@@ -549,6 +751,8 @@ class LineCut(CutObject):
 
 
 class QuadCut(CutObject):
+    __slots__ = CutObject.SLOTS + ("_control", "_length")
+
     def __init__(
         self,
         start_point,
@@ -568,26 +772,34 @@ class QuadCut(CutObject):
         )
         self.raster_step = 0
         self._control = control_point
+        self._length = None
 
     def c(self):
         return self._control
 
+    def _key(self):
+        c = self._control
+        return (
+            self._start_x,
+            self._start_y,
+            c[0],
+            c[1],
+            self._end_x,
+            self._end_y,
+        )
+
     def length(self):
-        return Point.distance(self.start, self.c()) + Point.distance(self.c(), self.end)
+        key = self._key()
+        if self._length is None or self._length[0] != key:
+            points = ((key[0], key[1]), (key[2], key[3]), (key[4], key[5]))
+            self._length = key, bezier_length(points)
+        return self._length[1]
 
     def generator(self):
         # pylint: disable=unsubscriptable-object
-        start = self.start
-        c = self.c()
-        end = self.end
-        return ZinglPlotter.plot_quad_bezier(
-            start[0],
-            start[1],
-            c[0],
-            c[1],
-            end[0],
-            end[1],
-        )
+        key = self._key()
+        steps = plot_cache.steps(key, lambda: ZinglPlotter.plot_quad_bezier(*key))
+        return PlotCache.generate(steps, self.normal)
 
     def point(self, t):
         x0, y0 = self.start
@@ -600,6 +812,8 @@ class QuadCut(CutObject):
 
 
 class CubicCut(CutObject):
+    __slots__ = CutObject.SLOTS + ("_control1", "_control2", "_length")
+
     def __init__(
         self,
         start_point,
@@ -621,6 +835,7 @@ class CubicCut(CutObject):
         self.raster_step = 0
         self._control1 = control1
         self._control2 = control2
+        self._length = None
 
     def c1(self):
         return self._control1 if self.normal else self._control2
@@ -628,29 +843,37 @@ class CubicCut(CutObject):
     def c2(self):
         return self._control2 if self.normal else self._control1
 
-    def length(self):
+    def _key(self):
+        c1 = self._control1
+        c2 = self._control2
         return (
-            Point.distance(self.start, self.c1())
-            + Point.distance(self.c1(), self.c2())
-            + Point.distance(self.c2(), self.end)
-        )
-
-    def generator(self):
-        start = self.start
-        c1 = self.c1()
-        c2 = self.c2()
-        end = self.end
-        return ZinglPlotter.plot_cubic_bezier(
-            start[0],
-            start[1],
+            self._start_x,
+            self._start_y,
             c1[0],
             c1[1],
             c2[0],
             c2[1],
-            end[0],
-            end[1],
+            self._end_x,
+            self._end_y,
         )
 
+    def length(self):
+        key = self._key()
+        if self._length is None or self._length[0] != key:
+            points = (
+                (key[0], key[1]),
+                (key[2], key[3]),
+                (key[4], key[5]),
+                (key[6], key[7]),
+            )
+            self._length = key, bezier_length(points)
+        return self._length[1]
+
+    def generator(self):
+        key = self._key()
+        steps = plot_cache.steps(key, lambda: ZinglPlotter.plot_cubic_bezier(*key))
+        return PlotCache.generate(steps, self.normal)
+
     def point(self, t):
         x0, y0 = self.start
         x1, y1 = self.c1()
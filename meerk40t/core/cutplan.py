@@ -14,20 +14,56 @@ CutPlan handles the various complicated algorithms to optimising the sequence of
     those inside the same curves so that raster burns are fully optimised.
 """
 
-from copy import copy
+import hashlib
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy, deepcopy
 from os import times
+from pickle import PicklingError
 from time import time
 from typing import Optional
 
 from ..svgelements import Group, Matrix, Polygon
 from ..tools.pathtools import VectorMontonizer
-from .cutcode import CutCode, CutGroup, CutObject, RasterCut
+from .cutcode import (
+    CubicCut,
+    CutCode,
+    CutGroup,
+    CutObject,
+    LineCut,
+    PlotCut,
+    RasterCut,
+    RawCut,
+)
 
 
 class CutPlanningFailedError(Exception):
     pass
 
 
+class ParallelCommand:
+    """
+    ParallelCommand is a plan command whose cpu bound work may run in a worker process.
+
+    When executed, `prepare` runs in the planning thread and returns the arguments of
+    `function`. The function must be a module level function, and its arguments and
+    result must be picklable, such as PIL images, paths and matrices. `apply` gets the
+    result back in the planning thread. Calling the command runs all three serially.
+    """
+
+    def __init__(self, function, prepare, apply):
+        self.function = function
+        self.prepare = prepare
+        self.apply = apply
+        self.__name__ = getattr(function, "__name__", "parallel")
+
+    def __call__(self):
+        self.apply(self.function(*self.prepare()))
+
+
 class CutPlan:
     """
     Cut Plan is a centralized class to modify plans with specific methods.
@@ -40,6 +76,10 @@ class CutPlan:
         self.original = list()
         self.commands = list()
         self.channel = self.context.channel("optimize", timestamp=True)
+        # id(op) -> (op, blob cache key, cached cutobjects or None)
+        self._blob_keys = dict()
+        # id(op) -> preprocess commands deferred until the op is streamed
+        self._stream_commands = dict()
         # self.setting(bool, "opt_rasters_split", True)
 
     def __str__(self):
@@ -62,8 +102,65 @@ class CutPlan:
             # Executing command can add a command, complete them all.
             commands = self.commands[:]
             self.commands.clear()
+            results = self._execute_parallel(commands)
             for command in commands:
-                command()
+                if results is not None and isinstance(command, ParallelCommand):
+                    command.apply(results.pop(0))
+                else:
+                    command()
+
+    def _execute_parallel(self, commands):
+        """
+        Runs the functions of the parallel commands in a process pool, if enabled.
+
+        The results are returned in the order of the commands and are applied in that
+        order, so the plan is the same as if executed serially. Functions that fail to
+        dispatch or whose pool breaks are run serially instead.
+
+        @param commands: commands to execute
+        @return: list of results of the parallel commands or None to run serially.
+        """
+        context = self.context
+        if not context.opt_parallel_preprocess:
+            return None
+        parallel = [c for c in commands if isinstance(c, ParallelCommand)]
+        if len(parallel) < 2:
+            return None
+        workers = context.opt_parallel_workers
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(parallel))
+        if workers < 2:
+            return None
+        arguments = [c.prepare() for c in parallel]
+        results = [None] * len(parallel)
+        pending = list(range(len(parallel)))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(c.function, *args)
+                    for c, args in zip(parallel, arguments)
+                ]
+                for i, future in enumerate(futures):
+                    results[i] = future.result()
+                    pending.remove(i)
+        except (
+            BrokenProcessPool,
+            PicklingError,
+            AttributeError,
+            TypeError,
+            OSError,
+        ) as e:
+            if self.channel:
+                self.channel("Parallel preprocessing failed, running serially: %s" % e)
+        for i in pending:
+            results[i] = parallel[i].function(*arguments[i])
+        if self.channel:
+            self.channel(
+                "Preprocessed %d commands with %d workers"
+                % (len(parallel) - len(pending), workers)
+            )
+        return results
 
     def preprocess(self):
         """ "
@@ -117,17 +214,86 @@ class CutPlan:
         # if rotary.rotary_enabled:
         #     axis = rotary.axis
 
+        cache = None
+        if context.opt_blob_cache and not context.opt_stream_plan:
+            cache = context.blob_cache
+            cache.max_size = context.opt_blob_cache_size * 1048576
         for op in self.plan:
             if not hasattr(op, "type"):
                 continue
             if op.type.startswith("op"):
+                if cache is not None and self._blob_cached(cache, op, matrix):
+                    # Unchanged operation, blob reuses the cached cutobjects.
+                    continue
+                commands = self.commands
+                if context.opt_stream_plan and op.type in CutStream.STREAMED_TYPES:
+                    # Images are prepared when the operation is streamed.
+                    commands = self._stream_commands.setdefault(id(op), list())
                 if hasattr(op, "preprocess"):
-                    op.preprocess(self.context, matrix, self.commands)
+                    op.preprocess(self.context, matrix, commands)
                 for node in op.flat():
                     if node is op:
                         continue
                     if hasattr(node, "preprocess"):
-                        node.preprocess(self.context, matrix, self.commands)
+                        node.preprocess(self.context, matrix, commands)
+
+    def _blob_cached(self, cache, op, matrix):
+        """
+        Registers the blob cache key of the operation and checks whether its cutobjects
+        are already cached. Cached cutobjects are held by the plan until blob, so they
+        cannot be evicted in between.
+
+        @param cache: blob cache
+        @param op: operation
+        @param matrix: scene to device matrix
+        @return: whether the operation is cached
+        """
+        if op.type not in BlobCache.CACHED_TYPES:
+            return False
+        context = self.context
+        extra = [
+            context.opt_closed_distance,
+            context.opt_merge_passes,
+            context.opt_merge_ops,
+            context.opt_nearest_neighbor,
+            context.opt_inner_first,
+        ]
+        penbox = op.settings.get("penbox")
+        if penbox is not None:
+            try:
+                extra.append(context.elements.penbox.get(penbox))
+            except AttributeError:
+                pass
+        key = BlobCache.key(op, matrix, *extra)
+        if key is None:
+            return False
+        cutobjects = cache.get(key)
+        self._blob_keys[id(op)] = (op, key, cutobjects)
+        if cutobjects is None:
+            return False
+        # Preprocessing is skipped. It converts the child nodes and queues the commands
+        # producing their cutobjects, which are all replaced by the cached cutobjects.
+        # The settings it derives on the operation itself are restored.
+        op.settings.update(cache.settings(key))
+        return True
+
+    def _as_cutobjects(self, op, closed_distance, passes):
+        """
+        Cutobjects of the operation, taken from the blob cache where possible.
+        """
+        try:
+            op, key, cutobjects = self._blob_keys[id(op)]
+        except KeyError:
+            return op.as_cutobjects(closed_distance=closed_distance, passes=passes)
+        if cutobjects is None:
+            cutobjects = list(
+                op.as_cutobjects(closed_distance=closed_distance, passes=passes)
+            )
+            self.context.blob_cache.put(key, cutobjects, op.settings)
+            self._blob_keys[id(op)] = (op, key, cutobjects)
+        elif self.channel:
+            self.channel("Blob cache hit: %s %s" % (op.type, key))
+        return BlobCache.copy(cutobjects)
 
     def blob(self):
         """
@@ -144,6 +310,9 @@ class CutPlan:
         if not self.plan:
             return
         context = self.context
+        if context.opt_stream_plan:
+            self.stream()
+            return
 
         grouped_plan = list()
         last_type = ""
@@ -200,7 +369,8 @@ class CutPlan:
                         passes = 1
                     for p in range(copies):
                         cutcode = CutCode(
-                            op.as_cutobjects(
+                            self._as_cutobjects(
+                                op,
                                 closed_distance=context.opt_closed_distance,
                                 passes=passes,
                             ),
@@ -268,6 +438,53 @@ class CutPlan:
                 else:
                     self.plan.append(blob)
 
+    def stream(self):
+        """
+        Streaming alternative to blob, for jobs too large to hold in memory.
+
+        Operations are replaced with CutStream jobs that prepare the images and produce
+        the cutobjects of each operation only while spooling. Consecutive operations
+        share a stream if merge operations is set. Travel is optimized within a window
+        of cutobjects, inner first and merge passes are not applied.
+        """
+        context = self.context
+        window = context.opt_stream_window
+        if not context.opt_reduce_travel:
+            window = 0
+        plan = list(self.plan)
+        self.plan.clear()
+        stream = None
+        for op in plan:
+            if getattr(op, "type", None) not in CutStream.STREAMED_TYPES:
+                stream = None
+                self.plan.append(op)
+                continue
+            copies = op.implicit_passes
+            if op.type == "op hatch":
+                # hatch duplicates sub-objects.
+                copies = 1
+            if stream is None or not context.opt_merge_ops:
+                stream = CutStream(
+                    window=window,
+                    closed_distance=context.opt_closed_distance,
+                    plot_size=context.opt_stream_window,
+                )
+                self.plan.append(stream)
+            stream.add(op, self._stream_commands.pop(id(op), ()), copies)
+        self._stream_commands.clear()
+
+    def simplify(self):
+        """
+        Simplify stage, after blob. Merges collinear and removes zero-length or sub-step
+        line cuts within each cut group and fits runs of short lines with cubic cuts.
+        @return:
+        """
+        for c in self.plan:
+            if isinstance(c, CutCode):
+                simplify_cutcode(
+                    c, self.context.opt_simplify_tolerance, channel=self.channel
+                )
+
     def preopt(self):
         """
         Add commands for optimize stage.
@@ -285,6 +502,8 @@ class CutPlan:
         if not has_cutcode:
             return
 
+        if context.opt_simplify:
+            self.commands.append(self.simplify)
         if context.opt_reduce_travel and (
             context.opt_nearest_neighbor or context.opt_2opt
         ):
@@ -362,7 +581,331 @@ class CutPlan:
     def clear(self):
         self.plan.clear()
         self.commands.clear()
+        self._blob_keys.clear()
+        self._stream_commands.clear()
+
+
+class BlobCache:
+    """
+    BlobCache is a content-addressed LRU cache of the cutobjects of operations.
+
+    Entries are keyed on a digest of the operation type and settings, the type, matrix,
+    colors, geometry, raster attributes and settings of every child node, the scene to
+    device matrix and the planner settings used by blob. An unchanged operation in a
+    replanned job skips preprocessing, validation and blob and reuses a copy of its cached
+    cutobjects, and the operation settings as they were after preprocessing. The cache is
+    bounded by the estimated memory of the stored cutobjects.
+    """
+
+    # Node attributes changing the cutobjects made from the node, beyond its geometry.
+    NODE_ATTRIBUTES = (
+        "step_x",
+        "step_y",
+        "direction",
+        "overscan",
+        "dpi",
+        "invert",
+        "red",
+        "green",
+        "blue",
+        "lightness",
+        "operations",
+    )
+
+    CACHED_TYPES = ("op cut", "op engrave", "op raster", "op image", "op hatch")
+
+    def __init__(self, max_size=256 * 1048576):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def get(self, key):
+        try:
+            cutobjects, settings, size = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return cutobjects
+
+    def settings(self, key):
+        """
+        Operation settings stored with the cutobjects of the key.
+        """
+        return dict(self._entries[key][1])
+
+    def put(self, key, cutobjects, settings=None):
+        size = sum(BlobCache.estimate(cut) for cut in cutobjects)
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[2]
+        if size > self.max_size:
+            return
+        settings = dict(settings) if settings is not None else dict()
+        self._entries[key] = (cutobjects, settings, size)
+        self.size += size
+        while self.size > self.max_size and self._entries:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self.size -= old_entry[2]
+
+    @staticmethod
+    def estimate(cut):
+        """
+        Estimated memory in bytes of the cutobject.
+        """
+        if isinstance(cut, CutGroup):
+            return 200 + sum(BlobCache.estimate(c) for c in cut)
+        if isinstance(cut, RasterCut):
+            return 200 + cut.width * cut.height * len(cut.image.getbands())
+        if isinstance(cut, (PlotCut, RawCut)):
+            return 200 + 64 * len(cut.plot)
+        return 200
+
+    @staticmethod
+    def key(op, matrix, *extra):
+        """
+        Content digest of the operation, its child nodes, the matrix and any extra values.
+
+        @return: hex digest or None if the operation cannot be cached.
+        """
+        digest = hashlib.sha1()
+
+        def update(value):
+            digest.update(repr(value).encode("utf8"))
+
+        update(op.type)
+        update(sorted((str(k), repr(v)) for k, v in op.settings.items()))
+        update((matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f))
+        update(extra)
+        for node in op.flat():
+            if node is op:
+                continue
+            if node.type == "reference":
+                node = node.node
+            if node.type == "elem text":
+                # Text is rendered with the gui font, which is not part of the node data.
+                return None
+            update(node.type)
+            m = getattr(node, "matrix", None)
+            if m is not None:
+                update((m.a, m.b, m.c, m.d, m.e, m.f))
+            update(getattr(node, "stroke", None))
+            update(getattr(node, "fill", None))
+            update(getattr(node, "stroke_width", None))
+            update([getattr(node, attr, None) for attr in BlobCache.NODE_ATTRIBUTES])
+            settings = getattr(node, "settings", None)
+            if isinstance(settings, dict):
+                update(sorted((str(k), repr(v)) for k, v in settings.items()))
+            image = getattr(node, "image", None)
+            if image is not None:
+                update((image.mode, image.size, getattr(node, "dpi", None)))
+                digest.update(image.tobytes())
+            elif getattr(node, "path", None) is not None:
+                update(node.path.d(transformed=False))
+            elif getattr(node, "shape", None) is not None:
+                update(node.shape)
+        return digest.hexdigest()
+
+    LINKS = ("parent", "next", "previous")
+
+    @staticmethod
+    def copy(cutobjects):
+        """
+        Copies the cutobjects for a new plan. Images and their pixel access are shared.
+
+        The links between cutobjects are remapped to the copies rather than deep copied,
+        which would recurse along the whole chain of next and previous cuts.
+        """
+        memo = dict()
+        copies = dict()
+        originals = list()
+
+        def copy_cut(cut):
+            state = cut.__getstate__()
+            links[id(cut)] = {
+                k: state.pop(k)
+                for k in BlobCache.LINKS + ("inside", "contains")
+                if k in state
+            }
+            if isinstance(cut, RasterCut):
+                memo[id(cut.image)] = cut.image
+                memo[id(cut.plot.data)] = cut.plot.data
+            c = cut.__class__.__new__(cut.__class__)
+            c.__setstate__(deepcopy(state, memo))
+            if isinstance(cut, CutGroup):
+                list.extend(c, [copy_cut(child) for child in cut])
+            copies[id(cut)] = c
+            originals.append(cut)
+            return c
+
+        def mapped(value):
+            if value is None:
+                return None
+            return copies.get(id(value), value)
+
+        links = dict()
+        copied = [copy_cut(cut) for cut in cutobjects]
+        for cut in originals:
+            c = copies[id(cut)]
+            for key, value in links[id(cut)].items():
+                if key in BlobCache.LINKS:
+                    value = mapped(value)
+                elif value is not None:
+                    value = [mapped(v) for v in value]
+                setattr(c, key, value)
+        return copied
+
+
+class CutStream:
+    """
+    CutStream is a spoolable job producing the cutobjects of operations lazily.
+
+    The deferred preprocess commands of each operation are executed when the operation
+    is reached, and each operation is dropped once its cutobjects are produced. At most
+    `window` cutobjects of one operation are held, the nearest of these to the current
+    position is plotted next, with open paths allowed to run backwards. The operations
+    are burned in order, merged operations are not mixed. A window of 0 keeps the
+    cutobjects in the order of the operations. The driver is given
+    plot_start every `plot_size` cuts so its queue stays bounded as well.
+    """
+
+    STREAMED_TYPES = ("op cut", "op engrave", "op raster", "op image", "op hatch")
+
+    def __init__(self, window=256, closed_distance=15, plot_size=256):
+        self.window = window
+        self.closed_distance = closed_distance
+        self.plot_size = max(1, plot_size)
+        self.ops = list()
+
+    def __str__(self):
+        return "CutStream(%s)" % ", ".join(
+            str(getattr(op, "label", None) or op.type)
+            for op, commands, copies in self.ops
+        )
+
+    def __len__(self):
+        return len(self.ops)
+
+    def add(self, op, commands=(), copies=1):
+        self.ops.append((op, list(commands), copies))
 
+    def sources(self):
+        """
+        Cutobjects of each operation in turn, releasing each operation when reached.
+        """
+        while self.ops:
+            op, commands, copies = self.ops.pop(0)
+            yield self._produce(op, commands, copies)
+
+    def _produce(self, op, commands, copies):
+        for command in commands:
+            command()
+        commands.clear()
+        for p in range(copies):
+            for cutobject in op.as_cutobjects(
+                closed_distance=self.closed_distance, passes=1
+            ):
+                yield cutobject
+
+    def cutobjects(self):
+        """
+        Cutobjects of the operations, releasing each operation once it is produced.
+        """
+        for source in self.sources():
+            yield from source
+
+    @staticmethod
+    def _reversible(cut):
+        if isinstance(cut, CutGroup):
+            return not cut.closed and all(c.reversible() for c in cut.flat())
+        return cut.reversible()
+
+    @staticmethod
+    def _nearest(window, x, y):
+        """
+        Index of the nearest cutobject of the window and whether it runs backwards.
+        """
+        best = 0
+        backwards = False
+        distance = float("inf")
+        for i, (cut, reversible) in enumerate(window):
+            start = cut.start
+            d = abs(start[0] - x) + abs(start[1] - y)
+            if d < distance:
+                best, backwards, distance = i, False, d
+                if d == 0:
+                    break
+            if reversible:
+                end = cut.end
+                d = abs(end[0] - x) + abs(end[1] - y)
+                if d < distance:
+                    best, backwards, distance = i, True, d
+                    if d == 0:
+                        break
+        return best, backwards
+
+    def ordered(self):
+        """
+        Cuts in the sequence to burn, optimized over a window within each operation.
+        """
+        x, y = 0, 0
+        for source in self.sources():
+            for cut in self._ordered(source, x, y):
+                x, y = cut.end
+                yield cut
+
+    def _ordered(self, source, x, y):
+        window = list()
+        exhausted = False
+        while True:
+            while not exhausted and len(window) < max(1, self.window):
+                try:
+                    cutobject = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if cutobject.start is None:
+                    # Empty groups and blank rasters have nothing to plot.
+                    continue
+                reversible = self.window > 0 and self._reversible(cutobject)
+                window.append((cutobject, reversible))
+            if not window:
+                return
+            index, backwards = self._nearest(window, x, y)
+            cutobject = window.pop(index)[0]
+            if isinstance(cutobject, CutGroup):
+                cuts = list(cutobject.flat())
+            else:
+                cuts = [cutobject]
+            if backwards:
+                cuts.reverse()
+                for cut in cuts:
+                    cut.reverse()
+            for cut in cuts:
+                yield cut
+            x, y = cuts[-1].end
+
+    def generate(self):
+        count = 0
+        for cut in self.ordered():
+            yield "plot", cut
+            count += 1
+            if count >= self.plot_size:
+                yield "plot_start"
+                count = 0
+        yield "plot_start"
 
 
 def is_inside(inner, outer):
@@ -484,6 +1027,338 @@ def correct_empty(context: CutGroup):
             del context[index]
 
 
+def simplify_cutcode(context: CutGroup, tolerance=1.0, channel=None):
+    """
+    Simplifies the line cuts of every cut group within the context.
+
+    Connected runs of line cuts with the same settings are reduced to the fewest lines
+    within tolerance, removing collinear, zero-length and sub-step segments. Smooth
+    parts of the runs made of three or more lines are fitted with cubic cuts within the
+    tolerance. Groups left empty are removed.
+
+    @param context: cutcode to simplify, modified in place.
+    @param tolerance: maximum distance of the simplified cuts from the original lines.
+    @param channel: channel to report the number of cuts before and after.
+    @return: context
+    """
+    if channel:
+        start_time = time()
+        start_count = sum(1 for _ in context.flat())
+    stack = [context]
+    while stack:
+        group = stack.pop()
+        cuts = list()
+        run = list()
+        changed = False
+        for c in group:
+            if isinstance(c, CutGroup):
+                stack.append(c)
+            if (
+                isinstance(c, LineCut)
+                and c.burns_done == 0
+                and (
+                    not run
+                    or (
+                        run[-1].end == c.start
+                        and (
+                            run[-1].settings is c.settings
+                            or run[-1].settings == c.settings
+                        )
+                        and run[-1].passes == c.passes
+                    )
+                )
+            ):
+                run.append(c)
+                continue
+            if run:
+                changed |= _simplify_run(run, cuts, tolerance)
+                run = list()
+            if isinstance(c, LineCut) and c.burns_done == 0:
+                run.append(c)
+            else:
+                cuts.append(c)
+        if run:
+            changed |= _simplify_run(run, cuts, tolerance)
+        if not changed:
+            continue
+        group[:] = cuts
+        for i, cut in enumerate(cuts):
+            if isinstance(cut, CutGroup):
+                continue
+            cut.first = i == 0
+            cut.last = i == len(cuts) - 1
+            cut.next = cuts[(i + 1) % len(cuts)]
+            cut.previous = cuts[i - 1]
+    correct_empty(context)
+    if channel:
+        end_count = sum(1 for _ in context.flat())
+        channel(
+            "Simplified %d cuts to %d cuts in %.3f elapsed seconds"
+            % (start_count, end_count, time() - start_time)
+        )
+    return context
+
+
+def _simplify_run(run, cuts, tolerance):
+    """
+    Appends the simplified cuts of a connected run of line cuts to cuts.
+
+    @return: whether the run was changed.
+    """
+    first = run[0]
+    points = [first.start]
+    for c in run:
+        if c.end != points[-1]:
+            points.append(c.end)
+    if len(points) == 1:
+        # Zero-length run.
+        return True
+    count = len(cuts)
+    kept = simplify_polyline(points, tolerance)
+    for a, b, controls in fit_polyline(points, kept, tolerance):
+        if controls is None:
+            cut = LineCut(points[a], points[b], first.settings, first.passes)
+        else:
+            cut = CubicCut(
+                points[a],
+                controls[0],
+                controls[1],
+                points[b],
+                first.settings,
+                first.passes,
+            )
+        cut.parent = first.parent
+        cut.closed = first.closed
+        cut.original_op = first.original_op
+        cut.pass_index = first.pass_index
+        cut.mode = first.mode
+        cuts.append(cut)
+    changed = len(cuts) - count != len(run) or any(
+        not isinstance(c, LineCut) for c in cuts[count:]
+    )
+    if not changed:
+        # Same lines, keep the original cuts.
+        cuts[count:] = run
+    return changed
+
+
+def _segment_distance(p, a, b):
+    """
+    Distance of point p from the line segment a, b.
+    """
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    d2 = dx * dx + dy * dy
+    if d2 == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / d2
+    t = max(0.0, min(1.0, t))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Douglas-Peucker simplification of an open polyline.
+
+    @param points: list of points
+    @param tolerance: maximum distance of removed points from the simplified polyline.
+    @return: sorted indexes of the points kept, including both ends.
+    """
+    last = len(points) - 1
+    keep = [False] * len(points)
+    keep[0] = keep[last] = True
+    stack = [(0, last)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        pa = points[a]
+        pb = points[b]
+        index = a
+        distance = -1.0
+        for i in range(a + 1, b):
+            d = _segment_distance(points[i], pa, pb)
+            if d > distance:
+                index = i
+                distance = d
+        if distance > tolerance:
+            keep[index] = True
+            stack.append((a, index))
+            stack.append((index, b))
+    return [i for i, k in enumerate(keep) if k]
+
+
+def _turn(a, b, c):
+    """
+    Angle in radians between the directions a, b and b, c.
+    """
+    a1 = math.atan2(b[1] - a[1], b[0] - a[0])
+    a2 = math.atan2(c[1] - b[1], c[0] - b[0])
+    return abs((a2 - a1 + math.pi) % math.tau - math.pi)
+
+
+def fit_polyline(points, kept, tolerance, max_turn=math.pi / 4):
+    """
+    Fits the simplified polyline with lines and cubics. Smooth spans of three or more
+    simplified lines, turning less than max_turn at every point, are fitted with cubics
+    through the original points.
+
+    @param points: original points
+    @param kept: indexes of the points of the simplified polyline
+    @param tolerance: maximum distance of the cubics from the original polyline
+    @param max_turn: maximum turn in radians at the points within a curve
+    @return: generator of (start index, end index, controls or None for a line)
+    """
+    start = 0
+    while start < len(kept) - 1:
+        end = start + 1
+        while end < len(kept) - 1 and (
+            _turn(points[kept[end - 1]], points[kept[end]], points[kept[end + 1]])
+            < max_turn
+        ):
+            end += 1
+        if end - start < 3:
+            for i in range(start, end):
+                yield kept[i], kept[i + 1], None
+        else:
+            yield from _fit_span(points, kept, start, end, tolerance)
+        start = end
+
+
+def _fit_span(points, kept, start, end, tolerance):
+    """
+    Fits cubics to the points between kept[start] and kept[end], splitting the span at
+    the worst fitting simplified point until the cubics are within tolerance. Parts of
+    fewer than three simplified lines remain lines.
+    """
+    stack = [(start, end)]
+    while stack:
+        s, e = stack.pop()
+        if e - s < 3:
+            for i in range(s, e):
+                yield kept[i], kept[i + 1], None
+            continue
+        controls, worst = fit_cubic(points[kept[s] : kept[e] + 1], tolerance)
+        if controls is not None:
+            yield kept[s], kept[e], controls
+            continue
+        # Split at the simplified point closest to the worst fitting point, leaving
+        # enough lines on both sides for curves where possible.
+        worst += kept[s]
+        margin = 3 if e - s >= 6 else 1
+        split = min(
+            range(s + margin, e - margin + 1), key=lambda i: abs(kept[i] - worst)
+        )
+        stack.append((split, e))
+        stack.append((s, split))
+
+
+def fit_cubic(points, tolerance, iterations=4):
+    """
+    Least squares fit of a cubic bezier to the points with fixed end points.
+
+    Points are parameterized by chord length, and the parameters are improved with
+    Newton steps.
+
+    @param points: points to fit, at least four.
+    @param tolerance: maximum distance of the cubic from the polyline of the points.
+    @param iterations: number of fits with improved parameters.
+    @return: ((c1, c2), None) or (None, index of the worst fitting point)
+    """
+    p0 = points[0]
+    p3 = points[-1]
+    n = len(points)
+    lengths = [0.0]
+    for i in range(1, n):
+        lengths.append(
+            lengths[-1]
+            + math.hypot(
+                points[i][0] - points[i - 1][0], points[i][1] - points[i - 1][1]
+            )
+        )
+    total = lengths[-1]
+    if total == 0:
+        return None, n // 2
+    ts = [d / total for d in lengths]
+    worst = n // 2
+    for _ in range(iterations):
+        a11 = a12 = a22 = 0.0
+        r1x = r1y = r2x = r2y = 0.0
+        for t, p in zip(ts, points):
+            e = 1.0 - t
+            b0 = e * e * e
+            b1 = 3.0 * e * e * t
+            b2 = 3.0 * e * t * t
+            b3 = t * t * t
+            rx = p[0] - b0 * p0[0] - b3 * p3[0]
+            ry = p[1] - b0 * p0[1] - b3 * p3[1]
+            a11 += b1 * b1
+            a12 += b1 * b2
+            a22 += b2 * b2
+            r1x += b1 * rx
+            r1y += b1 * ry
+            r2x += b2 * rx
+            r2y += b2 * ry
+        det = a11 * a22 - a12 * a12
+        if abs(det) < 1e-12:
+            return None, worst
+        c1 = ((a22 * r1x - a12 * r2x) / det, (a22 * r1y - a12 * r2y) / det)
+        c2 = ((a11 * r2x - a12 * r1x) / det, (a11 * r2y - a12 * r1y) / det)
+        curve = (p0, c1, c2, p3)
+
+        # Distances of the points from the curve, and of the curve from the lines.
+        error = 0.0
+        for i, (t, p) in enumerate(zip(ts, points)):
+            x, y = _cubic_point(curve, t)
+            d = math.hypot(x - p[0], y - p[1])
+            if d > error:
+                error = d
+                worst = i
+            if i:
+                mid = _cubic_point(curve, (t + ts[i - 1]) / 2.0)
+                d = _segment_distance(mid, points[i - 1], p)
+                if d > error:
+                    error = d
+                    worst = i
+        if error <= tolerance:
+            return (c1, c2), None
+        ts = [_newton_step(curve, t, p) for t, p in zip(ts, points)]
+    return None, min(max(worst, 1), n - 2)
+
+
+def _cubic_point(curve, t):
+    p0, p1, p2, p3 = curve
+    e = 1.0 - t
+    b0 = e * e * e
+    b1 = 3.0 * e * e * t
+    b2 = 3.0 * e * t * t
+    b3 = t * t * t
+    return (
+        b0 * p0[0] + b1 * p1[0] + b2 * p2[0] + b3 * p3[0],
+        b0 * p0[1] + b1 * p1[1] + b2 * p2[1] + b3 * p3[1],
+    )
+
+
+def _newton_step(curve, t, p):
+    """
+    Newton step of parameter t towards the point on the curve closest to p.
+    """
+    p0, p1, p2, p3 = curve
+    e = 1.0 - t
+    x, y = _cubic_point(curve, t)
+    d1x = 3.0 * e * e * (p1[0] - p0[0])
+    d1x += 6.0 * e * t * (p2[0] - p1[0]) + 3.0 * t * t * (p3[0] - p2[0])
+    d1y = 3.0 * e * e * (p1[1] - p0[1])
+    d1y += 6.0 * e * t * (p2[1] - p1[1]) + 3.0 * t * t * (p3[1] - p2[1])
+    d2x = 6.0 * (e * (p2[0] - 2 * p1[0] + p0[0]) + t * (p3[0] - 2 * p2[0] + p1[0]))
+    d2y = 6.0 * (e * (p2[1] - 2 * p1[1] + p0[1]) + t * (p3[1] - 2 * p2[1] + p1[1]))
+    numerator = (x - p[0]) * d1x + (y - p[1]) * d1y
+    denominator = d1x * d1x + d1y * d1y + (x - p[0]) * d2x + (y - p[1]) * d2y
+    if denominator == 0:
+        return t
+    return min(1.0, max(0.0, t - numerator / denominator))
+
+
 def inner_first_ident(context: CutGroup, channel=None):
     """
     Identifies closed CutGroups and then identifies any other CutGroups which
@@ -11,6 +11,7 @@ from meerk40t.core.exceptions import BadFileError
 from meerk40t.kernel import CommandSyntaxError, Service, Settings
 
 from ..svgelements import Angle, Color, Matrix, SVGElement, Viewbox
+from .classify import ClassificationIndex
 from .cutcode import CutCode
 from .element_types import *
 from .node.elem_image import ImageNode
@@ -6139,41 +6140,17 @@ class Elemental(Service):
             operations = list(self.ops())
         if add_op_function is None:
             add_op_function = self.add_op
+        index = ClassificationIndex(operations)
         for node in elements:
             # Following lines added to handle 0.7 special ops added to ops list
             if hasattr(node, "operation"):
                 add_op_function(node)
                 continue
-            was_classified = False
             # image_added code removed because it could never be used
-            for op in operations:
-                if op.type == "op raster":
-                    if hasattr(node, "stroke") and node.stroke is not None and (op.color == node.stroke or op.default):
-                        op.add_reference(node)
-                        was_classified = True
-                    elif node.type == "elem image":
-                        op.add_reference(node)
-                        was_classified = True
-                    elif node.type == "elem text":
-                        op.add_reference(node)
-                        was_classified = True
-                    elif hasattr(node, "fill") and node.fill is not None and node.fill.argb is not None:
-                        op.add_reference(node)
-                        was_classified = True
-                elif op.type in ("op engrave", "op cut", "op hatch"):
-                    if (
-                        hasattr(node, "stroke") and node.stroke is not None and op.color == node.stroke
-                    ) or op.default:
-                        op.add_reference(node)
-                        was_classified = True
-                elif op.type == "op image" and node.type == "elem image":
-                    op.add_reference(node)
-                    was_classified = True
-                    break  # May only classify in one image operation.
-                elif op.type == "op dots" and node.type == "elem point":
-                    op.add_reference(node)
-                    was_classified = True
-                    break  # May only classify in Dots.
+            matches = index.matches(node)
+            for op in matches:
+                op.add_reference(node)
+            was_classified = bool(matches)
 
             if not was_classified:
                 op = None
@@ -6187,11 +6164,13 @@ class Elemental(Service):
                     add_op_function(op)
                     op.add_reference(node)
                     operations.append(op)
+                    index.add(op)
                 if hasattr(node, "fill") and node.fill is not None and node.fill.argb is not None:
                     op = RasterOpNode(color=0, output=False)
                     add_op_function(op)
                     op.add_reference(node)
                     operations.append(op)
+                    index.add(op)
 
     def add_classify_op(self, op):
         """
@@ -3,7 +3,7 @@ from copy import copy
 from meerk40t.core.cutcode import CubicCut, CutGroup, LineCut, QuadCut
 from meerk40t.core.element_types import *
 from meerk40t.core.node.node import Node
-from meerk40t.core.parameters import Parameters
+from meerk40t.core.parameters import Parameters, ParameterSettings
 from meerk40t.svgelements import (
     Close,
     Color,
@@ -38,7 +38,7 @@ class EngraveOpNode(Node, Parameters):
         if len(args) == 1:
             obj = args[0]
             if hasattr(obj, "settings"):
-                self.settings = dict(obj.settings)
+                self.settings = ParameterSettings(obj.settings)
             elif isinstance(obj, dict):
                 self.settings.update(obj)
 
@@ -1,13 +1,24 @@
 from copy import copy
+from math import ceil, cos, sin, sqrt
 
 from meerk40t.core.cutcode import PlotCut
+from meerk40t.core.cutplan import ParallelCommand
 from meerk40t.core.element_types import *
 from meerk40t.core.node.elem_polyline import PolylineNode
 from meerk40t.core.node.node import Node
-from meerk40t.core.parameters import Parameters
+from meerk40t.core.parameters import Parameters, ParameterSettings
 from meerk40t.core.units import Length
-from meerk40t.svgelements import Angle, Color, Matrix, Path
-from meerk40t.tools.pathtools import EulerianFill
+from meerk40t.svgelements import (
+    Angle,
+    Close,
+    Color,
+    CubicBezier,
+    Line,
+    Move,
+    Path,
+    QuadraticBezier,
+)
+from meerk40t.tools.pathtools import EulerianFill, ScanlineFill
 
 MILS_IN_MM = 39.3701
 
@@ -33,7 +44,7 @@ class HatchOpNode(Node, Parameters):
         if len(args) == 1:
             obj = args[0]
             if hasattr(obj, "settings"):
-                self.settings = dict(obj.settings)
+                self.settings = ParameterSettings(obj.settings)
             elif isinstance(obj, dict):
                 self.settings.update(obj)
 
@@ -152,21 +163,10 @@ class HatchOpNode(Node, Parameters):
         @param commands:
         @return:
         """
+        passes = list()
 
-        def split(points):
-            pos = 0
-            for i, pts in enumerate(points):
-                if pts is None:
-                    yield points[pos: i - 1]
-                    pos = i + 1
-            if pos != len(points):
-                yield points[pos: len(points)]
-
-        def create_fill():
-            """
-            This currently applies Eulerian fill when it could just apply scanline fill.
-            @return:
-            """
+        def prepare_fill():
+            passes.clear()
             c = list()
             for node in self.children:
                 path = node.as_path()
@@ -183,7 +183,7 @@ class HatchOpNode(Node, Parameters):
             if penbox is not None:
                 penbox = context.elements.penbox[penbox]
 
-            polyline_lookup = dict()
+            fills = dict()
             for p in range(self.implicit_passes):
                 settings = dict(self.settings)
                 if penbox is not None:
@@ -201,34 +201,24 @@ class HatchOpNode(Node, Parameters):
                     angle = Angle.parse(h_angle)
 
                 key = f"{h_angle},{h_dist}"
-                if key in polyline_lookup:
-                    polylines = polyline_lookup[key]
-                else:
-                    counter_rotate = Matrix.rotate(-angle)
+                if key not in fills:
                     transformed_vector = matrix.transform_vector([0, distance_y])
-                    efill = EulerianFill(abs(
+                    distance = abs(
                         complex(transformed_vector[0], transformed_vector[1])
-                    ))
-                    for sp in c:
-                        sp.transform.reset()
-                        if angle is not None:
-                            sp *= Matrix.rotate(angle)
-                        sp = abs(sp)
-                        efill += [sp.point(i / 100.0, error=1e-4) for i in range(101)]
-                    points = efill.get_fill()
-                    polylines = list()
-                    for pts in split(points):
-                        polyline = Polyline(pts, stoke=settings.get("line_color"))
-                        polyline *= counter_rotate
-                        polylines.append(abs(polyline))
-                    polyline_lookup[key] = polylines
-                for polyline in polylines:
+                    )
+                    fills[key] = (angle, distance, settings.get("line_color"))
+                passes.append((key, settings))
+            return c, fills, self.hatch_type
+
+        def apply_fill(polyline_lookup):
+            for key, settings in passes:
+                for polyline in polyline_lookup[key]:
                     node = PolylineNode(shape=abs(polyline))
                     node.settings.update(settings)
                     self.add_node(node)
 
         if self.children:
-            commands.append(create_fill)
+            commands.append(ParallelCommand(hatch_fill, prepare_fill, apply_fill))
 
     def as_cutobjects(self, closed_distance=15, passes=1):
         """Generator of cutobjects for a particular operation."""
@@ -241,3 +231,89 @@ class HatchOpNode(Node, Parameters):
                 x, y = p
                 plot.plot_append(int(round(x)), int(round(y)), 1)
             yield plot
+
+
+def hatch_fill(paths, fills, hatch_type=0):
+    """
+    Hatch fill the closed subpaths for each of the fills. This is a module level
+    function so it can be sent to a worker process.
+
+    @param paths: list of subpaths
+    @param fills: dict of key: (angle, distance, line_color)
+    @param hatch_type: 0 scanline fill, 1 eulerian fill
+    @return: dict of key: list of polylines
+    """
+
+    def split(points):
+        pos = 0
+        for i, pts in enumerate(points):
+            if pts is None:
+                if i > pos:
+                    yield points[pos:i]
+                pos = i + 1
+        if pos != len(points):
+            yield points[pos: len(points)]
+
+    polyline_lookup = dict()
+    if not fills:
+        return polyline_lookup
+    tolerance = min(distance for angle, distance, line_color in fills.values()) / 20.0
+    outlines = list()
+    for sp in paths:
+        sp.transform.reset()
+        outlines.append(flatten(sp, tolerance))
+    for key, (angle, distance, line_color) in fills.items():
+        if hatch_type == 1:
+            fill = EulerianFill(distance)
+        else:
+            fill = ScanlineFill(distance)
+        cos_a = cos(angle)
+        sin_a = sin(angle)
+        for outline in outlines:
+            fill += [
+                (x * cos_a - y * sin_a, x * sin_a + y * cos_a) for x, y in outline
+            ]
+        points = fill.get_fill()
+        polylines = list()
+        for pts in split(points):
+            pts = [(x * cos_a + y * sin_a, y * cos_a - x * sin_a) for x, y in pts]
+            polylines.append(Polyline(pts, stoke=line_color))
+        polyline_lookup[key] = polylines
+    return polyline_lookup
+
+
+def flatten(path, tolerance):
+    """
+    Flattens the path into a list of points. Lines contribute their end points, curves
+    are subdivided by the bound on their second derivative such that the curve stays
+    within tolerance of the flattened points.
+
+    @param path: path to flatten
+    @param tolerance: maximum distance between the curve and the flattened points
+    @return: list of points
+    """
+    points = list()
+    for segment in path:
+        if isinstance(segment, Move):
+            if not points:
+                points.append((segment.end.x, segment.end.y))
+            continue
+        if isinstance(segment, (Line, Close)):
+            points.append((segment.end.x, segment.end.y))
+            continue
+        if isinstance(segment, QuadraticBezier):
+            bound = 2.0 * abs(segment.start - 2 * segment.control + segment.end)
+        elif isinstance(segment, CubicBezier):
+            bound = 6.0 * max(
+                abs(segment.start - 2 * segment.control1 + segment.control2),
+                abs(segment.control1 - 2 * segment.control2 + segment.end),
+            )
+        else:
+            bound = segment.length(error=1e-4)
+        if tolerance > 0:
+            count = max(1, int(ceil(sqrt(bound / (8.0 * tolerance)))))
+        else:
+            count = 100
+        for x, y in segment.npoint([i / count for i in range(1, count + 1)]):
+            points.append((float(x), float(y)))
+    return points
@@ -1,9 +1,10 @@
 from copy import copy
 
 from meerk40t.core.cutcode import RasterCut
+from meerk40t.core.cutplan import ParallelCommand
 from meerk40t.core.element_types import *
 from meerk40t.core.node.node import Node
-from meerk40t.core.parameters import Parameters
+from meerk40t.core.parameters import Parameters, ParameterSettings
 from meerk40t.core.units import Length
 from meerk40t.image.actualize import actualize
 from meerk40t.svgelements import Color, Path, Polygon
@@ -31,7 +32,7 @@ class ImageOpNode(Node, Parameters):
         if len(args) == 1:
             obj = args[0]
             if hasattr(obj, "settings"):
-                self.settings = dict(obj.settings)
+                self.settings = ParameterSettings(obj.settings)
             elif isinstance(obj, dict):
                 self.settings.update(obj)
 
@@ -194,12 +195,15 @@ class ImageOpNode(Node, Parameters):
             # Transformation must be uniform to permit native rastering.
             if m1.a != step_x or m1.b != 0.0 or m1.c != 0.0 or m1.d != step_y:
                 def actual(image_node, s_x, s_y):
-                    def actualize_images():
-                        image_node.image, image_node.matrix = actualize(
-                            image_node.image, image_node.matrix, step_x=s_x, step_y=s_y
-                        )
+                    def prepare_image():
+                        return image_node.image, image_node.matrix, s_x, s_y
+
+                    def apply_image(result):
+                        image_node.image, image_node.matrix = result
                         image_node.cache = None
-                    return actualize_images
+
+                    return ParallelCommand(actualize, prepare_image, apply_image)
+
                 commands.append(actual(node, step_x, step_y))
                 break
 
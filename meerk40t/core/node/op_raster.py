@@ -1,11 +1,11 @@
 from copy import copy
 
 from meerk40t.core.cutcode import RasterCut
-from meerk40t.core.cutplan import CutPlanningFailedError
+from meerk40t.core.cutplan import CutPlanningFailedError, ParallelCommand
 from meerk40t.core.element_types import *
 from meerk40t.core.node.elem_image import ImageNode
 from meerk40t.core.node.node import Node
-from meerk40t.core.parameters import Parameters
+from meerk40t.core.parameters import Parameters, ParameterSettings
 from meerk40t.core.units import Length
 from meerk40t.image.actualize import actualize
 from meerk40t.svgelements import Color, Path, Polygon, Matrix
@@ -33,7 +33,7 @@ class RasterOpNode(Node, Parameters):
         if len(args) == 1:
             obj = args[0]
             if hasattr(obj, "settings"):
-                self.settings = dict(obj.settings)
+                self.settings = ParameterSettings(obj.settings)
             elif isinstance(obj, dict):
                 self.settings.update(obj)
 
@@ -206,13 +206,14 @@ class RasterOpNode(Node, Parameters):
             if m.a != step_x or m.b != 0.0 or m.c != 0.0 or m.d != step_y:
 
                 def actualize_raster_image(image_node, s_x, s_y):
-                    def actualize_raster_image_node():
-                        image_node.image, image_node.matrix = actualize(
-                            image_node.image, image_node.matrix, step_x=s_x, step_y=s_y
-                        )
+                    def prepare_image():
+                        return image_node.image, image_node.matrix, s_x, s_y
+
+                    def apply_image(result):
+                        image_node.image, image_node.matrix = result
                         image_node.cache = None
 
-                    return actualize_raster_image_node()
+                    return ParallelCommand(actualize, prepare_image, apply_image)
 
                 commands.append(actualize_raster_image(node, step_x, step_y))
             return
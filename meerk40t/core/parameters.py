@@ -48,25 +48,206 @@ STRING_PARAMETERS = ("overscan", "hatch_distance", "hatch_angle")
 
 COLOR_PARAMETERS = ("color", "line_color")
 
+# Every parameter property, derived into the settings of the cuts and held by the snapshots.
+PARAMETER_FIELDS = (
+    "color",
+    "default",
+    "output",
+    "raster_step_x",
+    "raster_step_y",
+    "dpi",
+    "overscan",
+    "speed",
+    "power",
+    "frequency",
+    "rapid_speed",
+    "line_color",
+    "laser_enabled",
+    "ppi_enabled",
+    "dot_length",
+    "dot_length_custom",
+    "implicit_dotlength",
+    "shift_enabled",
+    "passes",
+    "passes_custom",
+    "implicit_passes",
+    "raster_direction",
+    "raster_swing",
+    "hatch_type",
+    "hatch_angle",
+    "hatch_angle_inc",
+    "hatch_distance",
+    "acceleration",
+    "acceleration_custom",
+    "implicit_accel",
+    "dratio",
+    "dratio_custom",
+    "implicit_d_ratio",
+    "raster_preference_top",
+    "raster_preference_right",
+    "raster_preference_left",
+    "raster_preference_bottom",
+    "jog_distance",
+    "jog_enable",
+    "dwell_time",
+    "raster_alt",
+    "force_twitchless",
+    "constant_move_x",
+    "constant_move_y",
+)
+
+
+def _int_parameter(value):
+    return int(float(value))
+
+
+def _bool_parameter(value):
+    return value.lower() == "true"
+
+
+# Types of the parameters given as strings, such as those loaded from the persistent settings.
+PARAMETER_TYPES = dict()
+PARAMETER_TYPES.update({attr: float for attr in FLOAT_PARAMETERS})
+PARAMETER_TYPES.update({attr: _int_parameter for attr in INT_PARAMETERS})
+PARAMETER_TYPES.update({attr: _bool_parameter for attr in BOOL_PARAMETERS})
+PARAMETER_TYPES.update(
+    {
+        "implicit_dotlength": _int_parameter,
+        "implicit_passes": _int_parameter,
+        "implicit_accel": _int_parameter,
+        "implicit_d_ratio": float,
+    }
+)
+
+
+class ParameterSnapshot:
+    """
+    Frozen values of the parameters of a settings dict, with string values coerced to the type of the parameter.
+
+    Reading a snapshot is an attribute lookup, rather than the dict lookup and default of every parameter property,
+    for the planner and drivers which read the parameters of every cut. Snapshots are taken by
+    Parameters.snapshot() and are cached on a ParameterSettings until it changes. The settings are kept as `settings`.
+    """
+
+    __slots__ = ("settings",) + PARAMETER_FIELDS
+
+    def __init__(self, parameters):
+        setattr_ = object.__setattr__
+        setattr_(self, "settings", parameters.settings)
+        for attr in PARAMETER_FIELDS:
+            value = getattr(parameters, attr)
+            if isinstance(value, str):
+                try:
+                    value = PARAMETER_TYPES[attr](value)
+                except (KeyError, ValueError):
+                    pass
+            setattr_(self, attr, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ParameterSnapshot is frozen.")
+
+    def __delattr__(self, key):
+        raise AttributeError("ParameterSnapshot is frozen.")
+
+    def __repr__(self):
+        return "ParameterSnapshot(%s)" % ", ".join(
+            "%s=%s" % (attr, repr(getattr(self, attr))) for attr in PARAMETER_FIELDS
+        )
+
+
+class ParameterSettings(dict):
+    """
+    Settings dict which keeps the snapshots taken of it, keyed by the parameters type, and drops them whenever it is
+    changed. The snapshots live and die with the settings dict.
+    """
+
+    __slots__ = ("snapshots",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.snapshots = dict()
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __setitem__(self, key, value):
+        self.snapshots.clear()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.snapshots.clear()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self.snapshots.clear()
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs):
+        self.snapshots.clear()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self.snapshots.clear()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.snapshots.clear()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.snapshots.clear()
+        return super().popitem()
+
+    def clear(self):
+        self.snapshots.clear()
+        super().clear()
+
+
+class BaseParameters:
+    """
+    Parameter properties over the settings dict. These declare no instance dict, so that the cut objects can keep
+    their attributes in slots. Everything else uses Parameters.
+    """
+
+    __slots__ = ()
 
-class Parameters:
     def __init__(self, settings: Dict = None, **kwargs):
         self.settings = settings
         if self.settings is None:
-            self.settings = dict()
+            self.settings = ParameterSettings()
         self.settings.update(kwargs)
 
     def derive(self):
-        derived_dict = dict(self.settings)
-        for attr in dir(self):
-            if attr.startswith("_"):
-                continue
+        derived_dict = ParameterSettings(self.settings)
+        for attr in PARAMETER_FIELDS:
             value = getattr(self, attr)
             if value is None:
                 continue
             derived_dict[attr] = value
         return derived_dict
 
+    def snapshot(self):
+        """
+        Snapshot of the parameters. The snapshot is cached on a ParameterSettings and shared by every Parameters of
+        the same type using it, such as the cuts of an operation, until the settings change. A plain settings dict
+        cannot tell when it changes, so it is snapshot afresh on every call.
+
+        @return: ParameterSnapshot
+        """
+        settings = self.settings
+        try:
+            snapshots = settings.snapshots
+        except AttributeError:
+            return ParameterSnapshot(self)
+        key = (type(self), getattr(self, "type", None))
+        try:
+            return snapshots[key]
+        except KeyError:
+            pass
+        snapshot = ParameterSnapshot(self)
+        snapshots[key] = snapshot
+        return snapshot
+
     def validate(self):
         settings = self.settings
         for v in FLOAT_PARAMETERS:
@@ -480,3 +661,9 @@ class Parameters:
     @constant_move_y.setter
     def constant_move_y(self, value):
         self.settings["constant_move_y"] = value
+
+
+class Parameters(BaseParameters):
+    """
+    Parameters of a settings dict, such as those of an operation or of the plot planner settings.
+    """
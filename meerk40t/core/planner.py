@@ -3,7 +3,7 @@ from copy import copy
 from meerk40t.kernel import CommandSyntaxError, Service
 
 from ..core.cutcode import CutCode
-from .cutplan import CutPlan, CutPlanningFailedError
+from .cutplan import BlobCache, CutPlan, CutPlanningFailedError
 from .node.op_cut import CutOpNode
 from .node.op_dots import DotsOpNode
 from .node.op_engrave import EngraveOpNode
@@ -259,6 +259,96 @@ def plugin(kernel, lifecycle=None):
                     "How close in device specific natural units do endpoints need to be to count as closed?"
                 ),
             },
+            {
+                "attr": "opt_simplify",
+                "object": context,
+                "default": False,
+                "type": bool,
+                "label": _("Simplify Paths"),
+                "tip": _(
+                    "Merge straight runs of short lines and remove lines too short to burn. "
+                    + "Smooth runs of short lines are replaced with curves. "
+                    + "This reduces the work for designs imported from CAD or traced images "
+                    + "with thousands of tiny segments."
+                ),
+            },
+            {
+                "attr": "opt_simplify_tolerance",
+                "object": context,
+                "default": 1.0,
+                "type": float,
+                "label": _("Simplify Tolerance"),
+                "tip": _(
+                    "How far in device specific natural units may simplified paths deviate from the original paths?"
+                ),
+            },
+            {
+                "attr": "opt_blob_cache",
+                "object": context,
+                "default": True,
+                "type": bool,
+                "label": _("Reuse Unchanged Operations"),
+                "tip": _(
+                    "Keep the planned burns of every operation and reuse them when the same operation "
+                    + "is planned again without any change to its settings, its elements or the device. "
+                    + "Replanning a job after a small change then only plans the changed operations."
+                ),
+            },
+            {
+                "attr": "opt_blob_cache_size",
+                "object": context,
+                "default": 256,
+                "type": int,
+                "label": _("Reuse Memory (MB)"),
+                "tip": _(
+                    "Maximum memory used to keep the planned burns of unchanged operations."
+                ),
+            },
+            {
+                "attr": "opt_parallel_preprocess",
+                "object": context,
+                "default": False,
+                "type": bool,
+                "label": _("Parallel Preprocessing"),
+                "tip": _(
+                    "Prepare images and hatch fills of different operations at the same time "
+                    + "on several processor cores. The result is the same as without this option."
+                ),
+            },
+            {
+                "attr": "opt_parallel_workers",
+                "object": context,
+                "default": 0,
+                "type": int,
+                "label": _("Parallel Workers"),
+                "tip": _(
+                    "Number of processes used for parallel preprocessing, 0 uses all processor cores."
+                ),
+            },
+            {
+                "attr": "opt_stream_plan",
+                "object": context,
+                "default": False,
+                "type": bool,
+                "label": _("Stream Large Jobs"),
+                "tip": _(
+                    "Prepare images and burns of every operation only while the job is sent to the laser, "
+                    + "rather than planning the whole job in advance. "
+                    + "Very large jobs then need much less memory, but the job cannot be previewed "
+                    + "and inner first is not applied. Travel is optimized over a window of burns."
+                ),
+            },
+            {
+                "attr": "opt_stream_window",
+                "object": context,
+                "default": 256,
+                "type": int,
+                "label": _("Stream Window"),
+                "tip": _(
+                    "Number of burns held at once when streaming a job. "
+                    + "Larger windows reduce the travel but need more memory and time."
+                ),
+            },
         ]
         kernel.register_choices("optimize", choices)
 
@@ -303,6 +393,7 @@ class Planner(Service):
         Service.__init__(self, kernel, "planner")
         self._plan = dict()
         self._default_plan = "0"
+        self.blob_cache = BlobCache()
 
     def length(self, v):
         return float(Length(v))
@@ -640,6 +731,17 @@ class Planner(Service):
             self.signal("plan", data.name, 4)
             return data_type, data
 
+        @self.console_command(
+            "simplify",
+            help=_("plan<?> simplify"),
+            input_type="plan",
+            output_type="plan",
+        )
+        def plan_simplify(data_type=None, data=None, **kwgs):
+            data.simplify()
+            self.signal("plan", data.name, 4)
+            return data_type, data
+
         @self.console_command(
             "preopt",
             help=_("plan<?> preopt"),
@@ -662,6 +764,28 @@ class Planner(Service):
             self.signal("plan", data.name, 6)
             return data_type, data
 
+        @self.console_option(
+            "clear", "c", type=bool, action="store_true", help=_("Clear the cache")
+        )
+        @self.console_command(
+            "blob_cache",
+            help=_("Show or clear the cache of unchanged operations"),
+        )
+        def blob_cache(command, channel, _, clear=False, **kwgs):
+            cache = self.blob_cache
+            if clear:
+                cache.clear()
+            channel(
+                _("Blob cache: %d entries, %.1f of %.1f MB, %d hits, %d misses")
+                % (
+                    len(cache),
+                    cache.size / 1048576.0,
+                    cache.max_size / 1048576.0,
+                    cache.hits,
+                    cache.misses,
+                )
+            )
+
         @self.console_command(
             "clear",
             help=_("plan<?> clear"),
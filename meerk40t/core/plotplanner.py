@@ -79,6 +79,10 @@ class PlotPlanner(Parameters):
         self.pos_x = None
         self.pos_y = None
 
+        # Cut being plotted and the number of its steps read.
+        self.current_cut = None
+        self.current_steps = 0
+
     def push(self, plot):
         self.abort = False
         self.queue.append(plot)
@@ -184,7 +188,9 @@ class PlotPlanner(Parameters):
             # Plot the current.
             # Current is executed in cut settings.
             yield None, None, PLOT_START
-            yield from self.process_plots(cut.generator())
+            self.current_cut = cut
+            self.current_steps = 0
+            yield from self.process_plots(self.count_steps(cut.generator()))
             self.pos_x = self.single.single_x
             self.pos_y = self.single.single_y
 
@@ -194,10 +200,19 @@ class PlotPlanner(Parameters):
             self.pos_x = self.single.single_x
             self.pos_y = self.single.single_y
 
+        self.current_cut = None
         self.reset()
         self.abort = False
         yield None, None, PLOT_FINISH
 
+    def count_steps(self, plot):
+        """
+        Counts the steps of the current cut read by the plot processes.
+        """
+        for step in plot:
+            self.current_steps += 1
+            yield step
+
     def process_plots(self, plot):
         """
         Converts a series of inputs into a series of outputs. There is not a 1:1 input to output conversion.
@@ -0,0 +1,190 @@
+"""
+The simulation timeline maps the time within a job onto the cutcode being run.
+
+Every cut object is given a travel time, from the end of the previous cut to its start, and a burn time, from its
+length and speed plus any extra time the cut requires. This is the same speed model as the cutcode duration
+estimates. Any job time can then be looked up with a binary search, giving the cut index, the position within that
+cut and whether the laser is on. None of this requires a gui so the simulation can be driven, and tested, headless.
+"""
+
+from bisect import bisect_right
+
+from .cutcode import MILS_IN_MM, CubicCut, DwellCut, QuadCut
+
+
+class SimulationState:
+    """
+    State of the simulated laser at a given time.
+
+    index is the cut being travelled to or burned, every cut before it is complete. t is the position within the
+    burn of that cut, between 0 and 1. laser is whether the laser is firing. x and y are the laser position.
+    """
+
+    __slots__ = ("time", "index", "t", "laser", "x", "y")
+
+    def __init__(self, time, index, t, laser, x, y):
+        self.time = time
+        self.index = index
+        self.t = t
+        self.laser = laser
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return "SimulationState(%f, index=%d, t=%f, laser=%s, x=%f, y=%f)" % (
+            self.time,
+            self.index,
+            self.t,
+            self.laser,
+            self.x,
+            self.y,
+        )
+
+
+class SimulationTimeline:
+    """
+    Timeline of the cuts within the cutcode, with the travel and burn periods of every cut.
+    """
+
+    def __init__(self, cutcode, travel_speed=None, origin=(0, 0)):
+        """
+        @param cutcode: cutcode to simulate, it is flattened.
+        @param travel_speed: travel speed in mm/s, defaults to the travel speed of the cutcode.
+        @param origin: laser position at the start of the job.
+        """
+        if travel_speed is None:
+            travel_speed = getattr(cutcode, "travel_speed", 20.0)
+        self.travel_speed = travel_speed
+        self.origin = origin
+        self.cuts = list(cutcode.flat())
+        # Times at which every cut starts travel, starts burning, and ends.
+        self.travel_starts = list()
+        self.burn_starts = list()
+        self.ends = list()
+        time = 0.0
+        x, y = origin
+        for cut in self.cuts:
+            self.travel_starts.append(time)
+            start = cut.start
+            if start is not None:
+                time += self.travel_time(x, y, start[0], start[1])
+            self.burn_starts.append(time)
+            time += self.burn_time(cut)
+            self.ends.append(time)
+            end = cut.end
+            if end is not None:
+                x, y = end
+        self.duration = time
+
+    def __len__(self):
+        return len(self.cuts)
+
+    def travel_time(self, x0, y0, x1, y1):
+        """
+        Time to travel between the given points, in seconds.
+        """
+        if not self.travel_speed:
+            return 0.0
+        distance = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5
+        return (distance / MILS_IN_MM) / self.travel_speed
+
+    @staticmethod
+    def burn_time(cut):
+        """
+        Time to burn the given cut object, in seconds.
+        """
+        time = cut.extra()
+        if cut.speed:
+            time += (cut.length() / MILS_IN_MM) / cut.speed
+        if isinstance(cut, DwellCut):
+            time += cut.dwell_time / 1000.0
+        return time
+
+    def time_at(self, index):
+        """
+        Time at which the cut at the given index begins its travel, or the duration past the last cut.
+        """
+        if index >= len(self.cuts):
+            return self.duration
+        if index <= 0:
+            return 0.0
+        return self.travel_starts[index]
+
+    def index_at(self, time):
+        """
+        Index of the cut being travelled to or burned at the given time. len(self) once the job is complete.
+        """
+        if time >= self.duration:
+            return len(self.cuts)
+        return bisect_right(self.ends, time)
+
+    def state(self, time):
+        """
+        Simulated laser state at the given job time.
+
+        @param time: time within the job, in seconds.
+        @return: SimulationState
+        """
+        time = max(0.0, time)
+        index = self.index_at(time)
+        if index >= len(self.cuts):
+            if self.cuts:
+                x, y = self.position(self.cuts[-1], 1.0)
+            else:
+                x, y = self.origin
+            return SimulationState(self.duration, len(self.cuts), 1.0, False, x, y)
+        cut = self.cuts[index]
+        burn_start = self.burn_starts[index]
+        if time < burn_start:
+            # Travelling from the previous cut.
+            if index == 0:
+                x0, y0 = self.origin
+            else:
+                x0, y0 = self.position(self.cuts[index - 1], 1.0)
+            x1, y1 = self.position(cut, 0.0)
+            travel_start = self.travel_starts[index]
+            r = (time - travel_start) / (burn_start - travel_start)
+            return SimulationState(
+                time, index, 0.0, False, x0 + (x1 - x0) * r, y0 + (y1 - y0) * r
+            )
+        span = self.ends[index] - burn_start
+        t = (time - burn_start) / span if span > 0 else 1.0
+        x, y = self.position(cut, t)
+        return SimulationState(time, index, t, True, x, y)
+
+    @staticmethod
+    def position(cut, t):
+        """
+        Position at t within the given cut. Curves are evaluated, everything else is taken to run straight from
+        its start to its end.
+        """
+        if isinstance(cut, (QuadCut, CubicCut)):
+            return cut.point(t)
+        start = cut.start
+        end = cut.end
+        if start is None:
+            start = end
+        if end is None:
+            end = start
+        if start is None:
+            return 0.0, 0.0
+        return (
+            start[0] + (end[0] - start[0]) * t,
+            start[1] + (end[1] - start[1]) * t,
+        )
+
+    def partial(self, index, t, samples=16):
+        """
+        Points along the cut at the given index from its start to t, to draw a partially burned cut.
+
+        @param index: index of the cut.
+        @param t: position within the cut.
+        @param samples: points used for curves.
+        @return: list of points
+        """
+        if index >= len(self.cuts) or t <= 0:
+            return []
+        cut = self.cuts[index]
+        if not isinstance(cut, (QuadCut, CubicCut)):
+            samples = 1
+        return [self.position(cut, t * i / samples) for i in range(samples + 1)]
@@ -1,6 +1,8 @@
 import time
-from threading import Lock
+from collections import deque
+from threading import Condition, Lock
 
+from meerk40t.core.cutcode import CutCode, RawCut
 from meerk40t.core.units import Length
 from meerk40t.kernel import CommandSyntaxError
 
@@ -237,6 +239,28 @@ def plugin(kernel, lifecycle):
             spooler.job("lock_rail")
             return "spooler", spooler
 
+        @kernel.console_command(
+            "resume_job",
+            input_type=("spooler", None),
+            output_type="spooler",
+            help=_("spool the rest of the last interrupted job"),
+        )
+        def resume_job(command, channel, _, data=None, **kwgs):
+            if data is None:
+                data = kernel.device.spooler
+            spooler = data
+            if spooler.busy():
+                channel(_("Busy Error"))
+                return "spooler", spooler
+            remaining = spooler.checkpoint.remaining()
+            if not remaining:
+                channel(_("No job to resume."))
+                return "spooler", spooler
+            count = sum(len(job) for job in remaining)
+            spooler.jobs(remaining)
+            channel(_("Resuming job, {count} cuts remaining.").format(count=count))
+            return "spooler", spooler
+
         @kernel.console_command(
             "test_dot_and_home",
             input_type=("spooler", None),
@@ -266,6 +290,346 @@ def plugin(kernel, lifecycle):
             return "spooler", spooler
 
 
+class SpoolerProgress:
+    """
+    Progress of the job being spooled, sent with the "spooler;progress" signal.
+
+    Cut objects are counted for jobs which provide them, such as cutcode, otherwise
+    cuts_total is None and there is no eta.
+    """
+
+    def __init__(self, label, cuts_total=None):
+        self.label = label
+        self.start_time = time.time()
+        self.end_time = None
+        self.commands = 0
+        self.cuts_done = 0
+        self.cuts_total = cuts_total
+
+    def __repr__(self):
+        return "SpoolerProgress(%s, commands=%d, cuts=%d/%s, eta=%s)" % (
+            repr(self.label),
+            self.commands,
+            self.cuts_done,
+            str(self.cuts_total),
+            str(self.eta),
+        )
+
+    @property
+    def finished(self):
+        return self.end_time is not None
+
+    @property
+    def elapsed(self):
+        end = self.end_time if self.end_time is not None else time.time()
+        return end - self.start_time
+
+    @property
+    def commands_per_second(self):
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.commands / elapsed
+
+    @property
+    def eta(self):
+        """
+        Estimated seconds remaining, from the rate of cut objects done so far.
+        """
+        if self.finished:
+            return 0.0
+        if not self.cuts_total or not self.cuts_done:
+            return None
+        return self.elapsed * (self.cuts_total - self.cuts_done) / self.cuts_done
+
+
+class SendMarks:
+    """
+    Marks within a stream of data sent to a device. Controllers count the data written
+    and the data confirmed by the device, in bytes, lines or packets. Each mark is
+    called once all the data written before it has been confirmed.
+    """
+
+    def __init__(self):
+        self.written = 0
+        self.confirmed = 0
+        self._marks = deque()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._marks)
+
+    def write(self, amount):
+        with self._lock:
+            self.written += amount
+
+    def mark(self, function):
+        with self._lock:
+            if self.confirmed < self.written:
+                self._marks.append((self.written, function))
+                return
+        function()
+
+    def confirm(self, amount):
+        ready = list()
+        with self._lock:
+            self.confirmed += amount
+            marks = self._marks
+            while marks and marks[0][0] <= self.confirmed:
+                ready.append(marks.popleft()[1])
+        for function in ready:
+            function()
+
+    def clear(self):
+        """
+        Drops the marks, the data written was discarded.
+        """
+        with self._lock:
+            self._marks.clear()
+            self.confirmed = self.written
+
+
+class JobCheckpoint:
+    """
+    Checkpoint of the cutcode jobs spooled, to resume a job after it was interrupted.
+
+    Drivers update the checkpoint with the cut being plotted and the number of its steps
+    plotted. The update is confirmed when the controller confirms all the data written
+    before it, for pipes providing mark(function), or immediately otherwise. Updates
+    are marked at most every interval steps of a cut, and every interval cuts or PERIOD
+    seconds for whole cuts. Marks store the position of their cut, so confirming a mark
+    does not search the cuts.
+
+    remaining() gives the cutcode left from the last confirmed position. The plot planner
+    buffers a few steps, so the remaining cutcode starts overlap steps before it.
+
+    The listener, if set, is called with the job and the number of its cuts plotted
+    whenever the driver moves on to another cut or completes one.
+    """
+
+    # Seconds after which a whole cut is marked, even within the interval.
+    PERIOD = 0.5
+
+    def __init__(self, interval=256, overlap=16):
+        self.interval = interval
+        self.overlap = overlap
+        self.jobs = list()
+        self.current = None
+        self._cuts = dict()
+        self._confirmed = dict()
+        self._last = None
+        self._plotted = 0
+        self._index = None
+        self._unmarked = 0
+        self._mark_time = 0
+        self._lock = Lock()
+        self.listener = None
+
+    def clear(self):
+        with self._lock:
+            self.jobs.clear()
+            self.current = None
+            self._cuts.clear()
+            self._confirmed.clear()
+            self._last = None
+            self._plotted = 0
+            self._index = None
+            self._unmarked = 0
+
+    def start(self, job):
+        """
+        The spooler starts executing the job.
+        """
+        with self._lock:
+            if not any(j is job for j in self.jobs):
+                self.jobs.append(job)
+            self._cuts[id(job)] = list(job.flat())
+            self.current = job
+            self._last = None
+            self._plotted = 0
+            self._index = None
+            self._unmarked = 0
+
+    def end(self, job):
+        """
+        The spooler finished executing the job. Updates for it may still be confirmed.
+        """
+        if self.current is job:
+            self.current = None
+
+    def update(self, pipe, cut, steps=None):
+        """
+        The driver plotted steps of the cut of the current job, None for all of them.
+
+        @param pipe: pipe the data was written to.
+        @param cut: cut being plotted.
+        @param steps: number of steps of the cut plotted.
+        @return:
+        """
+        job = self.current
+        if job is None or cut is None:
+            return
+        last = self._last
+        if steps is None and last is not None and last[0] is cut and last[1] is None:
+            return
+        if last is None or last[0] is not cut or steps is None:
+            self._progress(job, cut, steps)
+        if steps is None:
+            self._unmarked += 1
+            if self._unmarked < self.interval:
+                now = time.monotonic()
+                if now - self._mark_time < self.PERIOD:
+                    # Marked with a later cut, or by complete().
+                    self._last = cut, None
+                    return
+        elif (
+            last is not None
+            and last[0] is cut
+            and last[1] is not None
+            and steps - last[1] < self.interval
+        ):
+            return
+        self._last = cut, steps
+        self._mark(pipe, job, steps)
+
+    def _mark(self, pipe, job, steps):
+        """
+        Marks the cut last found by _progress, confirmed with the data written before it.
+        """
+        if self._index is None:
+            return
+        self._unmarked = 0
+        self._mark_time = time.monotonic()
+        position = self._index, steps
+
+        def confirm():
+            self._confirm(job, position)
+
+        mark = getattr(pipe, "mark", None)
+        if mark is None:
+            confirm()
+        else:
+            mark(confirm)
+
+    def _progress(self, job, cut, steps):
+        """
+        Counts the cuts of the job plotted, up to the cut being plotted, and including it
+        once all of its steps are plotted.
+        """
+        self._index = None
+        cuts = self._cuts.get(id(job))
+        if cuts is None:
+            return
+        for i in range(max(self._plotted - 1, 0), len(cuts)):
+            if cuts[i] is cut:
+                self._index = i
+                self._plotted = i + 1 if steps is None else i
+                break
+        else:
+            return
+        listener = self.listener
+        if listener is not None:
+            listener(job, self._plotted)
+
+    def complete(self, pipe):
+        """
+        The driver plotted all steps of the last cut updated.
+        """
+        last = self._last
+        job = self.current
+        if last is None or job is None:
+            return
+        if last[1] is not None:
+            self._progress(job, last[0], None)
+            self._last = last[0], None
+        elif not self._unmarked:
+            return
+        self._mark(pipe, job, None)
+
+    def _confirm(self, job, position):
+        with self._lock:
+            self._confirmed[id(job)] = position
+
+    def confirm(self, job, cut, steps=None):
+        with self._lock:
+            cuts = self._cuts.get(id(job))
+            if cuts is None:
+                return
+            index = self._confirmed.get(id(job), (0, None))[0]
+            for i in range(max(index, 0), len(cuts)):
+                if cuts[i] is cut:
+                    self._confirmed[id(job)] = i, steps
+                    return
+
+    def position(self, job):
+        """
+        Index of the last confirmed cut of the job, and the steps of it plotted, None
+        for all of them.
+        """
+        return self._confirmed.get(id(job), (-1, None))
+
+    def remaining(self):
+        """
+        Cutcode jobs of the remaining cuts. The cut interrupted is continued with a
+        RawCut of its remaining steps.
+
+        @return: list of cutcode
+        """
+        remaining = list()
+        with self._lock:
+            for job in self.jobs:
+                cuts = self._cuts.get(id(job))
+                if cuts is None:
+                    cuts = list(job.flat())
+                index, steps = self._confirmed.get(id(job), (-1, None))
+                if steps is None:
+                    # Cut at index is complete.
+                    index += 1
+                    steps = 0
+                else:
+                    # Back up by overlap steps, into the previous cuts if needed.
+                    back = self.overlap
+                    while steps < back and index > 0:
+                        back -= steps
+                        index -= 1
+                        steps = sum(1 for _ in cuts[index].generator())
+                    steps = max(0, steps - back)
+                rest = list()
+                if index < len(cuts):
+                    if steps:
+                        partial = self.partial(cuts[index], steps)
+                        if partial is not None:
+                            rest.append(partial)
+                    else:
+                        rest.append(cuts[index])
+                    rest.extend(cuts[index + 1 :])
+                if not rest:
+                    continue
+                resumed = CutCode(rest, settings=job.settings)
+                resumed.__setstate__(job.__getstate__())
+                remaining.append(resumed)
+        return remaining
+
+    @staticmethod
+    def partial(cut, steps):
+        """
+        RawCut of the cut without its first steps.
+        """
+        plot = list()
+        for i, step in enumerate(cut.generator()):
+            if i < steps:
+                continue
+            if len(step) == 2:
+                plot.append((step[0], step[1], 1))
+            else:
+                plot.append(step)
+        if not plot:
+            return None
+        raw = RawCut(settings=cut.settings)
+        raw.plot_extend(plot)
+        return raw
+
+
 class Spooler:
     """
     Stores spoolable lasercode events as a synchronous queue.
@@ -273,6 +637,11 @@ class Spooler:
 
     Spooler should be registered as a service_delegate of the service running the driver to process data.
 
+    The spooler thread blocks on a condition variable while there is nothing to do and is
+    woken by any change to the queue. Drivers call wake() when they release a hold, such as
+    on resume or when their buffer drains. Holds are still checked every HOLD_WAIT seconds,
+    for drivers which do not call wake().
+
     * peek()
     * pop()
     * job(job)
@@ -282,17 +651,28 @@ class Spooler:
     * remove(job)
     """
 
+    # Seconds between checks of the driver holds, without a wake() from the driver.
+    HOLD_WAIT = 0.5
+    # Seconds between progress signals during a job.
+    PROGRESS_INTERVAL = 0.5
+
     def __init__(self, context, driver=None, **kwargs):
         self.context = context
         self.driver = driver
+        self._dispatch_driver = None
+        self._dispatch_functions = None
         self.foreground_only = True
-        self._realtime_lock = Lock()
+        self._lock = Condition()
+        self._realtime_lock = self._lock
         self._realtime_queue = []
-        self._lock = Lock()
         self._queue = []
         self._idle = None
         self._shutdown = False
         self._thread = None
+        self.progress = None
+        self._progress_time = 0
+        self.checkpoint = JobCheckpoint()
+        self.checkpoint.listener = self._plotted
 
     def __repr__(self):
         return "Spooler(%s)" % str(self.context)
@@ -318,14 +698,25 @@ class Spooler:
 
     def shutdown(self, *args, **kwargs):
         self._shutdown = True
+        self.wake()
+
+    def wake(self):
+        """
+        Wakes the spooler thread to check the queues and the driver holds.
+        """
+        lock = self._lock
+        if lock is None:
+            return
+        with lock:
+            lock.notify_all()
 
     def restart(self):
         self._shutdown = False
         if self._thread is None:
 
             def clear_thread(*a):
-                self._shutdown = True
                 self._thread = None
+                self.shutdown()
 
             self._thread = self.context.threaded(
                 self.run,
@@ -334,6 +725,30 @@ class Spooler:
             )
             self._thread.stop = clear_thread
 
+    def dispatch_table(self):
+        """
+        Dispatch table of the driver, command name to the function found on the driver
+        instance, None for commands the driver does not have. Functions are looked up on
+        the instance, so functions set on the driver are called rather than those of its
+        class. Each command is looked up once, the table is rebuilt when the driver is
+        replaced.
+        """
+        driver = self.driver
+        if self._dispatch_driver is not driver:
+            self._dispatch_driver = driver
+            self._dispatch_functions = dict()
+        return self._dispatch_functions
+
+    def _dispatch(self, attr, args):
+        table = self.dispatch_table()
+        try:
+            function = table[attr]
+        except KeyError:
+            function = getattr(self.driver, attr, None)
+            table[attr] = function
+        if function is not None:
+            function(*args)
+
     def _execute_program(self, program):
         """
         This executes the different classes of spoolable object.
@@ -341,50 +756,137 @@ class Spooler:
         (str, attribute, ...) calls self.driver.str(*attributes)
         str, calls self.driver.str()
         callable, callable()
-        has_attribute(generator), recursive call to list of lines produced by
-        generator, recursive call to list of lines produced by generator
+        has_attribute(generator), the lines produced by generate() are executed
+        generator, the lines produced by generator are executed
+
+        Nested generators are executed with a stack rather than recursion. Cutcode
+        produced by a generator is checkpointed while it executes.
 
         @param program: line to be executed.
         @return:
         """
-        if self._shutdown:
+        progress = self.progress
+        stack = []
+        try:
+            self._execute_stack(program, progress, stack)
+        finally:
+            for generator, job in stack:
+                if job is not None:
+                    self.checkpoint.end(job)
+
+    def _execute_stack(self, program, progress, stack):
+        while not self._shutdown:
+            # TUPLE[str, Any,...]
+            if isinstance(program, tuple):
+                attr = program[0]
+                self._dispatch(attr, program[1:])
+                if progress is not None:
+                    progress.commands += 1
+            # STRING
+            elif isinstance(program, str):
+                self._dispatch(program, ())
+                if progress is not None:
+                    progress.commands += 1
+            else:
+                job = None
+                if isinstance(program, CutCode) and self.checkpoint.current is None:
+                    self.checkpoint.start(program)
+                    job = program
+                # .generator is a Generator
+                if hasattr(program, "generate"):
+                    program = getattr(program, "generate")
+                # GENERATOR
+                stack.append((iter(program()), job))
+            program = None
+            while stack:
+                try:
+                    program = next(stack[-1][0])
+                    break
+                except StopIteration:
+                    generator, job = stack.pop()
+                    if job is not None:
+                        self.checkpoint.end(job)
+            if program is None:
+                return
+
+    def _execute_job(self, program):
+        """
+        Executes a job from the queue, reporting its progress. Single commands are
+        executed without progress reports.
+        """
+        if isinstance(program, (tuple, str)):
+            self._execute_program(program)
             return
-        # TUPLE[str, Any,...]
-        if isinstance(program, tuple):
-            attr = program[0]
+        if isinstance(program, CutCode):
+            self.checkpoint.start(program)
+        cuts_total = None
+        if hasattr(program, "flat"):
+            cuts_total = sum(1 for _ in program.flat())
+        self.progress = SpoolerProgress(str(program), cuts_total)
+        self._progress_time = 0
+        self._signal_progress()
+        try:
+            self._execute_program(program)
+        finally:
+            self.checkpoint.end(program)
+            if not self._shutdown and cuts_total is not None:
+                # Drivers which do not update the checkpoint have plotted every cut.
+                self.progress.cuts_done = cuts_total
+            self.progress.end_time = time.time()
+            self._signal_progress(force=True)
+            self.progress = None
 
-            if hasattr(self.driver, attr):
-                function = getattr(self.driver, attr)
-                function(*program[1:])
+    def _plotted(self, job, cuts_done):
+        """
+        The driver plotted cuts of the job, from the checkpoint.
+        """
+        progress = self.progress
+        if progress is None:
             return
+        progress.cuts_done = cuts_done
+        self._signal_progress()
 
-        # STRING
-        if isinstance(program, str):
-            attr = program
+    def _signal_progress(self, force=False):
+        now = time.time()
+        if force or now - self._progress_time >= self.PROGRESS_INTERVAL:
+            self._progress_time = now
+            self.context.signal("spooler;progress", self.progress)
 
-            if hasattr(self.driver, attr):
-                function = getattr(self.driver, attr)
-                function()
-            return
+    def busy(self):
+        """
+        Whether a cutcode job is executing or queued.
+        """
+        if self.checkpoint.current is not None:
+            return True
+        return any(isinstance(q, CutCode) for q in self._queue)
 
-        # .generator is a Generator
-        if hasattr(program, "generate"):
-            program = getattr(program, "generate")
+    def _checkpoint(self, jobs):
+        """
+        Registers the cutcode jobs with the checkpoint. Spooling cutcode while no other
+        cutcode is executing or queued starts a new checkpoint.
+        """
+        cutcodes = [job for job in jobs if isinstance(job, CutCode)]
+        if not cutcodes:
+            return
+        if not self.busy():
+            self.checkpoint.clear()
+        self.checkpoint.jobs.extend(cutcodes)
 
-        # GENERATOR
-        for p in program():
-            if self._shutdown:
+    def _wait(self, timeout=None):
+        """
+        Waits for a change of the queues, up to timeout seconds.
+        """
+        with self._lock:
+            if self._shutdown or self._realtime_queue:
                 return
-            self._execute_program(p)
-        # print("Unspoolable object: {s}".format(s=str(program)))
+            if timeout is None and (self._queue or self._idle is not None):
+                return
+            self._lock.wait(timeout)
 
     def run(self):
-        while True:
+        while not self._shutdown:
             # Forever Looping.
-            if self._shutdown:
-                # We have been told to stop.
-                break
-            if len(self._realtime_queue):
+            if self._realtime_queue:
                 # There is realtime work.
                 with self._lock:
                     # threadsafe
@@ -392,29 +894,29 @@ class Spooler:
                 if program is not None:
                     # Process all data in the program.
                     self._execute_program(program)
+                continue
             # Check if driver is holding work.
             if self.driver.hold_work():
-                time.sleep(0.01)
+                self._wait(self.HOLD_WAIT)
                 continue
-            if len(self._queue):
+            if self._queue:
                 # There is active work to do.
                 with self._lock:
                     # threadsafe
-                    program = self._queue.pop(0)
+                    program = self._queue.pop(0) if self._queue else None
                 if program is not None:
                     # Process all data in the program.
-                    self._execute_program(program)
+                    self._execute_job(program)
             # Check if driver is holding idle.
             if self.driver.hold_idle():
-                time.sleep(0.01)
+                self._wait(self.HOLD_WAIT)
                 continue
             if self._idle is not None:
                 self._execute_program(self._idle)
                 # Finished idle cycle.
                 continue
-            else:
-                # There is nothing to send or do.
-                time.sleep(0.1)
+            # There is nothing to send or do, wait for work.
+            self._wait()
 
     @property
     def queue(self):
@@ -444,11 +946,12 @@ class Spooler:
         @param job:
         @return:
         """
-        with self._realtime_lock:
+        with self._lock:
             if len(job) == 1:
                 self._realtime_queue.extend(job)
             else:
                 self._realtime_queue.append(job)
+            self._lock.notify_all()
 
     def job(self, *job):
         """
@@ -460,11 +963,15 @@ class Spooler:
         @param job: job to send to the spooler.
         @return:
         """
+        if len(job) == 1:
+            # Several values are a single command, with no cutcode to checkpoint.
+            self._checkpoint(job)
         with self._lock:
             if len(job) == 1:
                 self._queue.extend(job)
             else:
                 self._queue.append(job)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
     def jobs(self, jobs):
@@ -476,11 +983,13 @@ class Spooler:
         @param jobs: jobs to extend
         @return:
         """
+        self._checkpoint(jobs if isinstance(jobs, (list, tuple)) else (jobs,))
         with self._lock:
             if isinstance(jobs, (list, tuple)):
                 self._queue.extend(jobs)
             else:
                 self._queue.append(jobs)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
     def set_idle(self, job):
@@ -491,6 +1000,7 @@ class Spooler:
         @return:
         """
         self._idle = job
+        self.wake()
 
     def job_if_idle(self, *element):
         """
@@ -8,18 +8,27 @@ def plugin(kernel, lifecycle):
         except ImportError:
             return True
     elif lifecycle == "register":
-        from meerk40t.tools.clipper import Clipper, ClipType, PolyFillType, PolyType
+        from meerk40t.tools.clipping import clip_backends
 
         _ = kernel.translation
         context = kernel.root
+        for name, backend in clip_backends().items():
+            kernel.register("clip/%s" % name, backend)
 
+        @context.console_option(
+            "backend",
+            "b",
+            type=str,
+            default="numpy",
+            help=_("Clipping backend: numpy or clipper"),
+        )
         @context.console_command(
             ("intersection", "xor", "union", "difference"),
             input_type="elements",
             output_type="elements",
             help=_("Constructive Additive Geometry: Add"),
         )
-        def cag(command, channel, _, data=None, **kwargs):
+        def cag(command, channel, _, data=None, backend=None, **kwargs):
             import numpy as np
 
             if len(data) < 2:
@@ -29,15 +38,11 @@ def plugin(kernel, lifecycle):
                     )
                 )
                 return "elements", []
+            clipper = context.lookup("clip", backend)
+            if clipper is None:
+                channel(_("No clipping backend: %s") % backend)
+                return "elements", []
 
-            if command == "intersection":
-                ct = ClipType.Intersection
-            elif command == "xor":
-                ct = ClipType.Xor
-            elif command == "union":
-                ct = ClipType.Union
-            else:  # difference
-                ct = ClipType.Difference
             solution_path = Path(stroke="blue", stroke_width=1000)
             last_polygon = None
             for i in range(len(data)):
@@ -55,14 +60,9 @@ def plugin(kernel, lifecycle):
                     current_polygon.append(s)
 
                 if last_polygon is not None:
-                    pc = Clipper()
-                    solution = []
-                    pc.AddPolygons(last_polygon, PolyType.Subject)
-                    pc.AddPolygons(current_polygon, PolyType.Clip)
-                    result = pc.Execute(
-                        ct, solution, PolyFillType.EvenOdd, PolyFillType.EvenOdd
+                    current_polygon = clipper.clip(
+                        last_polygon, current_polygon, command
                     )
-                    current_polygon = solution
                 last_polygon = current_polygon
 
             for se in last_polygon:
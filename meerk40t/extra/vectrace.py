@@ -1,19 +1,33 @@
+from math import sqrt
+
+from meerk40t.core.units import Length
 from meerk40t.svgelements import Matrix, Path, Polygon
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def plugin(kernel, lifecycle=None):
     if lifecycle == "register":
         _ = kernel.translation
 
+        @kernel.console_option(
+            "tolerance",
+            "t",
+            type=Length,
+            default="0",
+            help=_("Simplify the traced contours within this distance"),
+        )
         @kernel.console_command(
             "vectrace",
             help=_("return paths around image"),
             input_type="image",
             output_type="elements",
         )
-        def vectrace(data, **kwargs):
+        def vectrace(data, tolerance=None, **kwargs):
             elements = kernel.root.elements
-            path = Path(fill="black", stroke="blue")
             paths = []
             for node in data:
                 matrix = node.matrix
@@ -21,9 +35,25 @@ def plugin(kernel, lifecycle=None):
                 width, height = node.image.size
                 if image.mode != "L":
                     image = image.convert("L")
-                image = image.point(lambda e: int(e > 127) * 255)
-                for points in _vectrace(image.load(), width, height):
-                    path += Polygon(*points)
+                path = Path(fill="black", stroke="blue")
+                if np is None:
+                    image = image.point(lambda e: int(e > 127) * 255)
+                    for points in _vectrace(image.load(), width, height):
+                        path += Polygon(*points)
+                else:
+                    # Tolerance is given in scene units, contours are in pixels.
+                    scale = sqrt(abs(matrix.determinant))
+                    pixel_tolerance = float(tolerance) / scale if scale else 0.0
+                    mask = np.asarray(image) <= 127
+                    for points in trace_contours(mask):
+                        if pixel_tolerance > 0:
+                            points = simplify_contour(points, pixel_tolerance)
+                            if len(points) < 3:
+                                continue
+                        points = points.tolist()
+                        path.move(points[0])
+                        path.line(*points[1:])
+                        path.closed()
                 paths.append(
                     elements.elem_branch.add(
                         path=path, matrix=Matrix(matrix), type="elem path"
@@ -32,6 +62,133 @@ def plugin(kernel, lifecycle=None):
             return "elements", paths
 
 
+def _runs(values):
+    """
+    Finds the runs of equal non-zero values along the rows of a 2d array.
+
+    @param values: 2d integer array
+    @return: row, start, end and value arrays of the runs, end is exclusive.
+    """
+    rows, columns = values.shape
+    stride = columns + 1
+    # Every row is followed by a zero so no run can continue onto the next row.
+    padded = np.zeros((rows, stride), dtype=values.dtype)
+    padded[:, :columns] = values
+    flat = padded.ravel()
+    changes = np.flatnonzero(np.diff(flat, prepend=0))
+    starts = changes[flat[changes] != 0]
+    ends = changes[np.searchsorted(changes, starts, side="right")]
+    row = starts // stride
+    return row, starts - row * stride, ends - row * stride, flat[starts]
+
+
+def trace_contours(mask):
+    """
+    Traces the boundaries of the set pixels of a mask with run-lengths.
+
+    The boundaries between rows and between columns are found as runs of pixel
+    differences. Every run is a straight boundary segment from corner to corner, with
+    the set pixels on its right, so outer contours and holes have opposite
+    orientations. Each segment is followed by the segment starting at its end corner,
+    where two segments start at the same corner the right turn is taken which keeps
+    diagonally touching pixels apart, the same as _trace.
+
+    @param mask: 2d boolean array, True for pixels to be traced.
+    @return: list of contours, each an (n, 2) array of corner points.
+    """
+    height, width = mask.shape
+    pixels = np.zeros((height + 2, width + 2), dtype=np.int8)
+    pixels[1:-1, 1:-1] = mask
+    # Row boundary y lies above pixel row y, +1 where the set pixel is below.
+    row, x0, x1, value = _runs(pixels[1:, 1:-1] - pixels[:-1, 1:-1])
+    east = value > 0
+    h_start_x = np.where(east, x0, x1)
+    h_end_x = np.where(east, x1, x0)
+    h_direction = np.where(east, _EAST, _WEST)
+    # Column boundary x lies left of pixel column x, +1 where the set pixel is left.
+    column, y0, y1, value = _runs((pixels[1:-1, :-1] - pixels[1:-1, 1:]).T)
+    south = value > 0
+    v_start_y = np.where(south, y0, y1)
+    v_end_y = np.where(south, y1, y0)
+    v_direction = np.where(south, _SOUTH, _NORTH)
+
+    start_x = np.concatenate((h_start_x, column))
+    start_y = np.concatenate((row, v_start_y))
+    end_x = np.concatenate((h_end_x, column))
+    end_y = np.concatenate((row, v_end_y))
+    direction = np.concatenate((h_direction, v_direction))
+    count = len(direction)
+    if count == 0:
+        return []
+
+    stride = width + 1
+    start_key = start_y * stride + start_x
+    end_key = end_y * stride + end_x
+    order = np.argsort(start_key, kind="stable")
+    sorted_key = start_key[order]
+    index = np.searchsorted(sorted_key, end_key)
+    following = order[index]
+    other_index = np.minimum(index + 1, count - 1)
+    other = order[other_index]
+    take_other = (sorted_key[other_index] == end_key) & (
+        direction[other] == (direction + 1) % 4
+    )
+    following = np.where(take_other, other, following).tolist()
+
+    corners = np.stack((start_x, start_y), axis=1)
+    visited = bytearray(count)
+    contours = []
+    for i in range(count):
+        if visited[i]:
+            continue
+        cycle = []
+        j = i
+        while not visited[j]:
+            visited[j] = 1
+            cycle.append(j)
+            j = following[j]
+        contours.append(corners[cycle])
+    return contours
+
+
+def simplify_contour(points, tolerance):
+    """
+    Douglas-Peucker simplification of a closed contour.
+
+    @param points: (n, 2) array of contour points
+    @param tolerance: maximum distance of removed points from the simplified contour
+    @return: (m, 2) array of the kept points
+    """
+    count = len(points)
+    if count <= 3:
+        return points
+    closed = np.concatenate((points, points[:1])).astype(float)
+    far = int(np.argmax(np.sum((closed[:count] - closed[0]) ** 2, axis=1)))
+    keep = np.zeros(count + 1, dtype=bool)
+    keep[0] = keep[far] = keep[count] = True
+    stack = [(0, far), (far, count)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        delta = closed[b] - closed[a]
+        offsets = closed[a + 1 : b] - closed[a]
+        length = np.hypot(delta[0], delta[1])
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = (
+                np.abs(delta[0] * offsets[:, 1] - delta[1] * offsets[:, 0]) / length
+            )
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            i += a + 1
+            keep[i] = True
+            stack.append((a, i))
+            stack.append((i, b))
+    return points[keep[:count]]
+
+
 _NORTH = 3
 _EAST = 0
 _SOUTH = 1
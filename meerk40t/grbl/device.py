@@ -7,12 +7,12 @@ import time
 import serial
 from serial import SerialException
 
-from meerk40t.kernel import Service
+from meerk40t.kernel import LEVEL_DEBUG, LEVEL_ERROR, Service
 
 from ..core.cutcode import CubicCut, LineCut, QuadCut
 from ..core.parameters import Parameters
 from ..core.plotplanner import PlotPlanner
-from ..core.spoolers import Spooler
+from ..core.spoolers import SendMarks, Spooler
 from ..core.units import UNITS_PER_INCH, UNITS_PER_MIL, UNITS_PER_MM, ViewPort
 from ..device.basedevice import (
     DRIVER_STATE_FINISH,
@@ -591,6 +591,10 @@ class GRBLDriver(Parameters):
             self.grbl("M3\r")
         else:
             self.grbl("M4\r")
+        checkpoint = self.service.spooler.checkpoint
+        pipe = self.service.controller
+        settings = None
+        p_set = None
         for q in self.queue:
             x = self.native_x
             y = self.native_y
@@ -603,18 +607,23 @@ class GRBLDriver(Parameters):
             if self.on_value != 1.0:
                 self.power_dirty = True
             self.on_value = 1.0
-            if q.power != self.power:
-                self.set("power", q.power)
+            if q.settings is not settings:
+                # Cuts of the same operation share settings, which are not changed while plotting.
+                settings = q.settings
+                p_set = q.snapshot()
+            if p_set.power != self.power:
+                self.set("power", p_set.power)
             if (
-                q.speed != self.speed
-                or q.raster_step_x != self.raster_step_x
-                or q.raster_step_y != self.raster_step_y
+                p_set.speed != self.speed
+                or p_set.raster_step_x != self.raster_step_x
+                or p_set.raster_step_y != self.raster_step_y
             ):
-                self.set("speed", q.speed)
+                self.set("speed", p_set.speed)
             self.settings.update(q.settings)
             if isinstance(q, LineCut):
                 self.move_mode = 1
                 self.move(*q.end)
+                checkpoint.update(pipe, q)
             elif isinstance(q, (QuadCut, CubicCut)):
                 self.move_mode = 1
                 interp = self.service.interpolate
@@ -627,6 +636,7 @@ class GRBLDriver(Parameters):
                     t += step_size
                 last_x, last_y = q.end
                 self.move(last_x, last_y)
+                checkpoint.update(pipe, q)
             else:
                 self.plot_planner.push(q)
                 for x, y, on in self.plot_planner.gen():
@@ -637,7 +647,7 @@ class GRBLDriver(Parameters):
                         if on & PLOT_FINISH:  # Plot planner is ending.
                             break
                         elif on & PLOT_SETTING:  # Plot planner settings have changed.
-                            p_set = Parameters(self.plot_planner.settings)
+                            p_set = Parameters(self.plot_planner.settings).snapshot()
                             if p_set.power != self.power:
                                 self.set("power", p_set.power)
                             if (
@@ -661,7 +671,14 @@ class GRBLDriver(Parameters):
                         self.power_dirty = True
                     self.on_value = on
                     self.move(x, y)
+                    checkpoint.update(
+                        pipe,
+                        self.plot_planner.current_cut,
+                        self.plot_planner.current_steps,
+                    )
+                checkpoint.update(pipe, q)
         self.queue.clear()
+        checkpoint.complete(pipe)
         self.grbl("G1 S0\r")
         self.grbl("M5\r")
         self.power_dirty = True
@@ -877,6 +894,7 @@ class GRBLDriver(Parameters):
         """
         self.paused = False
         self.grbl("~")
+        self.service.spooler.wake()
 
     def reset(self, *args):
         """
@@ -1314,6 +1332,8 @@ class GrblController:
 
         self.lock_sending_queue = threading.RLock()
         self.sending_queue = []
+        # Marks of the lines written, confirmed by the "ok" responses.
+        self.marks = SendMarks()
 
         self.commands_in_device_buffer = []
         self.buffer_mode = 1  # 1:1 okay, send lines.
@@ -1387,8 +1407,18 @@ class GrblController:
         self.service.signal("serial;write", data)
         with self.lock_sending_queue:
             self.sending_queue.append(data)
+            self.marks.write(1)
             self.service.signal("serial;buffer", len(self.sending_queue))
 
+    def mark(self, function):
+        """
+        Calls the function once all the lines written so far are acknowledged.
+
+        @param function: function to call.
+        @return:
+        """
+        self.marks.mark(function)
+
     def start(self):
         self.open()
         if self.sending_thread is None:
@@ -1433,15 +1463,20 @@ class GrblController:
                         line = self.commands_in_device_buffer.pop(0)
                         self.buffered_characters -= len(line)
                     except IndexError:
-                        self.channel("Response: %s, but this was unexpected" % response)
+                        self.channel(
+                            "Response: %s, but this was unexpected",
+                            response,
+                            level=LEVEL_ERROR,
+                        )
                         continue
-                    self.channel("Response: %s" % response)
+                    self.marks.confirm(1)
+                    self.channel("Response: %s", response, level=LEVEL_DEBUG)
                 if response.startswith("echo:"):
                     self.service.channel("console")(response[5:])
                 if response.startswith("error"):
-                    self.channel("ERROR: %s" % response)
+                    self.channel("ERROR: %s", response, level=LEVEL_ERROR)
                 else:
-                    self.channel("Data: %s" % response)
+                    self.channel("Data: %s", response, level=LEVEL_DEBUG)
                 read += 1
             if read == 0 and write == 0:
                 time.sleep(0.05)
@@ -20,7 +20,7 @@ from ..core.units import (
     UNITS_PER_MM,
     UNITS_PERCENT,
 )
-from ..image.imagetools import RasterScripts
+from ..image.imagetools import RasterScripts, WizardPipeline
 from ..svgelements import Matrix, SVGImage
 from .icons import icons8_fantasy_50
 from .laserrender import LaserRender
@@ -48,6 +48,14 @@ class RasterWizardPanel(wx.Panel):
         self.previous_scene_position = None
 
         self.node = None
+        self.source_image = None
+        self.source_matrix = None
+        self.pil_image = None
+        self.matrix_image = None
+        self.step_image = None
+        self.preview_size = None
+        self.context.setting(int, "wizard_cache_size", 128)
+        self.pipeline = WizardPipeline(self.context.wizard_cache_size * 1048576)
 
         self.wx_bitmap_image = None
         self.image_width, self.image_height = None, None
@@ -176,12 +184,17 @@ class RasterWizardPanel(wx.Panel):
             if self.ops is None:
                 pass
             else:
-                self.node.image, self.node.matrix, step = RasterScripts.wizard_image(
-                    self.node, self.ops
+                # Previews run at screen resolution, the node only changes on commit.
+                (
+                    self.pil_image,
+                    self.matrix_image,
+                    self.step_image,
+                ) = self.pipeline.process(
+                    self.source_image,
+                    self.source_matrix,
+                    self.ops,
+                    preview=self.preview_size,
                 )
-                if step is not None:
-                    self.node.step_x = step
-                    self.node.step_y = step
             self.wx_bitmap_image = None
             if self.context is None:
                 with self.thread_update_lock:
@@ -207,6 +220,8 @@ class RasterWizardPanel(wx.Panel):
         for node in self.context.elements.elems(emphasized=True):
             if node.type == "elem image":
                 self.node = node
+                self.source_image = node.image
+                self.source_matrix = Matrix(node.matrix)
                 self.context.signal("RasterWizard-Image")
                 if self.ops is not None:
                     self.panel_select_op()
@@ -260,6 +275,7 @@ class RasterWizardPanel(wx.Panel):
             width = 1
         if height <= 0:
             height = 1
+        self.preview_size = max(width, height)
         self._preview_panel_buffer = wx.Bitmap(width, height)
         self.update_in_gui_thread()
         self.Layout()
@@ -476,23 +492,21 @@ class RasterWizardPanel(wx.Panel):
     def on_buttons_operations(
         self, event=None
     ):  # wxGlade: RasterWizard.<event_handler>
-        # TODO: broken
         if self.wizard_thread is not None:
             return
-        if self.node is not None:
-            self.node.image = self.pil_image
-            self.node.values["raster_step"] = self.step_image
-            self.node.transform = self.matrix_image
-            (
-                self.node.image_width,
-                self.node.image_height,
-            ) = self.pil_image.size
+        if self.node is not None and self.ops is not None:
+            # Full resolution is only computed on commit.
+            image, matrix, step = self.pipeline.process(
+                self.source_image, self.source_matrix, self.ops
+            )
+            self.node.image = image
+            self.node.matrix = matrix
+            if step is not None:
+                self.node.step_x = step
+                self.node.step_y = step
             self.node.lock = True
-            try:
-                self.node.node.object = self.node
-                self.node.node.altered()
-            except AttributeError:
-                pass
+            self.node.altered()
+            self.pipeline.clear()
         try:
             self.GetParent().Close()
         except (TypeError, AttributeError):
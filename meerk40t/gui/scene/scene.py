@@ -18,6 +18,9 @@ from meerk40t.gui.scene.sceneconst import (
     HITCHAIN_DELEGATE_AND_HIT,
     HITCHAIN_HIT,
     HITCHAIN_HIT_AND_DELEGATE,
+    LAYER_BACKGROUND,
+    LAYER_ELEMENTS,
+    LAYER_OVERLAY,
     ORIENTATION_RELATIVE,
     RESPONSE_ABORT,
     RESPONSE_CHAIN,
@@ -33,9 +36,6 @@ from meerk40t.svgelements import Matrix, Point
 # from weakref import ref
 
 
-# TODO: _buffer can be updated partially rather than fully rewritten, especially with some layering.
-
-
 class Scene(Module, Job):
     """
     The Scene Module holds all the needed references to widgets and catches the events from the ScenePanel which
@@ -48,6 +48,10 @@ class Scene(Module, Job):
     scene space to window space. The widgets are stored in a tree within the scene. The primary widget is the
     SceneSpaceWidget which draws elements in two different forms. It first draws the scene and all scenewidgets added
     to the scene and then the interface widget which contains all the non-scene widget elements.
+
+    Drawing is split into layers. The background (grid) and elements layers are cached as bitmaps and are only
+    redrawn when they are invalidated or their key (size, draw mode, view matrix, tree version) changes. The overlay
+    layer (selection, tools, reticles, guides) is recomposited on top of the cached layers for every frame.
     """
 
     def __init__(self, context, path, gui, **kwargs):
@@ -61,6 +65,7 @@ class Scene(Module, Job):
         )
         self.log = context.channel("scene")
         self.log_events = context.channel("scene-events")
+        self.log_frames = context.channel("scene-frames")
         self.gui = gui
         self.matrix = Matrix()
         self.hittable_elements = list()
@@ -80,6 +85,12 @@ class Scene(Module, Job):
         self.colors = GuiColors(self.context)
 
         self.screen_refresh_is_requested = True
+        # Lowest layer which needs to be redrawn for the next frame.
+        self.invalid_layer = LAYER_BACKGROUND
+        # Incremented by tree listeners when the elements need redrawing.
+        self.tree_version = 0
+        self._layer_buffers = {}
+        self._layer_keys = {}
         self.background_brush = wx.Brush(self.colors.color_background)
 
         # Stuff for magnet-lines
@@ -287,14 +298,20 @@ class Scene(Module, Job):
         """Called on the various signals trying to animate the screen."""
         try:
             if self.context.draw_mode & DRAW_MODE_ANIMATE == 0:
-                self.request_refresh()
+                self.request_refresh(layer=LAYER_OVERLAY)
         except AttributeError:
             pass
 
-    def request_refresh(self, origin=None, *args):
-        """Request an update to the scene."""
+    def request_refresh(self, origin=None, *args, layer=LAYER_BACKGROUND):
+        """
+        Request an update to the scene.
+
+        The layer is the lowest layer which needs to be redrawn. Requesting LAYER_OVERLAY only recomposites the
+        overlay widgets on top of the cached background and elements layers.
+        """
         try:
             if self.context.draw_mode & DRAW_MODE_REFRESH == 0:
+                self.invalid_layer = min(self.invalid_layer, layer)
                 self.screen_refresh_is_requested = True
         except AttributeError:
             pass
@@ -321,12 +338,67 @@ class Scene(Module, Job):
         if buf is None or buf.GetSize() != self.gui.ClientSize or not buf.IsOk():
             self.gui.set_buffer()
             buf = self.gui._Buffer
+        w, h = buf.Size
+        m = self.widget_root.scene_widget.matrix
+        key = (w, h, dm, m.a, m.b, m.c, m.d, m.e, m.f)
+        layer_keys = {
+            LAYER_BACKGROUND: key,
+            LAYER_ELEMENTS: (key, self.tree_version),
+        }
+        invalid = self.invalid_layer
+        self.invalid_layer = LAYER_OVERLAY
+        timings = []
+        source = None
+        for layer in (LAYER_BACKGROUND, LAYER_ELEMENTS):
+            layer_buffer = self._layer_buffers.get(layer)
+            if (
+                layer <= invalid
+                or layer_buffer is None
+                or self._layer_keys.get(layer) != layer_keys[layer]
+            ):
+                # Any layer above a redrawn layer must also be redrawn.
+                invalid = max(invalid, layer)
+                if layer_buffer is None or layer_buffer.GetSize() != buf.GetSize():
+                    layer_buffer = wx.Bitmap(w, h)
+                    self._layer_buffers[layer] = layer_buffer
+                start = time.perf_counter()
+                self._draw_layer(layer_buffer, source, layer, dm)
+                timings.append((layer, time.perf_counter() - start))
+                self._layer_keys[layer] = layer_keys[layer]
+            source = layer_buffer
+        start = time.perf_counter()
+        self._draw_layer(buf, source, LAYER_OVERLAY, dm, final=True)
+        timings.append((LAYER_OVERLAY, time.perf_counter() - start))
+        if self.log_frames:
+            names = {
+                LAYER_BACKGROUND: "background",
+                LAYER_ELEMENTS: "elements",
+                LAYER_OVERLAY: "overlay",
+            }
+            self.log_frames(
+                "Frame: %s, total %.2fms"
+                % (
+                    ", ".join(
+                        "%s %.2fms" % (names[layer], t * 1000.0) for layer, t in timings
+                    ),
+                    sum(t for layer, t in timings) * 1000.0,
+                )
+            )
+
+    def _draw_layer(self, bitmap, source, layer, dm, final=False):
+        """
+        Draws a single layer into the bitmap. The bitmap is first filled with the source bitmap of the layer beneath
+        or cleared to the background color if there is no such layer.
+        """
         dc = wx.MemoryDC()
-        dc.SelectObject(buf)
-        self.background_brush.SetColour(self.colors.color_background)
-        dc.SetBackground(self.background_brush)
-        dc.Clear()
+        dc.SelectObject(bitmap)
         w, h = dc.Size
+        if source is None:
+            self.background_brush.SetColour(self.colors.color_background)
+            dc.SetBackground(self.background_brush)
+            dc.Clear()
+        else:
+            dc.DrawBitmap(source, 0, 0)
         if dm & DRAW_MODE_FLIPXY != 0:
             dc.SetUserScale(-1, -1)
             dc.SetLogicalOrigin(w, h)
@@ -335,10 +407,12 @@ class Scene(Module, Job):
 
         font = wx.Font(14, wx.SWISS, wx.NORMAL, wx.BOLD)
         gc.SetFont(font, wx.BLACK)
-        self.draw(gc)
-        if dm & DRAW_MODE_INVERT != 0:
-            dc.Blit(0, 0, w, h, dc, 0, 0, wx.SRC_INVERT)
+        self.draw(gc, layer)
         gc.Destroy()
+        if final and dm & DRAW_MODE_INVERT != 0:
+            dc.SetUserScale(1, 1)
+            dc.SetLogicalOrigin(0, 0)
+            dc.Blit(0, 0, w, h, dc, 0, 0, wx.SRC_INVERT)
         dc.SelectObject(wx.NullBitmap)
         del dc
 
@@ -394,12 +468,14 @@ class Scene(Module, Job):
         """
         pass
 
-    def draw(self, canvas):
+    def draw(self, canvas, layer=None):
         """
         Scene Draw routine to be called on paint when the _Buffer bitmap needs to be redrawn.
+
+        If layer is None all layers are drawn.
         """
         if self.widget_root is not None:
-            self.widget_root.draw(canvas)
+            self.widget_root.draw(canvas, layer)
             if self.log:
                 self.log("Redraw Canvas")
 
@@ -20,3 +20,8 @@ ORIENTATION_VERTICAL = 0b00000010000000
 ORIENTATION_GRID = 0b00000100000000
 ORIENTATION_NO_BUFFER = 0b00001000000000
 BUFFER = 10.0
+
+# Scene layers, drawn bottom to top. Lower layers are cached between frames.
+LAYER_BACKGROUND = 0
+LAYER_ELEMENTS = 1
+LAYER_OVERLAY = 2
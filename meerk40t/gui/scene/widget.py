@@ -5,6 +5,7 @@ import wx
 from meerk40t.gui.scene.sceneconst import (
     BUFFER,
     HITCHAIN_DELEGATE,
+    LAYER_OVERLAY,
     ORIENTATION_ABSOLUTE,
     ORIENTATION_CENTERED,
     ORIENTATION_DIM_MASK,
@@ -43,6 +44,7 @@ class Widget(list):
         self.scene = scene
         self.parent = None
         self.properties = ORIENTATION_RELATIVE
+        self.layer = LAYER_OVERLAY
         if all:
             # contains all points
             self.left = -float("inf")
@@ -82,20 +84,23 @@ class Widget(list):
         """
         return HITCHAIN_DELEGATE
 
-    def draw(self, gc):
+    def draw(self, gc, layer=None):
         """
         Widget.draw() routine which concat's the widgets matrix and call the process_draw() function.
+
+        If a layer is given only the widgets within that layer are drawn, children are always visited.
         """
         # Concat if this is a thing.
         matrix = self.matrix
         gc.PushState()
         if matrix is not None and not matrix.is_identity():
             gc.ConcatTransform(wx.GraphicsContext.CreateMatrix(gc, ZMatrix(matrix)))
-        self.process_draw(gc)
+        if layer is None or self.layer == layer:
+            self.process_draw(gc)
         for i in range(len(self) - 1, -1, -1):
             widget = self[i]
             if not widget is None:
-                widget.draw(gc)
+                widget.draw(gc, layer)
         gc.PopState()
 
     def process_draw(self, gc):
@@ -1,7 +1,12 @@
 import wx
 
 from meerk40t.gui.laserrender import DRAW_MODE_REGMARKS
-from meerk40t.gui.scene.sceneconst import HITCHAIN_HIT, RESPONSE_CONSUME, RESPONSE_DROP
+from meerk40t.gui.scene.sceneconst import (
+    HITCHAIN_HIT,
+    LAYER_ELEMENTS,
+    RESPONSE_CONSUME,
+    RESPONSE_DROP,
+)
 from meerk40t.gui.scene.widget import Widget
 
 
@@ -9,12 +14,41 @@ class ElementsWidget(Widget):
     """
     The ElementsWidget is tasked with drawing the elements within the scene. It also
     serves to process leftclick in order to emphasize the given object.
+
+    The elements are drawn in the cached elements layer. Any change to the tree bumps the scene's tree_version
+    which invalidates that layer.
     """
 
     def __init__(self, scene, renderer):
         Widget.__init__(self, scene, all=True)
         self.renderer = renderer
         self.key_shift_pressed = False
+        self.layer = LAYER_ELEMENTS
+        self._listening = False
+
+    def init(self, context):
+        # init can be called both when added and when the scene opens.
+        if not self._listening:
+            context.elements.listen_tree(self)
+            self._listening = True
+
+    def final(self, context):
+        if self._listening:
+            context.elements.unlisten_tree(self)
+            self._listening = False
+
+    def _tree_changed(self, node, **kwargs):
+        self.scene.tree_version += 1
+
+    node_created = _tree_changed
+    node_destroyed = _tree_changed
+    node_attached = _tree_changed
+    node_detached = _tree_changed
+    node_changed = _tree_changed
+    modified = _tree_changed
+    altered = _tree_changed
+    reorder = _tree_changed
+    update = _tree_changed
 
     def hit(self):
         return HITCHAIN_HIT
@@ -3,7 +3,7 @@ import wx
 
 from meerk40t.core.units import Length
 from meerk40t.gui.laserrender import DRAW_MODE_BACKGROUND, DRAW_MODE_GRID, DRAW_MODE_GUIDES, swizzlecolor
-from meerk40t.gui.scene.sceneconst import HITCHAIN_HIT, RESPONSE_CHAIN
+from meerk40t.gui.scene.sceneconst import HITCHAIN_HIT, LAYER_BACKGROUND, RESPONSE_CHAIN
 from meerk40t.gui.scene.widget import Widget
 
 class GridWidget(Widget):
@@ -13,6 +13,7 @@ class GridWidget(Widget):
 
     def __init__(self, scene):
         Widget.__init__(self, scene, all=True)
+        self.layer = LAYER_BACKGROUND
         self.grid = None
         self.grid2 = None
         self.background = None
@@ -2,6 +2,7 @@ import wx
 
 from meerk40t.gui.scene.scene import (
     HITCHAIN_HIT,
+    LAYER_OVERLAY,
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
     RESPONSE_DROP,
@@ -105,7 +106,7 @@ class RectSelectWidget(Widget):
                 if self.start_location is None:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -122,7 +123,7 @@ class RectSelectWidget(Widget):
                 if ignore:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -132,7 +133,7 @@ class RectSelectWidget(Widget):
                 if self.start_location is None:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -149,7 +150,7 @@ class RectSelectWidget(Widget):
                 if ignore:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -159,7 +160,7 @@ class RectSelectWidget(Widget):
                 if self.start_location is None:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -169,7 +170,7 @@ class RectSelectWidget(Widget):
                 if self.start_location is None:
                     return RESPONSE_CHAIN
                 else:
-                    self.scene.request_refresh()
+                    self.scene.request_refresh(layer=LAYER_OVERLAY)
                     return RESPONSE_CONSUME
             else:
                 return RESPONSE_CHAIN
@@ -254,13 +255,13 @@ class RectSelectWidget(Widget):
                     else:
                         node.emphasized = False
 
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_OVERLAY)
             self.start_location = None
             self.end_location = None
 
             return RESPONSE_CONSUME
         elif event_type == "move":
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_OVERLAY)
             self.end_location = space_pos
             return RESPONSE_CONSUME
         elif event_type == "lost":
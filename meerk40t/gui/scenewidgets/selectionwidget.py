@@ -11,7 +11,11 @@ from meerk40t.gui.scene.scene import (
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
 )
-from meerk40t.gui.scene.sceneconst import HITCHAIN_HIT_AND_DELEGATE
+from meerk40t.gui.scene.sceneconst import (
+    HITCHAIN_HIT_AND_DELEGATE,
+    LAYER_ELEMENTS,
+    LAYER_OVERLAY,
+)
 from meerk40t.gui.scene.widget import Widget
 from meerk40t.gui.wxutils import create_menu_for_node
 from meerk40t.svgelements import Point, Rect
@@ -504,7 +508,9 @@ class RotationWidget(Widget):
                 e.matrix.post_rotate(delta_angle, self.rotate_cx, self.rotate_cy)
             # elements.update_bounds([b[0], b[1], b[2], b[3]])
 
-        self.scene.request_refresh()
+        self.scene.request_refresh(
+            layer=LAYER_ELEMENTS if event == 0 else LAYER_OVERLAY
+        )
 
     def hit(self):
         return HITCHAIN_HIT
@@ -768,7 +774,7 @@ class CornerWidget(Widget):
 
             elements.update_bounds([b[0], b[1], b[2], b[3]])
 
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_ELEMENTS)
 
     def hit(self):
         return HITCHAIN_HIT
@@ -965,7 +971,7 @@ class SideWidget(Widget):
 
             elements.update_bounds([b[0], b[1], b[2], b[3]])
 
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_ELEMENTS)
 
     def hit(self):
         return HITCHAIN_HIT
@@ -1090,7 +1096,9 @@ class SkewWidget(Widget):
                     )
 
             # elements.update_bounds([b[0] + dx, b[1] + dy, b[2] + dx, b[3] + dy])
-        self.scene.request_refresh()
+        self.scene.request_refresh(
+            layer=LAYER_ELEMENTS if event == 0 else LAYER_OVERLAY
+        )
 
     def event(self, window_pos=None, space_pos=None, event_type=None):
         s_me = "skew"
@@ -1227,7 +1235,9 @@ class MoveWidget(Widget):
 
             elements.update_bounds([b[0] + dx, b[1] + dy, b[2] + dx, b[3] + dy])
 
-        self.scene.request_refresh()
+        self.scene.request_refresh(
+            layer=LAYER_ELEMENTS if event == 0 else LAYER_OVERLAY
+        )
 
     def event(self, window_pos=None, space_pos=None, event_type=None):
         s_me = "move"
@@ -1309,7 +1319,7 @@ class MoveRotationOriginWidget(Widget):
         self.master.rotation_cx += dx
         self.master.rotation_cy += dy
         self.master.invalidate_rot_center()
-        self.scene.request_refresh()
+        self.scene.request_refresh(layer=LAYER_OVERLAY)
 
     def hit(self):
         return HITCHAIN_HIT
@@ -1426,7 +1436,7 @@ class ReferenceWidget(Widget):
                     except AttributeError:
                         pass
 
-        self.scene.request_refresh()
+        self.scene.request_refresh(layer=LAYER_OVERLAY)
 
     def event(self, window_pos=None, space_pos=None, event_type=None):
         s_me = "reference"
@@ -1824,13 +1834,13 @@ class SelectionWidget(Widget):
             except AttributeError:
                 pass
         # print("set...")
-        self.scene.request_refresh()
+        self.scene.request_refresh(layer=LAYER_OVERLAY)
 
     def delete_reference(self, event):
         self.scene.reference_object = None
         # Simplify, no complete scene refresh required
         # print("unset...")
-        self.scene.request_refresh()
+        self.scene.request_refresh(layer=LAYER_OVERLAY)
 
     def create_menu(self, gui, node, elements):
         if node is None:
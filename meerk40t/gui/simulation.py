@@ -5,6 +5,7 @@ import wx
 from meerk40t.kernel import Job, signal_listener
 
 from ..core.cutcode import CutCode, LineCut
+from ..core.simulation import SimulationTimeline
 from ..svgelements import Matrix
 from .icons import (
     icons8_laser_beam_hazard2_50,
@@ -14,6 +15,7 @@ from .icons import (
 )
 from .laserrender import LaserRender
 from .mwindow import MWindow
+from .scene.sceneconst import LAYER_OVERLAY
 from .scene.scenepanel import ScenePanel
 from .scene.widget import Widget
 from .scenewidgets.gridwidget import GridWidget
@@ -36,7 +38,8 @@ class SimulationPanel(wx.Panel, Job):
         self.job_name = "simulate"
         self.run_main = True
         self.process = self.animate_sim
-        self.interval = 0.1
+        self.interval = 0.05
+        self.playback_rate = 1.0
         if plan_name:
             cutplan = self.context.planner.get_or_make_plan(plan_name)
         else:
@@ -51,6 +54,9 @@ class SimulationPanel(wx.Panel, Job):
         self.cutcode = CutCode(self.cutcode.flat())
         self.max = max(len(self.cutcode), 0) + 1
         self.progress = self.max
+        self.timeline = SimulationTimeline(self.cutcode)
+        self.sim_time = self.timeline.duration
+        self.sim_state = None
 
         self.view_pane = ScenePanel(
             self.context,
@@ -252,6 +258,9 @@ class SimulationPanel(wx.Panel, Job):
             self.cutcode = CutCode(self.cutcode.flat())
             self.max = max(len(self.cutcode), 0) + 1
             self.progress = self.max
+            self.timeline = SimulationTimeline(self.cutcode)
+            self.sim_time = self.timeline.duration
+            self.sim_state = None
             self.slider_progress.SetMin(0)
             self.slider_progress.SetMax(self.max)
             self.slider_progress.SetValue(self.max)
@@ -312,13 +321,16 @@ class SimulationPanel(wx.Panel, Job):
         @return:
         """
         if scene_name == "SimScene":
-            self.request_refresh()
+            # Simulation ticks only move the progress drawn by the overlay widgets.
+            self.request_refresh(layer=LAYER_OVERLAY)
 
-    def request_refresh(self, *args):
-        self.widget_scene.request_refresh(*args)
+    def request_refresh(self, *args, **kwargs):
+        self.widget_scene.request_refresh(*args, **kwargs)
 
     def on_slider_progress(self, event=None):  # wxGlade: Simulation.<event_handler>
         self.progress = min(self.slider_progress.GetValue(), self.max)
+        self.sim_time = self.timeline.time_at(self.progress - 1)
+        self.sim_state = None
         self.context.signal("refresh_scene", self.widget_scene.name)
 
     def _start(self):
@@ -337,16 +349,24 @@ class SimulationPanel(wx.Panel, Job):
             return
         if self.progress >= self.max:
             self.progress = 0
+            self.sim_time = 0.0
             self.slider_progress.SetValue(self.progress)
         self._start()
 
     def animate_sim(self, event=None):
-        self.progress += 1
-        if self.progress >= self.max:
+        """
+        Advances the simulation by the elapsed job time, at the playback rate.
+        """
+        self.sim_time += self.interval * self.playback_rate
+        state = self.timeline.state(self.sim_time)
+        if state.index >= len(self.timeline):
+            self.sim_state = None
             self.progress = self.max
             self._stop()
         else:
-            self.context.signal("refresh_scene", self.widget_scene.name)
+            self.sim_state = state
+            self.progress = state.index + 1
+        self.context.signal("refresh_scene", self.widget_scene.name)
         self.slider_progress.SetValue(self.progress)
 
     def on_slider_playback(self, event=None):  # wxGlade: Simulation.<event_handler>
@@ -354,7 +374,8 @@ class SimulationPanel(wx.Panel, Job):
 
         value = self.slider_playbackspeed.GetValue()
         value = int((10.0 ** (value // 90)) * (1.0 + float(value % 90) / 10.0))
-        self.interval = 0.1 * 100.0 / float(value)
+        # 100% plays the job back in real time.
+        self.playback_rate = float(value) / 100.0
 
         self.text_playback_speed.SetValue("%d%%" % value)
 
@@ -371,6 +392,10 @@ class SimulationWidget(Widget):
     """
     The simulation widget is responsible for rendering the cutcode to the scene. This should be
     done such that both progress of 0 and 1 render nothing and items begin to draw at 2.
+
+    Completed cuts are drawn once into a cached bitmap, each frame only draws the cuts completed
+    since the last frame into it. The cut being burned is drawn up to the current laser position.
+    The cache is dropped when the view changes or the simulation moves backwards.
     """
 
     def __init__(self, scene, sim):
@@ -378,14 +403,54 @@ class SimulationWidget(Widget):
         self.renderer = LaserRender(self.scene.context)
         self.sim = sim
         self.matrix.post_cat(scene.context.device.device_to_scene_matrix())
+        self._cache = None
+        self._cache_key = None
+        self._drawn = 0
+
+    def _completed(self):
+        if self.sim.progress >= self.sim.max:
+            return len(self.sim.cutcode)
+        return max(self.sim.progress - 1, 0)
 
     def process_draw(self, gc: wx.GraphicsContext):
-        if self.sim.progress > 1:
-            if self.sim.progress < self.sim.max:
-                sim_cut = self.sim.cutcode[: self.sim.progress - 1]
-            else:
-                sim_cut = self.sim.cutcode
-            self.renderer.draw_cutcode(sim_cut, gc, 0, 0)
+        if self.sim.progress <= 1:
+            self._drawn = 0
+            self._cache = None
+            return
+        completed = self._completed()
+        transform = gc.GetTransform().Get()
+        width, height = self.scene.gui.ClientSize
+        key = (width, height, transform, id(self.sim.cutcode))
+        if (
+            self._cache is None
+            or self._cache_key != key
+            or completed < self._drawn
+        ):
+            self._cache = wx.Bitmap.FromRGBA(max(width, 1), max(height, 1), 0, 0, 0, 0)
+            self._cache_key = key
+            self._drawn = 0
+        if completed > self._drawn:
+            dc = wx.MemoryDC(self._cache)
+            cache_gc = wx.GraphicsContext.Create(dc)
+            cache_gc.SetTransform(cache_gc.CreateMatrix(*transform))
+            self.renderer.draw_cutcode(
+                self.sim.cutcode[self._drawn : completed], cache_gc, 0, 0
+            )
+            cache_gc.Destroy()
+            dc.SelectObject(wx.NullBitmap)
+            self._drawn = completed
+        gc.PushState()
+        gc.SetTransform(gc.CreateMatrix())
+        gc.DrawBitmap(self._cache, 0, 0, width, height)
+        gc.PopState()
+
+        state = self.sim.sim_state
+        if state is not None and state.laser:
+            points = self.sim.timeline.partial(state.index, state.t)
+            if len(points) > 1:
+                cut = self.sim.timeline.cuts[state.index]
+                self.renderer.set_pen(gc, cut.line_color, width=7.0, alpha=127)
+                gc.StrokeLines([wx.Point2D(*p) for p in points])
 
 
 class SimulationTravelWidget(Widget):
@@ -464,7 +529,10 @@ class SimReticleWidget(Widget):
     def process_draw(self, gc):
         x = 0
         y = 0
-        if (
+        state = self.sim.sim_state
+        if state is not None:
+            x, y = self.sim_matrix.point_in_matrix_space((state.x, state.y))
+        elif (
             self.sim.progress > 0
             and self.sim.cutcode is not None
             and len(self.sim.cutcode)
@@ -1,6 +1,7 @@
 import wx
 
 from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
     RESPONSE_DROP,
@@ -44,7 +45,7 @@ class DrawTool(ToolWidget):
             if self.series is None:
                 return RESPONSE_DROP
             self.add_point(space_pos[:2])
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_OVERLAY)
             response = RESPONSE_CONSUME
         elif event_type == "lost":
             self.series = None
@@ -1,6 +1,7 @@
 import wx
 
 from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
     RESPONSE_ABORT,
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
@@ -40,7 +41,7 @@ class EllipseTool(ToolWidget):
             response = RESPONSE_CONSUME
         elif event_type == "move":
             self.p2 = complex(space_pos[0], space_pos[1])
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_OVERLAY)
             response = RESPONSE_CONSUME
         elif event_type == "leftup":
             self.scene.tool_active = False
@@ -4,6 +4,7 @@ import wx
 
 from meerk40t.core.units import Length
 from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
     RESPONSE_ABORT,
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
@@ -152,7 +153,7 @@ class MeasureTool(ToolWidget):
         elif event_type == "hover":
             self.mouse_position = space_pos[0], space_pos[1]
             if self.point_series:
-                self.scene.request_refresh()
+                self.scene.request_refresh(layer=LAYER_OVERLAY)
         elif event_type == "doubleclick":
             self.scene.tool_active = False
             self.point_series = []
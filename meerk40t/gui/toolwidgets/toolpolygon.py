@@ -1,6 +1,7 @@
 import wx
 
 from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
     RESPONSE_ABORT,
     RESPONSE_CHAIN,
     RESPONSE_CONSUME,
@@ -47,7 +48,7 @@ class PolygonTool(ToolWidget):
         elif event_type == "hover":
             self.mouse_position = space_pos[0], space_pos[1]
             if self.point_series:
-                self.scene.request_refresh()
+                self.scene.request_refresh(layer=LAYER_OVERLAY)
         elif event_type == "doubleclick":
             polyline = Polygon(*self.point_series, stroke="blue", stroke_width=1000)
             elements = self.scene.context.elements
@@ -1,6 +1,10 @@
 import wx
 
-from meerk40t.gui.scene.sceneconst import RESPONSE_CHAIN, RESPONSE_CONSUME
+from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
+    RESPONSE_CHAIN,
+    RESPONSE_CONSUME,
+)
 from meerk40t.gui.toolwidgets.toolwidget import ToolWidget
 from meerk40t.svgelements import Polyline
 
@@ -42,7 +46,7 @@ class PolylineTool(ToolWidget):
         elif event_type == "hover":
             self.mouse_position = space_pos[0], space_pos[1]
             if self.point_series:
-                self.scene.request_refresh()
+                self.scene.request_refresh(layer=LAYER_OVERLAY)
             response = RESPONSE_CHAIN
         elif event_type == "doubleclick":
             polyline = Polyline(*self.point_series, stroke="blue", stroke_width=1000)
@@ -1,6 +1,10 @@
 import wx
 
-from meerk40t.gui.scene.sceneconst import RESPONSE_CHAIN, RESPONSE_CONSUME
+from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
+    RESPONSE_CHAIN,
+    RESPONSE_CONSUME,
+)
 from meerk40t.gui.toolwidgets.toolwidget import ToolWidget
 from meerk40t.svgelements import Rect
 
@@ -36,7 +40,7 @@ class RectTool(ToolWidget):
             response = RESPONSE_CONSUME
         elif event_type == "move":
             self.p2 = complex(space_pos[0], space_pos[1])
-            self.scene.request_refresh()
+            self.scene.request_refresh(layer=LAYER_OVERLAY)
             response = RESPONSE_CONSUME
         elif event_type == "leftup":
             self.scene.tool_active = False
@@ -1,6 +1,10 @@
 import wx
 
-from meerk40t.gui.scene.sceneconst import RESPONSE_CHAIN, RESPONSE_CONSUME
+from meerk40t.gui.scene.sceneconst import (
+    LAYER_OVERLAY,
+    RESPONSE_CHAIN,
+    RESPONSE_CONSUME,
+)
 from meerk40t.gui.toolwidgets.toolwidget import ToolWidget
 from meerk40t.svgelements import Path
 
@@ -61,7 +65,7 @@ class VectorTool(ToolWidget):
         elif event_type == "move":
             self.c0 = (space_pos[0], space_pos[1])
             if self.path:
-                self.scene.request_refresh()
+                self.scene.request_refresh(layer=LAYER_OVERLAY)
             response = RESPONSE_CONSUME
         elif event_type == "leftup":
             self.scene.tool_active = False
@@ -76,7 +80,7 @@ class VectorTool(ToolWidget):
         elif event_type == "hover":
             self.mouse_position = space_pos[0], space_pos[1]
             if self.path:
-                self.scene.request_refresh()
+                self.scene.request_refresh(layer=LAYER_OVERLAY)
         elif event_type == "doubleclick":
             self.scene.tool_active = False
             t = self.path
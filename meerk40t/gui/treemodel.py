@@ -0,0 +1,231 @@
+"""
+The tree model is the part of the element tree display which does not require wx. The shadow tree in wxmtree posts
+every change notified by the elements tree to an update queue rather than mutating the wx.TreeCtrl directly. The queue
+coalesces those updates and applies them in a single batch on the next idle cycle. Icons are rendered lazily by the
+tree icons, only once their items are shown, and cached by the content they display.
+
+Since neither requires a display, both can be tested on very large projects.
+"""
+
+# Per-node updates which are made redundant by rebuilding the tree.
+REBUILT_UPDATES = ("decorate", "enhance", "icon")
+
+
+class TreeUpdateQueue:
+    """
+    Queue of updates for a displayed tree. Updates are applied to the target, in a single batch, by flush().
+
+    Structural updates, registering and unregistering nodes, are applied in the order they were posted. Registering
+    a node and unregistering it again within the same batch cancels both. If more than rebuild_threshold structural
+    updates are posted the batch is replaced by rebuilding the tree. Per-node updates are applied after the
+    structural updates, once per node and action however often they are posted.
+
+    The target is called with apply_rebuild(), apply_register(node, **kwargs), apply_unregister(node, *args) and
+    apply_<action>(node) for every other action.
+    """
+
+    def __init__(self, target, schedule=None, rebuild_threshold=1000):
+        """
+        @param target: object the updates are applied to.
+        @param schedule: called when the first update of a batch is posted, to arrange the flush.
+        @param rebuild_threshold: structural updates within a batch above which the tree is rebuilt instead.
+        """
+        self.target = target
+        self.schedule = schedule
+        self.rebuild_threshold = rebuild_threshold
+        self.scheduled = False
+        self._rebuild = False
+        self._structure = list()
+        self._registers = dict()
+        self._updates = dict()
+
+    def __len__(self):
+        return int(self._rebuild) + len(self._structure) + len(self._updates)
+
+    def _posted(self):
+        if self.scheduled:
+            return
+        self.scheduled = True
+        if self.schedule is not None:
+            self.schedule()
+
+    def rebuild(self):
+        """
+        Rebuild the entire tree, this replaces every pending structural update.
+        """
+        self._rebuild = True
+        self._structure.clear()
+        self._registers.clear()
+        for key in [key for key in self._updates if key[0] in REBUILT_UPDATES]:
+            del self._updates[key]
+        self._posted()
+
+    def _structural(self, entry):
+        if self._rebuild:
+            return
+        if len(self._structure) >= self.rebuild_threshold:
+            self.rebuild()
+            return
+        self._structure.append(entry)
+        self._posted()
+
+    def register(self, node, **kwargs):
+        """
+        Node was attached to the tree.
+        """
+        if self._rebuild:
+            return
+        entry = ["register", node, kwargs]
+        self._structural(entry)
+        if not self._rebuild:
+            self._registers[id(node)] = entry
+
+    def unregister(self, node, *args):
+        """
+        Node was detached from the tree. args are given to the target, the node may be altered before the flush.
+        """
+        for key in [key for key in self._updates if key[1] == id(node)]:
+            del self._updates[key]
+        entry = self._registers.pop(id(node), None)
+        if entry is not None:
+            # Registered and unregistered within the batch, neither is applied.
+            entry[0] = None
+            self._posted()
+            return
+        self._structural(["unregister", node, args])
+
+    def post(self, action, node):
+        """
+        Per-node action, applied once for the node in this batch.
+        """
+        if self._rebuild and action in REBUILT_UPDATES:
+            return
+        key = (action, id(node))
+        if key not in self._updates:
+            self._updates[key] = node
+        self._posted()
+
+    def flush(self):
+        """
+        Apply every pending update to the target.
+
+        @return: whether the tree was rebuilt.
+        """
+        self.scheduled = False
+        rebuild = self._rebuild
+        structure = self._structure
+        updates = self._updates
+        self._rebuild = False
+        self._structure = list()
+        self._registers = dict()
+        self._updates = dict()
+        target = self.target
+        if rebuild:
+            target.apply_rebuild()
+        for action, node, args in structure:
+            if action == "register":
+                target.apply_register(node, **args)
+            elif action == "unregister":
+                target.apply_unregister(node, *args)
+        for key, node in updates.items():
+            getattr(target, "apply_" + key[0])(node)
+        return rebuild
+
+
+def icon_key(node):
+    """
+    Hash of the content displayed by the icon of the given node. Nodes showing the same content share an icon.
+    Element thumbnails are rendered into the bounds of the element so the translation of the matrix is not included.
+    """
+    if node.type == "reference":
+        node = node.node
+    node_type = node.type
+    if node_type == "elem image":
+        image = node.image
+        return node_type, image.mode, image.size, hash(image.tobytes())
+    if node_type is not None and node_type.startswith("elem "):
+        geometry = getattr(node, "path", None)
+        if geometry is None:
+            geometry = getattr(node, "shape", None)
+        try:
+            # Untransformed, the matrix is hashed separately.
+            geometry = geometry.d(transformed=False)
+        except (AttributeError, TypeError):
+            geometry = getattr(node, "text", geometry)
+        matrix = getattr(node, "matrix", None)
+        if matrix is not None:
+            matrix = (matrix.a, matrix.b, matrix.c, matrix.d)
+        return (
+            node_type,
+            hash(str(geometry)),
+            matrix,
+            str(getattr(node, "stroke", None)),
+            str(getattr(node, "fill", None)),
+            getattr(node, "stroke_width", None),
+        )
+    return node_type, str(getattr(node, "color", None))
+
+
+class TreeIcons:
+    """
+    Icons of the tree items.
+
+    Nodes are invalidated when their icon may have changed, and only rendered when refreshed while their items are
+    shown. Rendered icons are cached by the hash of the content they display and the cache is kept when the tree is
+    rebuilt.
+    """
+
+    def __init__(self, render, key=icon_key):
+        """
+        @param render: called with a node to render its icon, returns the icon or None.
+        @param key: called with a node to hash the content its icon displays.
+        """
+        self.render = render
+        self.key = key
+        self.icons = dict()
+        self.stale = dict()
+        self.renders = 0
+
+    def __len__(self):
+        return len(self.icons)
+
+    def invalidate(self, node):
+        """
+        Icon of the node may have changed, it will be set the next time the node is refreshed.
+        """
+        self.stale[id(node)] = node
+
+    def discard(self, node):
+        self.stale.pop(id(node), None)
+
+    def clear(self):
+        """
+        Clears the cached icons, for when the icons they refer to are no longer valid.
+        """
+        self.icons.clear()
+
+    def icon(self, node):
+        """
+        Cached icon for the node, rendered if no node with the same content was rendered before.
+        """
+        key = self.key(node)
+        try:
+            return self.icons[key]
+        except KeyError:
+            pass
+        icon = self.render(node)
+        self.renders += 1
+        self.icons[key] = icon
+        return icon
+
+    def refresh(self, nodes):
+        """
+        Icons for the stale nodes among those given.
+
+        @param nodes: nodes whose items are currently shown.
+        @return: generator of node, icon
+        """
+        stale = self.stale
+        for node in nodes:
+            if stale.pop(id(node), None) is not None:
+                yield node, self.icon(node)
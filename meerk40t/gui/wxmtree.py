@@ -16,6 +16,7 @@ from .icons import (
 )
 from .laserrender import DRAW_MODE_ICONS, LaserRender, swizzlecolor
 from .mwindow import MWindow
+from .treemodel import TreeIcons, TreeUpdateQueue
 from .wxutils import create_menu, get_key_name
 
 _ = wx.GetTranslation
@@ -83,6 +84,9 @@ class TreePanel(wx.Panel):
         self.__set_tree()
         self.wxtree.Bind(wx.EVT_KEY_UP, self.on_key_up)
         self.wxtree.Bind(wx.EVT_KEY_DOWN, self.on_key_down)
+        self.wxtree.Bind(wx.EVT_SCROLLWIN, self.shadow_tree.on_view_changed)
+        self.wxtree.Bind(wx.EVT_MOUSEWHEEL, self.shadow_tree.on_view_changed)
+        self.wxtree.Bind(wx.EVT_SIZE, self.shadow_tree.on_view_changed)
 
         self.context.signal("rebuild_tree")
 
@@ -110,6 +114,11 @@ class TreePanel(wx.Panel):
             self.shadow_tree.on_item_right_click,
             self.wxtree,
         )
+        self.Bind(
+            wx.EVT_TREE_ITEM_EXPANDED,
+            self.shadow_tree.on_view_changed,
+            self.wxtree,
+        )
 
     def on_key_down(self, event):
         keyvalue = get_key_name(event)
@@ -207,6 +216,9 @@ class ShadowTree:
     tree and updates the GUI version accordingly. This tree does not permit alterations to it, rather it sends any
     requested alterations to the 'elements.tree' or the 'elements.elements' or 'elements.'operations' and when those are
     reflected in the tree, the shadow tree is updated accordingly.
+
+    Updates are posted to a queue and applied together on the next idle cycle. Icons are only rendered for the items
+    which are shown, and are cached by their content for as long as the shadow tree exists.
     """
 
     def __init__(self, service, gui, wxtree):
@@ -217,6 +229,9 @@ class ShadowTree:
         self.dragging_nodes = None
         self.tree_images = None
         self.name = "Project"
+        self.updates = TreeUpdateQueue(self, schedule=self.schedule_updates)
+        self.icons = TreeIcons(self.render_icon)
+        self.refresh_pending = False
 
         self.do_not_select = False
         service.add_service_delegate(self)
@@ -252,8 +267,10 @@ class ShadowTree:
         @param kwargs:
         @return:
         """
+        item = node.item
         self.unregister_children(node)
         self.node_unregister(node, **kwargs)
+        self.updates.unregister(node, item)
 
     def node_attached(self, node, **kwargs):
         """
@@ -262,8 +279,7 @@ class ShadowTree:
         @param kwargs:
         @return:
         """
-        self.node_register(node, **kwargs)
-        self.register_children(node)
+        self.updates.register(node, **kwargs)
 
     def node_changed(self, node):
         """
@@ -271,10 +287,7 @@ class ShadowTree:
         @param node: Node that was changed.
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
+        self.updates.post("decorate", node)
 
     def selected(self, node):
         """
@@ -284,11 +297,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        self.set_enhancements(node)
+        self.updates.post("decorate", node)
+        self.updates.post("enhance", node)
         self.elements.signal("selected", node)
 
     def emphasized(self, node):
@@ -299,11 +309,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        self.set_enhancements(node)
+        self.updates.post("decorate", node)
+        self.updates.post("enhance", node)
         self.elements.signal("emphasized", node)
 
     def targeted(self, node):
@@ -314,11 +321,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        self.set_enhancements(node)
+        self.updates.post("decorate", node)
+        self.updates.post("enhance", node)
         self.elements.signal("targeted", node)
 
     def highlighted(self, node):
@@ -330,11 +334,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        self.set_enhancements(node)
+        self.updates.post("decorate", node)
+        self.updates.post("enhance", node)
         self.elements.signal("highlighted", node)
 
     def modified(self, node):
@@ -344,15 +345,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        try:
-            c = node.color
-            self.set_color(node, c)
-        except AttributeError:
-            pass
+        self.updates.post("decorate", node)
+        self.updates.post("icon", node)
         self.elements.signal("modified", node)
 
     def altered(self, node):
@@ -362,16 +356,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.update_decorations(node)
-        try:
-            c = node.color
-            self.set_color(node, c)
-        except AttributeError:
-            pass
-        self.set_icon(node)
+        self.updates.post("decorate", node)
+        self.updates.post("icon", node)
         self.elements.signal("altered", node)
 
     def expand(self, node):
@@ -381,10 +367,7 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.wxtree.ExpandAllChildren(item)
+        self.updates.post("expand", node)
 
     def collapse(self, node):
         """
@@ -393,17 +376,7 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.wxtree.CollapseAllChildren(item)
-        if (
-            item is self.wxtree.GetRootItem()
-            or self.wxtree.GetItemParent(item) is self.wxtree.GetRootItem()
-        ):
-            self.wxtree.Expand(self.elements.get(type="branch ops").item)
-            self.wxtree.Expand(self.elements.get(type="branch elems").item)
-            self.wxtree.Expand(self.elements.get(type="branch reg").item)
+        self.updates.post("collapse", node)
 
     def reorder(self, node):
         """
@@ -422,11 +395,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.set_icon(node)
-        self.on_force_element_update(node)
+        self.updates.post("icon", node)
+        self.updates.post("decorate", node)
 
     def focus(self, node):
         """
@@ -436,14 +406,7 @@ class ShadowTree:
         @param node:
         @return:
         """
-        item = node.item
-        if not item.IsOk():
-            raise ValueError("Bad Item")
-        self.wxtree.EnsureVisible(item)
-        for s in self.wxtree.GetSelections():
-            self.wxtree.SelectItem(s, False)
-        self.wxtree.SelectItem(item)
-        self.wxtree.ScrollTo(item)
+        self.updates.post("focus", node)
 
     def on_force_element_update(self, *args):
         """
@@ -453,9 +416,9 @@ class ShadowTree:
         """
         element = args[0]
         if hasattr(element, "node"):
-            self.update_decorations(element.node)
+            self.updates.post("decorate", element.node)
         else:
-            self.update_decorations(element)
+            self.updates.post("decorate", element)
 
     def on_element_update(self, *args):
         """
@@ -465,59 +428,69 @@ class ShadowTree:
         """
         element = args[0]
         if hasattr(element, "node"):
-            self.update_decorations(element.node)
+            self.updates.post("decorate", element.node)
         else:
-            self.update_decorations(element)
+            self.updates.post("decorate", element)
 
-    def refresh_tree(self, node=None):
-        """Any tree elements currently displaying wrong data as per elements should be updated to display
-        the proper values and contexts and icons."""
-        if node is None:
-            elemtree = self.elements._tree
-            node = elemtree.item
-        if node is None:
-            return
+    def schedule_updates(self):
+        """
+        Called by the update queue for the first update of a batch. The batch is applied on the next idle cycle.
+        """
+        wx.CallAfter(self.flush_updates)
+
+    def flush_updates(self):
+        """
+        Applies all the queued updates to the wx tree, then sets the icons of the items shown.
+
+        @return:
+        """
         tree = self.wxtree
+        if not tree:
+            # Tree control was destroyed before the updates were applied.
+            return
+        frozen = len(self.updates) > 100
+        if frozen:
+            tree.Freeze()
+        try:
+            self.updates.flush()
+        finally:
+            if frozen:
+                tree.Thaw()
+        self.refresh_icons()
 
-        child, cookie = tree.GetFirstChild(node)
-        while child.IsOk():
-            child_node = self.wxtree.GetItemData(child)
-            self.set_enhancements(child_node)
-            self.refresh_tree(child)
-            child, cookie = tree.GetNextChild(node, cookie)
+    def _item(self, node):
+        """
+        Valid tree item of the node, or None if the node is not shown within the tree.
+        """
+        item = node.item
+        if item is None or not item.IsOk():
+            return None
+        return item
 
-    def rebuild_tree(self):
+    def apply_rebuild(self):
         """
-        Tree requires being deleted and completely rebuilt.
+        Tree is deleted and completely rebuilt.
 
         @return:
         """
         elemtree = self.elements._tree
         self.dragging_nodes = None
         self.wxtree.DeleteAllItems()
+        self.icons.stale.clear()
 
-        self.tree_images = wx.ImageList()
-        self.tree_images.Create(width=20, height=20)
-
-        self.wxtree.SetImageList(self.tree_images)
+        if self.tree_images is None:
+            # The image list is kept between rebuilds, with the cached icons.
+            self.tree_images = wx.ImageList()
+            self.tree_images.Create(width=20, height=20)
+            self.wxtree.SetImageList(self.tree_images)
         elemtree.item = self.wxtree.AddRoot(self.name)
 
         self.wxtree.SetItemData(elemtree.item, elemtree)
-
-        self.set_icon(elemtree, icon_meerk40t.GetBitmap(False, resize=(20, 20)))
         self.register_children(elemtree)
 
         node_operations = elemtree.get(type="branch ops")
-        self.set_icon(node_operations, icons8_laser_beam_20.GetBitmap())
-
-        for n in node_operations.children:
-            self.set_icon(n)
-
         node_elements = elemtree.get(type="branch elems")
-        self.set_icon(node_elements, icons8_vector_20.GetBitmap())
-
         node_registration = elemtree.get(type="branch reg")
-        self.set_icon(node_registration, icons8_vector_20.GetBitmap())
 
         # Expand Ops, Element, and Regmarks nodes only
         self.wxtree.CollapseAll()
@@ -525,6 +498,93 @@ class ShadowTree:
         self.wxtree.Expand(node_elements.item)
         self.wxtree.Expand(node_registration.item)
 
+    def apply_register(self, node, pos=None, **kwargs):
+        """
+        Queued registration of the node and its children, unless they were registered with its parent.
+        """
+        if node.item is not None:
+            return
+        parent = node.parent
+        if parent is None or self._item(parent) is None:
+            return
+        self.node_register(node, pos=pos, **kwargs)
+        self.register_children(node)
+
+    def apply_unregister(self, node, item):
+        """
+        Queued deletion of the item the node had when it was detached.
+        """
+        if item is None or not item.IsOk():
+            return
+        self.wxtree.Delete(item)
+        for i in self.wxtree.GetSelections():
+            self.wxtree.SelectItem(i, False)
+
+    def apply_decorate(self, node):
+        if self._item(node) is not None:
+            self.update_decorations(node)
+
+    def apply_enhance(self, node):
+        if self._item(node) is not None:
+            self.set_enhancements(node)
+
+    def apply_icon(self, node):
+        if self._item(node) is not None:
+            self.icons.invalidate(node)
+
+    def apply_expand(self, node):
+        item = self._item(node)
+        if item is not None:
+            self.wxtree.ExpandAllChildren(item)
+
+    def apply_collapse(self, node):
+        item = self._item(node)
+        if item is None:
+            return
+        self.wxtree.CollapseAllChildren(item)
+        if (
+            item is self.wxtree.GetRootItem()
+            or self.wxtree.GetItemParent(item) is self.wxtree.GetRootItem()
+        ):
+            self.wxtree.Expand(self.elements.get(type="branch ops").item)
+            self.wxtree.Expand(self.elements.get(type="branch elems").item)
+            self.wxtree.Expand(self.elements.get(type="branch reg").item)
+
+    def apply_focus(self, node):
+        item = self._item(node)
+        if item is None:
+            return
+        self.wxtree.EnsureVisible(item)
+        for s in self.wxtree.GetSelections():
+            self.wxtree.SelectItem(s, False)
+        self.wxtree.SelectItem(item)
+        self.wxtree.ScrollTo(item)
+
+    def refresh_tree(self, node=None):
+        """Any tree elements currently displaying wrong data as per elements should be updated to display
+        the proper values and contexts and icons."""
+        if node is None:
+            elemtree = self.elements._tree
+            node = elemtree.item
+        if node is None:
+            return
+        tree = self.wxtree
+
+        child, cookie = tree.GetFirstChild(node)
+        while child.IsOk():
+            child_node = self.wxtree.GetItemData(child)
+            self.set_enhancements(child_node)
+            self.refresh_tree(child)
+            child, cookie = tree.GetNextChild(node, cookie)
+
+    def rebuild_tree(self):
+        """
+        Tree requires being deleted and completely rebuilt. This is queued, replacing the other queued changes.
+
+        @return:
+        """
+        self.updates.rebuild()
+
     def register_children(self, node):
         """
         All children of this node are registered.
@@ -549,25 +609,19 @@ class ShadowTree:
 
     def node_unregister(self, node, **kwargs):
         """
-        Node object is unregistered and item is deleted.
+        Node object is unregistered and its item is cleared. Deleting the item from the tree is queued.
 
         @param node:
         @param kwargs:
         @return:
         """
-        item = node.item
-        if item is None:
-            raise ValueError("Item was None for node " + repr(node))
-        if not item.IsOk():
-            raise ValueError("Bad Item")
         node.unregister_object()
-        self.wxtree.Delete(node.item)
-        for i in self.wxtree.GetSelections():
-            self.wxtree.SelectItem(i, False)
+        node.item = None
+        self.icons.discard(node)
 
     def node_register(self, node, pos=None, **kwargs):
         """
-        Node.item is added/inserted. Label is updated and values are set. Icon is set.
+        Node.item is added/inserted. Label is updated and values are set. Icon is invalidated.
 
         @param node:
         @param pos:
@@ -577,7 +631,7 @@ class ShadowTree:
         parent = node.parent
         parent_item = parent.item
         tree = self.wxtree
-        if pos is None:
+        if pos is None or pos >= tree.GetChildrenCount(parent_item, False):
             node.item = tree.AppendItem(parent_item, self.name)
         else:
             node.item = tree.InsertItem(parent_item, pos, self.name)
@@ -593,7 +647,7 @@ class ShadowTree:
             pass
         except TypeError:
             pass
-        self.set_icon(node)
+        self.icons.invalidate(node)
 
     def set_enhancements(self, node):
         """
@@ -631,86 +685,94 @@ class ShadowTree:
         else:
             tree.SetItemTextColour(item, wx.Colour(swizzlecolor(color)))
 
-    def set_icon(self, node, icon=None):
+    def on_view_changed(self, event):
+        """
+        Tree was scrolled, resized or an item was expanded. Icons of the items now shown are refreshed.
+
+        @param event:
+        @return:
+        """
+        event.Skip()
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            wx.CallAfter(self.refresh_icons)
+
+    def refresh_icons(self):
         """
-        Node icon to be created and applied
+        Sets the icons of the invalidated items which are currently shown within the tree.
 
-        @param node: Node to have the icon set.
-        @param icon: overriding icon to be forcably set, rather than a default.
         @return:
         """
-        root = self
-        drawmode = self.elements.root.draw_mode
-        if drawmode & DRAW_MODE_ICONS != 0:
+        self.refresh_pending = False
+        tree = self.wxtree
+        if not tree or not self.icons.stale:
             return
-        try:
-            item = node.item
-        except AttributeError:
-            return  # Node.item can be none if launched from ExecuteJob where the nodes are not part of the tree.
-        if node.item is None:
+        if self.elements.root.draw_mode & DRAW_MODE_ICONS != 0:
             return
-        tree = root.wxtree
-        if icon is None:
-            if node.type == "elem image":
-                image = self.renderer.make_thumbnail(node.image, width=20, height=20)
-                image_id = self.tree_images.Add(bitmap=image)
-                tree.SetItemImage(item, image=image_id)
-            elif node.type == "elem point":
-                if node.stroke is not None and node.stroke.rgb is not None:
-                    c = node.stroke
-                else:
-                    c = Color("black")
-                self.set_icon(node, icons8_scatter_plot_20.GetBitmap(color=c))
-                return
-            elif node.type == "reference":
-                image = self.renderer.make_raster(
-                    node.node, node.node.bounds, width=20, height=20, bitmap=True
-                )
-                if image is not None:
-                    image_id = self.tree_images.Add(bitmap=image)
-                    tree.SetItemImage(item, image=image_id)
-            elif node.type.startswith("elem "):
-                image = self.renderer.make_raster(
-                    node, node.bounds, width=20, height=20, bitmap=True
-                )
-                if image is not None:
-                    image_id = self.tree_images.Add(bitmap=image)
-                    tree.SetItemImage(item, image=image_id)
-            elif node.type in ("op raster", "op image"):
-                try:
-                    c = node.color
-                    self.set_color(node, c)
-                except AttributeError:
-                    c = None
-                self.set_icon(node, icons8_direction_20.GetBitmap(color=c))
-            elif node.type in ("op engrave", "op cut", "op hatch"):
-                try:
-                    c = node.color
-                    self.set_color(node, c)
-                except AttributeError:
-                    c = None
-                self.set_icon(node, icons8_laser_beam_20.GetBitmap(color=c))
-            elif node.type == "op dots":
-                try:
-                    c = node.color
-                    self.set_color(node, c)
-                except AttributeError:
-                    c = None
-                self.set_icon(node, icons8_scatter_plot_20.GetBitmap(color=c))
-            elif node.type == "op console":
-                try:
-                    c = node.color
-                    self.set_color(node, c)
-                except AttributeError:
-                    c = None
-                self.set_icon(node, icons8_system_task_20.GetBitmap(color=c))
-            elif node.type == "file":
-                self.set_icon(node, icons8_file_20.GetBitmap())
-            elif node.type == "group":
-                self.set_icon(node, icons8_group_objects_20.GetBitmap())
-        else:
-            image_id = self.tree_images.Add(bitmap=icon)
-            tree.SetItemImage(item, image=image_id)
+        shown = list()
+        item = tree.GetFirstVisibleItem()
+        while item.IsOk() and tree.IsVisible(item):
+            node = tree.GetItemData(item)
+            if node is not None:
+                shown.append(node)
+            item = tree.GetNextVisible(item)
+        for node, icon in self.icons.refresh(shown):
+            tree.SetItemImage(node.item, image=-1 if icon is None else icon)
+
+    def render_icon(self, node):
+        """
+        Renders the icon of the node into the image list.
+
+        @param node: Node to have the icon rendered.
+        @return: image id or None
+        """
+        bitmap = self.create_icon(node)
+        if bitmap is None:
+            return None
+        return self.tree_images.Add(bitmap=bitmap)
+
+    def create_icon(self, node):
+        """
+        Icon bitmap for the node.
+
+        @param node: Node to create the icon for.
+        @return: bitmap or None
+        """
+        node_type = node.type
+        if node_type == "elem image":
+            return self.renderer.make_thumbnail(node.image, width=20, height=20)
+        elif node_type == "elem point":
+            if node.stroke is not None and node.stroke.rgb is not None:
+                c = node.stroke
+            else:
+                c = Color("black")
+            return icons8_scatter_plot_20.GetBitmap(color=c)
+        elif node_type == "reference":
+            return self.create_icon(node.node)
+        elif node_type.startswith("elem "):
+            return self.renderer.make_raster(
+                node, node.bounds, width=20, height=20, bitmap=True
+            )
+        c = getattr(node, "color", None)
+        if node_type in ("op raster", "op image"):
+            return icons8_direction_20.GetBitmap(color=c)
+        elif node_type in ("op engrave", "op cut", "op hatch"):
+            return icons8_laser_beam_20.GetBitmap(color=c)
+        elif node_type == "op dots":
+            return icons8_scatter_plot_20.GetBitmap(color=c)
+        elif node_type == "op console":
+            return icons8_system_task_20.GetBitmap(color=c)
+        elif node_type == "file":
+            return icons8_file_20.GetBitmap()
+        elif node_type == "group":
+            return icons8_group_objects_20.GetBitmap()
+        elif node_type == "branch ops":
+            return icons8_laser_beam_20.GetBitmap()
+        elif node_type in ("branch elems", "branch reg"):
+            return icons8_vector_20.GetBitmap()
+        elif node_type == "root":
+            return icon_meerk40t.GetBitmap(False, resize=(20, 20))
+        return None
 
     def update_decorations(self, node):
         """
@@ -719,10 +781,8 @@ class ShadowTree:
         @param node:
         @return:
         """
-        self.set_icon(node)
         if node.item is None:
-            # This node is not registered the tree has desynced.
-            self.rebuild_tree()
+            # This node is not shown within the tree.
             return
 
         formatter = self.elements.lookup(f"format/{node.type}")
@@ -890,7 +950,9 @@ class ShadowTree:
 
         @return:
         """
+        self.flush_updates()
         self.do_not_select = True
         for e in self.elements.elems_nodes(emphasized=True):
-            self.wxtree.SelectItem(e.item, True)
+            if e.item is not None:
+                self.wxtree.SelectItem(e.item, True)
         self.do_not_select = False
@@ -1,4 +1,6 @@
+import hashlib
 import os
+from collections import OrderedDict
 from copy import copy
 from os import path as ospath
 
@@ -980,44 +982,17 @@ def plugin(kernel, lifecycle=None):
         """
         if angle is None:
             raise CommandSyntaxError
-        from PIL import Image, ImageDraw, ImageStat
-
         angle = angle.as_degrees
 
         for inode in data:
-            image = inode.image
-            im = image
-            image = image.convert("L")
-            image = image.rotate(angle, expand=1)
-            size = image.size[0] * scale, image.size[1] * scale
-            half_tone = Image.new("L", size)
-            draw = ImageDraw.Draw(half_tone)
-            for x in range(0, image.size[0], sample):
-                for y in range(0, image.size[1], sample):
-                    box = image.crop(
-                        (
-                            x - oversample,
-                            y - oversample,
-                            x + sample + oversample,
-                            y + sample + oversample,
-                        )
-                    )
-                    stat = ImageStat.Stat(box)
-                    diameter = (stat.mean[0] / 255) ** 0.5
-                    edge = 0.5 * (1 - diameter)
-                    x_pos, y_pos = (x + edge) * scale, (y + edge) * scale
-                    box_edge = sample * diameter * scale
-                    draw.ellipse(
-                        (x_pos, y_pos, x_pos + box_edge, y_pos + box_edge), fill=255
-                    )
-            half_tone = half_tone.rotate(-angle, expand=1)
-            width_half, height_half = half_tone.size
-            xx = (width_half - im.size[0] * scale) / 2
-            yy = (height_half - im.size[1] * scale) / 2
-            half_tone = half_tone.crop(
-                (xx, yy, xx + im.size[0] * scale, yy + im.size[1] * scale)
+            inode.image = RasterScripts.halftone(
+                inode.image,
+                sample=sample,
+                scale=scale,
+                angle=angle,
+                oversample=oversample,
+                keep_size=False,
             )
-            inode.image = half_tone
             if hasattr(inode, "node"):
                 inode.node.altered()
         return "image", data
@@ -1374,20 +1349,129 @@ class RasterScripts:
         return ops
 
     @staticmethod
-    def halftone(image, sample=10, scale=3.0, angle=22.0, oversample=2, black=False):
-        from PIL import Image, ImageDraw, ImageStat
+    def halftone(
+        image,
+        sample=10,
+        scale=3.0,
+        angle=22.0,
+        oversample=2,
+        black=False,
+        keep_size=True,
+    ):
+        """
+        Halftones the image. The image is rotated by angle and divided into sample sized
+        cells, every cell becomes a dot with an area proportional to the mean of the cell
+        grown by oversample on every side.
+
+        @param image: image to halftone
+        @param sample: cell size in pixels
+        @param scale: scale of the dot rendering
+        @param angle: halftone angle in degrees
+        @param oversample: pixels beyond the cell included in its mean
+        @param black: black dots on white rather than white dots on black
+        @param keep_size: resize the scaled halftone back to the size of the image
+        @return: halftone image
+        """
+        from PIL import Image
 
         original_image = image
         image = image.convert("L")
         image = image.rotate(angle, expand=1)
         size = int(image.size[0] * scale), int(image.size[1] * scale)
+        if sample == 0:
+            sample = 1
+        try:
+            half_tone = RasterScripts._halftone_dots(
+                image, size, sample, scale, oversample, black
+            )
+        except ImportError:
+            half_tone = RasterScripts._halftone_draw(
+                image, size, sample, scale, oversample, black
+            )
+        half_tone = half_tone.rotate(-angle, expand=1)
+        width_half, height_half = half_tone.size
+        xx = (width_half - original_image.size[0] * scale) / 2
+        yy = (height_half - original_image.size[1] * scale) / 2
+        half_tone = half_tone.crop(
+            (
+                xx,
+                yy,
+                xx + original_image.size[0] * scale,
+                yy + original_image.size[1] * scale,
+            )
+        )
+        if keep_size:
+            half_tone = half_tone.resize(original_image.size)
+        return half_tone
+
+    @staticmethod
+    def _halftone_dots(image, size, sample, scale, oversample, black):
+        """
+        Renders the halftone dots with numpy. The cell means are window sums of a summed
+        area table, the dots are masks of the distance of every pixel to the center of
+        its cell. Outside the image counts as black, as it does when cropping.
+        """
+        import numpy as np
+        from PIL import Image
+
+        width, height = image.size
+        columns = (width + sample - 1) // sample
+        rows = (height + sample - 1) // sample
+        window = sample + 2 * oversample
+        # Leading zero row and column so every window sum is a difference of the table.
+        padded = np.zeros(
+            (rows * sample + window + 1, columns * sample + window + 1), dtype=np.int64
+        )
+        top = 1 + oversample
+        padded[top : top + height, top : top + width] = np.asarray(image)
+        table = padded.cumsum(axis=0).cumsum(axis=1)
+        y0 = np.arange(rows) * sample
+        x0 = np.arange(columns) * sample
+        y1 = y0 + window
+        x1 = x0 + window
+        sums = (
+            table[np.ix_(y1, x1)]
+            - table[np.ix_(y0, x1)]
+            - table[np.ix_(y1, x0)]
+            + table[np.ix_(y0, x0)]
+        )
+        mean = sums / float(window * window)
+        if black:
+            diameter = np.sqrt((255.0 - mean) / 255.0)
+        else:
+            diameter = np.sqrt(mean / 255.0)
+        radius2 = (0.5 * sample * scale * diameter) ** 2
+
+        cell = sample * scale
+        u = np.arange(size[0]) + 0.5
+        column = np.minimum((u // cell).astype(int), columns - 1)
+        dx2 = (u - (column + 0.5) * cell) ** 2
+        v = np.arange(size[1]) + 0.5
+        row = np.minimum((v // cell).astype(int), rows - 1)
+        dy2 = (v - (row + 0.5) * cell) ** 2
+        dot, background = (0, 255) if black else (255, 0)
+        pixels = np.empty((size[1], size[0]), dtype=np.uint8)
+        # Rendered in bands of rows to bound the memory of the distance arrays.
+        band = max(1, 1048576 // max(1, size[0]))
+        for top in range(0, size[1], band):
+            bottom = min(top + band, size[1])
+            limit = radius2[row[top:bottom]][:, column]
+            inside = dy2[top:bottom, None] + dx2[None, :] <= limit
+            pixels[top:bottom] = np.where(inside, dot, background)
+        return Image.fromarray(pixels, "L")
+
+    @staticmethod
+    def _halftone_draw(image, size, sample, scale, oversample, black):
+        """
+        Draws the halftone dots cell by cell, used without numpy.
+        """
+        from PIL import Image, ImageDraw, ImageStat
+
         if black:
             half_tone = Image.new("L", size, color=255)
         else:
             half_tone = Image.new("L", size)
         draw = ImageDraw.Draw(half_tone)
-        if sample == 0:
-            sample = 1
         for x in range(0, image.size[0], sample):
             for y in range(0, image.size[1], sample):
                 box = image.crop(
@@ -1403,239 +1487,257 @@ class RasterScripts:
                     diameter = ((255 - stat.mean[0]) / 255) ** 0.5
                 else:
                     diameter = (stat.mean[0] / 255) ** 0.5
-                edge = 0.5 * (1 - diameter)
+                edge = 0.5 * sample * (1 - diameter)
                 x_pos, y_pos = (x + edge) * scale, (y + edge) * scale
                 box_edge = sample * diameter * scale
-                if black:
-                    draw.ellipse(
-                        (x_pos, y_pos, x_pos + box_edge, y_pos + box_edge), fill=0
-                    )
-                else:
-                    draw.ellipse(
-                        (x_pos, y_pos, x_pos + box_edge, y_pos + box_edge), fill=255
-                    )
-        half_tone = half_tone.rotate(-angle, expand=1)
-        width_half, height_half = half_tone.size
-        xx = (width_half - original_image.size[0] * scale) / 2
-        yy = (height_half - original_image.size[1] * scale) / 2
-        half_tone = half_tone.crop(
-            (
-                xx,
-                yy,
-                xx + original_image.size[0] * scale,
-                yy + original_image.size[1] * scale,
-            )
-        )
-        half_tone = half_tone.resize(original_image.size)
+                draw.ellipse(
+                    (x_pos, y_pos, x_pos + box_edge, y_pos + box_edge),
+                    fill=0 if black else 255,
+                )
         return half_tone
 
     @staticmethod
     def wizard_image(image_node, operations):
         image = image_node.image
         matrix = Matrix(image_node.matrix)
+        from PIL import Image
+
+        invert = RasterScripts.wizard_invert(operations)
         step = None
-        from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+        empty_mask = RasterScripts.empty_mask(image, invert)
+        for op in operations:
+            image, matrix, step, empty_mask = RasterScripts.wizard_step(
+                op, image, matrix, step, empty_mask, invert
+            )
+        if empty_mask is not None:
+            background = Image.new(image.mode, image.size, "white")
+            background.paste(image, mask=empty_mask)
+            image = background  # Mask exists use it to remove any pixels that were pure reject.
+        return image, matrix, step
 
-        # Lookahead check for inversion
+    @staticmethod
+    def wizard_invert(operations):
+        """
+        Lookahead check for inversion.
+        """
         invert = False
         for op in operations:
             if op["name"] == "grayscale" and op["enable"]:
                 invert = op["invert"]
+        return invert
+
+    @staticmethod
+    def empty_mask(image, invert):
         if invert:
-            empty_mask = image.convert("L").point(lambda e: 0 if e == 0 else 255)
+            return image.convert("L").point(lambda e: 0 if e == 0 else 255)
         else:
-            empty_mask = image.convert("L").point(lambda e: 0 if e == 255 else 255)
+            return image.convert("L").point(lambda e: 0 if e == 255 else 255)
 
-        # Process operations.
-        for op in operations:
-            name = op["name"]
-            if name == "crop":
-                try:
-                    if op["enable"] and op["bounds"] is not None:
-                        crop = op["bounds"]
-                        left = int(crop[0])
-                        upper = int(crop[1])
-                        right = int(crop[2])
-                        lower = int(crop[3])
-                        image = image.crop((left, upper, right, lower))
-                except KeyError:
-                    pass
-            elif name == "resample":
-                try:
-                    if op["enable"]:
-                        step = op["step"]
-                        image, matrix = actualize(
-                            image, matrix, step_x=step, step_y=step, inverted=invert
-                        )
-                        if invert:
-                            empty_mask = image.convert("L").point(
-                                lambda e: 0 if e == 0 else 255
-                            )
-                        else:
-                            empty_mask = image.convert("L").point(
-                                lambda e: 0 if e == 255 else 255
-                            )
-                except KeyError:
-                    pass
-            elif name == "grayscale":
-                try:
-                    if op["enable"]:
+    @staticmethod
+    def wizard_step(op, image, matrix, step, empty_mask, invert, scale=1.0):
+        """
+        Performs a single raster wizard operation. The given image is not altered.
+
+        @param op: operation
+        @param image: image the operation is applied to
+        @param matrix: matrix of the image
+        @param step: step set by an earlier resample
+        @param empty_mask: mask of the empty pixels, or None once applied
+        @param invert: whether black is treated as empty
+        @param scale: scale of the image to the full resolution image, for previews. Sizes
+        in pixels, the crop bounds, halftone sample and unsharp mask radius, are scaled
+        by it and the resample step by its inverse.
+        @return: image, matrix, step, empty_mask
+        """
+        from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+        name = op["name"]
+        if name == "crop":
+            try:
+                if op["enable"] and op["bounds"] is not None:
+                    crop = op["bounds"]
+                    left = int(crop[0] * scale)
+                    upper = int(crop[1] * scale)
+                    right = int(crop[2] * scale)
+                    lower = int(crop[3] * scale)
+                    image = image.crop((left, upper, right, lower))
+                    if empty_mask is not None:
+                        empty_mask = empty_mask.crop((left, upper, right, lower))
+            except KeyError:
+                pass
+        elif name == "resample":
+            try:
+                if op["enable"]:
+                    step = op["step"]
+                    image, matrix = actualize(
+                        image,
+                        matrix,
+                        step_x=step / scale,
+                        step_y=step / scale,
+                        inverted=invert,
+                    )
+                    empty_mask = RasterScripts.empty_mask(image, invert)
+            except KeyError:
+                pass
+        elif name == "grayscale":
+            try:
+                if op["enable"]:
+                    try:
+                        r = op["red"] * 0.299
+                        g = op["green"] * 0.587
+                        b = op["blue"] * 0.114
+                        v = op["lightness"]
+                        c = r + g + b
                         try:
-                            r = op["red"] * 0.299
-                            g = op["green"] * 0.587
-                            b = op["blue"] * 0.114
-                            v = op["lightness"]
-                            c = r + g + b
-                            try:
-                                c /= v
-                                r = r / c
-                                g = g / c
-                                b = b / c
-                            except ZeroDivisionError:
-                                pass
-                            if image.mode != "L":
-                                image = image.convert("RGB")
-                                image = image.convert("L", matrix=[r, g, b, 1.0])
-                            if op["invert"]:
-                                if image.mode == "F":
-                                    image = image.convert("L")
-                                image = ImageOps.invert(image)
-                        except (KeyError, OSError):
+                            c /= v
+                            r = r / c
+                            g = g / c
+                            b = b / c
+                        except ZeroDivisionError:
                             pass
+                        if image.mode != "L":
+                            image = image.convert("RGB")
+                            image = image.convert("L", matrix=[r, g, b, 1.0])
+                        if op["invert"]:
+                            if image.mode == "F":
+                                image = image.convert("L")
+                            image = ImageOps.invert(image)
+                    except (KeyError, OSError):
+                        pass
 
-                except KeyError:
-                    pass
-            elif name == "edge_enhance":
-                try:
-                    if op["enable"]:
-                        if image.mode == "P":
+            except KeyError:
+                pass
+        elif name == "edge_enhance":
+            try:
+                if op["enable"]:
+                    if image.mode == "P":
+                        image = image.convert("L")
+                    image = image.filter(filter=ImageFilter.EDGE_ENHANCE)
+            except KeyError:
+                pass
+        elif name == "auto_contrast":
+            try:
+                if op["enable"]:
+                    if image.mode not in ("RGB", "L"):
+                        # Auto-contrast raises NotImplementedError if P
+                        # Auto-contrast raises OSError if not RGB, L.
+                        image = image.convert("L")
+                    image = ImageOps.autocontrast(image, cutoff=op["cutoff"])
+            except KeyError:
+                pass
+        elif name == "tone":
+            try:
+                if op["enable"] and op["values"] is not None:
+                    if image.mode == "L":
+                        image = image.convert("P")
+                        tone_values = op["values"]
+                        if op["type"] == "spline":
+                            spline = RasterScripts.spline(tone_values)
+                        else:
+                            tone_values = [q for q in tone_values if q is not None]
+                            spline = RasterScripts.line(tone_values)
+                        if len(spline) < 256:
+                            spline.extend([255] * (256 - len(spline)))
+                        if len(spline) > 256:
+                            spline = spline[:256]
+                        image = image.point(spline)
+                        if image.mode != "L":
                             image = image.convert("L")
-                        image = image.filter(filter=ImageFilter.EDGE_ENHANCE)
-                except KeyError:
-                    pass
-            elif name == "auto_contrast":
-                try:
-                    if op["enable"]:
-                        if image.mode not in ("RGB", "L"):
-                            # Auto-contrast raises NotImplementedError if P
-                            # Auto-contrast raises OSError if not RGB, L.
+            except KeyError:
+                pass
+        elif name == "contrast":
+            try:
+                if op["enable"]:
+                    if op["contrast"] is not None and op["brightness"] is not None:
+                        contrast = ImageEnhance.Contrast(image)
+                        c = (op["contrast"] + 128.0) / 128.0
+                        image = contrast.enhance(c)
+
+                        brightness = ImageEnhance.Brightness(image)
+                        b = (op["brightness"] + 128.0) / 128.0
+                        image = brightness.enhance(b)
+            except KeyError:
+                pass
+        elif name == "gamma":
+            try:
+                if op["enable"] and op["factor"] is not None:
+                    if image.mode == "L":
+                        gamma_factor = float(op["factor"])
+
+                        def crimp(px):
+                            px = int(round(px))
+                            if px < 0:
+                                return 0
+                            if px > 255:
+                                return 255
+                            return px
+
+                        if gamma_factor == 0:
+                            gamma_lut = [0] * 256
+                        else:
+                            gamma_lut = [
+                                crimp(pow(i / 255, (1.0 / gamma_factor)) * 255)
+                                for i in range(256)
+                            ]
+                        image = image.point(gamma_lut)
+                        if image.mode != "L":
                             image = image.convert("L")
-                        image = ImageOps.autocontrast(image, cutoff=op["cutoff"])
-                except KeyError:
-                    pass
-            elif name == "tone":
-                try:
-                    if op["enable"] and op["values"] is not None:
-                        if image.mode == "L":
-                            image = image.convert("P")
-                            tone_values = op["values"]
-                            if op["type"] == "spline":
-                                spline = RasterScripts.spline(tone_values)
-                            else:
-                                tone_values = [q for q in tone_values if q is not None]
-                                spline = RasterScripts.line(tone_values)
-                            if len(spline) < 256:
-                                spline.extend([255] * (256 - len(spline)))
-                            if len(spline) > 256:
-                                spline = spline[:256]
-                            image = image.point(spline)
-                            if image.mode != "L":
-                                image = image.convert("L")
-                except KeyError:
-                    pass
-            elif name == "contrast":
-                try:
-                    if op["enable"]:
-                        if op["contrast"] is not None and op["brightness"] is not None:
-                            contrast = ImageEnhance.Contrast(image)
-                            c = (op["contrast"] + 128.0) / 128.0
-                            image = contrast.enhance(c)
-
-                            brightness = ImageEnhance.Brightness(image)
-                            b = (op["brightness"] + 128.0) / 128.0
-                            image = brightness.enhance(b)
-                except KeyError:
-                    pass
-            elif name == "gamma":
-                try:
-                    if op["enable"] and op["factor"] is not None:
-                        if image.mode == "L":
-                            gamma_factor = float(op["factor"])
-
-                            def crimp(px):
-                                px = int(round(px))
-                                if px < 0:
-                                    return 0
-                                if px > 255:
-                                    return 255
-                                return px
-
-                            if gamma_factor == 0:
-                                gamma_lut = [0] * 256
-                            else:
-                                gamma_lut = [
-                                    crimp(pow(i / 255, (1.0 / gamma_factor)) * 255)
-                                    for i in range(256)
-                                ]
-                            image = image.point(gamma_lut)
-                            if image.mode != "L":
-                                image = image.convert("L")
-                except KeyError:
-                    pass
-            elif name == "unsharp_mask":
-                try:
-                    if (
-                        op["enable"]
-                        and op["percent"] is not None
-                        and op["radius"] is not None
-                        and op["threshold"] is not None
-                    ):
-                        unsharp = ImageFilter.UnsharpMask(
-                            radius=op["radius"],
-                            percent=op["percent"],
-                            threshold=op["threshold"],
-                        )
-                        image = image.filter(unsharp)
-                except (KeyError, ValueError):  # Value error if wrong type of image.
-                    pass
-            elif name == "dither":
-                try:
-                    if empty_mask is not None:
-                        background = Image.new(image.mode, image.size, "white")
-                        background.paste(image, mask=empty_mask)
-                        image = background  # Mask exists use it to remove any pixels that were pure reject.
-                        empty_mask = None
-                    if op["enable"] and op["type"] is not None:
-                        if image.mode == "RGBA":
-                            pixel_data = image.load()
-                            width, height = image.size
-                            for y in range(height):
-                                for x in range(width):
-                                    if pixel_data[x, y][3] == 0:
-                                        pixel_data[x, y] = (255, 255, 255, 255)
-                        if op["type"] != "Floyd-Steinberg":
-                            image = dither(image, op["type"])
-                        image = image.convert("1")
-
-                except KeyError:
-                    pass
-            elif name == "halftone":
-                try:
-                    if op["enable"]:
-                        image = RasterScripts.halftone(
-                            image,
-                            sample=op["sample"],
-                            angle=op["angle"],
-                            oversample=op["oversample"],
-                            black=op["black"],
-                        )
-                except KeyError:
-                    pass
-        if empty_mask is not None:
-            background = Image.new(image.mode, image.size, "white")
-            background.paste(image, mask=empty_mask)
-            image = background  # Mask exists use it to remove any pixels that were pure reject.
-        return image, matrix, step
+            except KeyError:
+                pass
+        elif name == "unsharp_mask":
+            try:
+                if (
+                    op["enable"]
+                    and op["percent"] is not None
+                    and op["radius"] is not None
+                    and op["threshold"] is not None
+                ):
+                    unsharp = ImageFilter.UnsharpMask(
+                        radius=op["radius"] * scale,
+                        percent=op["percent"],
+                        threshold=op["threshold"],
+                    )
+                    image = image.filter(unsharp)
+            except (KeyError, ValueError):  # Value error if wrong type of image.
+                pass
+        elif name == "dither":
+            try:
+                if empty_mask is not None:
+                    background = Image.new(image.mode, image.size, "white")
+                    background.paste(image, mask=empty_mask)
+                    image = background  # Mask exists use it to remove any pixels that were pure reject.
+                    empty_mask = None
+                if op["enable"] and op["type"] is not None:
+                    if image.mode == "RGBA":
+                        image = image.copy()
+                        pixel_data = image.load()
+                        width, height = image.size
+                        for y in range(height):
+                            for x in range(width):
+                                if pixel_data[x, y][3] == 0:
+                                    pixel_data[x, y] = (255, 255, 255, 255)
+                    if op["type"] != "Floyd-Steinberg":
+                        image = dither(image, op["type"])
+                    image = image.convert("1")
+
+            except KeyError:
+                pass
+        elif name == "halftone":
+            try:
+                if op["enable"]:
+                    sample = op["sample"]
+                    if scale != 1.0:
+                        sample = max(1, int(round(sample * scale)))
+                    image = RasterScripts.halftone(
+                        image,
+                        sample=sample,
+                        angle=op["angle"],
+                        oversample=op["oversample"],
+                        black=op["black"],
+                    )
+            except KeyError:
+                pass
+        return image, matrix, step, empty_mask
 
     @staticmethod
     def line(p):
@@ -1706,6 +1808,145 @@ class RasterScripts:
         return r
 
 
+class WizardPipeline:
+    """
+    Runs raster wizard operations as a chain of memoized steps.
+
+    Every step result is cached under a digest of its input and the parameters of the
+    step. The input digest of the first step is taken from the source image, the input
+    digest of every later step is the digest of the step before it. Changing an
+    operation therefore recomputes that operation and the ones after it only.
+
+    In preview mode the source image is first scaled down to the preview size, and the
+    sizes in pixels of the operations are scaled to match, so the chain runs at screen
+    resolution and the preview looks like the full resolution result scaled down.
+
+    Results are kept in least recently used order within max_size bytes.
+    """
+
+    def __init__(self, max_size=128 * 1048576):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._source = None
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+        self._source = None
+        self.size = 0
+
+    @staticmethod
+    def estimate(image, empty_mask):
+        size = image.width * image.height * len(image.getbands())
+        if empty_mask is not None:
+            size += empty_mask.width * empty_mask.height
+        return size
+
+    def _source_state(self, image, matrix, preview):
+        """
+        Source image and digest, scaled for the preview. The last source is kept so
+        repeated runs on the same image neither rescale nor rehash it.
+        """
+        source = self._source
+        if source is not None and source[0] is image and source[1] == preview:
+            scaled, scale, digest = source[2:]
+        else:
+            from PIL import Image
+
+            scaled = image
+            scale = 1.0
+            width, height = image.size
+            if preview is not None and max(width, height) > preview > 0:
+                scale = preview / float(max(width, height))
+                size = (
+                    max(1, int(round(width * scale))),
+                    max(1, int(round(height * scale))),
+                )
+                scaled = image.resize(size, Image.BILINEAR)
+            digest = hashlib.sha1()
+            digest.update(repr((scaled.mode, scaled.size, scale)).encode())
+            digest.update(scaled.tobytes())
+            digest = digest.digest()
+            self._source = (image, preview, scaled, scale, digest)
+        scaled_matrix = Matrix(matrix)
+        if scaled is not image:
+            scaled_matrix.pre_scale(
+                image.width / float(scaled.width), image.height / float(scaled.height)
+            )
+        return scaled, scaled_matrix, scale, digest
+
+    def _get(self, key):
+        try:
+            state = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return state
+
+    def _put(self, key, state):
+        size = self.estimate(state[0], state[3])
+        if size > self.max_size:
+            return
+        self._cache[key] = state + (size,)
+        self.size += size
+        while self.size > self.max_size:
+            old_key, old_state = self._cache.popitem(last=False)
+            self.size -= old_state[-1]
+
+    def process(self, image, matrix, operations, preview=None):
+        """
+        Processes the image with the raster wizard operations.
+
+        @param image: source image, this is not altered
+        @param matrix: matrix of the source image
+        @param operations: raster wizard operations
+        @param preview: largest dimension of the preview, None for full resolution
+        @return: image, matrix, step
+        """
+        from PIL import Image
+
+        image, matrix, scale, digest = self._source_state(image, matrix, preview)
+        invert = RasterScripts.wizard_invert(operations)
+        step = None
+        empty_mask = None
+        digest = hashlib.sha1(digest + repr((invert, matrix)).encode()).digest()
+        state = self._get(digest)
+        if state is None:
+            empty_mask = RasterScripts.empty_mask(image, invert)
+            self._put(digest, (image, matrix, step, empty_mask))
+        else:
+            image, matrix, step, empty_mask = state[:4]
+        for op in operations:
+            if op.get("enable", False) or op["name"] == "dither":
+                parameters = repr(sorted(op.items()))
+            else:
+                # Disabled operations do nothing, whatever their other values.
+                parameters = repr((op["name"], False))
+            digest = hashlib.sha1(digest + parameters.encode()).digest()
+            state = self._get(digest)
+            if state is None:
+                image, matrix, step, empty_mask = RasterScripts.wizard_step(
+                    op, image, matrix, step, empty_mask, invert, scale=scale
+                )
+                self._put(digest, (image, matrix, step, empty_mask))
+            else:
+                image, matrix, step, empty_mask = state[:4]
+        if empty_mask is not None:
+            background = Image.new(image.mode, image.size, "white")
+            background.paste(image, mask=empty_mask)
+            image = background
+        else:
+            image = image.copy()
+        return image, Matrix(matrix), step
+
+
 class ImageLoader:
     @staticmethod
     def load_types():
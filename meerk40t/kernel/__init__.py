@@ -8,6 +8,8 @@ from .jobs import *
 from .kernel import *
 from .lifecycles import *
 from .module import *
+from .plugins import *
+from .registry import *
 from .service import *
 from .settings import *
 from .states import *
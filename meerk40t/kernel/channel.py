@@ -1,8 +1,22 @@
 import re
 from collections import deque
 from datetime import datetime
+from time import time
 from typing import Callable, Optional, Union
 
+# Severity levels of channel messages, matching those of the logging module.
+LEVEL_DEBUG = 10
+LEVEL_INFO = 20
+LEVEL_WARNING = 30
+LEVEL_ERROR = 40
+
+LEVEL_NAMES = {
+    "debug": LEVEL_DEBUG,
+    "info": LEVEL_INFO,
+    "warning": LEVEL_WARNING,
+    "error": LEVEL_ERROR,
+}
+
 # https://en.wikipedia.org/wiki/ANSI_escape_code#3-bit_and_4-bit
 BBCODE_LIST = {
     "black": "\033[30m",
@@ -68,6 +82,12 @@ class Channel:
     """
     Register and configure the Kernel channel that is used to send and view data within the kernel. Channels can send
     both string data and binary data. They provide debug information and data such as from a server module.
+
+    Messages are only processed when the channel is enabled, being watched or buffered, and their level is at least
+    the level of the channel. Messages may be given as a format with its args, `channel("Data: %s", data)`, or as a
+    callable returning the message, which are only formatted or called if the message is sent anywhere. Buffered
+    messages are kept in a ring buffer, unformatted, and only formatted when they are replayed to a new watcher, so
+    deferred messages should not depend on state which is later changed.
     """
 
     def __init__(
@@ -78,6 +98,7 @@ class Channel:
         timestamp: bool = False,
         pure: bool = False,
         ansi: bool = False,
+        level: int = 0,
     ):
         self.watchers = []
         self.greet = None
@@ -87,10 +108,12 @@ class Channel:
         self._ = lambda e: e
         self.timestamp = timestamp
         self.pure = pure
+        self.level = level
         if buffer_size == 0:
             self.buffer = None
         else:
-            self.buffer = deque()
+            # Records of message, args, indent, ansi, time.
+            self.buffer = deque(maxlen=buffer_size)
         self.ansi = ansi
 
     def __repr__(self):
@@ -100,6 +123,15 @@ class Channel:
             repr(self.line_end),
         )
 
+    def enabled(self, level: int = LEVEL_INFO) -> bool:
+        """
+        Whether a message of the given level would be sent anywhere. Check this before building messages which
+        cannot be deferred.
+        """
+        return level >= self.level and (
+            bool(self.watchers) or self.buffer is not None
+        )
+
     def _call_raw(
         self,
         message: Union[str, bytes, bytearray],
@@ -107,29 +139,28 @@ class Channel:
         for w in self.watchers:
             w(message)
         if self.buffer is not None:
-            self.buffer.append(message)
-            while len(self.buffer) > self.buffer_size:
-                self.buffer.popleft()
+            self.buffer.append((message, (), False, False, None))
 
-    def __call__(
-        self,
-        message: Union[str, bytes, bytearray],
-        *args,
-        indent: Optional[bool] = True,
-        ansi: Optional[bool] = False,
-        **kwargs,
-    ):
-        if isinstance(message, (bytes, bytearray)) or self.pure:
-            self._call_raw(message)
-            return
+    @staticmethod
+    def _resolve(message, args):
+        if callable(message):
+            message = message()
+        if args:
+            message = message % args
+        return message
 
-        original_msg = message
+    def _format(self, message, indent, ansi, timestamp):
+        """
+        Formats the message for the watchers of this channel.
+        """
+        if isinstance(message, (bytes, bytearray)) or self.pure:
+            return message
         if self.line_end is not None:
             message = message + self.line_end
         if indent:
             message = "    " + message.replace("\n", "\n    ")
-        if self.timestamp:
-            ts = datetime.now().strftime("[%H:%M:%S] ")
+        if timestamp is not None:
+            ts = datetime.fromtimestamp(timestamp).strftime("[%H:%M:%S] ")
             message = ts + message.replace("\n", "\n%s" % ts)
         if ansi:
             if self.ansi:
@@ -138,29 +169,56 @@ class Channel:
             else:
                 # Convert bbcode to stripped
                 message = self.bbcode_to_plain(message)
+        return message
+
+    def __call__(
+        self,
+        message: Union[str, bytes, bytearray, Callable],
+        *args,
+        level: int = LEVEL_INFO,
+        indent: Optional[bool] = True,
+        ansi: Optional[bool] = False,
+        **kwargs,
+    ):
+        if level < self.level:
+            return
+        watchers = self.watchers
+        buffer = self.buffer
+        if not watchers:
+            if buffer is not None:
+                # Captured without formatting, formatted only if replayed.
+                buffer.append(
+                    (message, args, indent, ansi, time() if self.timestamp else None)
+                )
+            return
+        message = self._resolve(message, args)
+        if isinstance(message, (bytes, bytearray)) or self.pure:
+            self._call_raw(message)
+            return
+
+        timestamp = time() if self.timestamp else None
+        formatted = self._format(message, indent, ansi, timestamp)
 
         console_open_print = False
         # Check if this channel is "open" i.e. being sent to console
         # and if so whether the console is being sent to print
         # because if so then we don't want to print ourselves
-        for w in self.watchers:
+        for w in watchers:
             if isinstance(w, Channel) and w.name == "console" and print in w.watchers:
                 console_open_print = True
                 break
-        for w in self.watchers:
+        for w in watchers:
             # Avoid double printing if this channel is "open" and printed
             # and console is also printed
             if w is print and console_open_print:
                 continue
             # Avoid double timestamp and indent
             if isinstance(w, Channel):
-                w(original_msg, indent=indent, ansi=ansi)
+                w(message, indent=indent, ansi=ansi, level=level)
             else:
-                w(message)
-        if self.buffer is not None:
-            self.buffer.append(message)
-            while len(self.buffer) > self.buffer_size:
-                self.buffer.popleft()
+                w(formatted)
+        if buffer is not None:
+            buffer.append((message, (), indent, ansi, timestamp))
 
     def __len__(self):
         return self.buffer_size
@@ -205,8 +263,9 @@ class Channel:
         if self.greet is not None:
             monitor_function(self.greet)
         if self.buffer is not None:
-            for line in list(self.buffer):
-                monitor_function(line)
+            for message, args, indent, ansi, timestamp in list(self.buffer):
+                message = self._resolve(message, args)
+                monitor_function(self._format(message, indent, ansi, timestamp))
 
     def unwatch(self, monitor_function: Callable):
         self.watchers.remove(monitor_function)
@@ -9,7 +9,7 @@ from datetime import datetime
 from threading import Thread
 from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple, Union
 
-from .channel import Channel
+from .channel import LEVEL_NAMES, Channel
 from .context import Context
 from .exceptions import CommandMatchRejected, CommandSyntaxError
 from .functions import (
@@ -22,6 +22,7 @@ from .functions import (
 from .jobs import ConsoleFunction, Job
 from .lifecycles import *
 from .module import Module
+from .registry import Registry, compiled_pattern
 from .service import Service
 from .settings import Settings
 from .states import *
@@ -89,7 +90,11 @@ class Kernel(Settings):
             times=1,
             run_main=True,
         )
-        self._registered = {}
+        self._registered = Registry()
+        # Active services and find results, memoized by the generations of the registries.
+        self._active_services = None
+        self._available_services = None
+        self._found = {}
         self.lookups = {}
         self.lookup_previous = {}
         self._dirty_paths = []
@@ -137,6 +142,9 @@ class Kernel(Settings):
         # Arguments Objects
         self.args = None
 
+        # Optional StartupProfiler, timing all plugins added after it is set.
+        self.startup_profiler = None
+
     def __str__(self):
         return "Kernel()"
 
@@ -224,6 +232,8 @@ class Kernel(Settings):
         @param plugin:
         @return:
         """
+        if self.startup_profiler is not None:
+            plugin = self.startup_profiler.wrap(plugin)
         additional_plugins = plugin(self, "plugins")
         if additional_plugins is not None:
             for p in additional_plugins:
@@ -268,16 +278,25 @@ class Kernel(Settings):
             except KeyError:
                 return []
 
+    def _services(self, pattern, memo):
+        registered = self._registered
+        if memo is not None and memo[0] == registered.generation:
+            return memo
+        services = list()
+        for r in registered.prefixed("service/"):
+            result = pattern.match(r)
+            if result:
+                services.append((result.group(1), registered[r]))
+        return registered.generation, services
+
     def services_active(self):
         """
         Generate a series of active services.
 
         @return: domain, service
         """
-        for r in list(self._registered):
-            result = RE_ACTIVE.match(r)
-            if result:
-                yield result.group(1), self._registered[r]
+        self._active_services = self._services(RE_ACTIVE, self._active_services)
+        yield from self._active_services[1]
 
     def services_available(self):
         """
@@ -285,10 +304,10 @@ class Kernel(Settings):
 
         @return: domain, service
         """
-        for r in list(self._registered):
-            result = RE_AVAILABLE.match(r)
-            if result:
-                yield result.group(1), self._registered[r]
+        self._available_services = self._services(
+            RE_AVAILABLE, self._available_services
+        )
+        yield from self._available_services[1]
 
     def remove_service(self, service: Service):
         self.set_service_lifecycle(service, LIFECYCLE_KERNEL_SHUTDOWN)
@@ -1101,6 +1120,10 @@ class Kernel(Settings):
             self.channel("console").unwatch(self.__print_delegate)
 
     def premain(self):
+        if self.startup_profiler is not None:
+            # Startup is complete, report the startup timings.
+            self.startup_profiler.stop()
+            self.startup_profiler.report(self.__print_delegate)
         if hasattr(self.args, "console") and self.args.console:
             self.channel("console").watch(self.__print_delegate)
             import sys
@@ -1285,6 +1308,40 @@ class Kernel(Settings):
     # REGISTRATION
     # ==========
 
+    def registry_generation(self) -> Tuple:
+        """
+        Generation of the registered data, changed by any register or unregister within the kernel or the active
+        services, and by activating services.
+        """
+        return self._registered.generation, tuple(
+            service._registered.generation for domain, service in self.services_active()
+        )
+
+    def _find(self, matchtext: str) -> List[Tuple[Any, str, str]]:
+        """
+        Registered objects, paths and suffixes that regex match the matchtext. These are memoized until the
+        registry generation changes.
+        """
+        generation = self.registry_generation()
+        try:
+            found_generation, found = self._found[matchtext]
+            if found_generation == generation:
+                return found
+        except KeyError:
+            pass
+        found = list()
+        for domain, service in self.services_active():
+            registered = service._registered
+            for r in registered.matching(matchtext):
+                found.append((registered[r], r, r.split("/")[-1]))
+        registered = self._registered
+        for r in registered.matching(matchtext):
+            found.append((registered[r], r, r.split("/")[-1]))
+        if len(self._found) > 1024:
+            self._found.clear()
+        self._found[matchtext] = generation, found
+        return found
+
     def find(self, *args):
         """
         Find registered path and objects that regex match the given matchtext
@@ -1292,15 +1349,7 @@ class Kernel(Settings):
         @param args: parts of matchtext
         @return:
         """
-        matchtext = "/".join(args)
-        match = re.compile(matchtext)
-        for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    yield service._registered[r], r, list(r.split("/"))[-1]
-        for r in self._registered:
-            if match.match(r):
-                yield self._registered[r], r, list(r.split("/"))[-1]
+        yield from self._find("/".join(args))
 
     def match(self, matchtext: str, suffix: bool = False) -> Generator[str, None, None]:
         """
@@ -1310,20 +1359,11 @@ class Kernel(Settings):
         @param suffix: provide the suffix of the match only.
         @return:
         """
-        match = re.compile(matchtext)
-        for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    if suffix:
-                        yield list(r.split("/"))[-1]
-                    else:
-                        yield r
-        for r in self._registered:
-            if match.match(r):
-                if suffix:
-                    yield list(r.split("/"))[-1]
-                else:
-                    yield r
+        for obj, r, sname in self._find(matchtext):
+            if suffix:
+                yield sname
+            else:
+                yield r
 
     def lookup(self, *args):
         """
@@ -1439,8 +1479,7 @@ class Kernel(Settings):
         @return:
         """
         self.channel("lookup")(
-            "Changed all: %s (%s)"
-            % (str(paths), str(threading.currentThread().getName()))
+            "Changed all: %s (%s)", paths, threading.current_thread().name
         )
         with self._lookup_lock:
             if not self._dirty_paths:
@@ -1455,7 +1494,7 @@ class Kernel(Settings):
         @return:
         """
         self.channel("lookup")(
-            "Changed %s (%s)" % (str(path), str(threading.currentThread().getName()))
+            "Changed %s (%s)", path, threading.current_thread().name
         )
         with self._lookup_lock:
             if not self._dirty_paths:
@@ -1463,7 +1502,7 @@ class Kernel(Settings):
             self._dirty_paths.append(path)
 
     def _matchtext_is_dirty(self, matchtext: str) -> bool:
-        match = re.compile(matchtext)
+        match, prefix = compiled_pattern(matchtext)
         for r in self._dirty_paths:
             if match.match(r):
                 return True
@@ -2083,7 +2122,7 @@ class Kernel(Settings):
                 "command", str(input_type), ".*"
             ):
                 if command_funct.regex:
-                    match = re.compile(cmd_re)
+                    match, prefix = compiled_pattern(cmd_re)
                     if not match.match(command):
                         continue
                 else:
@@ -2797,6 +2836,31 @@ class Kernel(Settings):
                 channel(_("Channel %s is not opened.") % channel_name)
             return "channel", channel_name
 
+        @self.console_argument("channel_name", help=_("channel name"))
+        @self.console_argument(
+            "level", help=_("lowest level of messages sent: debug, info, warning, error")
+        )
+        @self.console_command(
+            "level",
+            help=_("set the lowest level of messages this channel sends"),
+            input_type="channel",
+            output_type="channel",
+        )
+        def channel_level(channel, _, channel_name, level=None, **kwargs):
+            if channel_name is None:
+                raise CommandSyntaxError(_("channel_name is not specified."))
+            chan = self.channel(channel_name)
+            if level is not None:
+                try:
+                    chan.level = LEVEL_NAMES[level.lower()]
+                except KeyError:
+                    try:
+                        chan.level = int(level)
+                    except ValueError:
+                        raise CommandSyntaxError(_("Unknown level: %s") % level)
+            channel(_("Channel %s level: %d") % (channel_name, chan.level))
+            return "channel", channel_name
+
         @self.console_argument("channel_name", help=_("channel name"))
         @self.console_command(
             "print",
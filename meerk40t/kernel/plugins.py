@@ -0,0 +1,290 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from .exceptions import CommandMatchRejected, KernelError
+
+
+class LazyPlugin:
+    """
+    LazyPlugin is a kernel plugin that defers importing the real plugin module until it is first needed.
+
+    The lazy plugin declares up front the console commands the real plugin provides as registration paths, e.g.
+    "command/image/vectrace". During the register lifecycle these paths are registered with stub commands. When a
+    stub is executed the real module is imported, the real plugin is replayed through every lifecycle the lazy
+    plugin has already seen, which replaces the stubs with the real commands, and the command is then delegated to
+    the real command.
+
+    Optional package requirements are checked with `importlib.util.find_spec` during invalidate, so a missing
+    package disables the plugin without the cost of importing it.
+
+    Lazy plugins must be kernel plugins and may not provide additional plugins.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        attr: str = "plugin",
+        commands: Tuple[str, ...] = (),
+        requires: Tuple[str, ...] = (),
+    ):
+        self.module = module
+        self.attr = attr
+        self.commands = commands
+        self.requires = requires
+        # Used by the "plugin" console command to name this plugin.
+        self.__module__ = module
+        self.kernel = None
+        self.plugin = None
+        self.import_time = None
+        self._lifecycles = []
+        self._load_lock = threading.RLock()
+
+    def __repr__(self):
+        return "LazyPlugin(%s, loaded=%s)" % (repr(self.module), self.loaded)
+
+    @property
+    def loaded(self) -> bool:
+        return self.plugin is not None
+
+    def __call__(self, kernel, lifecycle: str):
+        if self.plugin is not None:
+            return self.plugin(kernel, lifecycle)
+        if lifecycle in ("plugins", "service", "module"):
+            return None
+        self.kernel = kernel
+        self._lifecycles.append(lifecycle)
+        if lifecycle == "invalidate":
+            for requirement in self.requires:
+                if importlib.util.find_spec(requirement) is None:
+                    return True
+        elif lifecycle == "register":
+            for path in self.commands:
+                kernel.register(path, self._stub_command(path))
+        return None
+
+    def load(self) -> Callable:
+        """
+        Imports the real plugin and brings it up to the lifecycle position of this lazy plugin.
+
+        @return: real plugin function
+        """
+        with self._load_lock:
+            if self.plugin is not None:
+                return self.plugin
+            kernel = self.kernel
+            start = time.perf_counter()
+            plugin = getattr(importlib.import_module(self.module), self.attr)
+            self.import_time = time.perf_counter() - start
+            profiler = getattr(kernel, "startup_profiler", None)
+            if profiler is not None:
+                plugin = profiler.wrap(plugin)
+                profiler.lazy_loaded(self)
+            additional_plugins = plugin(kernel, "plugins")
+            if additional_plugins is not None:
+                raise KernelError(
+                    "Lazy plugin %s may not provide additional plugins." % self.module
+                )
+            for lifecycle in self._lifecycles:
+                if plugin(kernel, lifecycle) and lifecycle == "invalidate":
+                    raise KernelError("Lazy plugin %s was invalidated." % self.module)
+            self.plugin = plugin
+            self._lifecycles.clear()
+            return plugin
+
+    def _stub_command(self, path: str) -> Callable:
+        """
+        Creates a stub console command which loads the real plugin and delegates to the real command registered at
+        the same path.
+        """
+        parts = path.split("/")
+
+        def stub(command: str, remainder: str, channel, **kwargs):
+            self.load()
+            real = self.kernel.lookup(path)
+            if real is None or real is stub:
+                raise CommandMatchRejected(
+                    "%s did not register %s" % (self.module, path)
+                )
+            return real(command, remainder, channel, **kwargs)
+
+        stub.long_help = None
+        stub.help = None
+        stub.regex = False
+        stub.hidden = False
+        stub.input_type = None if parts[1] == "None" else parts[1]
+        stub.output_type = None
+        stub.all_arguments_required = False
+        stub.arguments = list()
+        stub.options = list()
+        return stub
+
+
+class _TimedLoader:
+    """
+    Loader wrapper which times the execution of the module it loads. All other attributes are delegated.
+    """
+
+    def __init__(self, loader, fullname: str, times: Dict[str, float]):
+        self._loader = loader
+        self._fullname = fullname
+        self._times = times
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._times[self._fullname] = time.perf_counter() - start
+
+
+class _ImportTimer:
+    """
+    Meta path finder which wraps the loaders found by the other finders with a _TimedLoader.
+    """
+
+    def __init__(self, times: Dict[str, float]):
+        self._times = times
+        self._finding = set()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        except (ImportError, ValueError):
+            spec = None
+        finally:
+            self._finding.discard(fullname)
+        if spec is None or spec.loader is None:
+            return None
+        if not hasattr(spec.loader, "exec_module"):
+            return None
+        spec.loader = _TimedLoader(spec.loader, fullname, self._times)
+        return spec
+
+
+class StartupProfiler:
+    """
+    The StartupProfiler records the time spent in every plugin call, per plugin and per lifecycle, and the
+    inclusive import time of every module imported while it is running. It is enabled with --profile-startup.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self.imports = {}
+        self.plugin_times = {}
+        self.lifecycle_times = {}
+        self.lifecycle_order = []
+        self.lazy_plugins = []
+        self._wrapped = {}
+        self._finder = None
+
+    def start(self):
+        if self._finder is None:
+            self._finder = _ImportTimer(self.imports)
+            sys.meta_path.insert(0, self._finder)
+
+    def stop(self):
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+
+    def wrap(self, plugin: Callable) -> Callable:
+        """
+        Wraps the plugin function to time it. The same wrapper is returned for the same plugin.
+        """
+        try:
+            return self._wrapped[plugin]
+        except KeyError:
+            pass
+        if plugin in self._wrapped.values():
+            return plugin
+        name = plugin_name(plugin)
+
+        def timed_plugin(kernel, lifecycle):
+            start = time.perf_counter()
+            try:
+                return plugin(kernel, lifecycle)
+            finally:
+                self.record(name, lifecycle, time.perf_counter() - start)
+
+        timed_plugin.__module__ = getattr(plugin, "__module__", None)
+        timed_plugin.__wrapped__ = plugin
+        self._wrapped[plugin] = timed_plugin
+        return timed_plugin
+
+    def record(self, name: str, lifecycle: str, elapsed: float):
+        times = self.plugin_times.get(name)
+        if times is None:
+            times = dict()
+            self.plugin_times[name] = times
+        times[lifecycle] = times.get(lifecycle, 0.0) + elapsed
+        if lifecycle not in self.lifecycle_times:
+            self.lifecycle_order.append(lifecycle)
+            self.lifecycle_times[lifecycle] = 0.0
+        self.lifecycle_times[lifecycle] += elapsed
+
+    def lazy_loaded(self, lazy_plugin: LazyPlugin):
+        self.lazy_plugins.append(lazy_plugin)
+
+    def report(self, channel: Callable, limit: int = 20):
+        """
+        Sends the startup report to the given channel.
+
+        @param channel: channel or print function
+        @param limit: maximum number of plugins and imports listed
+        @return:
+        """
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        channel("Startup profile: %.1fms" % ((end - self.start_time) * 1000.0))
+        channel("Lifecycles:")
+        for lifecycle in self.lifecycle_order:
+            channel(
+                "    %s %.1fms"
+                % (lifecycle.ljust(15), self.lifecycle_times[lifecycle] * 1000.0)
+            )
+        channel("Plugins:")
+        totals = [
+            (sum(times.values()), name, times)
+            for name, times in self.plugin_times.items()
+        ]
+        totals.sort(key=lambda e: e[0], reverse=True)
+        for total, name, times in totals[:limit]:
+            parts = sorted(times.items(), key=lambda e: e[1], reverse=True)
+            details = ", ".join(
+                "%s %.1fms" % (lifecycle, t * 1000.0) for lifecycle, t in parts[:3]
+            )
+            channel("    %s %.1fms (%s)" % (name.ljust(40), total * 1000.0, details))
+        channel("Imports (inclusive):")
+        imports = sorted(self.imports.items(), key=lambda e: e[1], reverse=True)
+        for name, t in imports[:limit]:
+            channel("    %s %.1fms" % (name.ljust(40), t * 1000.0))
+        if self.lazy_plugins:
+            channel("Lazy plugins loaded:")
+            for lazy in self.lazy_plugins:
+                channel(
+                    "    %s %.1fms" % (lazy.module.ljust(40), lazy.import_time * 1000.0)
+                )
+
+
+def plugin_name(plugin: Any) -> str:
+    if isinstance(plugin, LazyPlugin):
+        return "%s (lazy)" % plugin.module
+    name = getattr(plugin, "__module__", None)
+    if name is None:
+        return str(plugin)
+    return name
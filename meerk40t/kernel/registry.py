@@ -0,0 +1,136 @@
+"""
+The registry is the dictionary of registered paths, for the kernel and for each service. It keeps a sorted index of
+its paths so the paths which can match a regex are found from the literal prefix of the regex, rather than by
+matching every registered path, and a generation which counts the changes to the registry so that the results of
+lookups can be memoized until the registry changes.
+"""
+
+import re
+from bisect import bisect_left, insort
+
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+REGEX_OPTIONAL = set("*?{")
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Literal text every string matched by the regex pattern starts with.
+
+    @param pattern: regex pattern, matched from the start of the string.
+    @return: prefix, possibly empty.
+    """
+    if "|" in pattern:
+        # Alternatives may start differently.
+        return ""
+    for i, c in enumerate(pattern):
+        if c in REGEX_SPECIAL:
+            if c in REGEX_OPTIONAL and i > 0:
+                # The preceding character may not occur.
+                return pattern[: i - 1]
+            return pattern[:i]
+    return pattern
+
+
+_patterns = {}
+
+
+def compiled_pattern(pattern: str):
+    """
+    Compiled regex and literal prefix for the pattern, cached.
+
+    @return: compiled, prefix
+    """
+    try:
+        return _patterns[pattern]
+    except KeyError:
+        pass
+    if len(_patterns) > 1024:
+        _patterns.clear()
+    compiled = re.compile(pattern), literal_prefix(pattern)
+    _patterns[pattern] = compiled
+    return compiled
+
+
+class Registry(dict):
+    """
+    Dictionary of registered paths to objects, with an index of the paths by prefix.
+
+    Paths are kept sorted, for the paths with a given prefix, along with the order they were registered in, so matched
+    paths are given in the same order as iterating the dictionary. The generation is incremented every time the
+    registry is changed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self)
+        self.generation = 0
+        self._paths = list()
+        self._order = dict()
+        self._sequence = 0
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, path, obj):
+        new = path not in self
+        dict.__setitem__(self, path, obj)
+        if new:
+            self._order[path] = self._sequence
+            self._sequence += 1
+            insort(self._paths, path)
+        self.generation += 1
+
+    def __delitem__(self, path):
+        if path not in self:
+            raise KeyError(path)
+        # Removed from the index first, so paths found by the index are registered.
+        del self._paths[bisect_left(self._paths, path)]
+        dict.__delitem__(self, path)
+        del self._order[path]
+        self.generation += 1
+
+    def pop(self, path, *args):
+        if path not in self:
+            return dict.pop(self, path, *args)
+        obj = self[path]
+        del self[path]
+        return obj
+
+    def popitem(self):
+        path = next(reversed(self))
+        return path, self.pop(path)
+
+    def setdefault(self, path, default=None):
+        if path not in self:
+            self[path] = default
+        return self[path]
+
+    def update(self, *args, **kwargs):
+        for path, obj in dict(*args, **kwargs).items():
+            self[path] = obj
+
+    def clear(self):
+        dict.clear(self)
+        self._paths.clear()
+        self._order.clear()
+        self.generation += 1
+
+    def prefixed(self, prefix: str):
+        """
+        Registered paths starting with the given prefix, in registration order.
+        """
+        paths = self._paths
+        start = bisect_left(paths, prefix)
+        end = start
+        count = len(paths)
+        while end < count and paths[end].startswith(prefix):
+            end += 1
+        found = paths[start:end]
+        found.sort(key=self._order.__getitem__)
+        return found
+
+    def matching(self, pattern: str):
+        """
+        Registered paths the regex pattern matches, in registration order.
+        """
+        match, prefix = compiled_pattern(pattern)
+        if not prefix:
+            return [path for path in self if match.match(path)]
+        return [path for path in self.prefixed(prefix) if match.match(path)]
@@ -1,3 +1,4 @@
+import asyncio
 import socket
 
 from meerk40t.kernel import STATE_END, STATE_TERMINATE, Module
@@ -8,6 +9,7 @@ def plugin(kernel, lifecycle=None):
         _ = kernel.translation
         kernel.register("module/TCPServer", TCPServer)
         kernel.register("module/UDPServer", UDPServer)
+        kernel.register("module/AsyncServer", AsyncServer)
 
         @kernel.console_option(
             "port", "p", type=int, default=23, help=_("port to listen on.")
@@ -246,3 +248,239 @@ class TCPServer(Module):
             self.events_channel(_("Connection to %s was closed.") % str(addr))
 
         return handle
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server.received(data, address=addr)
+
+    def error_received(self, exc):
+        pass
+
+
+class _StreamProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.connections.append(transport)
+
+    def connection_lost(self, exc):
+        try:
+            self.server.connections.remove(self.transport)
+        except ValueError:
+            pass
+        self.server.paused.discard(self.transport)
+
+    def data_received(self, data):
+        self.server.received(data, transport=self.transport)
+
+
+class AsyncTransport:
+    """
+    AsyncTransport serves UDP or TCP with asyncio. Received data is queued and given to the handler, in order, by a
+    single consumer task.
+
+    The queue applies backpressure. While max_queue items are waiting, tcp connections are no longer read and udp
+    packets are dropped. A Ruida client resends any packet which is not acknowledged. An exception raised by the
+    handler is logged and the consumer goes on with the next data.
+    """
+
+    def __init__(
+        self,
+        handler,
+        port=0,
+        protocol="udp",
+        host="",
+        max_queue=64,
+        address=None,
+        log=None,
+    ):
+        """
+        @param handler: called with the data received.
+        @param port: port to listen on, 0 for any free port.
+        @param protocol: "udp" or "tcp"
+        @param host: host to listen on.
+        @param max_queue: received items waiting, above which backpressure is applied.
+        @param address: udp address replies are sent to, until a packet is received.
+        @param log: called with a message for each exception raised by the handler.
+        """
+        self.handler = handler
+        self.log = log
+        self.port = port
+        self.protocol = protocol
+        self.host = host
+        self.max_queue = max_queue
+        self.address = address
+        self.loop = None
+        self.queue = None
+        self.consumer = None
+        self.server = None
+        self.udp = None
+        self.connections = list()
+        self.paused = set()
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self):
+        """
+        Binds the port and starts the consumer. Raises OSError if the port cannot be bound.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        if self.protocol == "udp":
+            self.udp, protocol = await self.loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(self.host, self.port)
+            )
+            self.port = self.udp.get_extra_info("sockname")[1]
+        else:
+            self.server = await self.loop.create_server(
+                lambda: _StreamProtocol(self), self.host or None, self.port
+            )
+            self.port = self.server.sockets[0].getsockname()[1]
+        self.consumer = self.loop.create_task(self.consume())
+
+    async def close(self):
+        if self.consumer is not None:
+            self.consumer.cancel()
+            try:
+                await self.consumer
+            except asyncio.CancelledError:
+                pass
+            self.consumer = None
+        if self.udp is not None:
+            self.udp.close()
+            self.udp = None
+        for transport in list(self.connections):
+            transport.close()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def received(self, data, address=None, transport=None):
+        """
+        Queues data received from the address, or from the tcp transport.
+        """
+        if address is not None:
+            self.address = address
+        if self.queue.qsize() >= self.max_queue:
+            if transport is None:
+                self.dropped += 1
+                return
+            transport.pause_reading()
+            self.paused.add(transport)
+        self.queue.put_nowait(data)
+
+    async def consume(self):
+        while True:
+            data = await self.queue.get()
+            try:
+                self.handler(data)
+            except Exception as e:
+                self.errors += 1
+                if self.log is not None:
+                    self.log("Error handling received data: %s" % str(e))
+            if self.paused and self.queue.qsize() <= self.max_queue // 2:
+                for transport in self.paused:
+                    transport.resume_reading()
+                self.paused.clear()
+
+    async def drain(self):
+        """
+        Waits until all the queued data was handled.
+        """
+        while self.queue.qsize():
+            await asyncio.sleep(0)
+
+    def send(self, data):
+        """
+        Sends the data to the udp address or every tcp connection. This may be called from any thread.
+
+        @return: whether there was anywhere to send the data.
+        """
+        if self.udp is not None:
+            if self.address is None:
+                return False
+            self.loop.call_soon_threadsafe(self.udp.sendto, data, self.address)
+            return True
+        for transport in self.connections:
+            self.loop.call_soon_threadsafe(transport.write, data)
+        return bool(self.connections)
+
+
+class AsyncServer(Module):
+    """
+    AsyncServer serves UDP or TCP with an asyncio event loop on its own thread.
+
+    Anything sent to the path/send channel is sent as a reply to the last seen UDP packet, or to every TCP connection.
+    Any data the server receives will be sent to the path/recv channel.
+    """
+
+    def __init__(
+        self, context, name, port=23, protocol="udp", udp_address=None, max_queue=64
+    ):
+        """
+        Laser Server init.
+
+        @param context: Context at which this module is attached.
+        @param name: Name of this module.
+        @param port: Listen port.
+        @param protocol: "udp" or "tcp"
+        @param udp_address: address replies are sent to until a UDP packet arrives.
+        @param max_queue: received items waiting, above which backpressure is applied.
+        """
+        Module.__init__(self, context, name)
+        self.port = port
+        self.events_channel = self.context.channel(
+            "server-%s-%d" % (protocol, port)
+        )
+        self.recv = self.context.channel("%s/recv" % name)
+        self.transport = AsyncTransport(
+            self.recv,
+            port=port,
+            protocol=protocol,
+            max_queue=max_queue,
+            address=udp_address,
+            log=self.events_channel,
+        )
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self.transport.start())
+        except OSError:
+            self.loop.close()
+            raise
+        self.context.channel("%s/send" % name).watch(self.send)
+        self.context.threaded(self.run_loop, thread_name=name, daemon=True)
+
+    def module_close(self, *args, **kwargs):
+        _ = self.context._
+        self.context.channel("%s/send" % self.name).unwatch(self.send)
+        self.events_channel(_("Shutting down server."))
+        self.state = STATE_TERMINATE
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def send(self, message):
+        _ = self.context._
+        if not self.transport.send(message):
+            self.events_channel(
+                _("No data can be sent as reply to a host that has never made contact.")
+            )
+
+    def run_loop(self):
+        _ = self.context._
+        asyncio.set_event_loop(self.loop)
+        self.events_channel(
+            _("%s Socket(%d) Listening.")
+            % (self.transport.protocol.upper(), self.port)
+        )
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.transport.close())
+            self.loop.close()
@@ -4,7 +4,7 @@ import threading
 import time
 from hashlib import md5
 
-from meerk40t.core.spoolers import Spooler
+from meerk40t.core.spoolers import SendMarks, Spooler
 from meerk40t.kernel import (
     STATE_ACTIVE,
     STATE_BUSY,
@@ -890,6 +890,7 @@ class LhystudiosDriver(Parameters):
         """
         if self.plot_data is None:
             return False
+        checkpoint = self.service.spooler.checkpoint
         for x, y, on in self.plot_data:
             while self.hold_work():
                 time.sleep(0.05)
@@ -901,9 +902,10 @@ class LhystudiosDriver(Parameters):
                 # Special Command.
                 if on & PLOT_FINISH:  # Plot planner is ending.
                     self.rapid_mode()
+                    checkpoint.complete(self.out_pipe)
                     break
                 elif on & PLOT_SETTING:  # Plot planner settings have changed.
-                    p_set = Parameters(self.plot_planner.settings)
+                    p_set = Parameters(self.plot_planner.settings).snapshot()
                     if p_set.power != self.power:
                         self.set_power(p_set.power)
                     if (
@@ -976,6 +978,11 @@ class LhystudiosDriver(Parameters):
                 dx = x - self.native_x
                 dy = y - self.native_y
             self.goto_octent(dx, dy, on & 1)
+            checkpoint.update(
+                self.out_pipe,
+                self.plot_planner.current_cut,
+                self.plot_planner.current_steps,
+            )
         self.plot_data = None
         return False
 
@@ -1865,6 +1872,9 @@ class LhystudiosController:
         self._status = [0] * 6
         self._usb_state = -1
 
+        # Marks of the bytes written, confirmed by the packets sent.
+        self.marks = SendMarks()
+
         self.connection = None
         self.max_attempts = 5
         self.refuse_counts = 0
@@ -1970,11 +1980,21 @@ class LhystudiosController:
         self.pipe_channel("write(%s)" % str(bytes_to_write))
         self._queue_lock.acquire(True)
         self._queue += bytes_to_write
+        self.marks.write(len(bytes_to_write))
         self._queue_lock.release()
         self.start()
         self.update_buffer()
         return self
 
+    def mark(self, function):
+        """
+        Calls the function once the packets of all the data written so far are confirmed.
+
+        @param function: function to call.
+        @return:
+        """
+        self.marks.mark(function)
+
     def realtime_write(self, bytes_to_write):
         """
         Writes data to the preempting commands, this will be moved to the front of the buffer by the thread
@@ -2067,6 +2087,7 @@ class LhystudiosController:
     def abort(self):
         self._buffer = bytearray()
         self._queue = bytearray()
+        self.marks.clear()
         self.context.signal("pipe;buffer", 0)
         self.update_state(STATE_TERMINATE)
 
@@ -2116,6 +2137,19 @@ class LhystudiosController:
             )
             self.context.signal("pipe;buffer", len(self))
 
+    def buffer_drained(self, length):
+        """
+        Wakes the spooler when sending length bytes released a hold of the driver, the buffer
+        falling to buffer_max or emptying.
+        """
+        if self.context is None:
+            return
+        size = len(self)
+        if size == 0 or (
+            self.context.buffer_limit and size <= self.context.buffer_max < size + length
+        ):
+            self.context.spooler.wake()
+
     def update_packet(self, packet):
         self.context.signal("pipe;packet", convert_to_list_bytes(packet))
         self.context.signal("pipe;packet_text", packet)
@@ -2365,6 +2399,8 @@ class LhystudiosController:
             del self._realtime_buffer[:length]
         else:
             del self._buffer[:length]
+            self.marks.confirm(length)
+            self.buffer_drained(length)
         if len(packet) != 0:
             # Packet was completed and sent. Only then update the channel.
             self.update_packet(packet)
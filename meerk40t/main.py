@@ -9,7 +9,7 @@ import argparse
 import os.path
 import sys
 
-from meerk40t.kernel import Kernel
+from meerk40t.kernel import Kernel, LazyPlugin, StartupProfiler
 
 APPLICATION_NAME = "MeerK40t"
 APPLICATION_VERSION = "0.8.0006 RC5"
@@ -100,6 +100,12 @@ parser.add_argument(
     default=False,
     help="Disable ANSI colors",
 )
+parser.add_argument(
+    "--profile-startup",
+    action="store_true",
+    default=False,
+    help="Report plugin and import timings of startup",
+)
 
 
 def plugin(kernel, lifecycle):
@@ -162,25 +168,30 @@ def plugin(kernel, lifecycle):
 
         plugins.append(svg_io.plugin)
 
-        from .extra import vectrace
-
-        plugins.append(vectrace.plugin)
-
-        from .extra import inkscape
-
-        plugins.append(inkscape.plugin)
-
-        from .extra import embroider
-
-        plugins.append(embroider.plugin)
-
-        from .extra import pathoptimize
-
-        plugins.append(pathoptimize.plugin)
+        from .core import binary_io
 
-        from .extra import updater
+        plugins.append(binary_io.plugin)
 
-        plugins.append(updater.plugin)
+        # Lazy plugins are only imported once one of their commands is used.
+        plugins.append(
+            LazyPlugin("meerk40t.extra.vectrace", commands=("command/image/vectrace",))
+        )
+        plugins.append(
+            LazyPlugin("meerk40t.extra.inkscape", commands=("command/None/inkscape",))
+        )
+        plugins.append(
+            LazyPlugin("meerk40t.extra.embroider", commands=("command/None/embroider",))
+        )
+        plugins.append(
+            LazyPlugin(
+                "meerk40t.extra.pathoptimize", commands=("command/None/optimize",)
+            )
+        )
+        plugins.append(
+            LazyPlugin(
+                "meerk40t.extra.updater", commands=("command/None/check_for_updates",)
+            )
+        )
 
         from .extra import winsleep
 
@@ -194,9 +205,18 @@ def plugin(kernel, lifecycle):
 
         plugins.append(dxf_io_plugin)
 
-        from .extra import cag
-
-        plugins.append(cag.plugin)
+        plugins.append(
+            LazyPlugin(
+                "meerk40t.extra.cag",
+                commands=(
+                    "command/elements/intersection",
+                    "command/elements/xor",
+                    "command/elements/union",
+                    "command/elements/difference",
+                ),
+                requires=("numpy",),
+            )
+        )
 
         from .balormk.plugin import plugin as balorplugin
 
@@ -238,5 +258,8 @@ def run():
         ansi=not args.disable_ansi,
     )
     kernel.args = args
+    if args.profile_startup:
+        kernel.startup_profiler = StartupProfiler()
+        kernel.startup_profiler.start()
     kernel.add_plugin(plugin)
     kernel()
@@ -732,6 +732,7 @@ class MoshiDriver:
         @return:
         """
         self.paused = False
+        self.service.spooler.wake()
 
     def reset(self, *args):
         """
@@ -942,8 +943,18 @@ class MoshiController:
     Send Epilogue
 
     Checks done before the Epilogue will have 205 state.
+
+    The program being sent stays in place, packets are read from it at an increasing
+    offset rather than removed from its front. The buffer and its offset are replaced
+    together under the buffer lock, and the offset is only advanced in the buffer the
+    packet was read from.
     """
 
+    # Seconds between buffer size signals while sending.
+    BUFFER_SIGNAL_INTERVAL = 0.1
+    # Seconds to wait when no packet could be sent.
+    IDLE_WAIT = 0.05
+
     def __init__(self, context, channel=None, *args, **kwargs):
         self.context = context
         self.state = STATE_UNKNOWN
@@ -953,6 +964,11 @@ class MoshiController:
         self._buffer = (
             bytearray()
         )  # Threadsafe buffered commands to be sent to controller.
+        self._buffer_offset = 0  # Offset of the data not yet sent.
+        self._buffer_view = None
+        self._buffer_lock = threading.Lock()
+        self._buffer_signal_time = 0
+        self._wake = threading.Event()
 
         self._programs = []  # Programs to execute.
 
@@ -986,7 +1002,9 @@ class MoshiController:
         buffered data. Without this class the BufferView displays nothing. This is optional for any output
         device.
         """
-        buffer = "Current Working Buffer: %s\n" % str(self._buffer)
+        with self._buffer_lock:
+            data = self._buffer[self._buffer_offset :]
+        buffer = "Current Working Buffer: %s\n" % str(data)
         for p in self._programs:
             buffer += "%s\n" % str(p.data)
         return buffer
@@ -1003,7 +1021,26 @@ class MoshiController:
 
     def __len__(self):
         """Provides the length of the buffer of this device."""
-        return len(self._buffer) + sum(map(len, self._programs))
+        return self.buffer_remaining() + sum(map(len, self._programs))
+
+    def buffer_remaining(self):
+        """
+        Number of bytes of the current program not yet sent.
+        """
+        with self._buffer_lock:
+            return len(self._buffer) - self._buffer_offset
+
+    def _set_buffer(self, data):
+        """
+        Sets the program data to send, from its start.
+
+        The view of the previous buffer is not released, the send thread may still be
+        reading a packet from it.
+        """
+        with self._buffer_lock:
+            self._buffer = data
+            self._buffer_offset = 0
+            self._buffer_view = memoryview(data) if len(data) else None
 
     def realtime_read(self):
         """
@@ -1097,6 +1134,7 @@ class MoshiController:
     def push_program(self, program):
         self.pipe_channel("Pushed: %s" % str(program.data))
         self._programs.append(program)
+        self._wake.set()
         self.start()
 
     def unlock_rail(self):
@@ -1143,7 +1181,7 @@ class MoshiController:
         """
         Abort the current buffer and data queue.
         """
-        self._buffer = bytearray()
+        self._set_buffer(bytearray())
         self._programs.clear()
         self.context.signal("pipe;buffer", 0)
         self.realtime_stop()
@@ -1168,16 +1206,24 @@ class MoshiController:
         if state == self.state:
             return
         self.state = state
+        self._wake.set()
         if self.context is not None:
             self.context.signal("pipe;thread", self.state)
 
-    def update_buffer(self):
+    def update_buffer(self, force=True):
         """
         Notify listening processes that the buffer size of this output has changed.
+
+        @param force: signal regardless of the time since the last signal.
         """
-        if self.context is not None:
-            self.context._buffer_size = len(self._buffer)
-            self.context.signal("pipe;buffer", self.context._buffer_size)
+        if self.context is None:
+            return
+        now = time.time()
+        if not force and now - self._buffer_signal_time < self.BUFFER_SIGNAL_INTERVAL:
+            return
+        self._buffer_signal_time = now
+        self.context._buffer_size = self.buffer_remaining()
+        self.context.signal("pipe;buffer", self.context._buffer_size)
 
     def update_packet(self, packet):
         """
@@ -1192,7 +1238,7 @@ class MoshiController:
         Send the current Moshiboard buffer
         """
         self.pipe_channel("Sending Buffer...")
-        while len(self._buffer) != 0:
+        while self.buffer_remaining() > 0:
             queue_processed = self.process_buffer()
             self.refuse_counts = 0
 
@@ -1214,11 +1260,9 @@ class MoshiController:
                     STATE_TERMINATE,
                 ):
                     self.update_state(STATE_IDLE)
-                if self.count > 50:
-                    self.count = 50
-                time.sleep(0.02 * self.count)
-                # will tick up to 1 second waits if there's never a queue.
-                self.count += 1
+                # Wait for a state change or new program, at most IDLE_WAIT.
+                self._wake.wait(self.IDLE_WAIT)
+                self._wake.clear()
 
     def _thread_data_send(self):
         """
@@ -1238,23 +1282,23 @@ class MoshiController:
                     self.update_state(STATE_ACTIVE)
                 if self.is_shutdown:
                     break
-                if len(self._buffer) == 0 and len(self._programs) == 0:
+                if self.buffer_remaining() == 0 and len(self._programs) == 0:
                     self.pipe_channel("Nothing to process")
                     break  # There is nothing to run.
                 if self._connection is None:
                     self.open()
                 # Stage 0: New Program send.
-                if len(self._buffer) == 0:
+                if self.buffer_remaining() == 0:
                     self.context.signal("pipe;running", True)
                     self.pipe_channel("New Program")
                     self.wait_until_accepting_packets()
                     self.realtime_prologue()
-                    self._buffer = self._programs.pop(0).data
-                    assert len(self._buffer) != 0
+                    self._set_buffer(self._programs.pop(0).data)
+                    assert self.buffer_remaining() != 0
 
                 # Stage 1: Send Program.
                 self.context.signal("pipe;running", True)
-                self.pipe_channel("Sending Data... %d bytes" % len(self._buffer))
+                self.pipe_channel("Sending Data... %d bytes" % self.buffer_remaining())
                 self._send_buffer()
                 self.update_status()
                 self.realtime_epilogue()
@@ -1263,7 +1307,7 @@ class MoshiController:
 
                 # Stage 2: Wait for Program to Finish.
                 self.pipe_channel("Waiting for finish processing.")
-                if len(self._buffer) == 0:
+                if self.buffer_remaining() == 0:
                     self.wait_finished()
                 self.context.signal("pipe;running", False)
 
@@ -1303,22 +1347,32 @@ class MoshiController:
 
         @return: queue process success.
         """
-        if len(self._buffer) > 0:
+        with self._buffer_lock:
             buffer = self._buffer
-        else:
-            return False
-
-        length = min(32, len(buffer))
-        packet = buffer[:length]
+            offset = self._buffer_offset
+            remaining = len(buffer) - offset
+            if remaining <= 0:
+                return False
+            length = min(32, remaining)
+            packet = bytes(self._buffer_view[offset : offset + length])
 
         # Packet is prepared and ready to send. Open Channel.
 
         self.send_packet(packet)
         self.context.packet_count += 1
 
-        # Packet was processed. Remove that data.
-        self._buffer = self._buffer[length:]
-        self.update_buffer()
+        # Packet was processed. Move past that data, unless the buffer was replaced
+        # while sending, by estop or a new program.
+        with self._buffer_lock:
+            if self._buffer is not buffer or self._buffer_offset != offset:
+                return True
+            if length == remaining:
+                self._buffer = bytearray()
+                self._buffer_offset = 0
+                self._buffer_view = None
+            else:
+                self._buffer_offset = offset + length
+        self.update_buffer(force=length == remaining)
         return True  # A packet was prepped and sent correctly.
 
     def send_packet(self, packet):
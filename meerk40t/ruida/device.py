@@ -1,4 +1,5 @@
 import os
+import re
 from io import BytesIO
 from typing import Tuple, Union
 
@@ -61,6 +62,13 @@ def plugin(kernel, lifecycle=None):
             action="store_true",
             help=_("shutdown current ruidaserver"),
         )
+        @kernel.console_option(
+            "tcp",
+            "t",
+            type=bool,
+            action="store_true",
+            help=_("also accept swizzled ruida data streamed over tcp"),
+        )
         @kernel.console_option(
             "laser",
             "l",
@@ -73,7 +81,14 @@ def plugin(kernel, lifecycle=None):
             help=_("activate the ruidaserver."),
         )
         def ruidaserver(
-            command, channel, _, laser=None, verbose=False, quit=False, **kwargs
+            command,
+            channel,
+            _,
+            laser=None,
+            tcp=False,
+            verbose=False,
+            quit=False,
+            **kwargs,
         ):
             """
             The ruidaserver emulation methods provide a simulation of a ruida device.
@@ -89,23 +104,31 @@ def plugin(kernel, lifecycle=None):
             ruidacontrol gives the ruida device control over the active device.
             ruidadesign accepts the ruida signals but turns them only into cutcode to be run locally.
             ruidabounce sends data to the ruidaemulator but sends data to the set bounce server.
+
+            The servers use asyncio, queuing the data received and no longer reading while the emulator falls behind.
             """
             root = kernel.root
             try:
-                r2m = root.open_as("module/UDPServer", "rd2mk", port=50200)
-                r2mj = root.open_as("module/UDPServer", "rd2mk-jog", port=50207)
+                r2m = root.open_as("module/AsyncServer", "rd2mk", port=50200)
+                r2mj = root.open_as("module/AsyncServer", "rd2mk-jog", port=50207)
+                if tcp:
+                    r2mt = root.open_as(
+                        "module/AsyncServer", "rd2mk-tcp", port=50200, protocol="tcp"
+                    )
+                else:
+                    r2mt = None
                 if laser:
                     m2l = root.open_as(
-                        "module/UDPServer",
+                        "module/AsyncServer",
                         "mk2lz",
                         port=40200,
-                        upd_address=(laser, 50200),
+                        udp_address=(laser, 50200),
                     )
                     m2lj = root.open_as(
-                        "module/UDPServer",
+                        "module/AsyncServer",
                         "mk2lz-jog",
                         port=40207,
-                        upd_address=(laser, 50207),
+                        udp_address=(laser, 50207),
                     )
                 else:
                     m2l = None
@@ -114,6 +137,7 @@ def plugin(kernel, lifecycle=None):
                 if quit:
                     root.close("rd2mk")
                     root.close("rd2mk-jog")
+                    root.close("rd2mk-tcp")
                     root.close("mk2lz")
                     root.close("mk2lz-jog")
                     root.close("emulator/ruida")
@@ -123,6 +147,8 @@ def plugin(kernel, lifecycle=None):
                     channel(_("Ruida Data Server opened on port %d.") % 50200)
                 if r2mj:
                     channel(_("Ruida Jog Server opened on port %d.") % 50207)
+                if r2mt:
+                    channel(_("Ruida TCP Data Server opened on port %d.") % 50200)
                 if m2l:
                     channel(_("Ruida Data Destination opened on port %d.") % 40200)
                 if m2lj:
@@ -136,6 +162,8 @@ def plugin(kernel, lifecycle=None):
                         r2m.events_channel.watch(console)
                     if r2mj:
                         r2mj.events_channel.watch(console)
+                    if r2mt:
+                        r2mt.events_channel.watch(console)
                     if m2l:
                         m2l.events_channel.watch(console)
                     if m2lj:
@@ -143,6 +171,9 @@ def plugin(kernel, lifecycle=None):
 
                 root.channel("rd2mk/recv").watch(emulator.checksum_write)
                 root.channel("rd2mk-jog/recv").watch(emulator.realtime_write)
+                if tcp:
+                    root.channel("rd2mk-tcp/recv").watch(emulator.stream_write)
+                    root.channel("ruida_reply").watch(root.channel("rd2mk-tcp/send"))
                 if laser:
                     root.channel("mk2lz/recv").watch(emulator.checksum_write)
                     root.channel("mk2lz-jog/recv").watch(emulator.realtime_write)
@@ -183,6 +214,187 @@ def plugin(kernel, lifecycle=None):
             )
 
 
+# Lengths of the fixed length commands, by opcode or by opcode and subcode.
+COMMAND_LENGTHS = {
+    0xCC: 1,
+    0xCD: 1,
+    0xCE: 1,
+    0xD7: 1,
+    0x80: 7,
+    0x88: 11,
+    0x89: 5,
+    0x8A: 3,
+    0x8B: 3,
+    0xA0: 7,
+    0xA8: 11,
+    0xA9: 5,
+    0xAA: 3,
+    0xAB: 3,
+    0xC0: 3,
+    0xC1: 3,
+    0xC2: 3,
+    0xC3: 3,
+    0xC4: 3,
+    0xC5: 3,
+    0xC7: 3,
+    0xC8: 3,
+    (0xC6, 0x01): 4,
+    (0xC6, 0x02): 4,
+    (0xC6, 0x05): 4,
+    (0xC6, 0x06): 4,
+    (0xC6, 0x07): 4,
+    (0xC6, 0x08): 4,
+    (0xC6, 0x10): 7,
+    (0xC6, 0x11): 7,
+    (0xC6, 0x12): 7,
+    (0xC6, 0x13): 7,
+    (0xC6, 0x15): 7,
+    (0xC6, 0x16): 7,
+    (0xC6, 0x21): 4,
+    (0xC6, 0x22): 4,
+    (0xC6, 0x31): 5,
+    (0xC6, 0x32): 5,
+    (0xC6, 0x35): 5,
+    (0xC6, 0x36): 5,
+    (0xC6, 0x37): 5,
+    (0xC6, 0x38): 5,
+    (0xC6, 0x41): 5,
+    (0xC6, 0x42): 5,
+    (0xC6, 0x50): 4,
+    (0xC6, 0x51): 4,
+    (0xC6, 0x55): 4,
+    (0xC6, 0x56): 4,
+    (0xC6, 0x60): 9,
+    (0xC9, 0x02): 7,
+    (0xC9, 0x03): 7,
+    (0xC9, 0x04): 8,
+    (0xC9, 0x05): 7,
+    (0xC9, 0x06): 7,
+    (0xCA, 0x01): 3,
+    (0xCA, 0x02): 3,
+    (0xCA, 0x03): 3,
+    (0xCA, 0x04): 3,
+    (0xCA, 0x05): 7,
+    (0xCA, 0x06): 8,
+    (0xCA, 0x10): 3,
+    (0xCA, 0x22): 3,
+    (0xCA, 0x30): 4,
+    (0xCA, 0x40): 3,
+    (0xCA, 0x41): 4,
+    (0xD9, 0x00): 8,
+    (0xD9, 0x01): 8,
+    (0xD9, 0x02): 8,
+    (0xD9, 0x03): 8,
+    (0xD9, 0x10): 13,
+    (0xD9, 0x30): 18,
+    (0xD9, 0x50): 8,
+    (0xD9, 0x51): 8,
+    (0xD9, 0x52): 8,
+    (0xD9, 0x53): 8,
+    (0xD9, 0x60): 13,
+    (0xD9, 0x70): 18,
+    (0xDA, 0x00): 4,
+    (0xDA, 0x01): 14,
+    (0xDA, 0x05): 2,
+    (0xDA, 0x54): 2,
+    (0xE6, 0x01): 2,
+    (0xE7, 0x00): 2,
+    (0xE7, 0x03): 12,
+    (0xE7, 0x04): 16,
+    (0xE7, 0x05): 3,
+    (0xE7, 0x06): 12,
+    (0xE7, 0x07): 12,
+    (0xE7, 0x08): 16,
+    (0xE7, 0x09): 7,
+    (0xE7, 0x0B): 3,
+    (0xE7, 0x13): 12,
+    (0xE7, 0x17): 12,
+    (0xE7, 0x23): 12,
+    (0xE7, 0x24): 3,
+    (0xE7, 0x32): 7,
+    (0xE7, 0x35): 12,
+    (0xE7, 0x38): 3,
+    (0xE7, 0x50): 12,
+    (0xE7, 0x51): 12,
+    (0xE7, 0x52): 13,
+    (0xE7, 0x53): 13,
+    (0xE7, 0x54): 8,
+    (0xE7, 0x55): 8,
+    (0xE7, 0x60): 3,
+    (0xE7, 0x61): 13,
+    (0xE7, 0x62): 13,
+    (0xE8, 0x00): 6,
+    (0xE8, 0x01): 4,
+}
+
+# Swizzle and unswizzle translation tables by magic.
+_swizzle_luts = dict()
+
+
+class RuidaDecoder:
+    """
+    Incremental decoder splitting unswizzled ruida data into commands. Every command begins with a byte with the high
+    bit set, followed by its data bytes.
+
+    Data can be fed in chunks split anywhere, such as the packets of a file transfer or a tcp stream. The last command
+    of a chunk is only given once it reaches the known length of its command, so commands awaiting a reply are
+    processed as soon as they arrive. A last command of unknown length is held until the next command begins.
+    """
+
+    COMMAND = re.compile(rb"[\x80-\xff][\x00-\x7f]*|[\x00-\x7f]+")
+
+    def __init__(self):
+        self.pending = b""
+
+    def feed(self, data):
+        """
+        Decodes the given chunk of data.
+
+        @param data: unswizzled data
+        @return: list of the complete commands
+        """
+        data = self.pending + bytes(data)
+        self.pending = b""
+        commands = self.COMMAND.findall(data)
+        if commands and self.incomplete(commands[-1]):
+            self.pending = commands.pop()
+        return commands
+
+    def flush(self):
+        """
+        @return: list of any command still held, complete or not.
+        """
+        pending = self.pending
+        self.pending = b""
+        if pending:
+            return [pending]
+        return []
+
+    @staticmethod
+    def incomplete(command):
+        """
+        Whether the command may continue, being shorter than the known length of its command or of unknown length.
+        """
+        opcode = command[0]
+        if opcode < 0x80:
+            return False
+        length = COMMAND_LENGTHS.get(opcode)
+        if length is None:
+            if len(command) < 2:
+                return True
+            length = COMMAND_LENGTHS.get((opcode, command[1]))
+            if length is None:
+                return True
+        return len(command) < length
+
+    @staticmethod
+    def commands(data):
+        """
+        All the commands within the given unswizzled data.
+        """
+        return RuidaDecoder.COMMAND.findall(bytes(data))
+
+
 class RuidaCommandError(Exception):
     """
     Exception raised when an invalid Ruida command is received.
@@ -319,6 +531,7 @@ class RuidaEmulator(Module, Parameters):
         # Should automatically shift encoding if wrong.
         # self.magic = 0x38
         self.lut_swizzle, self.lut_unswizzle = RuidaEmulator.swizzles_lut(self.magic)
+        self.decoder = RuidaDecoder()
 
         self.power1_min = 0
         self.power1_max = 0
@@ -480,18 +693,7 @@ class RuidaEmulator(Module, Parameters):
 
     @staticmethod
     def parse_commands(f):
-        array = list()
-        while True:
-            byte = f.read(1)
-            if len(byte) == 0:
-                break
-            b = ord(byte)
-            if b >= 0x80 and len(array) > 0:
-                yield array
-                array.clear()
-            array.append(b)
-        if len(array) > 0:
-            yield array
+        yield from RuidaDecoder.commands(f.read())
 
     def reply(self, response, desc="ACK"):
         if self.swizzle_mode:
@@ -538,7 +740,18 @@ class RuidaEmulator(Module, Parameters):
             )
             self.ruida_channel("--> " + str(data.hex()))
             return
-        self.write(BytesIO(self.unswizzle(data)))
+        self.process_all(self.decoder.feed(self.unswizzle(data)))
+
+    def stream_write(self, data):
+        """
+        Swizzled data from a stream, such as a tcp connection, split anywhere. Commands split between writes are
+        resumed with the next write.
+
+        @param data: Swizzled data.
+        @return:
+        """
+        self.swizzle_mode = True
+        self.process_all(self.decoder.feed(self.unswizzle(data)))
 
     def realtime_write(self, bytes_to_write):
         """
@@ -560,7 +773,16 @@ class RuidaEmulator(Module, Parameters):
         @param data:
         @return:
         """
-        for array in self.parse_commands(data):
+        self.process_all(self.parse_commands(data))
+
+    def process_all(self, commands):
+        """
+        Processes each of the given commands.
+
+        @param commands: iterable of unswizzled commands.
+        @return:
+        """
+        for array in commands:
             try:
                 self.process(array)
             except RuidaCommandError:
@@ -2214,16 +2436,10 @@ class RuidaEmulator(Module, Parameters):
         return "Unknown", 0
 
     def unswizzle(self, data):
-        array = list()
-        for b in data:
-            array.append(self.lut_unswizzle[b])
-        return bytes(array)
+        return bytes(data).translate(self.lut_unswizzle)
 
     def swizzle(self, data):
-        array = list()
-        for b in data:
-            array.append(self.lut_swizzle[b])
-        return bytes(array)
+        return bytes(data).translate(self.lut_swizzle)
 
     @staticmethod
     def swizzle_byte(b, magic):
@@ -2245,25 +2461,29 @@ class RuidaEmulator(Module, Parameters):
 
     @staticmethod
     def swizzles_lut(magic):
-        lut_swizzle = [RuidaEmulator.swizzle_byte(s, magic) for s in range(256)]
-        lut_unswizzle = [RuidaEmulator.unswizzle_byte(s, magic) for s in range(256)]
+        """
+        Swizzle and unswizzle tables for the magic, as 256 byte tables for bytes.translate().
+        """
+        try:
+            return _swizzle_luts[magic]
+        except KeyError:
+            pass
+        lut_swizzle = bytes(RuidaEmulator.swizzle_byte(s, magic) for s in range(256))
+        lut_unswizzle = bytes(
+            RuidaEmulator.unswizzle_byte(s, magic) for s in range(256)
+        )
+        _swizzle_luts[magic] = lut_swizzle, lut_unswizzle
         return lut_swizzle, lut_unswizzle
 
     @staticmethod
     def decode_bytes(data, magic=0x88):
         lut_swizzle, lut_unswizzle = RuidaEmulator.swizzles_lut(magic)
-        array = list()
-        for b in data:
-            array.append(lut_unswizzle[b])
-        return bytes(array)
+        return bytes(data).translate(lut_unswizzle)
 
     @staticmethod
     def encode_bytes(data, magic=0x88):
         lut_swizzle, lut_unswizzle = RuidaEmulator.swizzles_lut(magic)
-        array = list()
-        for b in data:
-            array.append(lut_swizzle[b])
-        return bytes(array)
+        return bytes(data).translate(lut_swizzle)
 
 
 class RDLoader:
@@ -1,6 +1,8 @@
 # -*- coding: ISO-8859-1 -*-
 
 import re
+from bisect import bisect_left
+from itertools import accumulate
 
 try:
     from collections.abc import MutableSequence  # noqa
@@ -3627,6 +3629,7 @@ class Shape(SVGElement, GraphicObject, Transformable):
             self._lengths = lengths
         else:
             self._lengths = [each / self._length for each in lengths]
+        self._positions = list(accumulate(self._lengths))
 
     def npoint(self, positions, error=ERROR):
         """
@@ -3691,24 +3694,28 @@ class Shape(SVGElement, GraphicObject, Transformable):
         except ValueError:
             return self.npoint([position], error=error)[0]
 
-        if self._length is None:
+        positions = getattr(self, "_positions", None)
+        if (
+            self._length is None
+            or positions is None
+            or len(positions) != len(segments)
+        ):
+            self._length = None
             self._calc_lengths(error=error, segments=segments)
+            positions = self._positions
 
         if self._length == 0:
             i = int(round(position * (len(segments) - 1)))
             return segments[i].point(0.0)
-        # Find which segment the point we search for is located on:
-        segment_start = 0
-        segment_pos = 0
-        segment = segments[0]
-        for index, segment in enumerate(segments):
-            segment_end = segment_start + self._lengths[index]
-            if segment_end >= position:
-                # This is the segment! How far in on the segment is the point?
-                segment_pos = (position - segment_start) / (segment_end - segment_start)
-                break
-            segment_start = segment_end
-        return segment.point(segment_pos)
+        # Binary search for the segment the point we search for is located on:
+        index = min(bisect_left(positions, position), len(segments) - 1)
+        segment_start = positions[index - 1] if index else 0
+        segment_end = positions[index]
+        if segment_end <= segment_start:
+            return segments[index].point(0.0)
+        # How far in on the segment is the point?
+        segment_pos = (position - segment_start) / (segment_end - segment_start)
+        return segments[index].point(min(max(segment_pos, 0.0), 1.0))
 
     def length(self, error=ERROR, min_depth=MIN_DEPTH):
         self._calc_lengths(error, min_depth)
@@ -3751,18 +3758,7 @@ class Shape(SVGElement, GraphicObject, Transformable):
         except ValueError:
             return None  # No bounding box items existed. So no bounding box.
 
-        if (
-            with_stroke
-            and self.stroke_width is not None
-            and not (self.stroke is None or self.stroke.value is None)
-        ):
-            if transformed:
-                delta = float(self.implicit_stroke_width) / 2.0
-            else:
-                delta = float(self.stroke_width) / 2.0
-        else:
-            delta = 0.0
-
+        delta = self._stroke_delta(transformed, with_stroke)
         return (
             min(xmins) - delta,
             min(ymins) - delta,
@@ -3770,6 +3766,27 @@ class Shape(SVGElement, GraphicObject, Transformable):
             max(ymaxs) + delta,
         )
 
+    def _stroke_delta(self, transformed=True, with_stroke=False):
+        """
+        Amount the bounding box grows by when the stroke-width is included.
+
+        Stroke and stroke-width may still be unparsed strings if they were set directly.
+        """
+        if not with_stroke or self.stroke_width is None:
+            return 0.0
+        stroke = self.stroke
+        if isinstance(stroke, str):
+            stroke = Color(stroke)
+        if stroke is None or stroke.value is None:
+            return 0.0
+        if not isinstance(self.stroke_width, str):
+            width = self.implicit_stroke_width if transformed else self.stroke_width
+            return float(width) / 2.0
+        width = Length(self.stroke_width).value()
+        if transformed and self.apply and self.transform is not None:
+            width *= sqrt(abs(self.transform.determinant))
+        return float(width) / 2.0
+
     def _init_shape(self, *args):
         """
         Generic SVG parsing of args. In those cases where the shape accepts finite elements we can process the last
@@ -5466,6 +5483,370 @@ class Arc(Curve):
             )
 
 
+class CompiledPath:
+    """
+    CompiledPath packs the segments of a path into numpy arrays once, so that points, lengths,
+    bounds and transforms are calculated for all the segments together rather than one by one.
+
+    Lines, closes, moves and quadratic beziers are stored as the exactly equivalent cubic beziers.
+    Arcs are stored as their ellipse parameters. Moves are zero length and sit at their end point.
+    """
+
+    LINEAR = 0
+    QUAD = 1
+    CUBIC = 2
+    ARC = 3
+
+    GAUSS_ORDER = 8
+    GAUSS_INTERVALS = 4
+    GAUSS_MAX_INTERVALS = 1024
+
+    def __init__(self, segments=()):
+        import numpy as np
+
+        count = len(segments)
+        kinds = []
+        coords = []
+        arcs = []
+        arc_index = []
+        last = Point(0, 0)
+        for index, segment in enumerate(segments):
+            start = segment.start
+            end = segment.end
+            if end is None:
+                end = start if start is not None else last
+            if start is None or isinstance(segment, Move):
+                start = end
+            last = end
+            if isinstance(segment, CubicBezier):
+                kinds.append(CompiledPath.CUBIC)
+                control1 = segment.control1
+                control2 = segment.control2
+            elif isinstance(segment, QuadraticBezier):
+                kinds.append(CompiledPath.QUAD)
+                control1 = control2 = segment.control
+            elif isinstance(segment, Arc) and segment.sweep != 0:
+                kinds.append(CompiledPath.ARC)
+                control1 = control2 = start
+                arc_index.append(index)
+                arcs.append(CompiledPath._arc_parameters(segment))
+            else:
+                kinds.append(CompiledPath.LINEAR)
+                control1 = control2 = start
+            coords.extend(
+                (
+                    start[0],
+                    start[1],
+                    control1[0],
+                    control1[1],
+                    control2[0],
+                    control2[1],
+                    end[0],
+                    end[1],
+                )
+            )
+        self.kinds = np.array(kinds, dtype=np.uint8)
+        self.points = np.array(coords, dtype=float).reshape((count, 4, 2))
+        self.arc_index = np.array(arc_index, dtype=int)
+        self.arcs = np.array(arcs, dtype=float).reshape((len(arcs), 7))
+        self.arc_segments = [segments[i] for i in arc_index]
+        self._elevate()
+        self._lengths = None
+        self._positions = None
+        self._length = None
+
+    @staticmethod
+    def _arc_parameters(arc):
+        return (
+            arc.center[0],
+            arc.center[1],
+            arc.rx,
+            arc.ry,
+            float(arc.get_rotation()),
+            arc.get_start_t(),
+            arc.sweep,
+        )
+
+    def _elevate(self):
+        """
+        Raises the lines and quads to cubic control points.
+        """
+        points = self.points
+        start = points[:, 0]
+        end = points[:, 3]
+        linear = self.kinds == CompiledPath.LINEAR
+        points[linear, 1] = start[linear] + (end[linear] - start[linear]) / 3.0
+        points[linear, 2] = end[linear] + (start[linear] - end[linear]) / 3.0
+        quad = self.kinds == CompiledPath.QUAD
+        control = points[quad, 1]
+        points[quad, 1] = start[quad] + 2.0 * (control - start[quad]) / 3.0
+        points[quad, 2] = end[quad] + 2.0 * (control - end[quad]) / 3.0
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def transformed(self, matrix):
+        """
+        Returns a copy of this compiled path with the given matrix applied.
+
+        @param matrix: Matrix to apply.
+        @return: CompiledPath
+        """
+        import numpy as np
+
+        compiled = copy(self)
+        m = np.array([[matrix.a, matrix.b], [matrix.c, matrix.d]], dtype=float)
+        compiled.points = self.points @ m + np.array([matrix.e, matrix.f])
+        compiled.arc_segments = [s * matrix for s in self.arc_segments]
+        compiled.arcs = np.array(
+            [CompiledPath._arc_parameters(s) for s in compiled.arc_segments],
+            dtype=float,
+        ).reshape(self.arcs.shape)
+        compiled._lengths = None
+        compiled._positions = None
+        compiled._length = None
+        return compiled
+
+    @staticmethod
+    def _gauss(intervals):
+        """
+        Composite Gauss-Legendre nodes and weights over [0, 1] split into the given intervals.
+        """
+        import numpy as np
+
+        nodes, weights = np.polynomial.legendre.leggauss(CompiledPath.GAUSS_ORDER)
+        offsets = np.arange(intervals, dtype=float)[:, None]
+        t = ((offsets + (nodes + 1.0) / 2.0) / intervals).ravel()
+        w = np.tile(weights, intervals) / (2.0 * intervals)
+        return t, w
+
+    @staticmethod
+    def _cubic_lengths(p, intervals):
+        import numpy as np
+
+        t, w = CompiledPath._gauss(intervals)
+        mt = 1.0 - t
+        # Derivative of the cubic, divided by 3.
+        d = (
+            (mt * mt)[None, :, None] * (p[:, 1] - p[:, 0])[:, None, :]
+            + (2.0 * mt * t)[None, :, None] * (p[:, 2] - p[:, 1])[:, None, :]
+            + (t * t)[None, :, None] * (p[:, 3] - p[:, 2])[:, None, :]
+        )
+        return 3.0 * np.hypot(d[:, :, 0], d[:, :, 1]) @ w
+
+    def lengths(self, error=1e-9):
+        """
+        Length of every segment. Curves and arcs are integrated by composite Gauss-Legendre
+        quadrature. Curves near a cusp are refined by doubling their intervals until the
+        relative change falls below the error.
+
+        @param error: relative error permitted for curve lengths.
+        @return: N-sized array of float
+        """
+        import numpy as np
+
+        if self._lengths is not None:
+            return self._lengths
+        p = self.points
+        lengths = np.zeros(len(self))
+        linear = self.kinds == CompiledPath.LINEAR
+        delta = p[linear, 3] - p[linear, 0]
+        lengths[linear] = np.hypot(delta[:, 0], delta[:, 1])
+        curves = np.nonzero(
+            (self.kinds == CompiledPath.QUAD) | (self.kinds == CompiledPath.CUBIC)
+        )[0]
+        intervals = CompiledPath.GAUSS_INTERVALS
+        lengths[curves] = CompiledPath._cubic_lengths(p[curves], intervals)
+        while len(curves) and intervals < CompiledPath.GAUSS_MAX_INTERVALS:
+            intervals *= 2
+            refined = CompiledPath._cubic_lengths(p[curves], intervals)
+            converged = np.abs(refined - lengths[curves]) <= error * refined
+            lengths[curves] = refined
+            curves = curves[~converged]
+        if len(self.arcs):
+            t, w = CompiledPath._gauss(CompiledPath.GAUSS_INTERVALS)
+            rx = self.arcs[:, 2:3]
+            ry = self.arcs[:, 3:4]
+            start_t = self.arcs[:, 5:6]
+            sweep = self.arcs[:, 6:7]
+            theta = start_t + sweep * t[None, :]
+            speed = np.hypot(rx * np.sin(theta), ry * np.cos(theta))
+            lengths[self.arc_index] = np.abs(sweep[:, 0]) * (speed @ w)
+        self._lengths = lengths
+        return lengths
+
+    def length(self):
+        """
+        Total length of the compiled path.
+        """
+        if self._length is None:
+            self._length = float(self.lengths().sum())
+        return self._length
+
+    def positions(self):
+        """
+        Cumulative end position of every segment, between 0 and 1, in terms of length.
+
+        @return: N-sized array of float
+        """
+        import numpy as np
+
+        if self._positions is None:
+            length = self.length()
+            if length == 0:
+                self._positions = np.zeros(len(self))
+            else:
+                self._positions = np.cumsum(self.lengths()) / length
+                self._positions[-1] = 1.0
+        return self._positions
+
+    def lookup(self, positions):
+        """
+        Finds the segment and the t value within that segment for each position, with a binary
+        search of the cumulative lengths.
+
+        @param positions: sequence of float between 0 and 1
+        @return: index array, t array
+        """
+        import numpy as np
+
+        positions = np.asarray(positions, dtype=float)
+        count = len(self)
+        if self.length() == 0:
+            index = np.round(np.clip(positions, 0.0, 1.0) * (count - 1)).astype(int)
+            return index, np.zeros(positions.shape)
+        cumulative = self.positions()
+        index = np.minimum(np.searchsorted(cumulative, positions), count - 1)
+        segment_start = np.where(index > 0, cumulative[index - 1], 0.0)
+        segment_length = cumulative[index] - segment_start
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(
+                segment_length > 0, (positions - segment_start) / segment_length, 0.0
+            )
+        return index, np.clip(t, 0.0, 1.0)
+
+    def evaluate(self, index, t):
+        """
+        Evaluates the given segments at the given t values.
+
+        @param index: N-sized array of segment indexes
+        @param t: N-sized array of t values between 0 and 1
+        @return: Nx2 array of float
+        """
+        import numpy as np
+
+        index = np.asarray(index, dtype=int)
+        t = np.asarray(t, dtype=float)
+        p = self.points[index]
+        mt = 1.0 - t
+        xy = (
+            (mt * mt * mt)[:, None] * p[:, 0]
+            + (3.0 * mt * mt * t)[:, None] * p[:, 1]
+            + (3.0 * mt * t * t)[:, None] * p[:, 2]
+            + (t * t * t)[:, None] * p[:, 3]
+        )
+        if len(self.arcs):
+            arc = self.kinds[index] == CompiledPath.ARC
+            if np.any(arc):
+                rows = np.searchsorted(self.arc_index, index[arc])
+                cx, cy, rx, ry, rotation, start_t = self.arcs[rows, :6].T
+                theta = start_t + self.arcs[rows, 6] * t[arc]
+                cos_rot = np.cos(rotation)
+                sin_rot = np.sin(rotation)
+                cos_t = np.cos(theta)
+                sin_t = np.sin(theta)
+                arc_xy = np.empty((len(rows), 2))
+                arc_xy[:, 0] = cx + rx * cos_t * cos_rot - ry * sin_t * sin_rot
+                arc_xy[:, 1] = cy + rx * cos_t * sin_rot + ry * sin_t * cos_rot
+                xy[arc] = arc_xy
+        # ensure clean endings
+        xy[t == 0] = p[t == 0, 0]
+        xy[t == 1] = p[t == 1, 3]
+        return xy
+
+    def npoint(self, positions):
+        """
+        Finds the points at the given positions along the whole compiled path.
+
+        @param positions: sequence of float between 0 and 1
+        @return: Nx2 array of float
+        """
+        index, t = self.lookup(positions)
+        return self.evaluate(index, t)
+
+    def point(self, position):
+        """
+        Finds the point at the given position along the whole compiled path.
+
+        @param position: float between 0 and 1
+        @return: Point
+        """
+        return Point(self.npoint([position])[0])
+
+    def bbox(self):
+        """
+        Tight bounding box of all the segments.
+
+        @return: xmin, ymin, xmax, ymax or None if there are no segments.
+        """
+        import numpy as np
+
+        if len(self) == 0:
+            return None
+        p = self.points[self.kinds != CompiledPath.ARC]
+        p0, p1, p2, p3 = p[:, 0], p[:, 1], p[:, 2], p[:, 3]
+        # Derivative roots of the cubic for each axis: a*t^2 + b*t + c = 0
+        a = -p0 + 3.0 * p1 - 3.0 * p2 + p3
+        b = 2.0 * (p0 - 2.0 * p1 + p2)
+        c = p1 - p0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quadratic = np.abs(a) >= 1e-12
+            sqrt_disc = np.sqrt(b * b - 4.0 * a * c)
+            r1 = np.where(quadratic, (-b + sqrt_disc) / (2.0 * a), -c / b)
+            r2 = np.where(quadratic, (-b - sqrt_disc) / (2.0 * a), np.nan)
+        candidates = [p0, p3]
+        for r in (r1, r2):
+            r = np.where((r > 0) & (r < 1), r, 0.0)
+            mr = 1.0 - r
+            candidates.append(
+                mr * mr * mr * p0
+                + 3.0 * mr * mr * r * p1
+                + 3.0 * mr * r * r * p2
+                + r * r * r * p3
+            )
+        if len(self.arcs):
+            candidates.extend(self._arc_extrema())
+        candidates = np.concatenate(candidates)
+        xmin, ymin = candidates.min(axis=0)
+        xmax, ymax = candidates.max(axis=0)
+        return float(xmin), float(ymin), float(xmax), float(ymax)
+
+    def _arc_extrema(self):
+        """
+        Start, end and the axis extrema of the arcs lying within their sweeps.
+        """
+        import numpy as np
+
+        cx, cy, rx, ry, rotation, start_t = self.arcs[:, :6].T
+        sweep = self.arcs[:, 6]
+        cos_rot = np.cos(rotation)
+        sin_rot = np.sin(rotation)
+        ends = self.points[self.arc_index]
+        extrema = [ends[:, 0], ends[:, 3]]
+        tx = np.arctan2(-ry * sin_rot, rx * cos_rot)
+        ty = np.arctan2(ry * cos_rot, rx * sin_rot)
+        for theta in (tx, tx + np.pi, ty, ty + np.pi):
+            offset = np.where(sweep >= 0, theta - start_t, start_t - theta) % tau
+            theta = np.where(offset <= np.abs(sweep), theta, start_t)
+            cos_t = np.cos(theta)
+            sin_t = np.sin(theta)
+            xy = np.empty((len(theta), 2))
+            xy[:, 0] = cx + rx * cos_t * cos_rot - ry * sin_t * sin_rot
+            xy[:, 1] = cy + rx * cos_t * sin_rot + ry * sin_t * cos_rot
+            extrema.append(xy)
+        return extrema
+
+
 class Path(Shape, MutableSequence):
     """
     A Path is a Mutable sequence of path segments
@@ -5493,6 +5874,7 @@ class Path(Shape, MutableSequence):
     def __init__(self, *args, **kwargs):
         Shape.__init__(self, *args, **kwargs)
         self._length = None
+        self._compiled = None
         self._lengths = None
         self._segments = list()
         if len(args) != 1:
@@ -5614,6 +5996,7 @@ class Path(Shape, MutableSequence):
                 new_element = new_element[0]
         self._segments[index] = new_element
         self._length = None
+        self._compiled = None
         self._lengths = None
         if isinstance(index, slice):
             self.validate_connections()
@@ -5629,6 +6012,7 @@ class Path(Shape, MutableSequence):
         original_element = self._segments[index]
         del self._segments[index]
         self._length = None
+        self._compiled = None
         if isinstance(index, slice):
             self.validate_connections()
         else:
@@ -5718,6 +6102,8 @@ class Path(Shape, MutableSequence):
         the end position of the first element in the list. The start element of the first segment may or may not be
         None.
         """
+        self._length = None
+        self._compiled = None
         zpoint = None
         last_segment = None
         for segment in self._segments:
@@ -6006,6 +6392,7 @@ class Path(Shape, MutableSequence):
                 return
             value = value[0]
         self._length = None
+        self._compiled = None
         index = len(self._segments) - 1
         self._segments.append(value)
         self._validate_connection(index)
@@ -6019,6 +6406,7 @@ class Path(Shape, MutableSequence):
                 return
             value = value[0]
         self._length = None
+        self._compiled = None
         self._segments.insert(index, value)
         self._validate_connection(index - 1)
         self._validate_connection(index)
@@ -6031,6 +6419,7 @@ class Path(Shape, MutableSequence):
         if isinstance(iterable, str):
             iterable = Path(iterable)
         self._length = None
+        self._compiled = None
         index = len(self._segments) - 1
         self._segments.extend(iterable)
         self._validate_connection(index)
@@ -6073,6 +6462,8 @@ class Path(Shape, MutableSequence):
             p += subpath
         self._segments = p._segments
         self._segments[0].start = prepoint
+        self._length = None
+        self._compiled = None
         return self
 
     def subpath(self, index):
@@ -6113,6 +6504,7 @@ class Path(Shape, MutableSequence):
         """
         GraphicObject.reify(self)
         Transformable.reify(self)
+        self._compiled = None
         if isinstance(self.transform, Matrix):
             for e in self._segments:
                 e *= self.transform
@@ -6185,6 +6577,50 @@ class Path(Shape, MutableSequence):
             return [s * self.transform for s in self._segments]
         return self._segments
 
+    def compiled(self, transformed=False):
+        """
+        Returns the CompiledPath of this path. The untransformed form is cached until the path is modified.
+
+        Segments altered in place, rather than through the path, are only noticed after the path is modified
+        or reified.
+
+        @param transformed: whether to apply the transform to the compiled path.
+        @return: CompiledPath
+        """
+        if self._compiled is None:
+            self._compiled = CompiledPath(self._segments)
+        if transformed and not self.transform.is_identity():
+            return self._compiled.transformed(self.transform)
+        return self._compiled
+
+    def npoint(self, positions, error=ERROR):
+        """
+        Find points between 0 and 1 within the path, evaluated together through the compiled path.
+        """
+        if len(self._segments) == 0:
+            return None
+        try:
+            return self.compiled().npoint(positions)
+        except ImportError:
+            return Shape.npoint(self, positions, error=error)
+
+    def bbox(self, transformed=True, with_stroke=False):
+        """
+        Get the bounding box for the path, calculated through the compiled path.
+
+        @param transformed: whether this is the transformed bounds or default.
+        @param with_stroke: should the stroke-width be included in the bounds.
+        @return: bounding box of the given element
+        """
+        try:
+            bbox = self.compiled(transformed=transformed).bbox()
+        except ImportError:
+            return Shape.bbox(self, transformed=transformed, with_stroke=with_stroke)
+        if bbox is None:
+            return None
+        delta = self._stroke_delta(transformed, with_stroke)
+        return bbox[0] - delta, bbox[1] - delta, bbox[2] + delta, bbox[3] + delta
+
     def approximate_arcs_with_cubics(self, error=0.1):
         """
         Iterates through this path and replaces any Arcs with cubic bezier curves.
@@ -7452,6 +7888,8 @@ class Subpath:
         end = self.index_to_path_index(end)
         self._path._validate_connection(start - 1, prefer_second=True)
         self._path._validate_connection(end)
+        self._path._length = None
+        self._path._compiled = None
 
     def reverse(self):
         size = len(self)
@@ -0,0 +1,404 @@
+"""
+Clipping backends perform the boolean operations between two sets of polygons: union, intersection, difference
+and xor, with the even-odd fill rule. Polygons are sequences of points, anything indexed as x, y. Every backend
+gives its result as a list of polygons, each a list of (x, y) tuples, the region of which is the result of the
+operation under the even-odd fill rule.
+
+The clipper backend is the reference, the port of Clipper in meerk40t.tools.clipper. The numpy backend splits every
+edge of both sets of polygons where it crosses an edge of the other set, keeps the split edges which have the
+result of the operation on one side and not on the other, and links them into closed polygons. Where the split
+edges cannot be linked into closed polygons, the numpy backend gives the result of the clipper backend instead.
+"""
+
+from .clipper import Clipper, ClipType, PolyFillType, PolyType
+from .clipper import Point as ClipperPoint
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CLIP_OPERATIONS = ("union", "intersection", "difference", "xor")
+
+
+def polygon_area(polygons):
+    """
+    Area of the polygons, with the area of holes wound the other way removed.
+
+    @param polygons: list of polygons as given by a clipping backend.
+    @return: absolute signed area
+    """
+    total = 0.0
+    for polygon in polygons:
+        count = len(polygon)
+        for i in range(count):
+            x0, y0 = polygon[i - 1]
+            x1, y1 = polygon[i]
+            total += x0 * y1 - x1 * y0
+    return abs(total) / 2.0
+
+
+class ClipperBackend:
+    """
+    Boolean operations by the Vatti clipping of meerk40t.tools.clipper.
+    """
+
+    name = "clipper"
+    clip_types = {
+        "union": ClipType.Union,
+        "intersection": ClipType.Intersection,
+        "difference": ClipType.Difference,
+        "xor": ClipType.Xor,
+    }
+
+    def clip(self, subject, clip, operation):
+        """
+        Boolean operation between the subject and the clip polygons.
+
+        @param subject: list of polygons.
+        @param clip: list of polygons.
+        @param operation: one of CLIP_OPERATIONS
+        @return: list of polygons
+        """
+        pc = Clipper()
+        solution = []
+        pc.AddPolygons(
+            [[ClipperPoint(p[0], p[1]) for p in polygon] for polygon in subject],
+            PolyType.Subject,
+        )
+        pc.AddPolygons(
+            [[ClipperPoint(p[0], p[1]) for p in polygon] for polygon in clip],
+            PolyType.Clip,
+        )
+        pc.Execute(
+            self.clip_types[operation],
+            solution,
+            PolyFillType.EvenOdd,
+            PolyFillType.EvenOdd,
+        )
+        return [[(p.x, p.y) for p in polygon] for polygon in solution]
+
+
+class NumpyBackend:
+    """
+    Boolean operations by classifying the split edges of the polygons with numpy.
+
+    Edges are only tested for crossing when their bounding boxes overlap, found by sorting the edges along x, and
+    points are only tested against the edges which cross the horizontal band of the polygons they are in.
+    """
+
+    name = "numpy"
+
+    def clip(self, subject, clip, operation):
+        """
+        Boolean operation between the subject and the clip polygons.
+
+        @param subject: list of polygons.
+        @param clip: list of polygons.
+        @param operation: one of CLIP_OPERATIONS
+        @return: list of polygons
+        """
+        if operation not in CLIP_OPERATIONS:
+            raise ValueError(operation)
+        a_starts, a_ends = _edges(subject)
+        b_starts, b_ends = _edges(clip)
+        if len(a_starts) == 0 or len(b_starts) == 0:
+            if operation == "intersection":
+                return []
+            if operation == "difference" or len(b_starts) == 0:
+                return _polygons(subject)
+            return _polygons(clip)
+        starts = np.concatenate((a_starts, b_starts))
+        ends = np.concatenate((a_ends, b_ends))
+        every = np.concatenate((starts, ends))
+        scale = float(np.max(every.max(axis=0) - every.min(axis=0)))
+        # Every edge is split where it crosses any other edge, so the result does not cross itself.
+        starts, ends = _split(starts, ends, *_crossings(starts, ends, scale))
+        if scale > 0:
+            # Where three or more edges cross at one point, the crossings of each pair differ in their last bits.
+            # Rounding to a grid far finer than the polygons makes them the same point. The grid is a power of two,
+            # which keeps integer points exact.
+            quantum = 2.0 ** np.floor(np.log2(scale * 1e-9))
+            starts = np.round(starts / quantum) * quantum
+            ends = np.round(ends / quantum) * quantum
+            used = np.any(starts != ends, axis=1)
+            starts = starts[used]
+            ends = ends[used]
+        delta = ends - starts
+        length = np.hypot(delta[:, 0], delta[:, 1])
+        offset = np.minimum(scale * 1e-7, length * 1e-3)
+        normal = np.column_stack((-delta[:, 1], delta[:, 0]))
+        normal *= (offset / length)[:, None]
+        middle = (starts + ends) / 2.0
+        samples = np.concatenate((middle + normal, middle - normal))
+        in_a = _inside(samples, a_starts, a_ends)
+        in_b = _inside(samples, b_starts, b_ends)
+        if operation == "union":
+            result = in_a | in_b
+        elif operation == "intersection":
+            result = in_a & in_b
+        elif operation == "difference":
+            result = in_a & ~in_b
+        else:
+            result = in_a ^ in_b
+        count = len(starts)
+        left = result[:count]
+        keep = left != result[count:]
+        if not np.any(keep):
+            return []
+        # Kept edges are directed with the result on their left.
+        edge_starts = np.where(left[:, None], starts, ends)[keep]
+        edge_ends = np.where(left[:, None], ends, starts)[keep]
+        polygons = _loops(edge_starts, edge_ends)
+        if polygons is None:
+            return ClipperBackend().clip(subject, clip, operation)
+        return polygons
+
+
+def _polygons(polygons):
+    """
+    Polygons as lists of (x, y) tuples.
+    """
+    return [
+        [(float(p[0]), float(p[1])) for p in polygon]
+        for polygon in polygons
+        if len(polygon) >= 3
+    ]
+
+
+def _edges(polygons):
+    """
+    Edges of the closed polygons, without zero length edges.
+
+    @return: starts, ends
+    """
+    starts = list()
+    for polygon in polygons:
+        points = np.array([(float(p[0]), float(p[1])) for p in polygon], dtype=float)
+        if len(points) < 3:
+            continue
+        starts.append(points)
+    if not starts:
+        empty = np.zeros((0, 2))
+        return empty, empty
+    ends = np.concatenate([np.roll(points, -1, axis=0) for points in starts])
+    starts = np.concatenate(starts)
+    used = np.any(starts != ends, axis=1)
+    return starts[used], ends[used]
+
+
+def _ranges(first, last):
+    """
+    Every position within the ranges, first to last exclusive.
+
+    @return: range of each position, positions
+    """
+    counts = last - first
+    owner = np.repeat(np.arange(len(first)), counts)
+    offset = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, first[owner] + offset
+
+
+def _crossings(starts, ends, scale):
+    """
+    Points where the edges cross each other, and where collinear edges overlap.
+
+    @return: edge, position along the edge, points
+    """
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    # Edges overlapping along x, each pair once, from the edges sorted by their low x.
+    order = np.argsort(low[:, 0], kind="stable")
+    first = np.arange(1, len(order) + 1)
+    last = np.searchsorted(low[order, 0], high[order, 0], side="right")
+    ai, bi = _ranges(first, np.maximum(first, last))
+    ai = order[ai]
+    bi = order[bi]
+    overlap = (low[ai, 1] <= high[bi, 1]) & (low[bi, 1] <= high[ai, 1])
+    ai = ai[overlap]
+    bi = bi[overlap]
+
+    p = starts[ai]
+    r = ends[ai] - p
+    q = starts[bi]
+    s = ends[bi] - q
+    qp = q - p
+    denominator = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+    r_length = np.hypot(r[:, 0], r[:, 1])
+    s_length = np.hypot(s[:, 0], s[:, 1])
+    parallel = np.abs(denominator) <= 1e-12 * r_length * s_length
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (qp[:, 0] * s[:, 1] - qp[:, 1] * s[:, 0]) / denominator
+        u = (qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) / denominator
+    tolerance = scale * 1e-12
+    t_start = t * r_length <= tolerance
+    t_end = (1 - t) * r_length <= tolerance
+    u_start = u * s_length <= tolerance
+    u_end = (1 - u) * s_length <= tolerance
+    crossing = (
+        ~parallel
+        & (t * r_length >= -tolerance)
+        & ((1 - t) * r_length >= -tolerance)
+        & (u * s_length >= -tolerance)
+        & ((1 - u) * s_length >= -tolerance)
+    )
+    points = p + t[:, None] * r
+    # Crossings at a vertex are the vertex itself, so the split edges meet exactly.
+    points = np.where((crossing & u_start)[:, None], q, points)
+    points = np.where((crossing & u_end)[:, None], q + s, points)
+    points = np.where((crossing & t_start)[:, None], p, points)
+    points = np.where((crossing & t_end)[:, None], p + r, points)
+    a_inner = crossing & ~t_start & ~t_end
+    b_inner = crossing & ~u_start & ~u_end
+    edge = [ai[a_inner], bi[b_inner]]
+    position = [t[a_inner], u[b_inner]]
+    split = [points[a_inner], points[b_inner]]
+
+    # Collinear overlapping edges are split at the ends of each other.
+    collinear = parallel & (
+        np.abs(qp[:, 0] * r[:, 1] - qp[:, 1] * r[:, 0]) <= tolerance * r_length
+    )
+    ai = ai[collinear]
+    bi = bi[collinear]
+    for split_edge, other in ((ai, bi), (bi, ai)):
+        origin = starts[split_edge]
+        direction = ends[split_edge] - origin
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        for other_end in (starts[other], ends[other]):
+            along = np.einsum("ij,ij->i", other_end - origin, direction)
+            along /= length * length
+            inner = (along * length > tolerance) & ((1 - along) * length > tolerance)
+            edge.append(split_edge[inner])
+            position.append(along[inner])
+            split.append(other_end[inner])
+    return np.concatenate(edge), np.concatenate(position), np.concatenate(split)
+
+
+def _split(starts, ends, edge, position, points):
+    """
+    Edges split at the given points.
+
+    @param edge: index of the edge split by each point.
+    @param position: position of each point along its edge.
+    @return: starts, ends
+    """
+    count = len(starts)
+    edge = np.concatenate((np.arange(count), edge))
+    position = np.concatenate((np.zeros(count), position))
+    points = np.concatenate((starts, points))
+    order = np.lexsort((position, edge))
+    edge = edge[order]
+    points = points[order]
+    following = np.empty(len(edge), dtype=bool)
+    following[:-1] = edge[1:] == edge[:-1]
+    following[-1] = False
+    split_ends = ends[edge]
+    split_ends[following] = points[1:][following[:-1]]
+    used = np.any(points != split_ends, axis=1)
+    return points[used], split_ends[used]
+
+
+def _inside(points, starts, ends):
+    """
+    Whether each point is inside the edges, by the even-odd rule.
+
+    The height of the edges is divided into as many bands as there are edges, and each point is tested against the
+    edges which cross its band.
+    """
+    inside = np.zeros(len(points), dtype=bool)
+    low = np.minimum(starts[:, 1], ends[:, 1])
+    high = np.maximum(starts[:, 1], ends[:, 1])
+    bottom = low.min()
+    top = high.max()
+    y = points[:, 1]
+    candidates = np.nonzero((bottom <= y) & (y <= top))[0]
+    if len(candidates) == 0:
+        return inside
+    count = len(starts)
+    height = (top - bottom) / count or 1.0
+    first = np.clip(((low - bottom) / height).astype(int), 0, count - 1)
+    last = np.clip(((high - bottom) / height).astype(int), 0, count - 1)
+    band_edges, band = _ranges(first, last + 1)
+    order = np.argsort(band, kind="stable")
+    band_edges = band_edges[order]
+    band = band[order]
+    point_band = np.clip(
+        ((y[candidates] - bottom) / height).astype(int), 0, count - 1
+    )
+    candidate, index = _ranges(
+        np.searchsorted(band, point_band, side="left"),
+        np.searchsorted(band, point_band, side="right"),
+    )
+    pi = candidates[candidate]
+    ei = band_edges[index]
+    px = points[pi, 0]
+    py = points[pi, 1]
+    x0 = starts[ei, 0]
+    y0 = starts[ei, 1]
+    x1 = ends[ei, 0]
+    y1 = ends[ei, 1]
+    straddle = (y0 > py) != (y1 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+    crossings = np.bincount(pi[straddle & (x > px)], minlength=len(points))
+    return (crossings & 1) == 1
+
+
+def _loops(starts, ends):
+    """
+    Link the directed edges into closed polygons, each edge followed by an edge which starts at its end.
+
+    Repeated edges, where the polygons run along each other, are linked once. Edges at a vertex which does not have
+    as many edges ending at it as starting from it cannot be part of a closed polygon.
+
+    @return: list of polygons, or None if any vertex is unbalanced.
+    """
+    vertices, index = np.unique(
+        np.concatenate((starts, ends)) @ np.array((1.0, 1.0j)),
+        return_inverse=True,
+    )
+    index = index.reshape(-1)
+    start_index = index[: len(starts)]
+    end_index = index[len(starts) :]
+    _, first = np.unique(start_index * len(vertices) + end_index, return_index=True)
+    first.sort()
+    starts = starts[first]
+    start_index = start_index[first]
+    end_index = end_index[first]
+    count = len(first)
+    balanced = np.bincount(start_index, minlength=len(vertices)) == np.bincount(
+        end_index, minlength=len(vertices)
+    )
+    if not np.all(balanced):
+        return None
+    # With the edges sorted by their start and by their end, the edges ending and starting at each vertex line up.
+    following = np.empty(count, dtype=int)
+    following[np.argsort(end_index, kind="stable")] = np.argsort(
+        start_index, kind="stable"
+    )
+    following = following.tolist()
+    points = list(map(tuple, starts.tolist()))
+    used = bytearray(count)
+    polygons = list()
+    for i in range(count):
+        if used[i]:
+            continue
+        polygon = list()
+        j = i
+        while not used[j]:
+            used[j] = 1
+            polygon.append(points[j])
+            j = following[j]
+        if len(polygon) >= 3:
+            polygons.append(polygon)
+    return polygons
+
+
+def clip_backends():
+    """
+    Available clipping backends, by name.
+    """
+    backends = {"clipper": ClipperBackend()}
+    if np is not None:
+        backends["numpy"] = NumpyBackend()
+    return backends
@@ -2,6 +2,11 @@ from math import isinf, isnan
 
 from meerk40t.svgelements import Point
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class GraphNode(Point):
     """
@@ -860,3 +865,190 @@ class EulerianFill:
         walk = list()
         graph.walk(walk)
         return walk
+
+
+class ScanlineFill:
+    """
+    Scanline fill given some outline shapes, creates a fill.
+
+    All the edges of all the outlines are intersected with every scanline at once. The intersections are sorted by
+    scanline and x and paired even-odd into rungs. The rungs are then linked in boustrophedon order, each rung is
+    connected to the rung on the next scanline which can be reached by following the outline between the two
+    scanlines. When no such rung exists the walk is broken and continues at the nearest unused rung.
+
+    The result is in the same form as the EulerianFill, points with None separating the walks. Without numpy the
+    EulerianFill is used instead.
+    """
+
+    def __init__(self, distance):
+        self.distance = distance
+        self.outlines = []
+
+    def __iadd__(self, other):
+        self.outlines.append(other)
+        return self
+
+    def get_fill(self):
+        if np is None:
+            efill = EulerianFill(self.distance)
+            for outline in self.outlines:
+                efill += outline
+            return efill.get_fill()
+        distance = self.distance
+        outlines = [
+            np.array([(p[0], p[1]) for p in outline], dtype=float)
+            for outline in self.outlines
+            if len(outline) >= 2
+        ]
+        if not outlines or not distance > 0:
+            return []
+        counts = np.array([len(outline) for outline in outlines])
+        starts = np.cumsum(counts) - counts
+        vertices = np.concatenate(outlines)
+        x = vertices[:, 0]
+        y = vertices[:, 1]
+        min_y = y.min()
+
+        # Edge i goes from vertex i to the next vertex of the same outline.
+        following = np.arange(1, len(vertices) + 1)
+        following[starts + counts - 1] = starts
+        # Scanline k is at min_y + k * distance. Every vertex is given the first
+        # scanline at or above it, an edge crosses the scanlines between those of
+        # its vertices. This is consistent for shared vertices so every scanline
+        # crosses the closed outlines an even number of times.
+        vertex_k = np.ceil((y - min_y) / distance).astype(int)
+        k0 = vertex_k
+        k1 = vertex_k[following]
+        k_low = np.minimum(k0, k1)
+        crossings = np.abs(k1 - k0)
+        edges = np.repeat(np.arange(len(vertices)), crossings)
+        offsets = np.repeat(np.cumsum(crossings) - crossings, crossings)
+        k = k_low[edges] + np.arange(len(edges)) - offsets
+        keep = k >= 1
+        edges = edges[keep]
+        k = k[keep]
+        if len(k) == 0:
+            return []
+        y0 = y[edges]
+        dy = y[following[edges]] - y0
+        t = np.clip((min_y + k * distance - y0) / dy, 0.0, 1.0)
+        xs = x[edges] + t * (x[following[edges]] - x[edges])
+        order = np.lexsort((xs, k))
+        xs = xs[order]
+        k = k[order]
+        edges = edges[order]
+        rung_k = k[0::2]
+        rung_x = np.stack((xs[0::2], xs[1::2]), axis=1)
+        rung_edge = np.stack((edges[0::2], edges[1::2]), axis=1)
+        rung_y = min_y + rung_k * distance
+        row_start = np.searchsorted(rung_k, np.arange(rung_k[-1] + 2))
+
+        outline_index = np.repeat(np.arange(len(outlines)), counts)
+        edge_outline = outline_index.tolist()
+        edge_start = starts[outline_index].tolist()
+        edge_count = counts[outline_index].tolist()
+        rx = rung_x.tolist()
+        ry = rung_y.tolist()
+        rk = rung_k.tolist()
+        re = rung_edge.tolist()
+        unused = np.ones(len(rk), dtype=bool)
+        row_start = row_start.tolist()
+
+        def connection(e_from, e_to, y_from, y_to):
+            """
+            Outline vertices between edge e_from at y_from and edge e_to at y_to,
+            provided the outline stays between the two scanlines. None if they are
+            not connected.
+            """
+            if e_from == e_to:
+                return []
+            if edge_outline[e_from] != edge_outline[e_to]:
+                return None
+            start = edge_start[e_from]
+            n = edge_count[e_from]
+            a = e_from - start
+            b = e_to - start
+            forward = (b - a) % n
+            backward = (a - b) % n
+            low = min(y_from, y_to)
+            high = max(y_from, y_to)
+            if forward <= backward:
+                walks = (
+                    (a + 1 + np.arange(forward)) % n,
+                    (a - np.arange(backward)) % n,
+                )
+            else:
+                walks = (
+                    (a - np.arange(backward)) % n,
+                    (a + 1 + np.arange(forward)) % n,
+                )
+            for walk in walks:
+                walk += start
+                wy = y[walk]
+                if wy.min() >= low and wy.max() <= high:
+                    return vertices[walk].tolist()
+            return None
+
+        def extend(r, side, step):
+            """
+            Walks from the given side of rung r to the rungs in the step direction.
+            """
+            points = []
+            while True:
+                row = rk[r] + step
+                if row < 0 or row >= len(row_start) - 1:
+                    return points
+                cx = rx[r][side]
+                candidates = [
+                    c for c in range(row_start[row], row_start[row + 1]) if unused[c]
+                ]
+                candidates.sort(key=lambda c: abs(rx[c][side] - cx))
+                for c in candidates:
+                    connect = connection(re[r][side], re[c][side], ry[r], ry[c])
+                    if connect is not None:
+                        break
+                else:
+                    return points
+                unused[c] = False
+                points.extend(connect)
+                points.append((rx[c][side], ry[c]))
+                side = 1 - side
+                points.append((rx[c][side], ry[c]))
+                r = c
+
+        fill = []
+        position = None
+        while True:
+            remaining = np.flatnonzero(unused)
+            if len(remaining) == 0:
+                break
+            if position is None:
+                r = int(remaining[0])
+                side = 0
+            else:
+                ends = rung_x[remaining] - position[0]
+                ends *= ends
+                ends += ((rung_y[remaining] - position[1]) ** 2)[:, None]
+                nearest = int(np.argmin(ends))
+                r = int(remaining[nearest // 2])
+                side = nearest % 2
+            unused[r] = False
+            up = extend(r, 1 - side, 1)
+            down = extend(r, side, -1)
+            down.reverse()
+            walk = down
+            walk.append((rx[r][side], ry[r]))
+            walk.append((rx[r][1 - side], ry[r]))
+            walk.extend(up)
+            if position is not None:
+                px, py = position
+                first = walk[0]
+                last = walk[-1]
+                if (last[0] - px) ** 2 + (last[1] - py) ** 2 < (first[0] - px) ** 2 + (
+                    first[1] - py
+                ) ** 2:
+                    walk.reverse()
+            fill.extend(walk)
+            fill.append(None)
+            position = walk[-1]
+        return fill
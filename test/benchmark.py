@@ -0,0 +1,33 @@
+"""
+Benchmarks are slow and their timings depend on the machine, so they are kept out of the
+default test run. Set MEERK40T_BENCHMARK=1 to run them.
+
+Each benchmark asserts that the optimized code is faster than, or smaller than, the code it
+replaces, rather than only reporting timings.
+"""
+
+import os
+import time
+import unittest
+
+BENCHMARK = bool(os.environ.get("MEERK40T_BENCHMARK"))
+
+
+def benchmark(test):
+    """
+    Decorates a benchmark test method or class, skipping it unless benchmarks are enabled.
+    """
+    return unittest.skipUnless(BENCHMARK, "set MEERK40T_BENCHMARK=1 to run benchmarks")(
+        test
+    )
+
+
+def timed(function, *args, **kwargs):
+    """
+    Calls the function with the given arguments.
+
+    @return: elapsed seconds, result of the call
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
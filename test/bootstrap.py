@@ -56,6 +56,10 @@ def bootstrap():
 
     kernel.add_plugin(svg_io.plugin)
 
+    from meerk40t.core import binary_io
+
+    kernel.add_plugin(binary_io.plugin)
+
     from meerk40t.dxf.plugin import plugin as dxf_io_plugin
 
     kernel.add_plugin(dxf_io_plugin)
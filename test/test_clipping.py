@@ -0,0 +1,241 @@
+import math
+import random
+import unittest
+
+import numpy as np
+
+from meerk40t.tools.clipping import (
+    CLIP_OPERATIONS,
+    ClipperBackend,
+    NumpyBackend,
+    _loops,
+    polygon_area,
+)
+from test.benchmark import benchmark, timed
+
+
+def square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def star(r, cx, cy, radius, count):
+    points = list()
+    for i in range(count):
+        angle = math.tau * i / count
+        distance = radius * (0.5 + 0.5 * r.random())
+        points.append(
+            (cx + distance * math.cos(angle), cy + distance * math.sin(angle))
+        )
+    return points
+
+
+def circle(cx, cy, radius, count=1000):
+    return [
+        (
+            cx + radius * math.cos(math.tau * i / count),
+            cy + radius * math.sin(math.tau * i / count),
+        )
+        for i in range(count)
+    ]
+
+
+def signed_area(polygon):
+    return (
+        sum(
+            polygon[i - 1][0] * polygon[i][1] - polygon[i][0] * polygon[i - 1][1]
+            for i in range(len(polygon))
+        )
+        / 2.0
+    )
+
+
+def perimeter(polygons):
+    return sum(
+        math.dist(polygon[i - 1], polygon[i])
+        for polygon in polygons
+        for i in range(len(polygon))
+    )
+
+
+def grid_polygons(r):
+    """
+    Polygons with their points on a coarse grid, which cross themselves, share vertices and run along each other.
+    """
+    polygons = list()
+    for i in range(r.randint(1, 2)):
+        if r.random() < 0.3:
+            x = r.randint(0, 5) * 10
+            y = r.randint(0, 5) * 10
+            polygons.append(square(x, y, r.randint(1, 6 - max(x, y) // 10) * 10))
+            continue
+        polygons.append(
+            [
+                (r.randint(0, 6) * 10, r.randint(0, 6) * 10)
+                for j in range(r.randint(3, 6))
+            ]
+        )
+    return polygons
+
+
+# Sample points of the grid polygons, off every line through two grid points.
+SAMPLE_X, SAMPLE_Y = np.meshgrid(
+    (np.arange(120) + 0.4137) * 0.5, (np.arange(120) + 0.2861) * 0.5
+)
+SAMPLE_X = SAMPLE_X.ravel()
+SAMPLE_Y = SAMPLE_Y.ravel()
+SAMPLE_OPERATIONS = {
+    "union": lambda a, b: a | b,
+    "intersection": lambda a, b: a & b,
+    "difference": lambda a, b: a & ~b,
+    "xor": lambda a, b: a ^ b,
+}
+
+
+def even_odd(polygons):
+    """
+    Whether each sample point is inside the polygons, by the even-odd rule.
+    """
+    inside = np.zeros(len(SAMPLE_X), dtype=bool)
+    for polygon in polygons:
+        for i in range(len(polygon)):
+            x0, y0 = polygon[i - 1]
+            x1, y1 = polygon[i]
+            if y0 == y1:
+                continue
+            x = x0 + (SAMPLE_Y - y0) * (x1 - x0) / (y1 - y0)
+            inside ^= ((y0 > SAMPLE_Y) != (y1 > SAMPLE_Y)) & (x > SAMPLE_X)
+    return inside
+
+
+def random_polygons(r):
+    return [
+        star(
+            r,
+            r.uniform(0, 5000000),
+            r.uniform(0, 5000000),
+            r.uniform(1000000, 10000000),
+            r.randint(3, 60),
+        )
+        for i in range(r.randint(1, 3))
+    ]
+
+
+class TestClipping(unittest.TestCase):
+    def test_clip_fuzz(self):
+        """
+        The numpy backend gives the same areas as the clipper backend, for overlapping polygons with the even-odd
+        rule. Clipper rounds the points it adds to integers, which moves the edges of its result by up to half a unit.
+        """
+        reference = ClipperBackend()
+        backend = NumpyBackend()
+        for seed in range(40):
+            r = random.Random(seed)
+            subject = random_polygons(r)
+            clip = random_polygons(r)
+            rounding = perimeter(subject) + perimeter(clip)
+            for operation in CLIP_OPERATIONS:
+                expected = polygon_area(reference.clip(subject, clip, operation))
+                area = polygon_area(backend.clip(subject, clip, operation))
+                self.assertAlmostEqual(
+                    area, expected, delta=rounding, msg=(seed, operation)
+                )
+
+    def test_clip_grid_fuzz(self):
+        """
+        Polygons on a grid, with collinear edges, shared vertices and self-crossings, cover the same sample points
+        as the operation on the sample points covered by the subject and the clip.
+        """
+        backend = NumpyBackend()
+        for seed in range(200):
+            r = random.Random(seed)
+            subject = grid_polygons(r)
+            clip = grid_polygons(r)
+            a = even_odd(subject)
+            b = even_odd(clip)
+            for operation in CLIP_OPERATIONS:
+                result = even_odd(backend.clip(subject, clip, operation))
+                expected = SAMPLE_OPERATIONS[operation](a, b)
+                self.assertEqual(
+                    np.count_nonzero(result != expected), 0, (seed, operation)
+                )
+
+    def test_clip_crossing_point(self):
+        """
+        Three edges crossing at one point, where each pair of them gives a slightly different crossing.
+        """
+        subject = [[(30, 60), (40, 0), (10, 20), (60, 10), (10, 10)]]
+        clip = [[(50, 40), (0, 10), (60, 10), (0, 40), (30, 60)]]
+        result = NumpyBackend().clip(subject, clip, "union")
+        self.assertAlmostEqual(polygon_area(result), 1507.5, delta=0.5)
+        self.assertFalse(
+            np.any(even_odd(result) != (even_odd(subject) | even_odd(clip)))
+        )
+
+    def test_clip_degenerate(self):
+        """
+        Polygons along each other, and touching at a vertex.
+        """
+        cases = (
+            ([square(0, 0, 10)], [square(0, 0, 10)], (100, 100, 0, 0)),
+            ([square(0, 0, 10)], [square(10, 0, 10)], (200, 0, 100, 200)),
+            ([square(0, 0, 10)], [square(10, 5, 10)], (200, 0, 100, 200)),
+            ([square(0, 0, 10)], [square(0, 0, 5)], (100, 25, 75, 75)),
+            ([square(0, 0, 10)], [square(10, 10, 10)], (200, 0, 100, 200)),
+            ([square(0, 0, 10)], [square(2, 2, 4)], (100, 16, 84, 84)),
+            (
+                [square(0, 0, 10), square(2, 2, 4)],
+                [square(5, 5, 10)],
+                (160, 24, 60, 136),
+            ),
+            ([square(0, 0, 10)], [], (100, 0, 100, 100)),
+        )
+        backend = NumpyBackend()
+        for subject, clip, areas in cases:
+            for operation, expected in zip(CLIP_OPERATIONS, areas):
+                area = polygon_area(backend.clip(subject, clip, operation))
+                self.assertAlmostEqual(area, expected, msg=(subject, clip, operation))
+
+    def test_clip_unbalanced(self):
+        """
+        Edges which cannot be linked into closed polygons are not linked, nor dropped.
+        """
+        starts = np.array([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)])
+        ends = np.array([(10.0, 0.0), (10.0, 10.0), (0.0, 0.0)])
+        self.assertEqual(len(_loops(starts, ends)), 1)
+        self.assertIsNone(_loops(starts[:2], ends[:2]))
+
+    def test_clip_holes(self):
+        """
+        Holes are wound against their outline.
+        """
+        subject = [square(0, 0, 10), square(2, 2, 4)]
+        result = NumpyBackend().clip(subject, [square(-5, -5, 30)], "intersection")
+        self.assertEqual(
+            sorted(signed_area(polygon) for polygon in result), [-16.0, 100.0]
+        )
+
+    @benchmark
+    def test_clip_benchmark(self):
+        """
+        Boolean operations between subpaths sampled at 1000 points, as the cag commands make them.
+        """
+        r = random.Random(3)
+        subject = [
+            circle(r.uniform(0, 10000), r.uniform(0, 10000), r.uniform(500, 2000))
+            for i in range(10)
+        ]
+        clip = [
+            circle(r.uniform(0, 10000), r.uniform(0, 10000), r.uniform(500, 2000))
+            for i in range(10)
+        ]
+        for operation in CLIP_OPERATIONS:
+            clipper_time, expected = timed(
+                ClipperBackend().clip, subject, clip, operation
+            )
+            numpy_time, result = timed(NumpyBackend().clip, subject, clip, operation)
+            self.assertAlmostEqual(
+                polygon_area(result),
+                polygon_area(expected),
+                delta=perimeter(subject) + perimeter(clip),
+            )
+            self.assertLess(numpy_time * 2, clipper_time)
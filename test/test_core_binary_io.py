@@ -0,0 +1,190 @@
+import os
+import tempfile
+import unittest
+from copy import copy
+
+from PIL import Image
+
+from meerk40t.core import binary_io
+from meerk40t.kernel import Kernel
+from meerk40t.svgelements import (
+    Arc,
+    Circle,
+    Color,
+    Matrix,
+    Path,
+    Point,
+    Polygon,
+    Polyline,
+    Rect,
+    SimpleLine,
+)
+
+from test.benchmark import benchmark, timed
+
+try:
+    from meerk40t.core import svg_io
+except ImportError:
+    svg_io = None
+
+
+def binary_kernel():
+    kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+
+    from meerk40t.device import dummydevice
+
+    kernel.add_plugin(dummydevice.plugin)
+
+    from meerk40t.core import elements
+
+    kernel.add_plugin(elements.plugin)
+
+    kernel.add_plugin(binary_io.plugin)
+
+    if svg_io is not None:
+        kernel.add_plugin(svg_io.plugin)
+    kernel()
+    kernel.console("service device start dummy 0\n")
+    return kernel
+
+
+def add_paths(elements, count):
+    branch = elements.elem_branch
+    for i in range(count):
+        path = Path(
+            "M%d,0 L%d,100 Q50,50 20,20 C10,10 30,30 40,40 A20,30 0 0,1 60,60 Z"
+            % (i, i + 10),
+            stroke="red",
+        )
+        branch.add(path=path, type="elem path")
+
+
+class TestBinaryIO(unittest.TestCase):
+    def setUp(self):
+        self.kernel = binary_kernel()
+        self.elements = self.kernel.elements
+        f, self.filename = tempfile.mkstemp(suffix=".mkb")
+        os.close(f)
+
+    def tearDown(self):
+        self.kernel.shutdown()
+        os.remove(self.filename)
+
+    def test_binary_round_trip(self):
+        elements = self.elements
+        branch = elements.elem_branch
+        group = branch.add(type="group", label="Group")
+        path = Path(
+            "M0,0 L100,100 Q50,50 20,20 C10,10 30,30 40,40 A20,30 0 0,1 60,60 Z "
+            "M5,5 h10",
+            stroke="blue",
+            fill="#00ff0080",
+            stroke_width=3.0,
+            transform=Matrix("scale(2) translate(5,7)"),
+        )
+        group.add(path=path, type="elem path", label="Outline")
+        branch.add(shape=Rect(10, 20, 30, 40, 2, 3, stroke="red"), type="elem rect")
+        branch.add(shape=Circle(50, 50, 20, stroke="red"), type="elem ellipse")
+        branch.add(shape=SimpleLine(0, 0, 5, 5, stroke="red"), type="elem line")
+        branch.add(shape=Polygon((0, 0), (10, 0), (10, 10)), type="elem polyline")
+        branch.add(shape=Polyline((0, 0), (10, 0), (10, 10)), type="elem polyline")
+        image = Image.new("L", (8, 4), color=128)
+        operations = [{"name": "grayscale", "enable": True, "lightness": 1.0}]
+        branch.add(
+            image=image,
+            matrix=Matrix("scale(3)"),
+            dpi=333,
+            type="elem image",
+            invert=True,
+            lightness=0.75,
+            operations=operations,
+        )
+        elements.note = "binary note"
+        elements.classify(list(elements.elems()))
+        types_before = [e.type for e in elements.elems()]
+        ops_before = [(op.type, len(op.children)) for op in elements.ops()]
+
+        self.assertTrue(elements.save(self.filename))
+        elements.clear_all()
+        self.assertTrue(elements.load(self.filename))
+
+        after = list(elements.elems())
+        self.assertEqual([e.type for e in after], types_before)
+        self.assertEqual(
+            [(op.type, len(op.children)) for op in elements.ops()], ops_before
+        )
+        self.assertEqual(elements.note, "binary note")
+        loaded_path = after[0]
+        self.assertEqual(loaded_path.parent.type, "group")
+        self.assertEqual(loaded_path.path, path)
+        self.assertEqual(loaded_path.matrix, path.transform)
+        self.assertEqual(loaded_path.stroke, Color("blue"))
+        self.assertEqual(loaded_path.fill, Color("#00ff0080"))
+        self.assertEqual(loaded_path.stroke_width, 3.0)
+        self.assertEqual(loaded_path.settings["label"], "Outline")
+        self.assertTrue(isinstance(loaded_path.path[4], Arc))
+        self.assertEqual(after[1].shape.ry, 3)
+        self.assertEqual(after[2].shape.rx, 20)
+        self.assertEqual(after[3].shape.x2, 5)
+        self.assertTrue(isinstance(after[4].shape, Polygon))
+        self.assertEqual(after[5].shape.points[2], Point(10, 10))
+        self.assertFalse(isinstance(after[5].shape, Polygon))
+        loaded_image = after[6]
+        self.assertEqual(loaded_image.image.size, (8, 4))
+        self.assertEqual(loaded_image.image.getpixel((1, 1)), 128)
+        self.assertEqual(loaded_image.matrix, Matrix("scale(3)"))
+        self.assertEqual(loaded_image.dpi, 333)
+        self.assertIs(loaded_image.settings["invert"], True)
+        self.assertEqual(loaded_image.settings["lightness"], 0.75)
+        self.assertEqual(loaded_image.settings["operations"], operations)
+
+    def test_binary_lazy(self):
+        """
+        Path segments are decoded on first use, after the file is closed.
+        """
+        add_paths(self.elements, 3)
+        paths = [copy(e.path) for e in self.elements.elems()]
+        self.assertTrue(self.elements.save(self.filename))
+        self.elements.clear_all()
+        self.assertTrue(self.elements.load(self.filename))
+        loaded = [e.path for e in self.elements.elems()]
+        for path in loaded:
+            self.assertIsInstance(path, binary_io.BinaryPath)
+            self.assertIsNotNone(path._geometry)
+        self.assertEqual(loaded, paths)
+        for path in loaded:
+            self.assertIsNone(path._geometry)
+
+    def test_binary_bad_file(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"<svg></svg>")
+        self.assertFalse(self.elements.load(self.filename))
+        self.assertEqual(len(list(self.elements.elems())), 0)
+
+
+@benchmark
+@unittest.skipIf(svg_io is None, "svg_io requires wxPython")
+class TestBinaryBenchmark(unittest.TestCase):
+    def test_binary_benchmark(self):
+        """
+        Saving and loading a large project as binary is faster than as svg.
+        """
+        kernel = binary_kernel()
+        try:
+            elements = kernel.elements
+            add_paths(elements, 2000)
+            directory = tempfile.mkdtemp()
+            times = dict()
+            for extension in ("svg", "mkb"):
+                filename = os.path.join(directory, "benchmark.%s" % extension)
+                save_time, result = timed(elements.save, filename)
+                elements.clear_elements()
+                load_time, result = timed(elements.load, filename)
+                self.assertEqual(len(list(elements.elems())), 2000)
+                times[extension] = save_time, load_time
+                os.remove(filename)
+            os.rmdir(directory)
+            self.assertLess(times["mkb"][0], times["svg"][0])
+            self.assertLess(times["mkb"][1], times["svg"][1])
+        finally:
+            kernel.shutdown()
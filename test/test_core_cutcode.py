@@ -1,17 +1,39 @@
 import random
+import threading
+import tracemalloc
 import unittest
+from copy import copy
 
 from PIL import Image, ImageDraw
 
-from meerk40t.core.cutcode import CutCode, LineCut, QuadCut, RasterCut
+from meerk40t.core.cutcode import (
+    CubicCut,
+    CutCode,
+    CutObject,
+    LineCut,
+    PlotCache,
+    QuadCut,
+    RasterCut,
+    plot_cache,
+)
 from meerk40t.core.node.elem_image import ImageNode
 from meerk40t.core.node.elem_path import PathNode
 from meerk40t.core.node.op_cut import CutOpNode
 from meerk40t.core.node.op_engrave import EngraveOpNode
 from meerk40t.core.node.op_image import ImageOpNode
 from meerk40t.core.node.op_raster import RasterOpNode
+from meerk40t.core.parameters import Parameters
 
-from meerk40t.svgelements import Path, Point, SVGImage, Matrix
+from meerk40t.svgelements import (
+    CubicBezier,
+    Matrix,
+    Path,
+    Point,
+    QuadraticBezier,
+    SVGImage,
+)
+from meerk40t.tools.zinglplotter import ZinglPlotter
+from test.benchmark import benchmark, timed
 
 
 class TestCutcode(unittest.TestCase):
@@ -382,3 +404,149 @@ class TestCutcode(unittest.TestCase):
                 self.assertNotEqual(y_dir, ry_dir)
             else:
                 self.assertNotEqual(x_dir, rx_dir)
+
+
+class TestCurveCuts(unittest.TestCase):
+    def test_curve_length(self):
+        cubic = CubicCut((0, 0), (1000, 0), (1000, 1000), (0, 1000))
+        expected = CubicBezier((0, 0), (1000, 0), (1000, 1000), (0, 1000)).length(
+            error=1e-9
+        )
+        self.assertAlmostEqual(cubic.length(), expected, delta=0.01)
+        cubic.reverse()
+        self.assertAlmostEqual(cubic.length(), expected, delta=0.01)
+        quad = QuadCut((0, 0), (500, 1000), (1000, 0))
+        expected = QuadraticBezier((0, 0), (500, 1000), (1000, 0)).length()
+        self.assertAlmostEqual(quad.length(), expected, delta=0.01)
+        # Straight curves are as long as the line.
+        self.assertAlmostEqual(
+            CubicCut((0, 0), (10, 0), (20, 0), (30, 0)).length(), 30.0
+        )
+        self.assertAlmostEqual(QuadCut((0, 0), (0, 0), (0, 0)).length(), 0.0)
+
+    def test_curve_plot_cache(self):
+        cubic = CubicCut((0, 0), (1000, 0), (1000, 1000), (0, 1000))
+        misses = plot_cache.misses
+        steps = list(cubic.generator())
+        plotted = ZinglPlotter.plot_cubic_bezier(0, 0, 1000, 0, 1000, 1000, 0, 1000)
+        self.assertEqual(steps, list(plotted))
+        self.assertEqual(list(cubic.generator()), steps)
+        cubic.reverse()
+        self.assertEqual(list(cubic.generator()), steps[::-1])
+        self.assertEqual(plot_cache.misses, misses + 1)
+
+        quad = QuadCut((0, 0), (500, 1000), (1000, 0))
+        self.assertEqual(
+            list(quad.generator()),
+            list(ZinglPlotter.plot_quad_bezier(0, 0, 500, 1000, 1000, 0)),
+        )
+
+    def test_plot_cache_lru(self):
+        cache = PlotCache(max_size=1200)
+
+        def plotter(n):
+            return lambda: ((i, i) for i in range(n))
+
+        cache.steps("a", plotter(20))
+        cache.steps("b", plotter(20))
+        self.assertEqual(len(cache), 2)
+        cache.steps("a", plotter(20))
+        cache.steps("c", plotter(20))
+        # b was least recently used.
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+        self.assertLessEqual(cache.size, cache.max_size)
+        steps = cache.steps("d", plotter(1000))
+        self.assertEqual(len(steps), 2000)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(list(PlotCache.generate(steps, False))[0], (999, 999))
+
+    def test_plot_cache_threads(self):
+        cache = PlotCache(max_size=20000)
+
+        def plotter(n):
+            return lambda: ((i, n) for i in range(n))
+
+        def worker(seed):
+            for i in range(500):
+                n = 10 + (seed * 7 + i * 13) % 40
+                steps = cache.steps(n, plotter(n))
+                self.assertEqual(len(steps), 2 * n)
+                self.assertEqual(steps[1], n)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.hits + cache.misses, 4000)
+        self.assertLessEqual(cache.size, cache.max_size)
+        self.assertEqual(
+            cache.size,
+            sum(PlotCache.entry_size(steps) for steps in cache._entries.values()),
+        )
+
+
+class DictLineCut(CutObject):
+    """
+    Line cut keeping its attributes in a __dict__, to compare with slots.
+    """
+
+    def __init__(self, start_point, end_point, settings=None):
+        CutObject.__init__(self, start_point, end_point, settings=settings)
+        self.raster_step = 0
+
+
+def line_cuts(cls, count, settings):
+    return [cls((i, 0), (i + 5, 10), settings=settings) for i in range(count)]
+
+
+class TestCutObjectSlots(unittest.TestCase):
+    def test_slots(self):
+        settings = {"speed": 20.0}
+        line = LineCut((0, 0), (10, 5), settings=settings)
+        cubic = CubicCut((0, 0), (1, 5), (9, 5), (10, 0), settings=settings)
+        for cut in (line, cubic):
+            self.assertFalse(hasattr(cut, "__dict__"))
+            self.assertIs(cut.settings, settings)
+            cut.reverse()
+            copied = copy(cut)
+            self.assertEqual(copied.start, cut.start)
+            self.assertFalse(copied.normal)
+            self.assertIs(copied.settings, settings)
+            self.assertEqual(list(copied.generator()), list(cut.generator()))
+        self.assertEqual(line.speed, 20.0)
+        self.assertEqual(cubic.__getstate__()["_control1"], (1, 5))
+        # Parameters of a settings dict, as the drivers use, keep their __dict__.
+        parameters = Parameters(settings)
+        self.assertEqual(parameters.speed, 20.0)
+        parameters.speed = 30.0
+        self.assertEqual(settings["speed"], 30.0)
+
+    @benchmark
+    def test_slots_benchmark(self):
+        """
+        Line cuts with slots take less memory than line cuts with a __dict__, and are not
+        slower to iterate.
+        """
+
+        def iterate(cuts):
+            total = 0
+            for cut in CutCode(cuts).flat():
+                total += cut.start[0] + cut.end[1]
+            return total
+
+        settings = dict()
+        sizes = dict()
+        times = dict()
+        totals = dict()
+        for cls in (DictLineCut, LineCut):
+            tracemalloc.start()
+            cuts = line_cuts(cls, 50000, settings)
+            sizes[cls] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            times[cls], totals[cls] = timed(iterate, cuts)
+        self.assertEqual(totals[LineCut], totals[DictLineCut])
+        self.assertLess(sizes[LineCut] * 1.1, sizes[DictLineCut])
+        self.assertLess(times[LineCut], times[DictLineCut] * 1.5)
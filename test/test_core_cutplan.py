@@ -0,0 +1,540 @@
+import math
+import unittest
+
+from PIL import Image
+
+from meerk40t.core.cutcode import CubicCut, CutCode, CutGroup, LineCut, RasterCut
+from meerk40t.core.cutplan import (
+    BlobCache,
+    CutStream,
+    ParallelCommand,
+    simplify_cutcode,
+    simplify_polyline,
+)
+from meerk40t.core.node.elem_image import ImageNode
+from meerk40t.core.node.elem_path import PathNode
+from meerk40t.core.node.node import Node
+from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.node.op_image import ImageOpNode
+from meerk40t.image.actualize import actualize
+from meerk40t.kernel import Kernel
+from meerk40t.svgelements import Matrix, Path
+
+
+def plan_kernel():
+    kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+
+    from meerk40t.device import dummydevice
+
+    kernel.add_plugin(dummydevice.plugin)
+
+    from meerk40t.core import elements
+
+    kernel.add_plugin(elements.plugin)
+
+    from meerk40t.core import planner
+
+    kernel.add_plugin(planner.plugin)
+
+    from meerk40t.rotary import rotary
+
+    kernel.add_plugin(rotary.plugin)
+    kernel()
+    kernel.console("service device start dummy 0\n")
+    return kernel
+
+
+def engrave_op(d="M0,0 L100,0 L100,100 Z"):
+    root = Node()
+    root._root = root
+    root.bootstrap = dict(reference=Node)
+    op = EngraveOpNode()
+    op._parent = root
+    op._root = root
+    node = PathNode(path=Path(d, stroke="blue"))
+    op._children.append(node)
+    node._parent = op
+    return op
+
+
+def image_op(**kwargs):
+    root = Node()
+    root._root = root
+    root.bootstrap = dict(reference=Node)
+    op = ImageOpNode()
+    op._parent = root
+    op._root = root
+    node = ImageNode(image=Image.new("L", (10, 10), 0), matrix=Matrix(), **kwargs)
+    op._children.append(node)
+    node._parent = op
+    return op
+
+
+class TestBlobCache(unittest.TestCase):
+    def test_blob_cache_key(self):
+        matrix = Matrix()
+        key = BlobCache.key(engrave_op(), matrix)
+        self.assertEqual(key, BlobCache.key(engrave_op(), matrix))
+        self.assertNotEqual(key, BlobCache.key(engrave_op(), Matrix("scale(2)")))
+        self.assertNotEqual(key, BlobCache.key(engrave_op("M0,0 L100,1"), matrix))
+        op = engrave_op()
+        op.settings["speed"] = 12.0
+        self.assertNotEqual(key, BlobCache.key(op, matrix))
+        op = engrave_op()
+        op.children[0].matrix.post_translate(5, 0)
+        self.assertNotEqual(key, BlobCache.key(op, matrix))
+        self.assertNotEqual(key, BlobCache.key(engrave_op(), matrix, 15))
+
+    def test_blob_cache_key_image(self):
+        matrix = Matrix()
+        key = BlobCache.key(image_op(), matrix)
+        self.assertEqual(key, BlobCache.key(image_op(), matrix))
+        for kwargs in (
+            dict(step_x=2),
+            dict(step_y=2),
+            dict(direction=1),
+            dict(overscan=20),
+            dict(dpi=250),
+            dict(invert=True),
+            dict(red=0.5),
+            dict(lightness=0.5),
+            dict(operations=[{"name": "grayscale"}]),
+        ):
+            self.assertNotEqual(key, BlobCache.key(image_op(**kwargs), matrix), kwargs)
+        op = image_op()
+        op.children[0].settings["dither_type"] = "Ordered"
+        self.assertNotEqual(key, BlobCache.key(op, matrix))
+
+    def test_blob_cache_lru(self):
+        cache = BlobCache(max_size=1000)
+        cuts = [LineCut((0, 0), (10, 10)), LineCut((10, 10), (0, 0))]
+        cache.put("a", cuts)
+        cache.put("b", cuts)
+        self.assertEqual(cache.size, 800)
+        self.assertIs(cache.get("a"), cuts)
+        cache.put("c", cuts)
+        # b was least recently used.
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertLessEqual(cache.size, cache.max_size)
+        cache.put("d", [LineCut((0, 0), (1, 1))] * 10)
+        self.assertNotIn("d", cache)
+        self.assertEqual(cache.hits, 1)
+
+    def test_blob_cache_copy(self):
+        image = Image.new("L", (10, 10), 0)
+        raster = RasterCut(image, 0, 0, 1, 1)
+        line = LineCut((0, 0), (10, 10))
+        copied = BlobCache.copy([raster, line])
+        self.assertIsNot(copied[0], raster)
+        self.assertIs(copied[0].image, image)
+        copied[1].reverse()
+        self.assertTrue(line.normal)
+        self.assertEqual(copied[1].start, line.end)
+
+
+class TestBlobCachePlan(unittest.TestCase):
+    def test_replan_uses_cache(self):
+        kernel = plan_kernel()
+        try:
+            elements = kernel.elements
+            kernel.console("rect 1in 1in 1in 1in\n")
+            kernel.console("circle 3in 3in 1in\n")
+            kernel.console("element* stroke red\n")
+            kernel.console("element* classify\n")
+            for op in list(elements.ops()):
+                if op.type == "op raster":
+                    op.remove_node()
+            planner = kernel.planner
+            planner.opt_blob_cache = True
+            cache = planner.blob_cache
+            results = list()
+            for i in range(2):
+                kernel.console("plan copy preprocess validate blob preopt optimize\n")
+                plan = planner.default_plan
+                results.append(
+                    [(c.start, c.end) for cc in plan.plan for c in cc.flat()]
+                )
+                kernel.console("plan clear\n")
+            self.assertTrue(results[0])
+            self.assertEqual(results[0], results[1])
+            self.assertGreater(cache.hits, 0)
+            misses = cache.misses
+
+            for e in elements.elems():
+                e.matrix.post_translate(1000, 0)
+                break
+            kernel.console("plan copy preprocess validate blob preopt optimize\n")
+            changed = [
+                (c.start, c.end)
+                for cc in planner.default_plan.plan
+                for c in cc.flat()
+            ]
+            kernel.console("plan clear\n")
+            self.assertNotEqual(changed, results[0])
+            self.assertEqual(cache.misses, misses + 1)
+        finally:
+            kernel.shutdown()
+
+    def test_replan_restores_settings(self):
+        """
+        A cached operation has the settings its preprocessing gives it.
+        """
+        kernel = plan_kernel()
+        try:
+            elements = kernel.elements
+            elements.elem_branch.add(
+                type="elem image",
+                image=Image.new("L", (100, 100), 0),
+                matrix=Matrix("scale(100)"),
+            )
+            kernel.console("element* classify\n")
+            planner = kernel.planner
+            results = list()
+            for cached in (False, True, True):
+                planner.opt_blob_cache = cached
+                kernel.console("plan copy preprocess validate\n")
+                results.append(
+                    [
+                        dict(op.settings)
+                        for op in planner.default_plan.plan
+                        if op.type == "op image"
+                    ]
+                )
+                kernel.console("plan blob preopt optimize\n")
+                kernel.console("plan clear\n")
+            self.assertGreater(planner.blob_cache.hits, 0)
+            self.assertTrue(results[0])
+            self.assertEqual(results[1], results[0])
+            self.assertEqual(results[2], results[0])
+        finally:
+            kernel.shutdown()
+
+
+class TestParallelPreprocess(unittest.TestCase):
+    def test_parallel_commands(self):
+        kernel = plan_kernel()
+        planner = kernel.planner
+        try:
+            planner.opt_parallel_preprocess = True
+            planner.opt_parallel_workers = 2
+            images = [Image.new("L", (20 + i, 10), i * 10) for i in range(3)]
+            results = dict()
+
+            def command(index):
+                def prepare():
+                    return images[index], Matrix("rotate(30)"), 1.0, 1.0
+
+                def apply(result):
+                    results[index] = result
+
+                return ParallelCommand(actualize, prepare, apply)
+
+            plan = planner.get_or_make_plan("parallel")
+            serial = list()
+            plan.commands.append(lambda: serial.append(len(results)))
+            for i in range(3):
+                plan.commands.append(command(i))
+            plan.execute()
+            self.assertEqual(serial, [0])
+            self.assertEqual(len(results), 3)
+            for i in range(3):
+                image, matrix = actualize(images[i], Matrix("rotate(30)"), 1.0, 1.0)
+                self.assertEqual(results[i][0].tobytes(), image.tobytes())
+                self.assertEqual(results[i][1], matrix)
+
+            # Local functions cannot be sent to a worker and run serially.
+            def local(value):
+                return value * 2
+
+            for i in range(3):
+                plan.commands.append(
+                    ParallelCommand(
+                        local, lambda i=i: (i,), lambda r, i=i: results.update({i: r})
+                    )
+                )
+            plan.execute()
+            self.assertEqual(results, {0: 0, 1: 2, 2: 4})
+        finally:
+            planner.opt_parallel_preprocess = False
+            kernel.shutdown()
+
+    def test_parallel_hatch(self):
+        kernel = plan_kernel()
+        planner = kernel.planner
+        try:
+            elements = kernel.elements
+            planner.opt_blob_cache = False
+            kernel.console("rect 1in 1in 1in 1in\n")
+            kernel.console("circle 3in 3in 1in\n")
+            elements.clear_operations()
+            for angle in ("0deg", "45deg"):
+                op = elements.op_branch.add(type="op hatch")
+                op.settings["hatch_angle"] = angle
+                for e in elements.elems():
+                    op.add_reference(e)
+            results = list()
+            for parallel in (False, True):
+                planner.opt_parallel_preprocess = parallel
+                kernel.console("plan copy preprocess validate blob\n")
+                results.append(
+                    [c.plot for cc in planner.default_plan.plan for c in cc.flat()]
+                )
+                kernel.console("plan clear\n")
+            self.assertTrue(results[0])
+            self.assertEqual(results[0], results[1])
+        finally:
+            planner.opt_blob_cache = True
+            planner.opt_parallel_preprocess = False
+            kernel.shutdown()
+
+
+def line_group(points, closed=False):
+    group = CutGroup(None, closed=closed)
+    settings = dict()
+    for a, b in zip(points, points[1:]):
+        cut = LineCut(a, b, settings=settings, parent=group)
+        cut.closed = closed
+        group.append(cut)
+    return group
+
+
+def distance_to_polyline(p, points):
+    best = float("inf")
+    for a, b in zip(points, points[1:]):
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        d2 = dx * dx + dy * dy
+        t = 0 if d2 == 0 else ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / d2
+        t = max(0.0, min(1.0, t))
+        best = min(best, math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy))
+    return best
+
+
+class TestSimplify(unittest.TestCase):
+    def test_simplify_polyline(self):
+        points = [(0, 0), (10, 0), (10, 0), (20, 1), (30, 0), (30, 50)]
+        self.assertEqual(simplify_polyline(points, 1.5), [0, 4, 5])
+        self.assertEqual(simplify_polyline(points, 0.4), [0, 1, 3, 4, 5])
+
+    def test_simplify_lines(self):
+        points = [(i, 0) for i in range(100)] + [(99, i) for i in range(1, 50)]
+        points.insert(20, (19, 0))
+        cutcode = CutCode([line_group(points), RasterCut(Image.new("L", (2, 2)), 0, 0, 1, 1)])
+        simplify_cutcode(cutcode, 1.0)
+        group = cutcode[0]
+        self.assertEqual([(c.start, c.end) for c in group], [((0, 0), (99, 0)), ((99, 0), (99, 49))])
+        self.assertTrue(group[0].first)
+        self.assertTrue(group[1].last)
+        self.assertIs(group[0].next, group[1])
+        self.assertIs(group[1].parent, group)
+        self.assertIsInstance(cutcode[1], RasterCut)
+
+        # Zero-length groups are removed.
+        cutcode = CutCode([line_group([(5, 5), (5, 5)]), line_group([(0, 0), (9, 0)])])
+        simplify_cutcode(cutcode, 1.0)
+        self.assertEqual(len(cutcode), 1)
+        self.assertEqual(cutcode[0][0].end, (9, 0))
+
+    def test_simplify_curves(self):
+        points = [
+            (
+                round(1000 + 800 * math.cos(2 * math.pi * i / 720)),
+                round(1000 + 800 * math.sin(2 * math.pi * i / 720)),
+            )
+            for i in range(721)
+        ]
+        group = line_group(points, closed=True)
+        cutcode = CutCode([group])
+        simplify_cutcode(cutcode, 1.0)
+        cuts = list(cutcode.flat())
+        self.assertLess(len(cuts), 20)
+        self.assertTrue(any(isinstance(c, CubicCut) for c in cuts))
+        self.assertEqual(cuts[0].start, points[0])
+        self.assertEqual(cuts[-1].end, points[-1])
+        for a, b in zip(cuts, cuts[1:]):
+            self.assertEqual(a.end, b.start)
+        for c in cuts:
+            self.assertTrue(c.closed)
+            for i in range(11):
+                # Rounded end points add up to half a unit.
+                self.assertLess(distance_to_polyline(c.point(i / 10.0), points), 1.6)
+
+    def test_simplify_plan(self):
+        kernel = plan_kernel()
+        planner = kernel.planner
+        try:
+            planner.opt_simplify = True
+            elements = kernel.elements
+            points = [
+                (1000 + 500 * math.cos(i / 100.0), 1000 + 500 * math.sin(i / 100.0))
+                for i in range(600)
+            ]
+            d = "M%f,%f " % points[0] + " ".join("L%f,%f" % p for p in points[1:])
+            elements.elem_branch.add(path=Path(d, stroke="red"), type="elem path")
+            kernel.console("element* classify\n")
+            counts = list()
+            for stages in ("blob", "blob simplify"):
+                kernel.console("plan copy preprocess validate %s\n" % stages)
+                counts.append(
+                    sum(
+                        1
+                        for cc in planner.default_plan.plan
+                        if isinstance(cc, CutCode)
+                        for c in cc.flat()
+                    )
+                )
+                kernel.console("plan clear\n")
+            self.assertEqual(counts[0], 599)
+            self.assertLess(counts[1], 20)
+        finally:
+            planner.opt_simplify = False
+            kernel.shutdown()
+
+
+class LineOp:
+    """
+    Operation stand-in producing an open two segment path for each start point.
+    """
+
+    type = "op engrave"
+
+    def __init__(self, starts):
+        self.starts = starts
+
+    def as_cutobjects(self, closed_distance=15, passes=1):
+        for x, y in self.starts:
+            yield line_group([(x, y), (x + 10, y), (x + 20, y)])
+
+
+class GroupOp(LineOp):
+    """
+    Operation stand-in producing the given cutobjects.
+    """
+
+    def as_cutobjects(self, closed_distance=15, passes=1):
+        return iter(self.starts)
+
+
+class TestCutStream(unittest.TestCase):
+    def test_stream_order(self):
+        starts = [(1000, 0), (0, 0), (500, 0), (100, 0)]
+        prepared = list()
+        stream = CutStream(window=0, plot_size=3)
+        stream.add(LineOp(starts), [lambda: prepared.append(True)])
+        self.assertEqual(len(stream), 1)
+        commands = list(stream.generate())
+        self.assertEqual(prepared, [True])
+        self.assertEqual(len(stream), 0)
+        # A window of 0 keeps the order of the operation.
+        plots = [c[1] for c in commands if c[0] == "plot"]
+        self.assertEqual([c.start for c in plots[::2]], starts)
+        self.assertEqual(commands[3], "plot_start")
+        self.assertEqual(commands.count("plot_start"), 3)
+
+        stream = CutStream(window=4)
+        stream.add(LineOp(starts))
+        plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+        self.assertEqual(
+            [c.start for c in plots[::2]], [(0, 0), (100, 0), (500, 0), (1000, 0)]
+        )
+
+        # The window slides over the copies, which may mix.
+        stream = CutStream(window=4)
+        stream.add(LineOp(starts), copies=2)
+        plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+        self.assertEqual(len(plots), 16)
+        for a, b in zip(plots[::2], plots[1::2]):
+            self.assertIs(a.parent, b.parent)
+            self.assertEqual(a.end, b.start)
+
+        # Open paths run backwards from their nearest end.
+        stream = CutStream(window=4)
+        stream.add(LineOp([(-40, 0)]))
+        plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+        self.assertEqual(
+            [(c.start, c.end) for c in plots],
+            [((-20, 0), (-30, 0)), ((-30, 0), (-40, 0))],
+        )
+
+    def test_stream_merged_ops(self):
+        """
+        Merged operations are burned one after the other, the window does not mix them.
+        """
+        stream = CutStream(window=4)
+        stream.add(LineOp([(1000, 0), (0, 0)]))
+        stream.add(LineOp([(500, 0), (100, 0)]))
+        plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+        # The second operation runs backwards from its nearest end.
+        self.assertEqual(
+            [c.start for c in plots[::2]], [(0, 0), (1000, 0), (520, 0), (120, 0)]
+        )
+        # The position carries over to the next operation.
+        stream = CutStream(window=4)
+        stream.add(LineOp([(1000, 0)]))
+        stream.add(LineOp([(0, 0), (1100, 0)]))
+        plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+        self.assertEqual([c.start for c in plots[::2]], [(1000, 0), (1100, 0), (20, 0)])
+
+    def test_stream_empty_cuts(self):
+        """
+        Cutobjects without a start are skipped, the cuts after them are still plotted.
+        """
+        empty = CutGroup(None)
+        self.assertIsNone(empty.start)
+        for window in (0, 4):
+            stream = CutStream(window=window)
+            stream.add(
+                GroupOp(
+                    [
+                        empty,
+                        line_group([(0, 0), (10, 0)]),
+                        CutGroup(None),
+                        line_group([(10, 0), (20, 0)]),
+                    ]
+                )
+            )
+            stream.add(GroupOp([CutGroup(None)]))
+            stream.add(GroupOp([line_group([(20, 0), (30, 0)])]))
+            plots = [c[1] for c in stream.generate() if c[0] == "plot"]
+            self.assertEqual(
+                [c.start for c in plots], [(0, 0), (10, 0), (20, 0)], window
+            )
+
+    def test_stream_plan(self):
+        kernel = plan_kernel()
+        planner = kernel.planner
+        try:
+            elements = kernel.elements
+            for i in range(5):
+                kernel.console("rect %din 1in 0.5in 0.5in\n" % (4 - i))
+            kernel.console("circle 3in 3in 1in\n")
+            kernel.console("element* stroke red\n")
+            kernel.console("element* classify\n")
+            for op in list(elements.ops()):
+                if op.type == "op raster":
+                    op.remove_node()
+            results = list()
+            for stream in (False, True):
+                planner.opt_stream_plan = stream
+                kernel.console("plan copy preprocess validate blob preopt optimize\n")
+                plan = planner.default_plan
+                self.assertEqual(plan.commands, [])
+                jobs = [j for j in plan.plan if hasattr(j, "generate")]
+                self.assertTrue(jobs)
+                if stream:
+                    self.assertTrue(all(isinstance(j, CutStream) for j in jobs))
+                results.append(
+                    sorted(
+                        tuple(sorted((c[1].start, c[1].end)))
+                        for j in jobs
+                        for c in j.generate()
+                        if c[0] == "plot"
+                    )
+                )
+                kernel.console("plan clear\n")
+            self.assertTrue(results[0])
+            self.assertEqual(results[0], results[1])
+        finally:
+            planner.opt_stream_plan = False
+            kernel.shutdown()
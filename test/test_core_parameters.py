@@ -0,0 +1,183 @@
+import unittest
+
+from meerk40t.core.cutcode import LineCut
+from meerk40t.core.node.op_cut import CutOpNode
+from meerk40t.core.node.op_raster import RasterOpNode
+from meerk40t.core.parameters import (
+    PARAMETER_FIELDS,
+    BaseParameters,
+    ParameterSettings,
+    ParameterSnapshot,
+    Parameters,
+)
+from test.benchmark import benchmark, timed
+
+
+def derive_by_dir(parameters):
+    """
+    Parameters.derive() as it was, over every attribute of the parameters.
+    """
+    derived_dict = dict(parameters.settings)
+    for attr in dir(parameters):
+        if attr.startswith("_"):
+            continue
+        value = getattr(parameters, attr)
+        if value is None:
+            continue
+        derived_dict[attr] = value
+    return derived_dict
+
+
+class TestParameters(unittest.TestCase):
+    def test_parameter_fields(self):
+        properties = [
+            attr
+            for attr, value in vars(BaseParameters).items()
+            if isinstance(value, property)
+        ]
+        self.assertEqual(sorted(PARAMETER_FIELDS), sorted(properties))
+
+    def test_derive_fields(self):
+        for parameters in (
+            Parameters({"speed": 25.0, "power": 500, "hex_color": "#ff0000"}),
+            Parameters({"passes": 3, "passes_custom": True, "dratio_custom": True}),
+            LineCut((0, 0), (100, 100), settings={"raster_step_x": 3}),
+        ):
+            expected = {
+                key: value
+                for key, value in derive_by_dir(parameters).items()
+                if not callable(value)
+                and (key in PARAMETER_FIELDS or key in parameters.settings)
+            }
+            self.assertEqual(parameters.derive(), expected)
+
+    def test_snapshot_values(self):
+        for parameters in (
+            Parameters(),
+            CutOpNode(speed=12.5, power=600),
+            RasterOpNode(raster_step_x=3, passes=2, passes_custom=True),
+            LineCut((0, 0), (100, 100), settings=RasterOpNode().derive()),
+        ):
+            snapshot = parameters.snapshot()
+            for attr in PARAMETER_FIELDS:
+                self.assertEqual(
+                    getattr(snapshot, attr), getattr(parameters, attr), attr
+                )
+            self.assertIs(snapshot.settings, parameters.settings)
+
+    def test_snapshot_coerced(self):
+        settings = {
+            "speed": "20.5",
+            "power": "1000.0",
+            "raster_swing": "True",
+            "overscan": "1mm",
+        }
+        snapshot = Parameters(settings).snapshot()
+        self.assertEqual(snapshot.speed, 20.5)
+        self.assertIsInstance(snapshot.power, int)
+        self.assertIs(snapshot.raster_swing, True)
+        self.assertEqual(snapshot.overscan, "1mm")
+        with self.assertRaises(AttributeError):
+            snapshot.speed = 10
+
+    def test_snapshot_cached(self):
+        settings = ParameterSettings({"speed": 30.0})
+        cuts = [LineCut((i, 0), (i, 10), settings=settings) for i in range(10)]
+        snapshot = cuts[0].snapshot()
+        self.assertIsInstance(snapshot, ParameterSnapshot)
+        for cut in cuts:
+            self.assertIs(cut.snapshot(), snapshot)
+        cuts[3].speed = 40.0
+        changed = cuts[0].snapshot()
+        self.assertIsNot(changed, snapshot)
+        self.assertEqual(changed.speed, 40.0)
+        settings["power"] = 200
+        self.assertEqual(cuts[5].snapshot().power, 200)
+        # The same settings have different defaults for different operation types.
+        cut_op = CutOpNode()
+        raster_op = RasterOpNode()
+        raster_op.settings = cut_op.settings
+        self.assertEqual(cut_op.snapshot().speed, 10.0)
+        self.assertEqual(raster_op.snapshot().speed, 150.0)
+
+    def test_snapshot_invalidated(self):
+        settings = ParameterSettings(speed=30.0, power=500.0)
+        parameters = Parameters(settings)
+        changes = (
+            lambda: settings.update(speed=40.0),
+            lambda: settings.setdefault("dpi", 500),
+            lambda: settings.pop("dpi"),
+            lambda: settings.__delitem__("power"),
+            lambda: settings.__ior__({"power": 300.0}),
+            lambda: settings.clear(),
+        )
+        for change in changes:
+            snapshot = parameters.snapshot()
+            self.assertIs(parameters.snapshot(), snapshot)
+            change()
+            self.assertIsNot(parameters.snapshot(), snapshot)
+        self.assertEqual(parameters.snapshot().speed, 10.0)
+
+    def test_snapshot_plain_dict(self):
+        settings = {"speed": 30.0}
+        parameters = Parameters(settings)
+        self.assertIs(parameters.settings, settings)
+        self.assertEqual(parameters.snapshot().speed, 30.0)
+        settings["speed"] = 40.0
+        self.assertEqual(parameters.snapshot().speed, 40.0)
+
+    def test_settings_copy(self):
+        import copy
+        import pickle
+
+        op = CutOpNode(speed=30.0)
+        self.assertIsInstance(op.settings, ParameterSettings)
+        self.assertIsInstance(CutOpNode(op).settings, ParameterSettings)
+        self.assertIsInstance(op.derive(), ParameterSettings)
+        op.snapshot()
+        for settings in (
+            pickle.loads(pickle.dumps(op.settings)),
+            copy.copy(op.settings),
+            copy.deepcopy(op.settings),
+        ):
+            self.assertIsInstance(settings, ParameterSettings)
+            self.assertEqual(settings, op.settings)
+            self.assertEqual(settings.snapshots, {})
+            settings["speed"] = 40.0
+            self.assertEqual(op.settings["speed"], 30.0)
+
+    @benchmark
+    def test_snapshot_benchmark(self):
+        """
+        A plot_start loop reading the parameters of every cut, through the snapshot of their shared settings
+        rather than the properties.
+        """
+        settings = RasterOpNode(speed=25.0, power=800).derive()
+        cuts = [LineCut((i, 0), (i, 10), settings=settings) for i in range(100000)]
+
+        def properties():
+            total = 0
+            for q in cuts:
+                total += q.power + q.speed
+                total += q.raster_step_x + q.raster_step_y
+                if q.implicit_accel is not None or q.implicit_d_ratio is not None:
+                    total += 1
+            return total
+
+        def snapshots():
+            total = 0
+            settings = None
+            for q in cuts:
+                if q.settings is not settings:
+                    settings = q.settings
+                    p_set = q.snapshot()
+                total += p_set.power + p_set.speed
+                total += p_set.raster_step_x + p_set.raster_step_y
+                if p_set.implicit_accel is not None or p_set.implicit_d_ratio is not None:
+                    total += 1
+            return total
+
+        property_time, expected = timed(properties)
+        snapshot_time, total = timed(snapshots)
+        self.assertEqual(total, expected)
+        self.assertLess(snapshot_time * 5, property_time)
@@ -0,0 +1,125 @@
+import unittest
+
+from meerk40t.core.cutcode import (
+    MILS_IN_MM,
+    CubicCut,
+    CutCode,
+    DwellCut,
+    LineCut,
+    QuadCut,
+)
+from meerk40t.core.simulation import SimulationTimeline
+from test.benchmark import benchmark, timed
+
+
+def mm(value):
+    # Cut coordinates are whole mils.
+    return round(value * MILS_IN_MM)
+
+
+def simulation_cutcode():
+    """
+    A 10mm line at 10mm/s, a 10mm travel, and a 20mm line at 20mm/s.
+    """
+    settings = {"speed": 10.0}
+    fast = {"speed": 20.0}
+    cutcode = CutCode()
+    cutcode.travel_speed = 10.0
+    cutcode.append(LineCut((0, 0), (mm(10), 0), settings=settings))
+    cutcode.append(LineCut((mm(10), mm(10)), (mm(30), mm(10)), settings=fast))
+    return cutcode
+
+
+class TestSimulationTimeline(unittest.TestCase):
+    def test_timeline_duration(self):
+        cutcode = simulation_cutcode()
+        timeline = SimulationTimeline(cutcode)
+        self.assertEqual(len(timeline), 2)
+        self.assertAlmostEqual(timeline.duration, 3.0, delta=0.01)
+        expected = cutcode.duration_cut() + cutcode.length_travel() / MILS_IN_MM / 10.0
+        self.assertAlmostEqual(timeline.duration, expected)
+        self.assertEqual(timeline.time_at(0), 0.0)
+        self.assertAlmostEqual(timeline.time_at(1), 1.0, delta=0.01)
+        self.assertEqual(timeline.time_at(2), timeline.duration)
+
+    def test_timeline_state(self):
+        timeline = SimulationTimeline(simulation_cutcode())
+        state = timeline.state(0.5)
+        self.assertEqual(state.index, 0)
+        self.assertTrue(state.laser)
+        self.assertAlmostEqual(state.t, 0.5, delta=0.01)
+        self.assertAlmostEqual(state.x, mm(5), delta=1)
+        # Travelling to the second line.
+        state = timeline.state(1.5)
+        self.assertEqual(state.index, 1)
+        self.assertFalse(state.laser)
+        self.assertAlmostEqual(state.x, mm(10))
+        self.assertAlmostEqual(state.y, mm(5), delta=1)
+        state = timeline.state(2.5)
+        self.assertEqual(state.index, 1)
+        self.assertTrue(state.laser)
+        self.assertAlmostEqual(state.x, mm(20), delta=1)
+        state = timeline.state(10)
+        self.assertEqual(state.index, 2)
+        self.assertFalse(state.laser)
+        self.assertAlmostEqual(state.x, mm(30))
+        self.assertEqual(timeline.state(-1).index, 0)
+
+    def test_timeline_curves(self):
+        settings = {"speed": 10.0}
+        cutcode = CutCode()
+        cutcode.append(QuadCut((0, 0), (100, 100), (200, 0), settings=settings))
+        cutcode.append(
+            CubicCut((200, 0), (200, 100), (300, 100), (300, 0), settings=settings)
+        )
+        cutcode.append(DwellCut((300, 0), (300, 0), settings={"dwell_time": 500}))
+        timeline = SimulationTimeline(cutcode)
+        self.assertAlmostEqual(timeline.ends[2] - timeline.burn_starts[2], 0.5)
+        quad = cutcode[0]
+        state = timeline.state(timeline.burn_starts[0] + timeline.ends[0] / 2.0)
+        self.assertAlmostEqual(state.t, 0.5)
+        self.assertAlmostEqual(state.x, quad.point(0.5)[0])
+        self.assertAlmostEqual(state.y, quad.point(0.5)[1])
+        points = timeline.partial(1, 0.5)
+        self.assertEqual(len(points), 17)
+        self.assertEqual(points[0], cutcode[1].point(0))
+        self.assertEqual(points[-1], cutcode[1].point(0.5))
+        self.assertEqual(len(timeline.partial(0, 0)), 0)
+
+    def test_timeline_monotonic(self):
+        cutcode = CutCode()
+        for i in range(200):
+            cutcode.append(
+                LineCut((i * 10, 0), (i * 10, 500), settings={"speed": 5.0 + i % 7})
+            )
+        timeline = SimulationTimeline(cutcode)
+        last = 0
+        steps = 1000
+        for i in range(steps + 1):
+            state = timeline.state(timeline.duration * i / steps)
+            self.assertGreaterEqual(state.index, last)
+            last = state.index
+        self.assertEqual(last, len(cutcode))
+
+    @benchmark
+    def test_timeline_benchmark(self):
+        """
+        Looking up frames is faster than re-slicing the completed cutcode every frame.
+        """
+        cutcode = CutCode()
+        for i in range(100000):
+            cutcode.append(LineCut((i, 0), (i, 100), settings={"speed": 10.0}))
+        timeline = SimulationTimeline(cutcode)
+        frames = 500
+
+        def lookup():
+            for i in range(frames):
+                timeline.state(timeline.duration * i / frames)
+
+        def prefix():
+            for i in range(frames):
+                cutcode[: len(cutcode) * i // frames]
+
+        lookup_time, result = timed(lookup)
+        prefix_time, result = timed(prefix)
+        self.assertLess(lookup_time, prefix_time)
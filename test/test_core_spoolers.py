@@ -0,0 +1,353 @@
+import threading
+import time
+import unittest
+
+from meerk40t.core.cutcode import CutCode, LineCut, RawCut
+from meerk40t.core.drivers import Driver
+from meerk40t.core.spoolers import (
+    JobCheckpoint,
+    SendMarks,
+    Spooler,
+    SpoolerProgress,
+)
+from meerk40t.kernel import Kernel
+
+
+class RecordingDriver(Driver):
+    def __init__(self, context):
+        super().__init__(context, name="recording")
+        self.calls = list()
+        self.event = threading.Event()
+        self.held = False
+
+    def hold_work(self):
+        return self.held
+
+    def move_abs(self, x, y):
+        self.calls.append(("move_abs", x, y))
+
+    def home(self, *values):
+        self.calls.append(("home",))
+
+    def plot(self, plot):
+        self.calls.append(("plot", plot))
+
+    def plot_start(self):
+        self.calls.append(("plot_start",))
+
+    def signal(self, signal, *args):
+        self.event.set()
+
+
+class PlottingDriver(RecordingDriver):
+    """
+    Driver which plots the queued cuts in plot_start, updating the checkpoint as it goes.
+    """
+
+    def __init__(self, context, spooler=None):
+        super().__init__(context)
+        self.spooler = spooler
+        self.queue = list()
+        self.progress = list()
+
+    def plot(self, plot):
+        self.progress.append(self.spooler.progress.cuts_done)
+        self.queue.append(plot)
+
+    def plot_start(self):
+        checkpoint = self.spooler.checkpoint
+        for q in self.queue:
+            for steps in range(3):
+                checkpoint.update(None, q, steps)
+                self.progress.append(self.spooler.progress.cuts_done)
+            checkpoint.update(None, q)
+            self.progress.append(self.spooler.progress.cuts_done)
+        self.queue.clear()
+        checkpoint.complete(None)
+
+
+class TestSpooler(unittest.TestCase):
+    def setUp(self):
+        self.kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        self.kernel()
+        self.driver = RecordingDriver(self.kernel.root)
+        self.spooler = Spooler(self.kernel.root, driver=self.driver)
+
+    def tearDown(self):
+        self.spooler.shutdown()
+        self.kernel.shutdown()
+
+    def run_job(self, *job):
+        self.driver.event.clear()
+        if job:
+            self.spooler.job(*job)
+        self.spooler.job(("signal", "done"))
+        self.assertTrue(self.driver.event.wait(5))
+
+    def test_spooler_dispatch_order(self):
+        def inner():
+            yield "move_abs", 1, 1
+            yield "home"
+
+        def outer():
+            yield "move_abs", 0, 0
+            yield inner
+            yield "unknown_command"
+            yield "move_abs", 2, 2
+
+        self.spooler.restart()
+        self.run_job(outer)
+        self.assertEqual(
+            self.driver.calls,
+            [("move_abs", 0, 0), ("move_abs", 1, 1), ("home",), ("move_abs", 2, 2)],
+        )
+        self.assertIn("move_abs", self.spooler.dispatch_table())
+        self.assertIsNone(self.spooler.dispatch_table()["unknown_command"])
+
+    def test_spooler_dispatch_instance(self):
+        """
+        Functions set on the driver instance are dispatched rather than those of its class,
+        and a new driver gets a new dispatch table.
+        """
+        self.driver.home = lambda *values: self.driver.calls.append(("replaced",))
+        self.spooler.restart()
+        self.run_job("home")
+        self.assertEqual(self.driver.calls, [("replaced",)])
+        driver = RecordingDriver(self.kernel.root)
+        self.spooler.driver = driver
+        self.driver = driver
+        self.run_job("home")
+        self.assertEqual(driver.calls, [("home",)])
+
+    def test_spooler_deep_generators(self):
+        def nested(depth):
+            if depth:
+                yield lambda: nested(depth - 1)
+            else:
+                yield "home"
+
+        self.spooler.restart()
+        self.run_job(lambda: nested(5000))
+        self.assertEqual(self.driver.calls, [("home",)])
+
+    def test_spooler_hold_and_wake(self):
+        self.driver.held = True
+        self.spooler.restart()
+        self.spooler.job("home")
+        time.sleep(0.05)
+        self.assertEqual(self.driver.calls, [])
+        self.driver.held = False
+        start = time.perf_counter()
+        self.spooler.wake()
+        self.run_job()
+        self.assertEqual(self.driver.calls, [("home",)])
+        # Waking releases the hold without waiting for the next check of the holds.
+        self.assertLess(time.perf_counter() - start, self.spooler.HOLD_WAIT / 2)
+
+    def test_spooler_latency(self):
+        self.spooler.restart()
+        # Let the spooler thread go idle.
+        time.sleep(0.05)
+        start = time.perf_counter()
+        self.run_job()
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_spooler_progress(self):
+        reports = list()
+
+        def progress(origin, value):
+            reports.append(
+                (value.cuts_done, value.cuts_total, value.finished, value.eta)
+            )
+
+        self.kernel.root.listen("spooler;progress", progress)
+        self.kernel.process_queue()
+        cutcode = CutCode([LineCut((i, 0), (i, 10)) for i in range(20)])
+        self.spooler.restart()
+        self.run_job(cutcode)
+        plots = [c for c in self.driver.calls if c[0] == "plot"]
+        self.assertEqual(len(plots), 20)
+        self.kernel.process_queue()
+        self.kernel.root.unlisten("spooler;progress", progress)
+        # Signals are coalesced, the last one reports the finished job.
+        self.assertEqual(reports[-1], (20, 20, True, 0.0))
+
+    def test_spooler_progress_plotted(self):
+        """
+        Progress follows the cuts the driver plots, not the cuts given to the driver.
+        """
+        driver = PlottingDriver(self.kernel.root, self.spooler)
+        self.spooler.driver = driver
+        self.driver = driver
+        cutcode = CutCode([LineCut((i, 0), (i, 10)) for i in range(5)])
+        self.spooler.restart()
+        self.run_job(cutcode)
+        expected = [0] * 5
+        for i in range(5):
+            expected.extend((i, i, i, i + 1))
+        self.assertEqual(driver.progress, expected)
+
+    def test_spooler_progress_eta(self):
+        progress = SpoolerProgress("job", 10)
+        self.assertIsNone(progress.eta)
+        progress.start_time -= 2.0
+        progress.cuts_done = 4
+        progress.commands = 8
+        self.assertAlmostEqual(progress.eta, 3.0, delta=0.1)
+        self.assertAlmostEqual(progress.commands_per_second, 4.0, delta=0.1)
+        self.assertFalse(progress.finished)
+        progress.end_time = progress.start_time + 2.0
+        self.assertTrue(progress.finished)
+        self.assertEqual(progress.eta, 0.0)
+        self.assertEqual(progress.elapsed, 2.0)
+
+    def test_spooler_checkpoint(self):
+        first = CutCode([LineCut((i, 0), (i, 10)) for i in range(5)])
+        second = CutCode([LineCut((i, 0), (i, 10)) for i in range(5)])
+        self.spooler.restart()
+        self.run_job(first)
+        self.assertEqual(self.spooler.checkpoint.jobs, [first])
+        self.assertIsNone(self.spooler.checkpoint.current)
+        self.assertFalse(self.spooler.busy())
+        # Nothing is executing, a new job starts a new checkpoint.
+        self.run_job(second)
+        self.assertEqual(self.spooler.checkpoint.jobs, [second])
+
+    def test_spooler_checkpoint_generated(self):
+        """
+        Cutcode produced by a generator job is checkpointed while it executes.
+        """
+        driver = PlottingDriver(self.kernel.root, self.spooler)
+        self.spooler.driver = driver
+        self.driver = driver
+        cutcode = CutCode([LineCut((i, 0), (i, 10)) for i in range(5)])
+
+        def generated():
+            yield "move_abs", 0, 0
+            yield cutcode
+
+        self.spooler.restart()
+        self.run_job(generated)
+        checkpoint = self.spooler.checkpoint
+        self.assertEqual(checkpoint.jobs, [cutcode])
+        self.assertIsNone(checkpoint.current)
+        self.assertEqual(checkpoint.position(cutcode), (4, None))
+        self.assertEqual(checkpoint.remaining(), [])
+
+
+class TestSendMarks(unittest.TestCase):
+    def test_send_marks(self):
+        marks = SendMarks()
+        called = list()
+        marks.mark(lambda: called.append("empty"))
+        self.assertEqual(called, ["empty"])
+        marks.write(10)
+        marks.mark(lambda: called.append("a"))
+        marks.write(5)
+        marks.mark(lambda: called.append("b"))
+        marks.confirm(8)
+        self.assertEqual(called, ["empty"])
+        marks.confirm(2)
+        self.assertEqual(called, ["empty", "a"])
+        marks.write(5)
+        marks.mark(lambda: called.append("c"))
+        marks.clear()
+        self.assertEqual(len(marks), 0)
+        marks.confirm(100)
+        self.assertEqual(called, ["empty", "a"])
+
+
+class MarkedPipe:
+    def __init__(self):
+        self.marks = SendMarks()
+
+    def write(self, amount):
+        self.marks.write(amount)
+
+    def mark(self, function):
+        self.marks.mark(function)
+
+
+class TestJobCheckpoint(unittest.TestCase):
+    def test_checkpoint_confirmed_cuts(self):
+        checkpoint = JobCheckpoint(interval=1, overlap=0)
+        cuts = [LineCut((i * 10, 0), (i * 10, 10)) for i in range(4)]
+        job = CutCode(list(cuts))
+        job.label = "job"
+        later = CutCode([LineCut((0, 0), (5, 5))])
+        checkpoint.jobs.extend((job, later))
+        checkpoint.start(job)
+        pipe = MarkedPipe()
+        for cut in cuts[:3]:
+            pipe.write(10)
+            checkpoint.update(pipe, cut)
+        # Nothing is confirmed, everything remains.
+        self.assertEqual(checkpoint.position(job), (-1, None))
+        remaining = checkpoint.remaining()
+        self.assertEqual(list(remaining[0].flat()), cuts)
+        self.assertEqual(remaining[0].label, "job")
+        self.assertIs(remaining[1][0], later[0])
+
+        pipe.marks.confirm(20)
+        self.assertEqual(checkpoint.position(job), (1, None))
+        remaining = checkpoint.remaining()
+        self.assertEqual(list(remaining[0].flat()), cuts[2:])
+        pipe.marks.confirm(20)
+        checkpoint.end(job)
+        self.assertEqual(list(checkpoint.remaining()[0].flat()), cuts[3:])
+
+        # Pipes without marks are confirmed right away.
+        checkpoint.start(later)
+        checkpoint.update(None, later[0])
+        checkpoint.update(pipe, cuts[3])
+        self.assertEqual(checkpoint.position(later), (0, None))
+        self.assertEqual(len(checkpoint.remaining()), 1)
+
+    def test_checkpoint_throttled_cuts(self):
+        """
+        Whole cuts are marked every interval cuts, and the last cut on completion.
+        """
+        checkpoint = JobCheckpoint(interval=256, overlap=0)
+        checkpoint.PERIOD = float("inf")
+        cuts = [LineCut((i, 0), (i, 10)) for i in range(1000)]
+        job = CutCode(list(cuts))
+        checkpoint.start(job)
+        pipe = MarkedPipe()
+        for cut in cuts:
+            pipe.write(1)
+            checkpoint.update(pipe, cut)
+        self.assertEqual(len(pipe.marks), 3)
+        checkpoint.complete(pipe)
+        self.assertEqual(len(pipe.marks), 4)
+        pipe.marks.confirm(600)
+        self.assertEqual(checkpoint.position(job), (511, None))
+        pipe.marks.confirm(400)
+        self.assertEqual(checkpoint.position(job), (999, None))
+        self.assertEqual(checkpoint.remaining(), [])
+
+    def test_checkpoint_partial_cut(self):
+        checkpoint = JobCheckpoint(interval=4, overlap=3)
+        first = LineCut((0, 0), (20, 0))
+        second = LineCut((20, 0), (20, 20))
+        job = CutCode([first, second])
+        checkpoint.start(job)
+        for steps in range(1, 21):
+            checkpoint.update(None, second, steps)
+        # Updates within the interval of the last one are skipped.
+        self.assertEqual(checkpoint.position(job), (1, 17))
+        remaining = checkpoint.remaining()[0]
+        self.assertEqual(len(remaining), 1)
+        self.assertIsInstance(remaining[0], RawCut)
+        plot = list(remaining[0].generator())
+        self.assertEqual(plot, [(20, y, 1) for y in range(14, 21)])
+
+        # The overlap reaches back into the previous cut.
+        checkpoint.start(job)
+        checkpoint.update(None, second, 1)
+        remaining = checkpoint.remaining()[0]
+        self.assertEqual(len(remaining), 2)
+        self.assertEqual(list(remaining[0].generator())[0], (19, 0, 1))
+        self.assertIs(remaining[1], second)
+
+        checkpoint.complete(None)
+        self.assertEqual(checkpoint.remaining(), [])
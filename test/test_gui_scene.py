@@ -0,0 +1,136 @@
+import unittest
+
+try:
+    from meerk40t.gui.scene.scene import Scene
+    from meerk40t.gui.scene.sceneconst import (
+        LAYER_BACKGROUND,
+        LAYER_ELEMENTS,
+        LAYER_OVERLAY,
+    )
+    from meerk40t.gui.scenewidgets.selectionwidget import (
+        MoveRotationOriginWidget,
+        MoveWidget,
+    )
+except ImportError:
+    Scene = None
+
+
+class LayerElements:
+    _emphasized_bounds = [0, 0, 10, 10]
+
+    def has_emphasis(self):
+        return True
+
+    def flat(self, **kwargs):
+        return []
+
+    def update_bounds(self, bounds):
+        self._emphasized_bounds = bounds
+
+    def ensure_positive_bounds(self):
+        pass
+
+
+class LayerContext:
+    draw_mode = 0
+
+    def __init__(self):
+        self.elements = LayerElements()
+
+    @staticmethod
+    def _(text):
+        return text
+
+    def signal(self, *args):
+        pass
+
+
+class LayerScene:
+    """
+    Scene stand-in keeping the refresh state of the real scene.
+    """
+
+    if Scene is not None:
+        request_refresh = Scene.request_refresh
+
+    def __init__(self):
+        self.context = LayerContext()
+        self.invalid_layer = LAYER_OVERLAY
+        self.screen_refresh_is_requested = False
+        self.tree_version = 0
+        self.tool_active = False
+
+    def cursor(self, cursor, always=False):
+        pass
+
+    def revised_magnet_bound(self, bounds):
+        return 0, 0
+
+
+class LayerMaster:
+    key_shift_pressed = False
+    key_control_pressed = False
+    key_alt_pressed = False
+    tool_running = False
+    show_border = True
+
+    def __init__(self):
+        self.left = 0
+        self.top = 0
+        self.right = 10
+        self.bottom = 10
+        self.width = 10
+        self.height = 10
+        self.rotation_cx = 5
+        self.rotation_cy = 5
+        self.total_delta_x = 0
+        self.total_delta_y = 0
+
+    def invalidate_rot_center(self):
+        pass
+
+    def check_rot_center(self):
+        pass
+
+
+def position(x, y, dx=0, dy=0):
+    return x, y, x - dx, y - dy, dx, dy
+
+
+@unittest.skipIf(Scene is None, "the scene requires wxPython")
+class TestSceneLayers(unittest.TestCase):
+    def test_hover_keeps_elements(self):
+        """
+        Hovering over the selection handles only recomposites the overlay.
+        """
+        scene = LayerScene()
+        master = LayerMaster()
+        widgets = (
+            MoveRotationOriginWidget(master, scene, 4),
+            MoveWidget(master, scene, 4, 2),
+        )
+        for widget in widgets:
+            for event_type in ("hover_start", "hover", "hover_end"):
+                widget.event(position(5, 5), position(5, 5), event_type)
+        self.assertEqual(scene.invalid_layer, LAYER_OVERLAY)
+        self.assertEqual(scene.tree_version, 0)
+
+    def test_drag_layers(self):
+        """
+        Moving the rotation center redraws the overlay, moving the selection redraws the elements over the cached
+        background.
+        """
+        scene = LayerScene()
+        master = LayerMaster()
+        widget = MoveRotationOriginWidget(master, scene, 4)
+        for event_type in ("leftdown", "move", "leftup"):
+            widget.event(position(5, 5, 1, 1), position(5, 5, 1, 1), event_type)
+        self.assertTrue(scene.screen_refresh_is_requested)
+        self.assertEqual(scene.invalid_layer, LAYER_OVERLAY)
+
+        widget = MoveWidget(master, scene, 4, 2)
+        widget.event(position(5, 5), position(5, 5), "leftdown")
+        self.assertEqual(scene.invalid_layer, LAYER_OVERLAY)
+        widget.event(position(6, 6, 1, 1), position(6, 6, 1, 1), "move")
+        self.assertEqual(scene.invalid_layer, LAYER_ELEMENTS)
+        self.assertNotEqual(scene.invalid_layer, LAYER_BACKGROUND)
@@ -0,0 +1,310 @@
+import unittest
+from copy import copy
+
+from PIL import Image, ImageDraw
+
+from meerk40t.core.node.rootnode import RootNode
+from meerk40t.gui.treemodel import TreeIcons, TreeUpdateQueue, icon_key
+from meerk40t.svgelements import Matrix, Path
+from test.benchmark import benchmark, timed
+
+SHAPES = (
+    "M0,0 L100,100 L0,100 Z",
+    "M0,0 Q50,100 100,0",
+    "M0,0 C0,100 100,100 100,0",
+    "M0,0 L100,0 L100,100 L0,100 Z",
+)
+
+
+class TreeContext:
+    @staticmethod
+    def _(text):
+        return text
+
+
+def render(node):
+    """
+    Thumbnail of the node, drawn with Pillow.
+    """
+    if node.type != "elem path":
+        return None
+    x0, y0, x1, y1 = node.bounds
+    scale = 19.0 / max(x1 - x0, y1 - y0, 1)
+    image = Image.new("L", (20, 20), 255)
+    points = [
+        ((p[0] - x0) * scale, (p[1] - y0) * scale)
+        for p in node.path.npoint([i / 64.0 for i in range(65)])
+    ]
+    ImageDraw.Draw(image).line(points, fill=0)
+    return image.tobytes()
+
+
+class HeadlessTree:
+    """
+    Stand-in for the wx shadow tree, keeping the items in dictionaries. Every item is expanded and the first
+    'shown' items are visible.
+    """
+
+    def __init__(self, root, shown=30):
+        self.root = root
+        self.shown = shown
+        self.labels = dict()
+        self.children = {None: list()}
+        self.images = dict()
+        self.next_item = 0
+        self.decorated = 0
+        self.updates = TreeUpdateQueue(self)
+        self.icons = TreeIcons(render)
+        root.listen(self)
+        self.apply_rebuild()
+
+    def flush(self):
+        self.updates.flush()
+        for node, icon in self.icons.refresh(self.visible()):
+            self.images[node.item] = icon
+
+    def visible(self):
+        nodes = list()
+        stack = list(reversed(self.children[None]))
+        while stack and len(nodes) < self.shown:
+            item = stack.pop()
+            nodes.append(self.labels[item])
+            stack.extend(reversed(self.children[item]))
+        return nodes
+
+    def node_attached(self, node, pos=None, **kwargs):
+        self.updates.register(node, pos=pos)
+
+    def node_detached(self, node, **kwargs):
+        item = node.item
+        for n in node.flat():
+            n.item = None
+            self.icons.discard(n)
+        self.updates.unregister(node, item)
+
+    def altered(self, node, **kwargs):
+        self.updates.post("decorate", node)
+        self.updates.post("icon", node)
+
+    def apply_rebuild(self):
+        self.labels.clear()
+        self.children = {None: list()}
+        self.images.clear()
+        self.icons.stale.clear()
+        for node in self.root.children:
+            self.register(node, None)
+
+    def register(self, node, parent_item, pos=None):
+        item = self.next_item
+        self.next_item += 1
+        node.item = item
+        self.labels[item] = node
+        self.children[item] = list()
+        siblings = self.children[parent_item]
+        if pos is None:
+            siblings.append(item)
+        else:
+            siblings.insert(pos, item)
+        self.icons.invalidate(node)
+        for child in node.children:
+            self.register(child, item)
+
+    def apply_register(self, node, pos=None):
+        if node.item is not None or node.parent.item is None:
+            return
+        self.register(node, node.parent.item, pos)
+
+    def apply_unregister(self, node, item):
+        if item is None:
+            return
+        for siblings in self.children.values():
+            if item in siblings:
+                siblings.remove(item)
+                break
+        stack = [item]
+        while stack:
+            item = stack.pop()
+            stack.extend(self.children.pop(item))
+            del self.labels[item]
+            self.images.pop(item, None)
+
+    def apply_decorate(self, node):
+        if node.item is not None:
+            self.decorated += 1
+
+    def apply_icon(self, node):
+        if node.item is not None:
+            self.icons.invalidate(node)
+
+
+class EagerTree:
+    """
+    Updates every item as it is notified, rendering every icon, as the shadow tree did before the update queue.
+    """
+
+    def __init__(self, root):
+        self.images = dict()
+        self.decorated = 0
+        root.listen(self)
+
+    def node_attached(self, node, **kwargs):
+        self.altered(node)
+
+    def altered(self, node, **kwargs):
+        self.decorated += 1
+        if node.type == "elem path":
+            self.images[id(node)] = render(node)
+
+
+def project(count, listener=None, shown=30):
+    root = RootNode(TreeContext())
+    tree = None
+    if listener is not None:
+        tree = listener(root, shown=shown) if listener is HeadlessTree else listener(root)
+    elements = root.get(type="branch elems")
+    paths = [Path(shape) for shape in SHAPES]
+    for i in range(count):
+        elements.add(
+            type="elem path",
+            path=copy(paths[i % len(paths)]),
+            matrix=Matrix(1, 0, 0, 1, i % 500, i // 500),
+        )
+    return root, tree
+
+
+class RecordingTarget:
+    def __init__(self):
+        self.applied = list()
+
+    def apply_rebuild(self):
+        self.applied.append(("rebuild",))
+
+    def apply_register(self, node, **kwargs):
+        self.applied.append(("register", node))
+
+    def apply_unregister(self, node, *args):
+        self.applied.append(("unregister", node))
+
+    def __getattr__(self, name):
+        if not name.startswith("apply_"):
+            raise AttributeError(name)
+        return lambda node: self.applied.append((name[6:], node))
+
+
+class TestTreeUpdateQueue(unittest.TestCase):
+    def test_queue_coalesces(self):
+        target = RecordingTarget()
+        scheduled = list()
+        queue = TreeUpdateQueue(target, schedule=lambda: scheduled.append(True))
+        a, b, c = object(), object(), object()
+        queue.register(a)
+        queue.post("decorate", a)
+        queue.post("decorate", a)
+        queue.post("icon", a)
+        queue.register(b)
+        queue.unregister(b)
+        queue.unregister(c, "item")
+        self.assertEqual(len(scheduled), 1)
+        self.assertFalse(queue.flush())
+        self.assertEqual(
+            target.applied,
+            [("register", a), ("unregister", c), ("decorate", a), ("icon", a)],
+        )
+        self.assertEqual(len(queue), 0)
+        queue.post("decorate", a)
+        self.assertEqual(len(scheduled), 2)
+
+    def test_queue_rebuild(self):
+        target = RecordingTarget()
+        queue = TreeUpdateQueue(target, rebuild_threshold=10)
+        nodes = [object() for i in range(20)]
+        for node in nodes:
+            queue.post("decorate", node)
+            queue.register(node)
+        queue.post("focus", nodes[0])
+        queue.post("decorate", nodes[0])
+        self.assertTrue(queue.flush())
+        self.assertEqual(target.applied, [("rebuild",), ("focus", nodes[0])])
+
+
+class TestTreeIcons(unittest.TestCase):
+    def test_icon_content_key(self):
+        root, tree = project(8)
+        nodes = list(root.get(type="branch elems").children)
+        self.assertEqual(icon_key(nodes[0]), icon_key(nodes[4]))
+        self.assertNotEqual(icon_key(nodes[0]), icon_key(nodes[1]))
+        nodes[4].stroke = "red"
+        self.assertNotEqual(icon_key(nodes[0]), icon_key(nodes[4]))
+        nodes[5].matrix.post_scale(2)
+        self.assertNotEqual(icon_key(nodes[1]), icon_key(nodes[5]))
+
+    def test_icons_lazy(self):
+        rendered = list()
+        icons = TreeIcons(lambda node: rendered.append(node) or len(rendered))
+        root, tree = project(100)
+        nodes = list(root.get(type="branch elems").children)
+        for node in nodes:
+            icons.invalidate(node)
+        refreshed = list(icons.refresh(nodes[:10]))
+        self.assertEqual(len(refreshed), 10)
+        self.assertEqual(len(rendered), len(SHAPES))
+        self.assertIs(refreshed[0][0], nodes[0])
+        self.assertEqual(refreshed[0][1], refreshed[4][1])
+        self.assertEqual(len(icons.stale), 90)
+        self.assertEqual(len(list(icons.refresh(nodes[:10]))), 0)
+
+
+class TestHeadlessTree(unittest.TestCase):
+    def test_tree_large_project(self):
+        root, tree = project(50000, HeadlessTree)
+        self.assertEqual(len(tree.updates), 1)
+        tree.flush()
+        elements = root.get(type="branch elems")
+        self.assertEqual(len(tree.children[elements.item]), 50000)
+        # Only the icons of the shown items are rendered, once per shape.
+        self.assertEqual(len(tree.images), tree.shown)
+        shown = len({icon_key(node) for node in tree.visible()})
+        self.assertEqual(tree.icons.renders, shown)
+        for node in elements.children:
+            node.altered()
+            node.altered()
+        tree.flush()
+        self.assertEqual(tree.decorated, 50000)
+        self.assertEqual(tree.icons.renders, shown)
+        # Icons are kept when the tree is rebuilt.
+        tree.updates.rebuild()
+        tree.flush()
+        self.assertEqual(len(tree.images), tree.shown)
+        self.assertEqual(tree.icons.renders, shown)
+
+    def test_tree_structure(self):
+        root, tree = project(10, HeadlessTree)
+        tree.flush()
+        elements = root.get(type="branch elems")
+        group = elements.add(type="group")
+        first = elements.children[0]
+        first.remove_node()
+        child = group.add(
+            type="elem path", path=Path(SHAPES[0]), matrix=Matrix("scale(3)")
+        )
+        transient = elements.add(type="elem path", path=Path(SHAPES[1]))
+        transient.remove_node()
+        tree.flush()
+        self.assertIsNone(first.item)
+        self.assertIsNone(transient.item)
+        self.assertEqual(tree.children[group.item], [child.item])
+        self.assertEqual(
+            [tree.labels[item] for item in tree.children[elements.item]],
+            list(elements.children),
+        )
+        self.assertIs(tree.visible()[2], elements.children[0])
+
+    @benchmark
+    def test_tree_benchmark(self):
+        """
+        Queued updates with lazy icons are faster than updating every item as it is notified.
+        """
+        eager_time, result = timed(project, 50000, EagerTree)
+        queued_time, (root, tree) = timed(project, 50000, HeadlessTree)
+        flush_time, result = timed(tree.flush)
+        self.assertLess(queued_time + flush_time, eager_time)
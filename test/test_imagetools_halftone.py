@@ -0,0 +1,75 @@
+import math
+import unittest
+
+from PIL import Image, ImageDraw
+
+from meerk40t.image.imagetools import RasterScripts
+from meerk40t.kernel import Kernel
+from meerk40t.svgelements import Matrix
+from test.benchmark import benchmark, timed
+
+
+def mean(image):
+    histogram = image.histogram()
+    return sum(i * c for i, c in enumerate(histogram)) / sum(histogram)
+
+
+class TestHalftone(unittest.TestCase):
+    def test_halftone_dot_area(self):
+        """
+        Dot areas follow the gray value of the cells.
+        """
+        image = Image.new("L", (200, 200), 128)
+        half_tone = RasterScripts.halftone(image, sample=10, angle=0, oversample=0)
+        self.assertEqual(half_tone.size, image.size)
+        expected = 255 * math.pi / 4 * 128 / 255
+        self.assertAlmostEqual(mean(half_tone), expected, delta=3)
+
+        half_tone = RasterScripts.halftone(
+            image, sample=10, angle=0, oversample=0, black=True
+        )
+        expected = 255 - 255 * math.pi / 4 * 127 / 255
+        self.assertAlmostEqual(mean(half_tone), expected, delta=3)
+
+    def test_halftone_matches_drawing(self):
+        image = Image.linear_gradient("L").resize((120, 90))
+        ImageDraw.Draw(image).ellipse((10, 10, 60, 60), fill=30)
+        dots = RasterScripts._halftone_dots(image, (360, 270), 6, 3.0, 2, False)
+        drawn = RasterScripts._halftone_draw(image, (360, 270), 6, 3.0, 2, False)
+        self.assertEqual(dots.size, drawn.size)
+        # Drawn ellipses include their outline pixels, so they come out larger.
+        self.assertLessEqual(mean(dots), mean(drawn))
+        self.assertAlmostEqual(mean(dots), mean(drawn), delta=25)
+
+    def test_halftone_command(self):
+        kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        try:
+            from meerk40t.core import elements
+            from meerk40t.image import imagetools
+
+            kernel.add_plugin(elements.plugin)
+            kernel.add_plugin(imagetools.plugin)
+            kernel()
+            image = Image.new("L", (50, 40), 200)
+            node = kernel.elements.elem_branch.add(
+                image=image, matrix=Matrix(), type="elem image"
+            )
+            node.emphasized = True
+            kernel.console("image halftone 2 5 0deg -s 2\n")
+            self.assertEqual(node.image.size, (100, 80))
+            self.assertGreater(mean(node.image), 0)
+        finally:
+            kernel.shutdown()
+
+    @benchmark
+    def test_halftone_benchmark(self):
+        """
+        The vectorized halftone, rotations included, is faster than drawing the dots.
+        """
+        image = Image.linear_gradient("L").resize((600, 600))
+        vectorized, result = timed(RasterScripts.halftone, image, sample=4)
+        rotated = image.rotate(22.0, expand=1)
+        size = rotated.size[0] * 3, rotated.size[1] * 3
+        drawn, dots = timed(RasterScripts._halftone_draw, rotated, size, 4, 3.0, 2, False)
+        self.assertEqual(result.size, image.size)
+        self.assertLess(vectorized * 3, drawn)
@@ -0,0 +1,153 @@
+import unittest
+
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+from meerk40t.image.imagetools import RasterScripts, WizardPipeline
+from meerk40t.svgelements import Matrix
+
+
+class ImageNode:
+    def __init__(self, image, matrix):
+        self.image = image
+        self.matrix = matrix
+
+
+def source_image():
+    image = Image.linear_gradient("L").resize((300, 200)).convert("RGB")
+    ImageDraw.Draw(image).ellipse((50, 50, 150, 150), fill=(200, 30, 30))
+    return image
+
+
+def grayscale():
+    return {
+        "name": "grayscale",
+        "enable": True,
+        "invert": False,
+        "red": 1.0,
+        "green": 1.0,
+        "blue": 1.0,
+        "lightness": 1.0,
+    }
+
+
+def preview_difference(ops, preview):
+    """
+    Mean difference between the preview and the full resolution result scaled down to
+    the size of the preview.
+    """
+    image = source_image().resize((600, 400))
+    pipeline = WizardPipeline()
+    full = pipeline.process(image, Matrix(), ops)[0]
+    scaled = pipeline.process(image, Matrix(), ops, preview=preview)[0]
+    full = full.resize(scaled.size, Image.BOX)
+    difference = ImageChops.difference(full.convert("L"), scaled.convert("L"))
+    return scaled.size, ImageStat.Stat(difference).mean[0]
+
+
+class TestWizardPipeline(unittest.TestCase):
+    def test_pipeline_matches_wizard(self):
+        image = source_image()
+        pipeline = WizardPipeline()
+        for script in ("Gravy", "Xin", "Newsy", "Simple", "Stipo", "Gold"):
+            ops = getattr(RasterScripts, "raster_script_%s" % script.lower())()
+            expected = RasterScripts.wizard_image(ImageNode(image, Matrix()), ops)
+            result = pipeline.process(image, Matrix(), ops)
+            self.assertEqual(result[0].mode, expected[0].mode)
+            self.assertEqual(result[0].tobytes(), expected[0].tobytes())
+            self.assertEqual(result[1], expected[1])
+            self.assertEqual(result[2], expected[2])
+        self.assertEqual(image.tobytes(), source_image().tobytes())
+
+    def test_pipeline_recomputes_later_steps(self):
+        image = source_image()
+        pipeline = WizardPipeline()
+        ops = RasterScripts.raster_script_newsy()
+        pipeline.process(image, Matrix(), ops)
+        self.assertEqual(pipeline.hits, 0)
+        misses = pipeline.misses
+
+        pipeline.process(image, Matrix(), ops)
+        self.assertEqual(pipeline.misses, misses)
+
+        # Changing the halftone recomputes the halftone and the dither after it.
+        ops[3]["sample"] = 8
+        hits = pipeline.hits
+        result = pipeline.process(image, Matrix(), ops)
+        self.assertEqual(pipeline.misses, misses + 2)
+        self.assertEqual(pipeline.hits, hits + 4)
+        expected = RasterScripts.wizard_image(ImageNode(image, Matrix()), ops)
+        self.assertEqual(result[0].tobytes(), expected[0].tobytes())
+
+        # Values of disabled operations do not matter.
+        ops[2]["enable"] = False
+        pipeline.process(image, Matrix(), ops)
+        misses = pipeline.misses
+        ops[2]["contrast"] = 50
+        pipeline.process(image, Matrix(), ops)
+        self.assertEqual(pipeline.misses, misses)
+
+    def test_pipeline_preview(self):
+        image = source_image()
+        pipeline = WizardPipeline()
+        ops = RasterScripts.raster_script_simple()
+        full, full_matrix, step = pipeline.process(image, Matrix(), ops)
+        preview, preview_matrix, preview_step = pipeline.process(
+            image, Matrix(), ops, preview=150
+        )
+        self.assertEqual(step, preview_step)
+        self.assertEqual(preview.size, (50, 33))
+        self.assertEqual(full.size, (100, 66))
+        # The preview covers the same area as the full image.
+        bounds = preview_matrix.point_in_matrix_space(preview.size)
+        full_bounds = full_matrix.point_in_matrix_space(full.size)
+        self.assertAlmostEqual(bounds[0], full_bounds[0], delta=6)
+        self.assertAlmostEqual(bounds[1], full_bounds[1], delta=6)
+
+    def test_pipeline_memory_cap(self):
+        image = source_image()
+        ops = RasterScripts.raster_script_gravy()
+        unlimited = WizardPipeline()
+        unlimited.process(image, Matrix(), ops)
+        pipeline = WizardPipeline(max_size=unlimited.size // 2)
+        result = pipeline.process(image, Matrix(), ops)
+        self.assertLessEqual(pipeline.size, pipeline.max_size)
+        self.assertLess(len(pipeline), len(unlimited))
+        expected = unlimited.process(image, Matrix(), ops)
+        self.assertEqual(result[0].tobytes(), expected[0].tobytes())
+        pipeline.clear()
+        self.assertEqual(pipeline.size, 0)
+        self.assertEqual(len(pipeline), 0)
+
+    def test_pipeline_preview_scaled(self):
+        """
+        Sizes in pixels are scaled for the preview, which matches the full resolution
+        result scaled down.
+        """
+        crop = {"name": "crop", "enable": True, "bounds": (100, 100, 500, 300)}
+        size, difference = preview_difference([crop, grayscale()], 300)
+        self.assertEqual(size, (200, 100))
+        self.assertLess(difference, 1.0)
+
+        halftone = {
+            "name": "halftone",
+            "enable": True,
+            "black": True,
+            "sample": 20,
+            "angle": 22,
+            "oversample": 2,
+        }
+        size, difference = preview_difference([grayscale(), halftone], 300)
+        self.assertEqual(size, (300, 200))
+        # Unscaled cells are twice the size of the scaled down cells, about 90.
+        self.assertLess(difference, 10.0)
+
+        unsharp = {
+            "name": "unsharp_mask",
+            "enable": True,
+            "percent": 500,
+            "radius": 8,
+            "threshold": 0,
+        }
+        size, difference = preview_difference([grayscale(), unsharp], 300)
+        # An unscaled radius differs by about 4.4.
+        self.assertLess(difference, 2.5)
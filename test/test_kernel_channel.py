@@ -0,0 +1,136 @@
+import unittest
+
+from meerk40t.kernel import LEVEL_DEBUG, LEVEL_ERROR, LEVEL_WARNING, Channel
+from test.benchmark import benchmark, timed
+
+
+class Message:
+    """
+    Message argument counting how often it is formatted.
+    """
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "message"
+
+
+class TestChannel(unittest.TestCase):
+    def test_channel_format_args(self):
+        channel = Channel("test")
+        lines = list()
+        channel.watch(lines.append)
+        channel("Data: %s %d", "ok", 5)
+        channel("100%")
+        channel(lambda: "deferred")
+        self.assertEqual(lines, ["    Data: ok 5", "    100%", "    deferred"])
+
+    def test_channel_unwatched_deferred(self):
+        channel = Channel("test")
+        message = Message()
+        called = list()
+        self.assertFalse(channel.enabled())
+        channel("Data: %s", message)
+        channel(lambda: called.append(True))
+        self.assertEqual(message.formatted, 0)
+        self.assertEqual(called, [])
+        lines = list()
+        channel.watch(lines.append)
+        self.assertTrue(channel.enabled())
+        channel("Data: %s", message)
+        self.assertEqual(message.formatted, 1)
+        self.assertEqual(lines, ["    Data: message"])
+
+    def test_channel_levels(self):
+        channel = Channel("test", level=LEVEL_WARNING)
+        lines = list()
+        channel.watch(lines.append)
+        message = Message()
+        channel("Data: %s", message, level=LEVEL_DEBUG)
+        channel("Info")
+        channel("Error: %s", message, level=LEVEL_ERROR)
+        self.assertEqual(lines, ["    Error: message"])
+        self.assertEqual(message.formatted, 1)
+        self.assertFalse(channel.enabled(LEVEL_DEBUG))
+        self.assertTrue(channel.enabled(LEVEL_ERROR))
+        channel.level = 0
+        channel("Data", level=LEVEL_DEBUG)
+        self.assertEqual(lines[-1], "    Data")
+
+    def test_channel_ring_buffer(self):
+        channel = Channel("test", buffer_size=3, line_end="\n")
+        message = Message()
+        for i in range(10):
+            channel("Line %d %s", i, message)
+        channel(b"\x01\x02")
+        self.assertEqual(len(channel.buffer), 3)
+        # Captured messages are only formatted when replayed.
+        self.assertEqual(message.formatted, 0)
+        lines = list()
+        channel.watch(lines.append)
+        self.assertEqual(
+            lines, ["    Line 8 message\n    ", "    Line 9 message\n    ", b"\x01\x02"]
+        )
+        self.assertEqual(message.formatted, 2)
+        channel("Watched")
+        self.assertEqual(len(channel.buffer), 3)
+        replayed = list()
+        channel.watch(replayed.append)
+        self.assertEqual(replayed, lines[1:])
+
+    def test_channel_timestamp_replay(self):
+        channel = Channel("test", buffer_size=5, timestamp=True)
+        channel("Captured")
+        lines = list()
+        channel.watch(lines.append)
+        channel("Watched")
+        self.assertRegex(lines[0], r"^\[\d\d:\d\d:\d\d\]     Captured$")
+        self.assertRegex(lines[1], r"^\[\d\d:\d\d:\d\d\]     Watched$")
+
+    def test_channel_watched_by_channel(self):
+        channel = Channel("test")
+        console = Channel("console", level=LEVEL_WARNING)
+        lines = list()
+        console.watch(lines.append)
+        channel.watch(console)
+        channel("Data: %s", "ok", level=LEVEL_DEBUG)
+        channel("Error: %s", "bad", level=LEVEL_ERROR)
+        self.assertEqual(lines, ["    Error: bad"])
+
+    @benchmark
+    def test_channel_benchmark(self):
+        """
+        Unwatched channels cost about a function call in the grbl send loop, which no longer formats its messages.
+        """
+        responses = [
+            "ok",
+            "<Idle|MPos:0.000,0.000,0.000|FS:0,0|WCO:0.000,0.000,0.000>",
+            "error:20",
+        ] * 100000
+
+        def noop(*args, **kwargs):
+            pass
+
+        def send_loop(channel):
+            for response in responses:
+                channel("Data: %s", response, level=LEVEL_DEBUG)
+
+        def eager_loop(channel):
+            for response in responses:
+                channel("Data: %s" % response)
+
+        noop_time, result = timed(send_loop, noop)
+        unwatched_time, result = timed(send_loop, Channel("grbl"))
+        eager_time, result = timed(eager_loop, Channel("grbl"))
+        buffered_time, result = timed(send_loop, Channel("grbl", buffer_size=20))
+        watched = Channel("grbl")
+        watched.watch(noop)
+        watched_time, result = timed(send_loop, watched)
+        watched.level = LEVEL_WARNING
+        filtered_time, result = timed(send_loop, watched)
+        self.assertLess(unwatched_time, noop_time * 5)
+        self.assertLess(unwatched_time, eager_time)
+        self.assertLess(buffered_time, watched_time)
+        self.assertLess(filtered_time, watched_time)
@@ -0,0 +1,96 @@
+import sys
+import types
+import unittest
+
+from meerk40t.kernel import (
+    LIFECYCLE_KERNEL_SHUTDOWN,
+    Kernel,
+    LazyPlugin,
+    StartupProfiler,
+)
+
+
+def _lazy_module(name, calls):
+    """
+    Creates a fake plugin module in sys.modules, recording the lifecycles it receives.
+    """
+
+    def plugin(kernel, lifecycle):
+        calls.append(lifecycle)
+        if lifecycle == "register":
+
+            @kernel.console_command("lazytest", output_type="lazytest")
+            def lazytest(channel, **kwargs):
+                channel("lazy command executed")
+                return "lazytest", "lazy"
+
+    module = types.ModuleType(name)
+    module.plugin = plugin
+    sys.modules[name] = module
+    return module
+
+
+class TestLazyPlugin(unittest.TestCase):
+    def tearDown(self):
+        sys.modules.pop("meerk40t_lazy_test", None)
+
+    def test_lazy_plugin_loads_on_command(self):
+        calls = []
+        kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        _lazy_module("meerk40t_lazy_test", calls)
+        lazy = LazyPlugin("meerk40t_lazy_test", commands=("command/None/lazytest",))
+        kernel.add_plugin(lazy)
+        kernel()
+        try:
+            self.assertFalse(lazy.loaded)
+            self.assertEqual(calls, [])
+            self.assertIsNotNone(kernel.lookup("command/None/lazytest"))
+
+            output = []
+            kernel.channel("console").watch(output.append)
+            kernel.console("lazytest\n")
+            self.assertTrue(lazy.loaded)
+            self.assertTrue(any("lazy command executed" in e for e in output))
+            # Every lifecycle seen by the lazy plugin is replayed in order.
+            self.assertEqual(calls[0], "plugins")
+            self.assertLess(calls.index("register"), calls.index("boot"))
+            self.assertIn("mainloop", calls)
+        finally:
+            kernel.set_kernel_lifecycle(kernel, LIFECYCLE_KERNEL_SHUTDOWN)
+        # Once loaded, lifecycles are forwarded to the real plugin.
+        self.assertIn("shutdown", calls)
+
+    def test_lazy_plugin_requires(self):
+        kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        lazy = LazyPlugin(
+            "meerk40t_lazy_test",
+            commands=("command/None/lazytest",),
+            requires=("meerk40t_package_that_does_not_exist",),
+        )
+        kernel.add_plugin(lazy)
+        kernel()
+        try:
+            self.assertIsNone(kernel.lookup("command/None/lazytest"))
+        finally:
+            kernel.shutdown()
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def test_profiler_records_plugins(self):
+        def plugin(kernel, lifecycle):
+            pass
+
+        kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        profiler = StartupProfiler()
+        kernel.startup_profiler = profiler
+        kernel.add_plugin(plugin)
+        kernel.add_plugin(plugin)
+        kernel()
+        kernel.shutdown()
+        self.assertEqual(len(kernel._kernel_plugins), 1)
+        self.assertIn(__name__, profiler.plugin_times)
+        self.assertIn("register", profiler.plugin_times[__name__])
+        self.assertIn("boot", profiler.lifecycle_order)
+        report = []
+        profiler.report(report.append)
+        self.assertTrue(report[0].startswith("Startup profile"))
@@ -0,0 +1,184 @@
+import random
+import re
+import unittest
+
+from meerk40t.kernel import Kernel, Registry, Service, literal_prefix
+from test.benchmark import benchmark, timed
+
+PATTERNS = (
+    "command/.*",
+    "command/None/.*",
+    "command/elements/.*",
+    "command/.*/.*",
+    "command/None/c1.*",
+    "tree/elem.*/.*",
+    "tree/(elem path|elem rect)/.*",
+    "button/control/.*",
+    "format/.*",
+    "provider/device/.*",
+    "service/(.*)/active",
+    "choices/.*",
+    ".*/c2",
+    "dev/.*",
+    "dev/value",
+    "x?command/None/.*",
+    "commands?/None/c3",
+    "comman[d]/None/c4",
+    "nothing/.*",
+)
+
+
+class Reference:
+    """
+    The registry lookups of the kernel before the registry was indexed, scanning every registered path.
+    """
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+
+    def services_active(self):
+        registered = self.kernel._registered
+        for r in list(registered):
+            result = re.match("service/(.*)/active", r)
+            if result:
+                yield result.group(1), registered[r]
+
+    def find(self, *args):
+        match = re.compile("/".join(args))
+        for domain, service in self.services_active():
+            for r in dict(service._registered):
+                if match.match(r):
+                    yield service._registered[r], r, list(r.split("/"))[-1]
+        registered = self.kernel._registered
+        for r in dict(registered):
+            if match.match(r):
+                yield registered[r], r, list(r.split("/"))[-1]
+
+    def lookup(self, *args):
+        value = "/".join(args)
+        for domain, service in self.services_active():
+            try:
+                return service._registered[value]
+            except KeyError:
+                pass
+        return self.kernel._registered.get(value)
+
+
+def registry_kernel(count=200, seed=1):
+    kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+    r = random.Random(seed)
+    prefixes = (
+        "command/None/",
+        "command/elements/",
+        "tree/elem path/",
+        "tree/elem rect/",
+        "tree/group/",
+        "button/control/",
+        "format/",
+        "provider/device/",
+        "choices/",
+    )
+    for i in range(count):
+        kernel.register("%sc%d" % (r.choice(prefixes), i), i)
+    services = list()
+    for i in range(3):
+        service = Service(kernel, "registry%d" % i)
+        for j in range(count // 4):
+            service.register("%sc%d" % (r.choice(prefixes), j), (i, j))
+        service.register("dev/value", i)
+        kernel.add_service("dev", service)
+        services.append(service)
+    return kernel, services
+
+
+class TestRegistry(unittest.TestCase):
+    def test_literal_prefix(self):
+        self.assertEqual(literal_prefix("command/None/.*"), "command/None/")
+        self.assertEqual(literal_prefix("service/(.*)/active"), "service/")
+        self.assertEqual(literal_prefix("commands?/x"), "command")
+        self.assertEqual(literal_prefix("command+"), "command")
+        self.assertEqual(literal_prefix("a|b"), "")
+        self.assertEqual(literal_prefix("\\w+"), "")
+        self.assertEqual(literal_prefix("format/svg"), "format/svg")
+
+    def test_registry_order(self):
+        registry = Registry()
+        for path in ("b/2", "a/1", "b/1", "c/1", "b/3"):
+            registry[path] = path
+        registry["b/2"] = "again"
+        del registry["b/1"]
+        registry["b/1"] = "moved"
+        self.assertEqual(registry.prefixed("b/"), ["b/2", "b/3", "b/1"])
+        self.assertEqual(registry.matching("b/[12]"), ["b/2", "b/1"])
+        self.assertEqual(registry.matching(".*/1"), ["a/1", "c/1", "b/1"])
+        generation = registry.generation
+        self.assertEqual(registry.pop("a/1"), "a/1")
+        self.assertIsNone(registry.pop("a/1", None))
+        registry.setdefault("d/1", 4)
+        self.assertEqual(registry.generation, generation + 2)
+        self.assertEqual(registry.prefixed(""), list(registry))
+        registry.clear()
+        self.assertEqual(registry.prefixed(""), [])
+
+    def test_registry_equivalence(self):
+        kernel, services = registry_kernel()
+        reference = Reference(kernel)
+
+        def check():
+            for pattern in PATTERNS:
+                self.assertEqual(
+                    list(kernel.find(pattern)), list(reference.find(pattern)), pattern
+                )
+                self.assertEqual(
+                    list(kernel.match(pattern, suffix=True)),
+                    [sname for obj, r, sname in reference.find(pattern)],
+                )
+            for path in ("dev/value", "format/c5", "command/None/c1", "missing"):
+                self.assertEqual(kernel.lookup(path), reference.lookup(path))
+            self.assertEqual(
+                list(kernel.services_active()), list(reference.services_active())
+            )
+
+        check()
+        # Changes to the kernel, a service and activation invalidate the results.
+        kernel.register("command/None/c1x", "new")
+        kernel.unregister(kernel._registered.prefixed("format/")[0])
+        check()
+        services[0].register("format/service", "service")
+        services[1].register("format/inactive", "inactive")
+        check()
+        kernel.activate_service_index("dev", 1)
+        check()
+        kernel.deactivate("dev")
+        kernel.unregister("service/dev/active")
+        check()
+        kernel.activate("dev", services[2])
+        services[2].unregister("dev/value")
+        check()
+
+    def test_registry_memoized(self):
+        kernel, services = registry_kernel()
+        found = kernel._find("command/None/.*")
+        self.assertIs(kernel._find("command/None/.*"), found)
+        services[0].register("command/None/memo", None)
+        self.assertIsNot(kernel._find("command/None/.*"), found)
+
+    @benchmark
+    def test_registry_benchmark(self):
+        """
+        Command dispatch lookups, indexed and memoized, against scanning every registered path.
+        """
+        kernel, services = registry_kernel(5000)
+        reference = Reference(kernel)
+        dispatch = ("command/None/.*", "command/elements/.*", "tree/elem path/.*")
+
+        def lookups(finder):
+            for i in range(200):
+                for pattern in dispatch:
+                    for result in finder(pattern):
+                        pass
+                list(finder("dev/value"))
+
+        scan_time, result = timed(lookups, reference.find)
+        indexed_time, result = timed(lookups, kernel.find)
+        self.assertLess(indexed_time * 10, scan_time)
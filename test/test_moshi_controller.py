@@ -0,0 +1,156 @@
+import threading
+import unittest
+
+from meerk40t.kernel import Kernel
+from meerk40t.moshi.device import STATUS_OK, MoshiController
+from meerk40t.moshi.moshiblob import MoshiBlob
+from test.benchmark import benchmark, timed
+
+
+class MockConnection:
+    """
+    Mock CH341 connection recording the packets written, without any USB delays.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.packets = 0
+        self.addresses = list()
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, packet):
+        self.data += packet
+        self.packets += 1
+
+    def write_addr(self, packet):
+        self.addresses.append(packet)
+
+    def get_status(self):
+        return [255, STATUS_OK, 0, 0, 0, 1]
+
+
+class GatedConnection(MockConnection):
+    """
+    Mock connection holding the send thread inside a write, until the test resumes it.
+    """
+
+    def __init__(self, gate_packet):
+        super().__init__()
+        self.gate_packet = gate_packet
+        self.writing = threading.Event()
+        self.resume = threading.Event()
+
+    def write(self, packet):
+        super().write(packet)
+        if self.packets == self.gate_packet:
+            self.writing.set()
+            self.resume.wait(5)
+
+
+def program(size):
+    blob = MoshiBlob()
+    blob.data = bytearray(i & 0xFF for i in range(size))
+    return blob
+
+
+class TestMoshiController(unittest.TestCase):
+    def setUp(self):
+        self.kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        from meerk40t.device.ch341 import ch341
+
+        self.kernel.add_plugin(ch341.plugin)
+        self.kernel()
+        context = self.kernel.root
+        context.label = "moshi-test"
+        context.packet_count = 0
+        self.context = context
+        self.controller = MoshiController(context)
+        self.connection = MockConnection()
+        self.controller._connection = self.connection
+
+    def tearDown(self):
+        self.controller.shutdown()
+        self.kernel.shutdown()
+
+    def test_moshi_send_programs(self):
+        controller = self.controller
+        programs = [program(1000), program(64), program(33)]
+        expected = b"".join(bytes(p.data) for p in programs)
+        controller._programs.extend(programs)
+        controller.start()
+        thread = controller._thread
+        if thread is not None:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(bytes(self.connection.data), expected)
+        self.assertEqual(self.connection.packets, 32 + 2 + 2)
+        self.assertEqual(len(controller), 0)
+        self.assertEqual(self.context.packet_count, 36)
+
+    def test_moshi_buffer_offset(self):
+        controller = self.controller
+        controller._set_buffer(program(100).data)
+        self.assertEqual(len(controller), 100)
+        self.assertTrue(controller.process_buffer())
+        self.assertEqual(controller.buffer_remaining(), 68)
+        self.assertIn(str(bytearray(range(32, 100))), controller.viewbuffer())
+        controller.estop()
+        self.assertEqual(len(controller), 0)
+        self.assertFalse(controller.process_buffer())
+
+    def test_moshi_estop_while_sending(self):
+        """
+        Estop while a packet is being written drops the program, the send thread does not
+        advance the offset in the emptied buffer and later programs are still sent.
+        """
+        controller = self.controller
+        connection = GatedConnection(5)
+        controller._connection = connection
+        controller.push_program(program(1000))
+        self.assertTrue(connection.writing.wait(5))
+        controller.estop()
+        connection.resume.set()
+        thread = controller._thread
+        if thread is not None:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(connection.packets, 5)
+        self.assertEqual(controller.buffer_remaining(), 0)
+        self.assertEqual(len(controller), 0)
+
+        follow = program(64)
+        controller.push_program(follow)
+        thread = controller._thread
+        if thread is not None:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(connection.packets, 7)
+        self.assertEqual(bytes(connection.data[-64:]), bytes(follow.data))
+        self.assertEqual(len(controller), 0)
+
+    @benchmark
+    def test_moshi_send_benchmark(self):
+        """
+        Sending from an offset has a higher throughput than removing each packet from the
+        buffer, which copies the rest of the buffer for every packet.
+        """
+        controller = self.controller
+        size = 8 * 1048576
+        controller._set_buffer(program(size).data)
+        elapsed, result = timed(controller._send_buffer)
+        self.assertEqual(len(self.connection.data), size)
+
+        def send_sliced(buffer):
+            while len(buffer):
+                packet = buffer[:32]
+                self.connection.write(packet)
+                buffer = buffer[32:]
+
+        old_size = 1048576
+        old_elapsed, result = timed(send_sliced, program(old_size).data)
+        self.assertLess(old_size / old_elapsed * 2, size / elapsed)
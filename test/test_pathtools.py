@@ -0,0 +1,136 @@
+import math
+import unittest
+
+from meerk40t.core.node.op_hatch import flatten, hatch_fill
+from meerk40t.svgelements import Angle, Circle, Path, Polygon, Rect
+from meerk40t.tools.pathtools import EulerianFill, ScanlineFill
+from test.benchmark import benchmark, timed
+
+
+def circle(cx, cy, r, count=180):
+    return [
+        (
+            cx + r * math.cos(2 * math.pi * i / count),
+            cy + r * math.sin(2 * math.pi * i / count),
+        )
+        for i in range(count)
+    ]
+
+
+def gear(cx, cy, r, teeth):
+    points = []
+    for i in range(teeth * 4):
+        a = 2 * math.pi * i / (teeth * 4)
+        rr = r if (i // 2) % 2 == 0 else r * 0.8
+        points.append((cx + rr * math.cos(a), cy + rr * math.sin(a)))
+    return Path(Polygon(points))
+
+
+def logo():
+    shapes = [
+        gear(1000, 1000, 800, 24),
+        Path(Circle(1000, 1000, 300)),
+        Path("M100,100 C500,-200 900,400 1300,100 L1300,300 Q700,800 100,300 Z"),
+    ]
+    for i in range(20):
+        shapes.append(Path(Circle(300 + i * 80, 1900, 30)))
+    paths = [Path(sp) for shape in shapes for sp in shape.as_subpaths()]
+    for path in paths:
+        path.approximate_arcs_with_cubics()
+    return paths
+
+
+def walks(points):
+    walk = []
+    for p in points:
+        if p is None:
+            if walk:
+                yield walk
+            walk = []
+        else:
+            walk.append((float(p[0]), float(p[1])))
+    if walk:
+        yield walk
+
+
+def rungs(points):
+    found = set()
+    for walk in walks(points):
+        for a, b in zip(walk, walk[1:]):
+            if abs(a[1] - b[1]) < 1e-6 and abs(a[0] - b[0]) > 1e-6:
+                x0, x1 = sorted((a[0], b[0]))
+                found.add((round(a[1], 3), round(x0, 3), round(x1, 3)))
+    return found
+
+
+class TestScanlineFill(unittest.TestCase):
+    def test_scanline_rect(self):
+        fill = ScanlineFill(5)
+        fill += [(0, 0), (100, 0), (100, 200), (0, 200)]
+        points = fill.get_fill()
+        self.assertEqual(len(list(walks(points))), 1)
+        found = rungs(points)
+        self.assertEqual(found, {(5.0 * k, 0.0, 100.0) for k in range(1, 40)})
+
+    def test_scanline_matches_eulerian(self):
+        outer = circle(500, 500, 300)
+        inner = circle(520, 480, 100)
+        scan = ScanlineFill(7)
+        scan += outer
+        scan += inner
+        efill = EulerianFill(7)
+        efill += outer
+        efill += inner
+        scan_points = scan.get_fill()
+        found = rungs(scan_points)
+        self.assertTrue(found.issubset(rungs(efill.get_fill())))
+        self.assertEqual(len(found), len(set((r[0], r[1]) for r in found)))
+        for y, x0, x1 in found:
+            x = (x0 + x1) / 2.0
+            self.assertLess(math.hypot(x - 500, y - 500), 300)
+            self.assertGreater(math.hypot(x - 520, y - 480), 100)
+
+        # Every connection between rungs follows the outlines.
+        for walk in walks(scan_points):
+            for a, b in zip(walk, walk[1:]):
+                if abs(a[1] - b[1]) < 1e-6:
+                    continue
+                for p in (a, b):
+                    r = min(
+                        abs(math.hypot(p[0] - 500, p[1] - 500) - 300),
+                        abs(math.hypot(p[0] - 520, p[1] - 480) - 100),
+                    )
+                    self.assertLess(r, 2.0)
+
+    def test_flatten(self):
+        path = Path("M0,0 L100,0 C100,100 0,100 0,0 Z")
+        coarse = flatten(path, 10.0)
+        fine = flatten(path, 0.1)
+        self.assertEqual(coarse[0], (0.0, 0.0))
+        self.assertEqual(coarse[1], (100.0, 0.0))
+        self.assertLess(len(coarse), len(fine))
+        self.assertEqual(len(flatten(Path(Rect(0, 0, 10, 10)), 0.1)), 5)
+
+    def test_hatch_fill_types(self):
+        fills = {"a": (Angle.degrees(30), 10.0, None)}
+        lookup = [
+            hatch_fill([Path(p) for p in logo()], fills, hatch_type)["a"]
+            for hatch_type in (0, 1)
+        ]
+        for polylines in lookup:
+            self.assertTrue(polylines)
+            for polyline in polylines:
+                self.assertGreater(len(polyline.points), 1)
+
+    @benchmark
+    def test_hatch_fill_benchmark(self):
+        """
+        The scanline fill hatches a complex logo faster than the eulerian fill.
+        """
+        paths = logo()
+        fills = {"a": (Angle.degrees(15), 2.0, None)}
+        scanline_time, scanline = timed(hatch_fill, [Path(p) for p in paths], fills, 0)
+        eulerian_time, eulerian = timed(hatch_fill, [Path(p) for p in paths], fills, 1)
+        self.assertTrue(scanline["a"])
+        self.assertTrue(eulerian["a"])
+        self.assertLess(scanline_time * 2, eulerian_time)
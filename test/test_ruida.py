@@ -0,0 +1,307 @@
+import asyncio
+import random
+import unittest
+from io import BytesIO
+
+from meerk40t.kernelserver import AsyncTransport
+from meerk40t.ruida.device import RuidaDecoder, RuidaEmulator
+from test.benchmark import benchmark, timed
+
+
+class RecordingChannel(list):
+    def __call__(self, message, *args, **kwargs):
+        self.append(message)
+
+
+class EmulatorContext:
+    def __init__(self):
+        self.channels = dict()
+
+    def channel(self, name, *args, **kwargs):
+        return self.channels.setdefault(name, RecordingChannel())
+
+
+def program(count=200, seed=1):
+    """
+    Unswizzled ruida program, of the commands RDWorks sends for a job of cuts.
+    """
+    r = random.Random(seed)
+    encode32 = RuidaEmulator.encode32
+    encode14 = RuidaEmulator.encode14
+    data = bytearray()
+    data += bytes([0xE7, 0x03] + encode32(0) + encode32(0))
+    data += bytes([0xE7, 0x07] + encode32(100500) + encode32(100000))
+    data += bytes([0xCA, 0x01, 0x00])
+    data += bytes([0xCA, 0x02, 0x00])
+    data += bytes([0xCA, 0x06, 0x00] + encode32(0xFF))
+    data += bytes([0xE7, 0x52, 0x00] + encode32(0) + encode32(0))
+    data += bytes([0xD9, 0x10, 0x02] + encode32(0) + encode32(0))
+    data += bytes([0xC9, 0x02] + encode32(100000))
+    data += bytes([0xC6, 0x01] + encode14(8192))
+    data += bytes([0xC6, 0x31, 0x00] + encode14(4096))
+    data += bytes([0xDA, 0x00, 0x05, 0x7E])
+    for i in range(count):
+        x = r.randint(0, 100000)
+        y = r.randint(0, 100000)
+        data += bytes([0x88] + encode32(x) + encode32(y))
+        data += bytes([0xA8] + encode32(x + 500) + encode32(y))
+        data += bytes([0xA9] + encode14(r.randint(-500, 500)) + encode14(-20))
+        data += bytes([0xAA] + encode14(r.randint(-500, 500)))
+        data += bytes([0xAB] + encode14(r.randint(-500, 500)))
+        if i % 50 == 0:
+            data += bytes([0xC9, 0x02] + encode32(r.randint(1000, 100000)))
+            data += bytes([0xCA, 0x01, 0x00])
+            data += bytes([0xE7, 0x00])
+    data += bytes([0xE5])
+    data += bytes([0xD7])
+    return bytes(data)
+
+
+def chunks(data, seed=2, maximum=1472):
+    r = random.Random(seed)
+    index = 0
+    while index < len(data):
+        size = r.randint(1, maximum)
+        yield data[index : index + size]
+        index += size
+
+
+def parse_commands_bytewise(data):
+    """
+    The byte by byte command parsing the decoder replaced.
+    """
+    f = BytesIO(data)
+    commands = list()
+    array = list()
+    while True:
+        byte = f.read(1)
+        if len(byte) == 0:
+            break
+        b = ord(byte)
+        if b >= 0x80 and len(array) > 0:
+            commands.append(bytes(array))
+            array.clear()
+        array.append(b)
+    if len(array) > 0:
+        commands.append(bytes(array))
+    return commands
+
+
+def emulator():
+    return RuidaEmulator(EmulatorContext(), "ruida")
+
+
+class TestRuidaSwizzle(unittest.TestCase):
+    def test_swizzle_lut(self):
+        everything = bytes(range(256))
+        for magic in (0x88, 0x11, 0x38):
+            swizzled = RuidaEmulator.encode_bytes(everything, magic)
+            self.assertEqual(
+                swizzled,
+                bytes(RuidaEmulator.swizzle_byte(b, magic) for b in everything),
+            )
+            self.assertEqual(RuidaEmulator.decode_bytes(swizzled, magic), everything)
+        e = emulator()
+        self.assertEqual(e.unswizzle(e.swizzle([0x88, 0x01, 0x7F])), b"\x88\x01\x7f")
+
+
+class TestRuidaDecoder(unittest.TestCase):
+    def test_decoder_whole(self):
+        data = b"\x01\x02" + program(20)
+        self.assertEqual(RuidaDecoder.commands(data), parse_commands_bytewise(data))
+        self.assertEqual(
+            list(RuidaEmulator.parse_commands(BytesIO(data))),
+            parse_commands_bytewise(data),
+        )
+
+    def test_decoder_resume(self):
+        data = program(50)
+        expected = RuidaDecoder.commands(data)
+        for size in range(1, 16):
+            decoder = RuidaDecoder()
+            commands = list()
+            for index in range(0, len(data), size):
+                commands.extend(decoder.feed(data[index : index + size]))
+            commands.extend(decoder.flush())
+            self.assertEqual(commands, expected)
+
+    def test_decoder_immediate(self):
+        """
+        Complete commands are decoded without waiting for the next chunk.
+        """
+        decoder = RuidaDecoder()
+        self.assertEqual(decoder.feed(b"\xda\x00\x05\x7e"), [b"\xda\x00\x05\x7e"])
+        self.assertEqual(decoder.feed(b"\xd7"), [b"\xd7"])
+        self.assertEqual(decoder.feed(b"\xda\x00"), [])
+        self.assertEqual(decoder.feed(b"\x05\x7e\xcc"), [b"\xda\x00\x05\x7e", b"\xcc"])
+        self.assertEqual(decoder.feed(b"\xc6"), [])
+        self.assertEqual(decoder.flush(), [b"\xc6"])
+
+    def test_emulator_replay(self):
+        """
+        Replaying a swizzled program in packets is the same as loading it whole.
+        """
+        data = program(100)
+        loaded = emulator()
+        loaded.write(BytesIO(data))
+        streamed = emulator()
+        for chunk in chunks(loaded.swizzle(data)):
+            streamed.stream_write(chunk)
+        log = loaded.context.channels["ruida"]
+        self.assertGreater(len(log), 500)
+        self.assertEqual(streamed.context.channels["ruida"], log)
+        self.assertNotIn("Crashed", "".join(log))
+
+        # Tcp chunks split any command, including those of unknown length.
+        for size in (1, 5, 7):
+            streamed = emulator()
+            swizzled = streamed.swizzle(data)
+            for index in range(0, len(swizzled), size):
+                streamed.stream_write(swizzled[index : index + size])
+            self.assertEqual(streamed.context.channels["ruida"], log, size)
+
+
+class FakeTransport:
+    def __init__(self):
+        self.reading = True
+
+    def pause_reading(self):
+        self.reading = False
+
+    def resume_reading(self):
+        self.reading = True
+
+
+class TestAsyncTransport(unittest.TestCase):
+    def replay(self, protocol):
+        """
+        Replays a swizzled program to an emulator through the transport. UDP packets carry a checksum.
+        """
+        data = program(100)
+        streamed = emulator()
+        swizzled = streamed.swizzle(data)
+        packets = list(chunks(swizzled, maximum=1024))
+        if protocol == "tcp":
+            handler = streamed.stream_write
+        else:
+            handler = streamed.checksum_write
+            packets = [
+                bytes([(sum(p) >> 8) & 0xFF, sum(p) & 0xFF]) + p for p in packets
+            ]
+
+        async def run():
+            server = AsyncTransport(handler, host="127.0.0.1", protocol=protocol)
+            await server.start()
+            loop = asyncio.get_running_loop()
+            if protocol == "tcp":
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                for packet in packets:
+                    writer.write(packet)
+                    await writer.drain()
+                writer.close()
+            else:
+                client, p = await loop.create_datagram_endpoint(
+                    asyncio.DatagramProtocol, remote_addr=("127.0.0.1", server.port)
+                )
+                for packet in packets:
+                    client.sendto(packet)
+                    await asyncio.sleep(0.001)
+                client.close()
+            for i in range(500):
+                log = streamed.context.channels["ruida"]
+                if log and log[-1].startswith("--> d7"):
+                    break
+                await asyncio.sleep(0.01)
+            await server.drain()
+            await server.close()
+
+        asyncio.run(run())
+        loaded = emulator()
+        loaded.write(BytesIO(data))
+        return streamed, loaded, packets
+
+    def test_transport_tcp_loopback(self):
+        streamed, loaded, packets = self.replay("tcp")
+        self.assertEqual(
+            streamed.context.channels["ruida"], loaded.context.channels["ruida"]
+        )
+
+    def test_transport_udp_loopback(self):
+        streamed, loaded, packets = self.replay("udp")
+        log = [m for m in streamed.context.channels["ruida"] if m.startswith("-->")]
+        expected = [m for m in loaded.context.channels["ruida"] if m.startswith("-->")]
+        self.assertEqual(log, expected)
+        replies = streamed.context.channels["ruida_reply"]
+        self.assertEqual(len(replies), len(packets) + 1)
+        self.assertEqual(replies[0], streamed.swizzle(b"\xcc"))
+
+    def test_transport_backpressure(self):
+        handled = list()
+
+        async def run():
+            server = AsyncTransport(handled.append, host="127.0.0.1", max_queue=4)
+            await server.start()
+            tcp = FakeTransport()
+            for i in range(10):
+                server.received(b"tcp %d" % i, transport=tcp)
+            self.assertFalse(tcp.reading)
+            for i in range(10):
+                server.received(b"udp %d" % i, address=("127.0.0.1", 1))
+            self.assertEqual(server.dropped, 10)
+            self.assertEqual(server.address, ("127.0.0.1", 1))
+            await server.drain()
+            self.assertTrue(tcp.reading)
+            await server.close()
+
+        asyncio.run(run())
+        self.assertEqual(handled, [b"tcp %d" % i for i in range(10)])
+
+    def test_transport_handler_error(self):
+        """
+        An exception raised by the handler is logged, later data is still handled.
+        """
+        handled = list()
+        log = RecordingChannel()
+
+        def handler(data):
+            if data == b"bad":
+                raise IndexError("index out of range")
+            handled.append(data)
+
+        async def run():
+            server = AsyncTransport(handler, host="127.0.0.1", log=log)
+            await server.start()
+            for data in (b"one", b"bad", b"two"):
+                server.received(data, address=("127.0.0.1", 1))
+            await server.drain()
+            await asyncio.sleep(0)
+            await server.close()
+            self.assertEqual(server.errors, 1)
+
+        asyncio.run(run())
+        self.assertEqual(handled, [b"one", b"two"])
+        self.assertEqual(len(log), 1)
+
+    @benchmark
+    def test_decode_benchmark(self):
+        """
+        Translating and decoding with the tables and decoder is faster than byte by byte.
+        """
+        data = program(20000)
+        e = emulator()
+        swizzled = e.swizzle(data)
+        lut = list(e.lut_unswizzle)
+
+        def bytewise():
+            array = list()
+            for b in swizzled:
+                array.append(lut[b])
+            return parse_commands_bytewise(bytes(array))
+
+        def translated():
+            return RuidaDecoder.commands(e.unswizzle(swizzled))
+
+        bytewise_time, expected = timed(bytewise)
+        translated_time, commands = timed(translated)
+        self.assertEqual(commands, expected)
+        self.assertLess(translated_time * 5, bytewise_time)
@@ -0,0 +1,195 @@
+import random
+import unittest
+
+import numpy as np
+
+from meerk40t.svgelements import (
+    Arc,
+    CompiledPath,
+    CubicBezier,
+    Line,
+    Matrix,
+    Path,
+    Point,
+    QuadraticBezier,
+    Shape,
+)
+from test.benchmark import benchmark, timed
+
+D = (
+    "M10,10 L100,20 Q150,80 60,120 C0,200 200,200 180,100 A50,30 30 1,1 250,60 "
+    "A40,40 0 0,0 300,300 Z M400,400 h50 v50 z M500,0 C600,100 400,100 500,0"
+)
+# Without cubics or elliptical arcs, so the scalar lengths are quick to calculate.
+D_SCALAR = (
+    "M10,10 L100,20 Q150,80 60,120 A90,90 30 1,1 250,60 A400,400 0 0,0 300,300 Z "
+    "M400,400 h50 v50 z"
+)
+
+
+def random_path(count, seed=1, cubics=True):
+    """
+    Random path of lines, quads, circular arcs and optionally cubics. The scalar lengths of
+    cubics and elliptical arcs are very slow to calculate without scipy.
+    """
+    r = random.Random(seed)
+    path = Path()
+    path.move((r.uniform(0, 1000), r.uniform(0, 1000)))
+    for i in range(count):
+        kind = i % 4
+        end = (r.uniform(0, 1000), r.uniform(0, 1000))
+        if kind == 0:
+            path.line(end)
+        elif kind == 1:
+            path.quad((r.uniform(0, 1000), r.uniform(0, 1000)), end)
+        elif kind == 2 and cubics:
+            path.cubic(
+                (r.uniform(0, 1000), r.uniform(0, 1000)),
+                (r.uniform(0, 1000), r.uniform(0, 1000)),
+                end,
+            )
+        elif kind == 2:
+            path.line(end)
+        else:
+            radius = r.uniform(50, 500)
+            path.arc(
+                radius,
+                radius,
+                r.uniform(0, 360),
+                int(r.random() > 0.5),
+                int(r.random() > 0.5),
+                end,
+            )
+    return path
+
+
+class TestCompiledPath(unittest.TestCase):
+    def assertPointsAlmostEqual(self, a, b, delta=1e-6):
+        self.assertEqual(len(a), len(b))
+        self.assertLess(float(np.max(np.abs(np.asarray(a) - np.asarray(b)))), delta)
+
+    def test_compiled_points(self):
+        path = Path(D)
+        compiled = path.compiled()
+        self.assertEqual(len(compiled), len(path))
+        t = np.linspace(0, 1, 51)
+        for index, segment in enumerate(path):
+            if segment.start is None:
+                continue
+            points = compiled.evaluate(np.full(len(t), index), t)
+            self.assertPointsAlmostEqual(points, segment.npoint(t))
+
+    def test_compiled_lengths(self):
+        path = random_path(40, cubics=False)
+        compiled = path.compiled()
+        lengths = compiled.lengths()
+        for segment, length in zip(path, lengths):
+            self.assertAlmostEqual(length, segment.length(), delta=1e-6)
+        self.assertAlmostEqual(compiled.length(), path.length(), delta=1e-5)
+        self.assertEqual(compiled.positions()[-1], 1.0)
+
+    def test_compiled_curve_lengths(self):
+        """
+        Cubic lengths, including curves near a cusp, against a fine polyline.
+        """
+        path = random_path(80)
+        path.cubic((0, 0), (1000, 1000), (0, 1000))
+        path.cubic((1000, 0), (0, 0), (1000, 1000))
+        lengths = path.compiled().lengths()
+        t = np.linspace(0, 1, 100001)
+        for segment, length in zip(path, lengths):
+            if isinstance(segment, CubicBezier):
+                points = segment.npoint(t)
+                polyline = np.sum(np.hypot(*np.diff(points, axis=0).T))
+                self.assertAlmostEqual(length / polyline, 1.0, delta=1e-6)
+
+    def test_compiled_npoint(self):
+        for path in (Path(D_SCALAR), random_path(40, cubics=False)):
+            positions = np.linspace(0, 1, 1001)
+            scalar = Shape.npoint(path, positions)
+            self.assertPointsAlmostEqual(path.npoint(positions), scalar, 1e-4)
+            for position in (0.0, 0.25, 0.5, 0.999, 1.0):
+                self.assertTrue(
+                    path.point(position).distance_to(
+                        path.compiled().point(position)
+                    )
+                    < 1e-4
+                )
+
+    def test_compiled_zero_length(self):
+        path = Path("M10,10 L10,10 L10,10")
+        compiled = path.compiled()
+        self.assertEqual(compiled.length(), 0)
+        self.assertEqual(compiled.point(0.5), Point(10, 10))
+        self.assertEqual(path.point(0.5), Point(10, 10))
+        self.assertIsNone(Path().bbox())
+        self.assertIsNone(Path().npoint([0.5]))
+
+    def test_compiled_bbox(self):
+        matrix = Matrix("rotate(33) scale(2,0.5) translate(10,5)")
+        for path in (Path(D), random_path(40)):
+            for transform in (Matrix(), matrix):
+                path.transform = Matrix(transform)
+                expected = Shape.bbox(path)
+                bbox = path.bbox()
+                for a, b in zip(bbox, expected):
+                    self.assertAlmostEqual(a, b, delta=1e-6)
+            path.stroke = "red"
+            path.stroke_width = 4
+            self.assertPointsAlmostEqual(
+                path.bbox(with_stroke=True), Shape.bbox(path, with_stroke=True)
+            )
+            bbox = path.bbox(with_stroke=True)
+            path.stroke_width = "4"
+            self.assertPointsAlmostEqual(path.bbox(with_stroke=True), bbox)
+
+    def test_compiled_transformed(self):
+        path = Path(D)
+        matrix = Matrix("rotate(20) scale(1.5, 0.75) translate(10, 5)")
+        compiled = path.compiled().transformed(matrix)
+        reified = abs(path * matrix)
+        self.assertPointsAlmostEqual(compiled.points, reified.compiled().points)
+        self.assertPointsAlmostEqual(compiled.arcs, reified.compiled().arcs)
+        positions = np.linspace(0, 1, 101)
+        self.assertPointsAlmostEqual(
+            compiled.npoint(positions), reified.compiled().npoint(positions)
+        )
+        for a, b in zip(compiled.bbox(), Shape.bbox(reified)):
+            self.assertAlmostEqual(a, b, delta=1e-6)
+
+    def test_compiled_invalidate(self):
+        path = Path("M0,0 L100,0")
+        self.assertEqual(path.bbox(), (0, 0, 100, 0))
+        compiled = path.compiled()
+        self.assertIs(path.compiled(), compiled)
+        path.append(Line((100, 0), (100, 50)))
+        self.assertEqual(path.bbox(), (0, 0, 100, 50))
+        path[2] = CubicBezier((100, 0), (200, 0), (200, 50), (100, 50))
+        self.assertAlmostEqual(path.bbox()[2], 175)
+        path.insert(2, QuadraticBezier((100, 0), (100, -100), (100, 0)))
+        self.assertAlmostEqual(path.bbox()[1], -50)
+        del path[2]
+        self.assertAlmostEqual(path.bbox()[1], 0)
+        path.extend([Arc(start=(100, 50), end=(0, 50), control=(50, 100))])
+        self.assertAlmostEqual(path.bbox()[3], 100)
+        path *= "scale(2)"
+        path.reify()
+        self.assertAlmostEqual(path.bbox(transformed=False)[3], 200)
+        path.reverse()
+        self.assertEqual(path.compiled().point(0), path.point(0))
+
+    @benchmark
+    def test_compiled_benchmark(self):
+        """
+        The compiled path is faster than the segment by segment calculations.
+        """
+        path = random_path(2000, cubics=False)
+        positions = np.linspace(0, 1, 20000)
+        path.length()
+        compile_time, compiled = timed(path.compiled)
+        bbox_time, bbox = timed(compiled.bbox)
+        npoint_time, points = timed(compiled.npoint, positions)
+        old_bbox_time, old_bbox = timed(Shape.bbox, path)
+        old_npoint_time, old_points = timed(Shape.npoint, path, positions)
+        self.assertLess(compile_time + bbox_time, old_bbox_time)
+        self.assertLess(npoint_time, old_npoint_time)
@@ -0,0 +1,111 @@
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from meerk40t.extra.vectrace import _vectrace, simplify_contour, trace_contours
+from meerk40t.kernel import Kernel
+from meerk40t.svgelements import Close, Matrix, Move
+from test.benchmark import benchmark, timed
+
+
+def area(contour):
+    x = contour[:, 0].astype(float)
+    y = contour[:, 1].astype(float)
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+
+def blobs(size):
+    image = Image.new("L", (size, size), 255)
+    draw = ImageDraw.Draw(image)
+    for i in range(size // 10):
+        x = (i * 7919) % size
+        y = (i * 104729) % size
+        r = 3 + (i * 31) % (size // 8)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=0 if i % 3 else 255)
+    return image
+
+
+class TestVectrace(unittest.TestCase):
+    def test_trace_hole(self):
+        mask = np.zeros((6, 6), dtype=bool)
+        mask[1:5, 1:5] = True
+        mask[2:4, 2:4] = False
+        contours = trace_contours(mask)
+        self.assertEqual(len(contours), 2)
+        self.assertEqual(contours[0].tolist(), [[1, 1], [5, 1], [5, 5], [1, 5]])
+        # Holes run the other way around.
+        self.assertEqual(area(contours[0]), 16)
+        self.assertEqual(area(contours[1]), -4)
+
+    def test_trace_diagonal(self):
+        mask = np.zeros((3, 3), dtype=bool)
+        mask[0, 0] = True
+        mask[1, 1] = True
+        contours = trace_contours(mask)
+        self.assertEqual(len(contours), 2)
+        for contour in contours:
+            self.assertEqual(len(contour), 4)
+            self.assertEqual(area(contour), 1)
+
+    def test_trace_area(self):
+        image = blobs(300)
+        mask = np.asarray(image) <= 127
+        contours = trace_contours(mask)
+        self.assertEqual(sum(area(c) for c in contours), mask.sum())
+        pixels = image.point(lambda e: int(e > 127) * 255).load()
+        old = list(_vectrace(pixels, 300, 300))
+        # The old tracer repeats the first point at the end.
+        self.assertEqual(sum(len(c) for c in contours), sum(len(p) - 1 for p in old))
+
+    def test_simplify(self):
+        image = Image.new("L", (200, 200), 255)
+        ImageDraw.Draw(image).ellipse((20, 20, 180, 180), fill=0)
+        contour = trace_contours(np.asarray(image) <= 127)[0]
+        simple = simplify_contour(contour, 1.0)
+        self.assertLess(len(simple), len(contour) / 2)
+        self.assertAlmostEqual(area(simple) / area(contour), 1.0, delta=0.01)
+        self.assertEqual(len(simplify_contour(contour, 0)), len(contour))
+
+    def test_vectrace_command(self):
+        kernel = Kernel("MeerK40t", "0.0.0-testing", "MeerK40t", ansi=False)
+        try:
+            from meerk40t.core import elements
+            from meerk40t.extra import vectrace
+            from meerk40t.image import imagetools
+
+            kernel.add_plugin(elements.plugin)
+            kernel.add_plugin(imagetools.plugin)
+            kernel.add_plugin(vectrace.plugin)
+            kernel()
+            image = Image.new("L", (6, 6), 255)
+            image.paste(0, (1, 1, 5, 5))
+            image.paste(255, (2, 2, 4, 4))
+            node = kernel.elements.elem_branch.add(
+                image=image, matrix=Matrix("scale(10)"), type="elem image"
+            )
+            node.emphasized = True
+            kernel.console("image vectrace\n")
+            paths = [e for e in kernel.elements.elems() if e.type == "elem path"]
+            self.assertEqual(len(paths), 1)
+            path = paths[0].path
+            self.assertEqual(sum(1 for s in path if isinstance(s, Move)), 2)
+            self.assertEqual(sum(1 for s in path if isinstance(s, Close)), 2)
+            self.assertEqual(paths[0].matrix, Matrix("scale(10)"))
+        finally:
+            kernel.shutdown()
+
+    @benchmark
+    def test_vectrace_benchmark(self):
+        """
+        The run-length tracer is faster than the pixel walking tracer, and simplifying its
+        contours reduces their points.
+        """
+        image = blobs(1000)
+        trace_time, contours = timed(trace_contours, np.asarray(image) <= 127)
+        simple = [simplify_contour(c, 1.0) for c in contours]
+        pixels = image.point(lambda e: int(e > 127) * 255).load()
+        walk_time, walked = timed(list, _vectrace(pixels, 1000, 1000))
+        self.assertTrue(walked)
+        self.assertLess(trace_time * 3, walk_time)
+        self.assertLess(sum(len(c) for c in simple), sum(len(c) for c in contours))